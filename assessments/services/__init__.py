@@ -0,0 +1 @@
+# Assessments services package
@@ -0,0 +1,196 @@
+"""
+Cohort Progress Service
+
+Builds the learner × activity competency matrix for a set of enrollments
+from one module query, one activity query and one result query, grouped in
+memory. Facilitator cohort and single-learner views render from it at a
+constant query count, however many learners or activities there are.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from academics.models import Module
+from assessments.models import AssessmentActivity, AssessmentResult
+
+
+SCORE_BANDS = [
+    (30, '0_30'),
+    (50, '31_50'),
+    (70, '51_70'),
+    (85, '71_85'),
+]
+TOP_SCORE_BAND = '86_100'
+
+
+def score_band(avg_score) -> str:
+    """Return the score distribution bucket for an average percentage."""
+    for upper, band in SCORE_BANDS:
+        if avg_score <= upper:
+            return band
+    return TOP_SCORE_BAND
+
+
+class CohortProgressMatrix:
+    """
+    Competency matrix for a set of enrollments.
+
+    Usage:
+        matrix = CohortProgressMatrix(enrollments)
+        matrix.enrollment_summary(enrollment)
+        matrix.module_breakdown(enrollment)
+    """
+
+    def __init__(self, enrollments):
+        self.enrollments = list(enrollments)
+        qualification_ids = {e.qualification_id for e in self.enrollments}
+        enrollment_ids = [e.pk for e in self.enrollments]
+
+        # Modules per qualification (sequence order)
+        self._modules: Dict[int, List] = defaultdict(list)
+        for module in Module.objects.filter(
+            qualification_id__in=qualification_ids
+        ).order_by('sequence_order', 'pk'):
+            self._modules[module.qualification_id].append(module)
+
+        # Active activities per qualification and per module
+        self._activities: Dict[int, List] = defaultdict(list)
+        self._module_activities: Dict[int, List] = defaultdict(list)
+        for activity in AssessmentActivity.objects.filter(
+            module__qualification_id__in=qualification_ids,
+            is_active=True
+        ).select_related('module').order_by('sequence_order', 'pk'):
+            self._activities[activity.module.qualification_id].append(activity)
+            self._module_activities[activity.module_id].append(activity)
+
+        # Results per enrollment and per (enrollment, activity), latest attempt first
+        self._results: Dict[int, List] = defaultdict(list)
+        self._attempts: Dict[tuple, List] = defaultdict(list)
+        for result in AssessmentResult.objects.filter(
+            enrollment_id__in=enrollment_ids
+        ).order_by('-attempt_number', '-pk'):
+            self._results[result.enrollment_id].append(result)
+            self._attempts[(result.enrollment_id, result.activity_id)].append(result)
+
+    # ===== LOOKUPS =====
+
+    def attempts(self, enrollment, activity) -> List:
+        """All results for an activity, latest attempt first."""
+        return self._attempts.get((enrollment.pk, activity.pk), [])
+
+    def average_score(self, enrollment) -> Optional[Decimal]:
+        """Average percentage_score over all scored results, or None."""
+        scores = [
+            r.percentage_score for r in self._results.get(enrollment.pk, [])
+            if r.percentage_score is not None
+        ]
+        if not scores:
+            return None
+        return sum(scores, Decimal('0')) / len(scores)
+
+    # ===== SUMMARIES =====
+
+    def enrollment_summary(self, enrollment) -> Dict:
+        """
+        Competency counts for one enrollment across its qualification's
+        active activities.
+
+        Returns:
+            Dict with total_activities, competent, pending, progress and
+            avg_score (raw average, or None when nothing is scored)
+        """
+        total_activities = len(self._activities.get(enrollment.qualification_id, []))
+        results = self._results.get(enrollment.pk, [])
+        competent = len({r.activity_id for r in results if r.result == 'C'})
+        attempted = len({r.activity_id for r in results})
+
+        return {
+            'total_activities': total_activities,
+            'competent': competent,
+            'pending': total_activities - attempted,
+            'progress': round((competent / total_activities * 100) if total_activities > 0 else 0),
+            'avg_score': self.average_score(enrollment),
+        }
+
+    def module_breakdown(self, enrollment) -> List[Dict]:
+        """
+        Per-module activity status for one enrollment (active modules only).
+
+        Returns:
+            List of module dicts with activities, competent_count,
+            total_count and progress
+        """
+        module_data = []
+
+        for module in self._modules.get(enrollment.qualification_id, []):
+            if not module.is_active:
+                continue
+
+            activity_data = []
+            for activity in self._module_activities.get(module.pk, []):
+                results = self.attempts(enrollment, activity)
+                latest = results[0] if results else None
+                is_competent = latest and latest.result == 'C'
+
+                activity_data.append({
+                    'activity': activity,
+                    'results': results,
+                    'latest_result': latest,
+                    'status': 'competent' if is_competent else
+                             'nyc' if latest and latest.result == 'NYC' else
+                             'pending' if latest else 'not_started',
+                    'can_grade': not is_competent and (not latest or len(results) < activity.max_attempts)
+                })
+
+            competent_count = len([a for a in activity_data if a['status'] == 'competent'])
+
+            module_data.append({
+                'module': module,
+                'activities': activity_data,
+                'competent_count': competent_count,
+                'total_count': len(activity_data),
+                'progress': round(competent_count / len(activity_data) * 100) if activity_data else 0
+            })
+
+        return module_data
+
+    def cohort_summary(self) -> Dict:
+        """
+        Annotate each enrollment with progress, avg_score and pending_count
+        and compute the cohort overview figures.
+
+        Returns:
+            Dict with enrollments, active_learners, pending_assessments,
+            avg_progress, pass_rate and score_distribution
+        """
+        total_progress = 0
+        total_score = 0
+        score_count = 0
+        score_distribution = {
+            '0_30': 0, '31_50': 0, '51_70': 0, '71_85': 0, '86_100': 0
+        }
+
+        for enrollment in self.enrollments:
+            summary = self.enrollment_summary(enrollment)
+            enrollment.progress = summary['progress']
+            enrollment.pending_count = summary['pending']
+            total_progress += summary['progress']
+
+            avg = summary['avg_score']
+            if avg is not None:
+                enrollment.avg_score = round(avg)
+                total_score += avg
+                score_count += 1
+                score_distribution[score_band(avg)] += 1
+            else:
+                enrollment.avg_score = None
+
+        count = len(self.enrollments)
+        return {
+            'enrollments': self.enrollments,
+            'active_learners': sum(1 for e in self.enrollments if e.status == 'ACTIVE'),
+            'pending_assessments': sum(e.pending_count for e in self.enrollments),
+            'avg_progress': round(total_progress / count) if count else 0,
+            'pass_rate': round(total_score / score_count) if score_count > 0 else 0,
+            'score_distribution': score_distribution,
+        }
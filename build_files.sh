@@ -7,6 +7,9 @@ pip install -r requirements.txt
 # Run database migrations
 python manage.py migrate --noinput
 
+# Index rows that have no full-text search document yet
+python manage.py rebuild_search_index --missing
+
 # Collect static files
 python manage.py collectstatic --noinput
 
@@ -101,6 +101,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
+    'workflows.middleware.TransitionAttemptBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -258,10 +259,31 @@ if CELERY_AVAILABLE:
             'task': 'finance.tasks.send_payment_reminders',
             'schedule': timedelta(hours=24),
         },
+        'recalculate-collection-metrics': {
+            'task': 'finance.tasks.recalculate_collection_metrics',
+            'schedule': crontab(hour=2, minute=0),  # Full rebuild nightly
+        },
+        'recalculate-collection-metrics-incremental': {
+            'task': 'finance.tasks.recalculate_collection_metrics',
+            'schedule': timedelta(minutes=30),
+            'kwargs': {'incremental': True},
+        },
+        'capture-intake-capacity-snapshots': {
+            'task': 'intakes.tasks.capture_capacity_snapshots',
+            'schedule': crontab(hour=23, minute=30),  # End of day
+        },
         'process-scheduled-reports': {
             'task': 'reporting.tasks.process_scheduled_reports',
             'schedule': timedelta(hours=1),
         },
+        'purge-expired-sessions': {
+            'task': 'core.services.sessions.purge_expired_sessions_task',
+            'schedule': crontab(hour=3, minute=30),  # Nightly
+        },
+        'compact-transition-attempts': {
+            'task': 'workflows.tasks.compact_transition_attempts',
+            'schedule': crontab(hour=3, minute=0),  # Nightly
+        },
         # CRM Automation Tasks
         'process-scheduled-communications': {
             'task': 'crm.tasks.process_scheduled_communications',
@@ -311,8 +333,21 @@ else:
 # =====================================================
 # Session Settings
 # =====================================================
-# Use database sessions for development (no Redis required)
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# SESSION_TIER selects the session backend:
+#   cached_db      - hot sessions served from CACHES, written through to the DB
+#   db             - database only
+#   signed_cookies - no server-side storage (session data must stay small)
+# cached_db is the default only when the shared Redis cache is in use; with
+# per-process locmem, workers could read each other's stale cached sessions.
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_TIER = os.environ.get('SESSION_TIER', 'cached_db' if REDIS_URL and not DEBUG else 'db')
+SESSION_ENGINE = SESSION_ENGINES.get(SESSION_TIER, SESSION_ENGINES['db'])
+# Expired sessions deleted per statement by the nightly purge
+SESSION_PURGE_CHUNK_SIZE = 5000
 SESSION_COOKIE_AGE = 86400 * 7  # 7 days
 SESSION_COOKIE_SECURE = not DEBUG
 SESSION_COOKIE_HTTPONLY = True
@@ -424,6 +459,11 @@ NINJA_JWT = {
     'SIGNING_KEY': SECRET_KEY,
 }
 
+# Auth activity tracking: validated JWT sessions are cached briefly and
+# last-activity timestamps are only rewritten once they are this old
+AUTH_SESSION_CACHE_SECONDS = 30
+AUTH_ACTIVITY_GRANULARITY_SECONDS = 60
+
 
 # =====================================================
 # Simple History Settings
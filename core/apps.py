@@ -11,3 +11,6 @@ class CoreConfig(AppConfig):
             from . import task_signals  # noqa
         except ImportError:
             pass
+        
+        from .services.search import connect_search_signals
+        connect_search_signals()
@@ -6,6 +6,12 @@ tokens stored server-side.
 
 Access tokens are JWTs (HS256) signed with settings.NINJA_JWT['SIGNING_KEY'].
 Refresh tokens are opaque random strings and are stored hashed in the DB.
+
+Activity tracking is throttled: validated sessions are cached for
+AUTH_SESSION_CACHE_SECONDS, and last-activity timestamps (UserAuthSession
+.last_used_at, the Django session's last_activity_ts) are only written once
+they are AUTH_ACTIVITY_GRANULARITY_SECONDS old. Idle timeouts allow for that
+lag, so a user is never logged out early and at most one granularity late.
 """
 
 from __future__ import annotations
@@ -21,6 +27,7 @@ from typing import Any, Optional, Tuple
 import jwt
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.utils import timezone
 
@@ -78,6 +85,46 @@ def get_idle_timeout() -> Optional[timedelta]:
         return None
 
 
+def get_activity_granularity() -> timedelta:
+    seconds = getattr(settings, "AUTH_ACTIVITY_GRANULARITY_SECONDS", 60)
+    try:
+        return timedelta(seconds=max(int(seconds), 0))
+    except Exception:
+        return timedelta(seconds=60)
+
+
+def get_session_cache_ttl() -> int:
+    try:
+        return max(int(getattr(settings, "AUTH_SESSION_CACHE_SECONDS", 30)), 0)
+    except Exception:
+        return 30
+
+
+def activity_is_stale(last_activity, now) -> bool:
+    """True when a stored last-activity time should be rewritten."""
+    return last_activity is None or now - last_activity >= get_activity_granularity()
+
+
+def is_idle(last_activity, now, idle_timeout: timedelta) -> bool:
+    """Idle check against a stored timestamp that may lag by up to one granularity."""
+    return last_activity is not None and now - last_activity > idle_timeout + get_activity_granularity()
+
+
+def _session_cache_key(session_id) -> str:
+    return f"core:auth_session:{session_id}"
+
+
+def cache_auth_session(session: "UserAuthSession") -> None:
+    """Cache a validated session (with its user) for the short session TTL."""
+    ttl = get_session_cache_ttl()
+    if ttl:
+        cache.set(_session_cache_key(session.pk), session, ttl)
+
+
+def forget_auth_session(session_id) -> None:
+    cache.delete(_session_cache_key(session_id))
+
+
 def _now() -> timezone.datetime:
     return timezone.now()
 
@@ -258,7 +305,7 @@ def rotate_or_reuse_refresh_session(*, refresh_token: str, request: HttpRequest)
         raise PermissionError("Refresh token expired")
 
     idle_timeout = get_idle_timeout()
-    if idle_timeout and session.last_used_at and now - session.last_used_at > idle_timeout:
+    if idle_timeout and is_idle(session.last_used_at, now, idle_timeout):
         session.revoke(reason="idle_timeout")
         raise PermissionError("Session expired")
 
@@ -330,17 +377,21 @@ def authenticate_request(request: HttpRequest) -> Tuple[Optional[USER_MODEL], Op
     user_id = payload.get("sub")
     session_id = payload.get("sid")
 
-    try:
-        user = USER_MODEL.objects.get(pk=user_id)
-    except USER_MODEL.DoesNotExist:
-        return None, None, "user_not_found"
-
-    try:
-        session = UserAuthSession.objects.select_related("user").get(pk=session_id, user=user)
-    except UserAuthSession.DoesNotExist:
-        return None, None, "session_not_found"
+    # Validated sessions are cached briefly (revoke() drops the entry)
+    session = cache.get(_session_cache_key(session_id)) if session_id else None
+    if session is None or str(session.user_id) != str(user_id):
+        try:
+            session = UserAuthSession.objects.select_related("user").get(pk=session_id, user_id=user_id)
+        except UserAuthSession.DoesNotExist:
+            if not USER_MODEL.objects.filter(pk=user_id).exists():
+                return None, None, "user_not_found"
+            return None, None, "session_not_found"
+        cache_stale = True
+    else:
+        cache_stale = False
 
     if not session.is_active:
+        forget_auth_session(session.pk)
         return None, None, "session_revoked"
 
     now = _now()
@@ -349,12 +400,18 @@ def authenticate_request(request: HttpRequest) -> Tuple[Optional[USER_MODEL], Op
         return None, None, "session_expired"
 
     idle_timeout = get_idle_timeout()
-    if idle_timeout and session.last_used_at and now - session.last_used_at > idle_timeout:
+    if idle_timeout and is_idle(session.last_used_at, now, idle_timeout):
         session.revoke(reason="idle_timeout")
         return None, None, "session_idle"
 
-    # Touch activity timestamp for active requests
-    session.last_used_at = now
-    session.save(update_fields=["last_used_at"])
+    # Touch activity timestamp once it has drifted past the granularity
+    if activity_is_stale(session.last_used_at, now):
+        session.last_used_at = now
+        UserAuthSession.objects.filter(pk=session.pk).update(last_used_at=now)
+        cache_stale = True
+
+    if cache_stale:
+        cache_auth_session(session)
 
+    user = session.user
     return user, session, None
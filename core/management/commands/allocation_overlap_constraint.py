@@ -0,0 +1,37 @@
+"""
+Management command to manage the optional PostgreSQL exclusion constraints
+that stop live resource allocations of different NOTs from overlapping.
+While enabled, conflicting allocations cannot be forced through.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.services.allocation_conflicts import (
+    disable_overlap_constraint, enable_overlap_constraint, overlap_constraint_enabled,
+)
+
+
+class Command(BaseCommand):
+    help = 'Enable, disable or show the resource allocation overlap constraints (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['enable', 'disable', 'status'])
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Allocation overlap constraints require PostgreSQL')
+
+        action = options['action']
+        if action == 'enable':
+            try:
+                with transaction.atomic():
+                    enable_overlap_constraint()
+            except Exception as e:
+                raise CommandError(
+                    f'Could not enable the constraints (resolve overlapping allocations first): {e}'
+                )
+        elif action == 'disable':
+            disable_overlap_constraint()
+
+        state = 'enabled' if overlap_constraint_enabled() else 'disabled'
+        self.stdout.write(self.style.SUCCESS(f'Allocation overlap constraints are {state}'))
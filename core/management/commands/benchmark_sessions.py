@@ -0,0 +1,29 @@
+"""
+Management command to compare session backends by queries per request.
+Run: python manage.py benchmark_sessions --requests 200
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services.sessions import measure_session_queries
+
+
+class Command(BaseCommand):
+    help = 'Count session queries per simulated request for each session tier'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Simulated requests per tier')
+        parser.add_argument(
+            '--write-every',
+            type=int,
+            default=10,
+            help='Modify and save the session every N requests (0 = read only)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Current tier: {settings.SESSION_TIER} ({settings.SESSION_ENGINE})")
+        for tier, engine in settings.SESSION_ENGINES.items():
+            result = measure_session_queries(engine, options['requests'], options['write_every'])
+            self.stdout.write(
+                f"{tier:<15} {result['queries']:>6} queries  {result['per_request']:.2f} per request"
+            )
@@ -0,0 +1,32 @@
+"""
+Management command to delete expired sessions in bounded chunks.
+A chunked alternative to clearsessions; also runs nightly via Celery Beat.
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in bounded chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Sessions deleted per statement (default: SESSION_PURGE_CHUNK_SIZE)',
+        )
+        parser.add_argument(
+            '--max-chunks',
+            type=int,
+            default=None,
+            help='Stop after this many chunks (default: until done)',
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_sessions(
+            chunk_size=options['chunk_size'],
+            max_chunks=options['max_chunks'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions'))
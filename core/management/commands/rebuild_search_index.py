@@ -0,0 +1,36 @@
+"""
+Management command to (re)build full-text search documents.
+Run once after deploying the search index, and after bulk imports that
+bypass model save hooks.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.search import SEARCH_INDEXES, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild full-text search documents for indexed models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help=f'Models to index (default: all of {", ".join(SEARCH_INDEXES)})',
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Only index rows that have no search document yet',
+        )
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(SEARCH_INDEXES)
+        unknown = [label for label in labels if label not in SEARCH_INDEXES]
+        if unknown:
+            raise CommandError(f'Not searchable: {", ".join(unknown)}')
+
+        for label in labels:
+            written = rebuild_search_index(apps.get_model(label), missing_only=options['missing'])
+            self.stdout.write(f'{label}: {written} documents')
+        self.stdout.write(self.style.SUCCESS('Search index up to date'))
@@ -6,9 +6,11 @@ from django.shortcuts import redirect
 from django.utils import timezone
 
 from core.jwt_utils import (
+    activity_is_stale,
     authenticate_request,
     clear_auth_cookies,
     get_cookie_names,
+    is_idle,
     revoke_by_refresh_token,
 )
 
@@ -44,7 +46,9 @@ class JWTAuthenticationMiddleware:
 class IdleLogoutMiddleware:
     """Auto-logout for idle users.
 
-    - For session-authenticated browser traffic: tracks last activity in session.
+    - For session-authenticated browser traffic: tracks last activity in session,
+      rewriting it only once it is AUTH_ACTIVITY_GRANULARITY_SECONDS old so
+      read-only requests do not save the session.
     - For JWT-authenticated API traffic: handled by authenticate_request() via session idle timeout.
 
     On idle timeout: clears Django session and JWT cookies.
@@ -79,11 +83,12 @@ class IdleLogoutMiddleware:
             return self.get_response(request)
 
         last_activity_ts = request.session.get("last_activity_ts")
+        last_activity = None
 
         if last_activity_ts:
             try:
                 last_activity = timezone.datetime.fromtimestamp(float(last_activity_ts), tz=timezone.get_current_timezone())
-                if (now - last_activity).total_seconds() > seconds:
+                if is_idle(last_activity, now, timezone.timedelta(seconds=seconds)):
                     # Revoke refresh token session (if cookie still present)
                     _, refresh_cookie_name = get_cookie_names()
                     refresh = request.COOKIES.get(refresh_cookie_name)
@@ -102,8 +107,9 @@ class IdleLogoutMiddleware:
             except Exception:
                 pass
 
-        # touch
-        request.session["last_activity_ts"] = now.timestamp()
+        # touch (throttled: an unchanged session is not saved)
+        if activity_is_stale(last_activity, now):
+            request.session["last_activity_ts"] = now.timestamp()
 
         return self.get_response(request)
 
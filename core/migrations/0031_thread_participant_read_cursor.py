@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:12
+
+from django.db import migrations, models
+from django.db.models import Max, Q
+
+
+def backfill_read_cursors(apps, schema_editor):
+    """
+    Start each cursor at the newest message the participant had already
+    read (read_by receipt, sent it, or sent before last_read_at).
+    """
+    ThreadParticipant = apps.get_model('core', 'ThreadParticipant')
+    Message = apps.get_model('core', 'Message')
+    for participant in ThreadParticipant.objects.iterator():
+        read = Q(read_by__has_key=str(participant.user_id)) | Q(sender_id=participant.user_id)
+        if participant.last_read_at:
+            read |= Q(sent_at__lte=participant.last_read_at)
+        cursor = Message.objects.filter(read, thread_id=participant.thread_id).aggregate(cursor=Max('id'))['cursor']
+        if cursor:
+            ThreadParticipant.objects.filter(pk=participant.pk).update(last_read_message_id=cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_requireddocumentconfig'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='threadparticipant',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:30
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        weight_a, weight_b, weight_c,
+        content='core_searchdocument', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, weight_a, weight_b, weight_c)
+        VALUES (new.id, new.weight_a, new.weight_b, new.weight_c);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, weight_a, weight_b, weight_c)
+        VALUES ('delete', old.id, old.weight_a, old.weight_b, old.weight_c);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, weight_a, weight_b, weight_c)
+        VALUES ('delete', old.id, old.weight_a, old.weight_b, old.weight_c);
+        INSERT INTO core_searchdocument_fts(rowid, weight_a, weight_b, weight_c)
+        VALUES (new.id, new.weight_a, new.weight_b, new.weight_c);
+    END
+    """,
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts) VALUES ('rebuild')",
+]
+
+
+def create_search_structures(apps, schema_editor):
+    """GIN index on PostgreSQL; FTS5 table and sync triggers on SQLite."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX core_searchdocument_vector_gin ON core_searchdocument USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        try:
+            for sql in SQLITE_FTS_SQL:
+                schema_editor.execute(sql)
+        except Exception:
+            # SQLite built without FTS5: search falls back to icontains
+            pass
+
+
+def drop_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_searchdocument_vector_gin')
+    elif vendor == 'sqlite':
+        for name in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS core_searchdocument_fts_{name}')
+        schema_editor.execute('DROP TABLE IF EXISTS core_searchdocument_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0031_thread_participant_read_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=64)),
+                ('weight_a', models.TextField(blank=True)),
+                ('weight_b', models.TextField(blank=True)),
+                ('weight_c', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_structures, drop_search_structures),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('LOGBOOK_UNSIGNED', 'Logbook Requires Signature'), ('LOGBOOK_SIGNED', 'Logbook Signed'), ('ATTENDANCE_REMINDER', 'Attendance Submission Reminder'), ('ATTENDANCE_VERIFIED', 'Attendance Verified'), ('DISCIPLINARY_ACTION', 'Disciplinary Action'), ('DISCIPLINARY_REVIEW_DUE', 'Disciplinary Review Due'), ('STIPEND_CALCULATED', 'Stipend Calculated'), ('STIPEND_APPROVED', 'Stipend Approved'), ('PLACEMENT_VISIT_SCHEDULED', 'Placement Visit Scheduled'), ('PLACEMENT_STATUS_CHANGE', 'Placement Status Changed'), ('NEW_MESSAGE', 'New Message'), ('WM_COMPLETED', 'Workplace Module Completed'), ('WM_SIGNED', 'Workplace Module Signed Off'), ('TASK_COMPLETED', 'Service Task Completed'), ('TASK_EVIDENCE_UPLOADED', 'Task Evidence Uploaded'), ('SYSTEM', 'System Notification'), ('REMINDER', 'Reminder')], max_length=30)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('link', models.CharField(blank=True, max_length=500)),
+                ('email_requested', models.BooleanField(default=False)),
+                ('email_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('sms_requested', models.BooleanField(default=False)),
+                ('sms_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notification', models.ForeignKey(blank=True, help_text='In-app notification, if the recipient has in-app enabled', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deliveries', to='core.notification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notification Delivery',
+                'verbose_name_plural': 'Notification Deliveries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'user', 'created_at'], name='core_notifi_fingerp_99d326_idx')],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ Contains base classes, User model, Role, and Permission models
 import uuid
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.db.models import Q
 from datetime import date
@@ -2398,8 +2399,10 @@ class ThreadParticipant(models.Model):
         blank=True
     )
     
-    # Read tracking
+    # Read tracking: messages with id > last_read_message_id are unread
+    # (advanced by core.services.messaging.mark_thread_read)
     last_read_at = models.DateTimeField(null=True, blank=True)
+    last_read_message_id = models.PositiveBigIntegerField(null=True, blank=True)
     
     # Notifications
     is_muted = models.BooleanField(default=False)
@@ -2419,9 +2422,10 @@ class ThreadParticipant(models.Model):
     
     @property
     def unread_count(self):
-        if not self.last_read_at:
-            return self.thread.messages.count()
-        return self.thread.messages.filter(sent_at__gt=self.last_read_at).count()
+        messages = self.thread.messages.exclude(sender_id=self.user_id)
+        if self.last_read_message_id is None:
+            return messages.count()
+        return messages.filter(id__gt=self.last_read_message_id).count()
 
 
 class Message(models.Model):
@@ -2463,10 +2467,12 @@ class Message(models.Model):
         return f"{sender_name}: {self.content[:50]}..."
     
     def mark_read_by(self, user):
-        """Mark message as read by a user"""
+        """Mark message (and everything before it in the thread) as read by a user"""
         from django.utils import timezone
+        from core.services.messaging import advance_read_cursor
         self.read_by[str(user.id)] = timezone.now().isoformat()
         self.save(update_fields=['read_by'])
+        advance_read_cursor(self.thread_id, user, self.pk)
 
 
 # =====================================================
@@ -2603,6 +2609,56 @@ class NotificationPreference(models.Model):
         return f"{self.user.email} - {self.notification_type}"
 
 
+class NotificationDelivery(models.Model):
+    """
+    One dispatched message to one recipient, whatever channels they chose.
+    De-duplication and email/SMS delivery are tracked here, so recipients
+    with in-app notifications turned off are covered too.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_deliveries'
+    )
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deliveries',
+        help_text='In-app notification, if the recipient has in-app enabled'
+    )
+    notification_type = models.CharField(
+        max_length=30,
+        choices=Notification.NOTIFICATION_TYPE_CHOICES
+    )
+    # SHA-256 of type, title, message and link (identical messages share it)
+    fingerprint = models.CharField(max_length=64)
+    
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    link = models.CharField(max_length=500, blank=True)
+    
+    # Requested channels and delivery status
+    email_requested = models.BooleanField(default=False)
+    email_sent_at = models.DateTimeField(null=True, blank=True)
+    sms_requested = models.BooleanField(default=False)
+    sms_sent_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Notification Delivery'
+        verbose_name_plural = 'Notification Deliveries'
+        indexes = [
+            models.Index(fields=['fingerprint', 'user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.title}"
+
+
 # =====================================================
 # DOCUMENT MANAGEMENT MODELS
 # =====================================================
@@ -3761,6 +3817,9 @@ class UserAuthSession(models.Model):
         self.revoke_reason = reason[:64]
         self.save(update_fields=['revoked_at', 'revoke_reason'])
 
+        from core.jwt_utils import forget_auth_session
+        forget_auth_session(self.pk)
+
 
 # =============================================================================
 # REQUIRED DOCUMENT CONFIGURATION - Global compliance settings
@@ -3817,3 +3876,39 @@ class RequiredDocumentConfig(models.Model):
     def get_required_types(cls):
         """Get list of required document type codes."""
         return list(cls.objects.filter(is_required=True).values_list('document_type', flat=True))
+
+
+# =============================================================================
+# FULL-TEXT SEARCH INDEX
+# =============================================================================
+
+class SearchDocument(models.Model):
+    """
+    Full-text search entry for one row of a searchable model.
+    Maintained by save hooks in core.services.search; text is split into
+    weight classes A (e.g. titles) to C (e.g. bodies) for ranking.
+    On PostgreSQL search_vector holds the weighted tsvector (GIN indexed);
+    on SQLite the core_searchdocument_fts FTS5 table mirrors the text columns.
+    """
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    object_id = models.CharField(max_length=64)
+    
+    weight_a = models.TextField(blank=True)
+    weight_b = models.TextField(blank=True)
+    weight_c = models.TextField(blank=True)
+    
+    search_vector = SearchVectorField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['content_type', 'object_id']
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+    
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}"
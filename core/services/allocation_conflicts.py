@@ -0,0 +1,261 @@
+"""
+Allocation Conflict Detection
+
+Batch overlap checks for ResourceAllocationPeriod:
+- All live allocations touching the proposed schedule's date window are
+  loaded with one query (restricted to the proposed resources)
+- Allocations and proposals are grouped per resource (allocation type plus
+  user or venue) and swept in start-date order with min-heaps of active
+  intervals keyed by end date, so a schedule of n periods is checked in
+  O(n log n + k) for k reported conflicts
+- Proposals are checked against existing allocations and against each other;
+  allocations of the proposal's own NOT (and the allocation a proposal
+  replaces) are ignored, as in ResourceAllocationPeriod.get_conflicts
+
+Periods are inclusive: [start_date, end_date].
+
+Non-overlap can also be enforced by PostgreSQL itself with
+enable_overlap_constraint() (see the allocation_overlap_constraint command).
+Once enabled, force=True can no longer book over an existing allocation.
+"""
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Q
+
+from core.models import ResourceAllocationPeriod
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_CONSTRAINTS = {
+    'core_rap_no_user_overlap': 'user_id',
+    'core_rap_no_venue_overlap': 'venue_id',
+}
+
+
+@dataclass(frozen=True)
+class ProposedAllocation:
+    """
+    One period to check.
+
+    Args:
+        allocation_type: FACILITATOR, ASSESSOR, MODERATOR or VENUE
+        start_date / end_date: Inclusive period
+        user_id / venue_id: The resource
+        training_notification_id: The NOT being planned (its own allocations
+            are not conflicts)
+        allocation_id: Existing allocation this proposal replaces
+        reference: Caller's label, returned with each conflict
+    """
+    allocation_type: str
+    start_date: date
+    end_date: date
+    user_id: Optional[int] = None
+    venue_id: Optional[int] = None
+    training_notification_id: Optional[int] = None
+    allocation_id: Optional[int] = None
+    reference: Hashable = None
+
+    @property
+    def resource_key(self) -> Tuple:
+        return (self.allocation_type, self.user_id, self.venue_id)
+
+
+@dataclass(frozen=True)
+class AllocationConflict:
+    """A proposal overlapping an existing allocation or another proposal."""
+    proposal: ProposedAllocation
+    existing: Optional[ResourceAllocationPeriod] = None
+    other_proposal: Optional[ProposedAllocation] = None
+
+    @property
+    def overlap(self) -> Tuple[date, date]:
+        other = self.existing or self.other_proposal
+        return (
+            max(self.proposal.start_date, other.start_date),
+            min(self.proposal.end_date, other.end_date),
+        )
+
+
+@dataclass(frozen=True, order=True)
+class _Interval:
+    start: date
+    end: date
+    seq: int
+    notification_id: Optional[int] = field(compare=False)
+    allocation: Optional[ResourceAllocationPeriod] = field(compare=False, default=None)
+    proposal: Optional[ProposedAllocation] = field(compare=False, default=None)
+
+
+def _resource_key(allocation: ResourceAllocationPeriod) -> Tuple:
+    return (allocation.allocation_type, allocation.user_id, allocation.venue_id)
+
+
+def load_allocations(proposals: List[ProposedAllocation]) -> List[ResourceAllocationPeriod]:
+    """Live allocations of the proposed resources within the schedule window, in one query."""
+    window_start = min(p.start_date for p in proposals)
+    window_end = max(p.end_date for p in proposals)
+    user_ids = {p.user_id for p in proposals if p.user_id}
+    venue_ids = {p.venue_id for p in proposals if p.venue_id}
+    return list(
+        ResourceAllocationPeriod.objects.filter(
+            Q(user_id__in=user_ids) | Q(venue_id__in=venue_ids),
+            allocation_type__in={p.allocation_type for p in proposals},
+            is_archived=False,
+            start_date__lte=window_end,
+            end_date__gte=window_start,
+        ).exclude(
+            pk__in=[p.allocation_id for p in proposals if p.allocation_id]
+        ).select_related('training_notification', 'user', 'venue')
+    )
+
+
+def _distinct_notifications(a: _Interval, b: _Interval) -> bool:
+    """Periods of the same NOT never conflict with each other."""
+    return a.notification_id is None or a.notification_id != b.notification_id
+
+
+def _sweep(intervals: List[_Interval]) -> Iterable[AllocationConflict]:
+    """Overlapping (proposal, existing) and (proposal, proposal) pairs of one resource."""
+    # Min-heaps of (end, seq, interval) still overlapping the sweep position
+    active_existing: List[Tuple[date, int, _Interval]] = []
+    active_proposed: List[Tuple[date, int, _Interval]] = []
+    for current in sorted(intervals):
+        for heap in (active_existing, active_proposed):
+            while heap and heap[0][0] < current.start:
+                heapq.heappop(heap)
+
+        if current.proposal is not None:
+            for _, _, other in active_existing:
+                if _distinct_notifications(current, other):
+                    yield AllocationConflict(proposal=current.proposal, existing=other.allocation)
+            for _, _, other in active_proposed:
+                if _distinct_notifications(current, other):
+                    yield AllocationConflict(proposal=current.proposal, other_proposal=other.proposal)
+            heapq.heappush(active_proposed, (current.end, current.seq, current))
+        else:
+            for _, _, other in active_proposed:
+                if _distinct_notifications(current, other):
+                    yield AllocationConflict(proposal=other.proposal, existing=current.allocation)
+            heapq.heappush(active_existing, (current.end, current.seq, current))
+
+
+def find_conflicts(
+    proposals: Iterable[ProposedAllocation],
+    allocations: Optional[List[ResourceAllocationPeriod]] = None,
+) -> List[AllocationConflict]:
+    """
+    Report every conflict in a proposed schedule.
+
+    Args:
+        proposals: Periods to check (proposals without a user or venue are ignored)
+        allocations: Preloaded allocations (default: load_allocations(proposals))
+
+    Returns:
+        Conflicts ordered by proposal start date
+    """
+    proposals = [p for p in proposals if p.user_id or p.venue_id]
+    if not proposals:
+        return []
+    if allocations is None:
+        allocations = load_allocations(proposals)
+
+    by_resource: Dict[Tuple, List[_Interval]] = {}
+    seq = 0
+    for proposal in proposals:
+        seq += 1
+        by_resource.setdefault(proposal.resource_key, []).append(_Interval(
+            proposal.start_date, proposal.end_date, seq,
+            notification_id=proposal.training_notification_id, proposal=proposal,
+        ))
+    for allocation in allocations:
+        intervals = by_resource.get(_resource_key(allocation))
+        if intervals is None:
+            continue
+        seq += 1
+        intervals.append(_Interval(
+            allocation.start_date, allocation.end_date, seq,
+            notification_id=allocation.training_notification_id, allocation=allocation,
+        ))
+
+    conflicts = []
+    for intervals in by_resource.values():
+        conflicts.extend(_sweep(intervals))
+    conflicts.sort(key=lambda c: (c.proposal.start_date, c.proposal.end_date))
+    return conflicts
+
+
+def conflict_details(conflict: AllocationConflict) -> Dict[str, Any]:
+    """API representation of a conflict with an existing allocation."""
+    existing = conflict.existing
+    return {
+        'id': existing.id,
+        'not_reference': existing.training_notification.reference_number,
+        'not_title': existing.training_notification.title,
+        'not_id': existing.training_notification.id,
+        'start_date': existing.start_date.isoformat(),
+        'end_date': existing.end_date.isoformat(),
+        'resource_name': (
+            existing.user.get_full_name() if existing.user
+            else (existing.venue.name if existing.venue else 'Unknown')
+        ),
+        'allocation_type': existing.get_allocation_type_display(),
+    }
+
+
+# =====================================================
+# DATABASE ENFORCEMENT (PostgreSQL, optional)
+# =====================================================
+
+def overlap_constraint_sql(name: str, column: str) -> str:
+    # Inclusive date ranges; rows of the same NOT may overlap (as get_conflicts)
+    return (
+        f'ALTER TABLE core_resourceallocationperiod ADD CONSTRAINT {name} '
+        f'EXCLUDE USING gist ('
+        f'allocation_type WITH =, {column} WITH =, training_notification_id WITH <>, '
+        f"daterange(start_date, end_date, '[]') WITH &&"
+        f') WHERE (NOT is_archived AND {column} IS NOT NULL)'
+    )
+
+
+def is_overlap_violation(error: Exception) -> bool:
+    """Whether a database error came from the overlap constraints."""
+    return any(name in str(error) for name in OVERLAP_CONSTRAINTS)
+
+
+def overlap_constraint_enabled() -> bool:
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COUNT(*) FROM pg_constraint WHERE conname = ANY(%s)', [list(OVERLAP_CONSTRAINTS)]
+        )
+        return cursor.fetchone()[0] == len(OVERLAP_CONSTRAINTS)
+
+
+def enable_overlap_constraint() -> None:
+    """
+    Add the non-overlap exclusion constraints (needs the btree_gist extension).
+    Fails if existing live allocations already overlap; resolve those first.
+    """
+    if connection.vendor != 'postgresql':
+        raise NotImplementedError('Allocation overlap constraints require PostgreSQL')
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        for name, column in OVERLAP_CONSTRAINTS.items():
+            cursor.execute(f'ALTER TABLE core_resourceallocationperiod DROP CONSTRAINT IF EXISTS {name}')
+            cursor.execute(overlap_constraint_sql(name, column))
+    logger.info('Enabled resource allocation overlap constraints')
+
+
+def disable_overlap_constraint() -> None:
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for name in OVERLAP_CONSTRAINTS:
+            cursor.execute(f'ALTER TABLE core_resourceallocationperiod DROP CONSTRAINT IF EXISTS {name}')
+    logger.info('Disabled resource allocation overlap constraints')
@@ -0,0 +1,92 @@
+"""
+Messaging Read Cursors
+
+Read state for MessageThread is one cursor per participant:
+ThreadParticipant.last_read_message_id. Every message in the thread with a
+higher id, not sent by the participant, is unread. Viewing a thread moves the
+cursor to the thread's latest message with one conditional UPDATE, so the
+cursor only ever moves forward even when two tabs race.
+
+Unread counts compare message ids against the cursor in SQL:
+- annotate_unread adds unread_count to a thread queryset in the same query
+  (one grouped query for a whole inbox)
+- total_unread is one aggregate across all of a user's threads
+
+Message.read_by is still written by Message.mark_read_by as a per-message
+receipt, but is no longer scanned for unread counts.
+
+Usage:
+    threads = annotate_unread(MessageThread.objects.all(), request.user)
+    mark_thread_read(thread, request.user)
+"""
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Message, ThreadParticipant
+
+
+def annotate_unread(threads_qs, user):
+    """
+    Restrict threads to those `user` participates in and annotate
+    unread_count (messages from others past the user's read cursor).
+
+    Args:
+        threads_qs: MessageThread queryset
+        user: The reader
+
+    Returns:
+        Annotated queryset
+    """
+    # filter() before annotate() so the count joins this user's participant row
+    return threads_qs.filter(participants__user=user).annotate(
+        unread_count=Count(
+            'messages',
+            filter=~Q(messages__sender=user) & (
+                Q(participants__last_read_message_id__isnull=True)
+                | Q(messages__id__gt=F('participants__last_read_message_id'))
+            ),
+        ),
+    )
+
+
+def total_unread(user) -> int:
+    """Unread messages across all of a user's threads, in one query."""
+    return Message.objects.filter(
+        # One filter() call so both conditions use the same participant row
+        Q(thread__participants__user=user),
+        Q(thread__participants__last_read_message_id__isnull=True)
+        | Q(id__gt=F('thread__participants__last_read_message_id')),
+    ).exclude(sender=user).count()
+
+
+def mark_thread_read(thread, user) -> bool:
+    """
+    Move the user's cursor to the latest message in the thread.
+
+    Returns:
+        True if the cursor moved
+    """
+    thread_messages = Message.objects.filter(thread=OuterRef('thread_id'))
+    latest = thread_messages.order_by().values('thread_id').annotate(latest=Max('id')).values('latest')
+    newer = thread_messages.filter(id__gt=Coalesce(OuterRef('last_read_message_id'), Value(0)))
+    return bool(
+        ThreadParticipant.objects.filter(thread=thread, user=user).filter(Exists(newer)).update(
+            last_read_message_id=Subquery(latest),
+            last_read_at=timezone.now(),
+        )
+    )
+
+
+def advance_read_cursor(thread_id, user, message_id) -> bool:
+    """
+    Move the user's cursor up to `message_id` if it is behind it.
+
+    Returns:
+        True if the cursor moved
+    """
+    return bool(
+        ThreadParticipant.objects.filter(thread_id=thread_id, user=user).filter(
+            Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=message_id)
+        ).update(last_read_message_id=message_id, last_read_at=timezone.now())
+    )
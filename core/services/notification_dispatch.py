@@ -0,0 +1,340 @@
+"""
+Notification Dispatcher
+
+Fan-out of messages to recipients:
+- Every recipient of a message gets a NotificationDelivery row, whatever
+  channels they chose; de-duplication and email/SMS tracking use these rows
+- Recipients that already received an identical message (same type, title,
+  message and link) within NOTIFICATION_DEDUPE_SECONDS are skipped
+- NotificationPreference rows for all recipients are read in one query
+  (defaults: in-app and email on, SMS off)
+- In-app Notification rows and delivery rows are written with one
+  bulk_create each
+- Email and SMS are not sent inline: one deliver_notification_batch job is
+  queued after commit (run inline without Celery). The job loads the
+  deliveries once, sends all email over one connection, skips recipients
+  already emailed or texted the same message within the window, and
+  records email/SMS delivery with bulk updates.
+
+Usage:
+    NotificationDispatcher.dispatch(
+        recipients=[user1, user2.pk],
+        notification_type='ATTENDANCE_REMINDER',
+        title='Submit attendance',
+        message='Please submit your weekly attendance.',
+    )
+
+    # A different message per recipient
+    NotificationDispatcher.dispatch_many([
+        (booking.learner.user_id, NotificationMessage('SYSTEM', 'Trade Test Scheduled', text, link))
+        for booking in bookings
+    ])
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from core.models import Notification, NotificationDelivery, NotificationPreference
+
+logger = logging.getLogger(__name__)
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+BULK_BATCH_SIZE = 500
+
+DEFAULT_DEDUPE_SECONDS = 300
+
+DEFAULT_PREFERENCES = {'in_app': True, 'email': True, 'sms': False}
+
+
+def dedupe_window() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'NOTIFICATION_DEDUPE_SECONDS', DEFAULT_DEDUPE_SECONDS))
+
+
+@dataclass(frozen=True)
+class NotificationMessage:
+    """One message; identical messages share a fingerprint."""
+    notification_type: str
+    title: str
+    message: str
+    link: str = ''
+    priority: str = 'NORMAL'
+
+    @property
+    def fingerprint(self) -> str:
+        content = '\x1f'.join([self.notification_type, self.title, self.message, self.link])
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _user_ids(recipients: Iterable) -> List[int]:
+    ids = []
+    for recipient in recipients:
+        if recipient is None:
+            continue
+        ids.append(recipient if isinstance(recipient, int) else recipient.pk)
+    return list(dict.fromkeys(ids))
+
+
+def load_preferences(user_ids: Iterable[int], notification_types: Iterable[str]) -> Dict[Tuple[int, str], Dict[str, bool]]:
+    """Channel preferences per (user, notification type), in one query."""
+    preferences = {}
+    for user_id, notification_type, in_app, email, sms in NotificationPreference.objects.filter(
+        user_id__in=set(user_ids), notification_type__in=set(notification_types)
+    ).values_list('user_id', 'notification_type', 'in_app_enabled', 'email_enabled', 'sms_enabled'):
+        preferences[(user_id, notification_type)] = {'in_app': in_app, 'email': email, 'sms': sms}
+    return preferences
+
+
+def _sent_before(deliveries: List[NotificationDelivery], sent_field: str, since) -> Set[Tuple[int, str]]:
+    """(user_id, fingerprint) pairs already delivered on a channel by other deliveries since `since`."""
+    if not deliveries:
+        return set()
+    return set(NotificationDelivery.objects.filter(
+        user_id__in={d.user_id for d in deliveries},
+        fingerprint__in={d.fingerprint for d in deliveries},
+        **{f'{sent_field}__gte': since},
+    ).exclude(pk__in=[d.pk for d in deliveries]).values_list('user_id', 'fingerprint'))
+
+
+class NotificationDispatcher:
+    """
+    Bulk in-app notifications with deferred, batched email and SMS delivery.
+    """
+
+    @staticmethod
+    def recently_notified(items: List[Tuple[int, NotificationMessage]], since) -> Set[Tuple[int, str]]:
+        """(user_id, fingerprint) pairs of items already dispatched since `since`."""
+        return set(NotificationDelivery.objects.filter(
+            user_id__in={user_id for user_id, _ in items},
+            fingerprint__in={message.fingerprint for _, message in items},
+            created_at__gte=since,
+        ).values_list('user_id', 'fingerprint'))
+
+    @staticmethod
+    def dispatch(
+        recipients: Iterable,
+        notification_type: str,
+        title: str,
+        message: str,
+        link: str = '',
+        priority: str = 'NORMAL',
+        email_template: Optional[str] = None,
+        email_context: Optional[Dict] = None,
+        sms_message: Optional[str] = None,
+    ) -> List[Notification]:
+        """
+        Notify every recipient of one message.
+
+        Args:
+            recipients: Users and/or user ids
+            notification_type: One of Notification.NOTIFICATION_TYPE_CHOICES
+            title: Notification title (also the email subject)
+            message: Full message
+            link: Optional URL
+            priority: LOW, NORMAL, HIGH or URGENT
+            email_template: Optional email template name
+            email_context: Template context (must be JSON-serialisable; it
+                travels with the delivery job)
+            sms_message: Optional shorter SMS text
+
+        Returns:
+            The created in-app Notification instances
+        """
+        notification = NotificationMessage(notification_type, title, message, link, priority)
+        return NotificationDispatcher.dispatch_many(
+            [(user_id, notification) for user_id in _user_ids(recipients)],
+            email_template=email_template,
+            email_context=email_context,
+            sms_message=sms_message,
+        )
+
+    @staticmethod
+    def dispatch_many(
+        items: Iterable[Tuple[int, NotificationMessage]],
+        email_template: Optional[str] = None,
+        email_context: Optional[Dict] = None,
+        sms_message: Optional[str] = None,
+    ) -> List[Notification]:
+        """
+        Notify recipients of their own messages in one pass.
+
+        Args:
+            items: (user id, NotificationMessage) pairs
+            email_template / email_context / sms_message: As for dispatch,
+                applied to every message
+
+        Returns:
+            The created in-app Notification instances
+        """
+        items = list(dict.fromkeys((user_id, message) for user_id, message in items if user_id))
+        if not items:
+            return []
+
+        duplicates = NotificationDispatcher.recently_notified(items, timezone.now() - dedupe_window())
+        items = [(user_id, message) for user_id, message in items if (user_id, message.fingerprint) not in duplicates]
+        if not items:
+            return []
+
+        preferences = load_preferences(
+            [user_id for user_id, _ in items], [message.notification_type for _, message in items]
+        )
+        channels = [preferences.get((user_id, message.notification_type), DEFAULT_PREFERENCES) for user_id, message in items]
+
+        in_app = {
+            index: Notification(
+                user_id=user_id,
+                notification_type=message.notification_type,
+                priority=message.priority,
+                title=message.title,
+                message=message.message,
+                link=message.link,
+            )
+            for index, ((user_id, message), channel) in enumerate(zip(items, channels)) if channel['in_app']
+        }
+        notifications = Notification.objects.bulk_create(list(in_app.values()), batch_size=BULK_BATCH_SIZE)
+
+        deliveries = NotificationDelivery.objects.bulk_create([
+            NotificationDelivery(
+                user_id=user_id,
+                notification=in_app.get(index),
+                notification_type=message.notification_type,
+                fingerprint=message.fingerprint,
+                title=message.title,
+                message=message.message,
+                link=message.link,
+                email_requested=channel['email'],
+                sms_requested=channel['sms'],
+            )
+            for index, ((user_id, message), channel) in enumerate(zip(items, channels))
+        ], batch_size=BULK_BATCH_SIZE)
+
+        pending = [delivery.pk for delivery in deliveries if delivery.email_requested or delivery.sms_requested]
+        if pending:
+            payload = {
+                'delivery_ids': pending,
+                'email_template': email_template,
+                'email_context': email_context,
+                'sms_message': sms_message,
+            }
+            transaction.on_commit(lambda: NotificationDispatcher.queue_delivery(payload))
+
+        return notifications
+
+    @staticmethod
+    def queue_delivery(payload: Dict) -> None:
+        """Hand email/SMS delivery to the background worker (inline without Celery)."""
+        if CELERY_AVAILABLE:
+            deliver_notification_batch.delay(payload)
+        else:
+            deliver_notification_batch(payload)
+
+
+def _email_messages(deliveries: List[NotificationDelivery], payload: Dict, from_email: str) -> List[EmailMultiAlternatives]:
+    rendered: Dict[str, Optional[str]] = {}
+    messages = []
+    for delivery in deliveries:
+        if delivery.fingerprint not in rendered:
+            html = None
+            if payload.get('email_template'):
+                context = payload.get('email_context') or {
+                    'title': delivery.title, 'message': delivery.message, 'link': delivery.link,
+                }
+                html = render_to_string(payload['email_template'], context)
+            rendered[delivery.fingerprint] = html
+        html = rendered[delivery.fingerprint]
+
+        email = EmailMultiAlternatives(
+            subject=delivery.title,
+            body=strip_tags(html) if html else delivery.message,
+            from_email=from_email,
+            to=[delivery.user.email],
+        )
+        if html:
+            email.attach_alternative(html, 'text/html')
+        email.delivery_id = delivery.pk
+        messages.append(email)
+    return messages
+
+
+def _record_sent(delivery_ids: List[int], channel: str) -> None:
+    """Flag deliveries, and their in-app rows, as sent on a channel."""
+    if not delivery_ids:
+        return
+    now = timezone.now()
+    NotificationDelivery.objects.filter(pk__in=delivery_ids).update(**{f'{channel}_sent_at': now})
+    Notification.objects.filter(deliveries__pk__in=delivery_ids).update(
+        **{f'{channel}_sent': True, f'{channel}_sent_at': now}
+    )
+
+
+@shared_task(name='core.services.notification_dispatch.deliver_notification_batch')
+def deliver_notification_batch(payload: Dict) -> Dict[str, int]:
+    """
+    Send the email and SMS for a batch of deliveries and record what was
+    sent in bulk.
+    """
+    from core.services.notifications import get_notification_service
+
+    service = get_notification_service()
+    deliveries = list(NotificationDelivery.objects.filter(
+        pk__in=payload['delivery_ids'],
+    ).select_related('user'))
+    summary = {'emailed': 0, 'texted': 0}
+    if not deliveries:
+        return summary
+    since = min(delivery.created_at for delivery in deliveries) - dedupe_window()
+
+    if service.email_enabled:
+        wanted = [d for d in deliveries if d.email_requested and d.email_sent_at is None and d.user.email]
+        already = _sent_before(wanted, 'email_sent_at', since)
+        recipients = [d for d in wanted if (d.user_id, d.fingerprint) not in already]
+        emailed = []
+        if recipients:
+            connection = get_connection()
+            try:
+                connection.open()
+                for email in _email_messages(recipients, payload, service.from_email):
+                    try:
+                        if connection.send_messages([email]):
+                            emailed.append(email.delivery_id)
+                    except Exception as e:
+                        logger.error(f"Failed to send email to {email.to[0]}: {e}")
+            finally:
+                connection.close()
+        _record_sent(emailed, 'email')
+        summary['emailed'] = len(emailed)
+
+    if service.sms_enabled:
+        wanted = [d for d in deliveries if d.sms_requested and d.sms_sent_at is None]
+        already = _sent_before(wanted, 'sms_sent_at', since)
+        texted = [
+            d.pk for d in wanted
+            if (d.user_id, d.fingerprint) not in already
+            and service.send_sms(d.user, payload.get('sms_message') or d.message)
+        ]
+        _record_sent(texted, 'sms')
+        summary['texted'] = len(texted)
+
+    logger.info(f"Delivered {len(deliveries)} notifications: {summary}")
+    return summary
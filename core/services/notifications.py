@@ -232,49 +232,27 @@ class NotificationService:
             link: Optional URL to link to
             priority: Priority level (LOW, NORMAL, HIGH, URGENT)
             email_template: Optional email template name
-            email_context: Optional email template context
+            email_context: Optional email template context (JSON-serialisable)
             sms_message: Optional shorter message for SMS
             
         Returns:
             The created Notification instance
         """
-        prefs = self.get_user_preferences(user, notification_type)
+        from core.services.notification_dispatch import NotificationDispatcher
         
-        # Always create in-app notification if enabled
-        notification = None
-        if prefs['in_app']:
-            notification = self.create_notification(
-                user=user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                link=link,
-                priority=priority
-            )
-        
-        # Send email if enabled and preferred
-        if prefs['email'] and self.email_enabled:
-            email_sent = self.send_email(
-                user=user,
-                subject=title,
-                template_name=email_template,
-                context=email_context or {'title': title, 'message': message, 'link': link},
-                plain_message=message
-            )
-            if notification and email_sent:
-                notification.email_sent = True
-                notification.email_sent_at = timezone.now()
-                notification.save(update_fields=['email_sent', 'email_sent_at'])
-        
-        # Send SMS if enabled and preferred
-        if prefs['sms'] and self.sms_enabled:
-            sms_sent = self.send_sms(user, sms_message or message)
-            if notification and sms_sent:
-                notification.sms_sent = True
-                notification.sms_sent_at = timezone.now()
-                notification.save(update_fields=['sms_sent', 'sms_sent_at'])
-        
-        return notification
+        # In-app row now; email/SMS by the batched delivery job after commit
+        notifications = NotificationDispatcher.dispatch(
+            recipients=[user],
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            link=link,
+            priority=priority,
+            email_template=email_template,
+            email_context=email_context,
+            sms_message=sms_message,
+        )
+        return notifications[0] if notifications else None
     
     def send_batch_notifications(
         self,
@@ -286,24 +264,22 @@ class NotificationService:
         priority: str = 'NORMAL'
     ) -> List[Notification]:
         """
-        Send the same notification to multiple users.
+        Send the same notification to multiple users (one bulk insert,
+        batched email/SMS delivery).
         
         Returns:
             List of created Notification instances
         """
-        notifications = []
-        for user in users:
-            notification = self.send_notification(
-                user=user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                link=link,
-                priority=priority
-            )
-            if notification:
-                notifications.append(notification)
-        return notifications
+        from core.services.notification_dispatch import NotificationDispatcher
+        
+        return NotificationDispatcher.dispatch(
+            recipients=users,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            link=link,
+            priority=priority,
+        )
     
     def get_unread_count(self, user: User) -> int:
         """Get count of unread notifications for a user."""
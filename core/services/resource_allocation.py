@@ -3,7 +3,7 @@ Resource Allocation Service
 Handles availability checking, conflict detection, and allocation management
 for NOT resource requirements (facilitators, assessors, moderators, venues).
 """
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from datetime import date
 from typing import Optional, List, Dict, Any, Tuple
@@ -11,6 +11,13 @@ from core.models import (
     ResourceAllocationPeriod, NOTResourceRequirement, TrainingNotification, User
 )
 from logistics.models import Venue
+from .allocation_conflicts import (
+    AllocationConflict, ProposedAllocation, find_conflicts, is_overlap_violation,
+    conflict_details as allocation_conflict_details,
+)
+
+# Raised when the optional database overlap constraint rejects a write
+OVERLAP_ENFORCED_MESSAGE = 'Resource has conflicts and overlapping allocations are blocked by the database.'
 
 
 def check_resource_availability(
@@ -19,7 +26,8 @@ def check_resource_availability(
     end_date: date,
     user: Optional[User] = None,
     venue: Optional[Venue] = None,
-    exclude_not_id: Optional[int] = None
+    exclude_not_id: Optional[int] = None,
+    exclude_allocation_id: Optional[int] = None
 ) -> Tuple[bool, List[Dict[str, Any]]]:
     """
     Check if a resource (user or venue) is available for a given period.
@@ -31,39 +39,45 @@ def check_resource_availability(
         user: User to check (for human resources)
         venue: Venue to check (for venue resources)
         exclude_not_id: NOT ID to exclude from conflict check (for updates)
+        exclude_allocation_id: Allocation being changed (for updates)
     
     Returns:
         Tuple of (is_available: bool, conflicts: List of conflict details)
     """
-    is_available, conflicts = ResourceAllocationPeriod.check_availability(
+    conflicts = find_conflicts([ProposedAllocation(
         allocation_type=allocation_type,
         start_date=start_date,
         end_date=end_date,
-        user=user,
-        venue=venue,
-        exclude_not_id=exclude_not_id
-    )
+        user_id=user.pk if user else None,
+        venue_id=venue.pk if venue else None,
+        training_notification_id=exclude_not_id,
+        allocation_id=exclude_allocation_id,
+    )])
     
     # Format conflicts for API response
-    conflict_details = []
-    for conflict in conflicts:
-        conflict_details.append({
-            'id': conflict.id,
-            'not_reference': conflict.training_notification.reference_number,
-            'not_title': conflict.training_notification.title,
-            'not_id': conflict.training_notification.id,
-            'start_date': conflict.start_date.isoformat(),
-            'end_date': conflict.end_date.isoformat(),
-            'resource_name': (
-                conflict.user.get_full_name() if conflict.user 
-                else (conflict.venue.name if conflict.venue else 'Unknown')
-            ),
-            'allocation_type': conflict.get_allocation_type_display(),
-        })
+    conflict_details = [allocation_conflict_details(conflict) for conflict in conflicts]
+    is_available = not conflict_details
     
     return is_available, conflict_details
 
 
+def check_schedule_availability(
+    proposals: List[ProposedAllocation]
+) -> List[AllocationConflict]:
+    """
+    Check a whole proposed schedule (e.g. a term's facilitator and venue
+    plan) at once: one query plus an in-memory sweep per resource, instead
+    of one overlap query per period.
+    
+    Args:
+        proposals: Periods to check
+    
+    Returns:
+        Every conflict with an existing allocation or between proposals
+    """
+    return find_conflicts(proposals)
+
+
 def create_resource_allocation(
     resource_requirement: NOTResourceRequirement,
     start_date: date,
@@ -118,16 +132,22 @@ def create_resource_allocation(
         raise ValueError(f'Resource has conflicts. Use force=True to override.')
     
     # Create the allocation
-    allocation = ResourceAllocationPeriod.objects.create(
-        resource_requirement=resource_requirement,
-        training_notification=resource_requirement.training_notification,
-        allocation_type=allocation_type,
-        user=user,
-        venue=venue,
-        start_date=start_date,
-        end_date=end_date,
-        notes=notes
-    )
+    try:
+        with transaction.atomic():
+            allocation = ResourceAllocationPeriod.objects.create(
+                resource_requirement=resource_requirement,
+                training_notification=resource_requirement.training_notification,
+                allocation_type=allocation_type,
+                user=user,
+                venue=venue,
+                start_date=start_date,
+                end_date=end_date,
+                notes=notes
+            )
+    except IntegrityError as e:
+        if not is_overlap_violation(e):
+            raise
+        raise ValueError(OVERLAP_ENFORCED_MESSAGE)
     
     return allocation, conflicts
 
@@ -159,13 +179,10 @@ def update_resource_allocation(
         end_date=new_end,
         user=new_user,
         venue=new_venue,
-        exclude_not_id=allocation.training_notification_id
+        exclude_not_id=allocation.training_notification_id,
+        exclude_allocation_id=allocation.id
     )
     
-    # Also exclude the current allocation
-    conflicts = [c for c in conflicts if c.get('id') != allocation.id]
-    is_available = len(conflicts) == 0
-    
     if not is_available and not force:
         raise ValueError(f'Resource has conflicts. Use force=True to override.')
     
@@ -179,7 +196,13 @@ def update_resource_allocation(
     if notes is not None:
         allocation.notes = notes
     
-    allocation.save()
+    try:
+        with transaction.atomic():
+            allocation.save()
+    except IntegrityError as e:
+        if not is_overlap_violation(e):
+            raise
+        raise ValueError(OVERLAP_ENFORCED_MESSAGE)
     
     return allocation, conflicts
 
@@ -0,0 +1,376 @@
+"""
+Full-Text Search
+
+search(model, query, filters) is the single entry point for ranked,
+prefix-matching search over the models declared in SEARCH_INDEXES. Each
+indexed row has one SearchDocument holding its text in weight classes
+A-C; the backend is chosen by database vendor:
+- PostgresSearchBackend: weighted tsvector in SearchDocument.search_vector
+  (GIN index), prefix tsquery terms, ranked by ts_rank
+- SQLiteFTSBackend: FTS5 table core_searchdocument_fts, kept in sync with
+  SearchDocument by triggers, ranked by bm25 (local and test runs)
+- BasicSearchBackend: icontains over the indexed fields, unranked (other
+  databases, or SQLite without FTS5)
+
+Documents are refreshed by post_save / post_delete hooks (connected in
+CoreConfig.ready), by update_search_index() after bulk writes, and by the
+rebuild_search_index management command.
+
+Usage:
+    tasks = search(Task, 'seta regist', filters=Q(assigned_to=user))
+    articles = search(KnowledgeBaseArticle, hint, match=ANY)
+"""
+import logging
+import operator
+import re
+from dataclasses import dataclass
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_delete, post_save
+
+from core.models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+# Search terms used from one query
+MAX_TERMS = 8
+
+# Filtered FTS5 hits given a bm25 rank; further matches are returned unranked
+SQLITE_MAX_RESULTS = 500
+
+FTS_TABLE = 'core_searchdocument_fts'
+
+# Term matching
+ALL = 'all'
+ANY = 'any'
+
+WEIGHTS = ('A', 'B', 'C')
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """
+    Searchable fields of one model.
+
+    `fields` pairs each field (related lookups allowed) with its weight
+    class; `config` is the PostgreSQL text search configuration.
+    `lookup_fields` also match the whole query as a substring (identifiers
+    such as emails and phone numbers, which the text parsers do not split
+    the way parse_terms does).
+    """
+    model: str
+    fields: Tuple[Tuple[str, str], ...]
+    config: str = 'english'
+    lookup_fields: Tuple[str, ...] = ()
+
+    @property
+    def model_class(self):
+        return apps.get_model(self.model)
+
+    @property
+    def field_names(self) -> List[str]:
+        return [name for name, _ in self.fields]
+
+    @property
+    def local_field_names(self) -> set:
+        return {name.split('__')[0] for name in self.field_names}
+
+    def document_text(self, row: Dict) -> Dict[str, str]:
+        """weight_a / weight_b / weight_c text for a values() row."""
+        text = {weight: [] for weight in WEIGHTS}
+        for name, weight in self.fields:
+            value = row.get(name)
+            if value:
+                text[weight].append(str(value))
+        return {f'weight_{weight.lower()}': ' '.join(parts) for weight, parts in text.items()}
+
+    def lookup_filter(self, query: str) -> Optional[Q]:
+        """icontains match of the raw query on lookup_fields, if any."""
+        query = (query or '').strip()
+        if not self.lookup_fields or not query:
+            return None
+        return reduce(operator.or_, [Q(**{f'{name}__icontains': query}) for name in self.lookup_fields])
+
+
+SEARCH_INDEXES: Dict[str, SearchIndex] = {
+    'core.Task': SearchIndex(
+        'core.Task',
+        fields=(('title', 'A'), ('description', 'B')),
+    ),
+    'crm.Lead': SearchIndex(
+        'crm.Lead',
+        fields=(('first_name', 'A'), ('last_name', 'A'), ('email', 'B'), ('phone', 'B')),
+        # Names, emails and numbers: no stemming or stop words
+        config='simple',
+        lookup_fields=('email', 'phone'),
+    ),
+    'support.SupportTicket': SearchIndex(
+        'support.SupportTicket',
+        fields=(('subject', 'A'), ('description', 'B')),
+    ),
+    'support.KnowledgeBaseArticle': SearchIndex(
+        'support.KnowledgeBaseArticle',
+        fields=(
+            ('title', 'A'), ('keywords', 'A'), ('summary', 'B'),
+            ('body', 'C'), ('category__name', 'C'),
+        ),
+    ),
+}
+
+
+def get_search_index(model) -> SearchIndex:
+    index = SEARCH_INDEXES.get(model._meta.label)
+    if index is None:
+        raise ValueError(f"{model._meta.label} has no search index")
+    return index
+
+
+def parse_terms(query: str) -> List[str]:
+    """Lower-cased word terms of a query (punctuation dropped)."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def _content_type(model) -> ContentType:
+    return ContentType.objects.get_for_model(model)
+
+
+def _object_pk(model):
+    """SearchDocument.object_id as the model's primary key type."""
+    return Cast('object_id', output_field=model._meta.pk)
+
+
+# =====================================================
+# BACKENDS
+# =====================================================
+
+class BasicSearchBackend:
+    """icontains over the indexed fields; every hit ranks 0."""
+
+    def refresh(self, index: SearchIndex, document_ids: List[int]) -> None:
+        pass
+
+    def filter(self, queryset, index: SearchIndex, terms: List[str], match: str, lookup: Optional[Q] = None):
+        combine = operator.and_ if match == ALL else operator.or_
+        condition = reduce(combine, [
+            reduce(operator.or_, [Q(**{f'{name}__icontains': term}) for name in index.field_names])
+            for term in terms
+        ])
+        if lookup is not None:
+            condition |= lookup
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector with a GIN index; prefix matching via `term:*`."""
+
+    def refresh(self, index: SearchIndex, document_ids: List[int]) -> None:
+        SearchDocument.objects.filter(pk__in=document_ids).update(search_vector=(
+            SearchVector('weight_a', weight='A', config=index.config)
+            + SearchVector('weight_b', weight='B', config=index.config)
+            + SearchVector('weight_c', weight='C', config=index.config)
+        ))
+
+    def filter(self, queryset, index: SearchIndex, terms: List[str], match: str, lookup: Optional[Q] = None):
+        joiner = ' & ' if match == ALL else ' | '
+        query = SearchQuery(
+            joiner.join(f'{term}:*' for term in terms), search_type='raw', config=index.config,
+        )
+        model = queryset.model
+        documents = SearchDocument.objects.filter(content_type=_content_type(model))
+        matching = documents.filter(search_vector=query).annotate(obj_pk=_object_pk(model))
+        rank = documents.filter(
+            object_id=Cast(OuterRef('pk'), output_field=SearchDocument._meta.get_field('object_id')),
+        ).annotate(rank=SearchRank(F('search_vector'), query)).values('rank')[:1]
+        condition = Q(pk__in=matching.values('obj_pk'))
+        if lookup is not None:
+            condition |= lookup
+        return queryset.filter(condition).annotate(
+            search_rank=Coalesce(Subquery(rank, output_field=FloatField()), Value(0.0)),
+        )
+
+
+class SQLiteFTSBackend:
+    """FTS5 with bm25 ranking; prefix matching via `"term"*`."""
+
+    # bm25 column weights for weight_a, weight_b, weight_c
+    COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+
+    def refresh(self, index: SearchIndex, document_ids: List[int]) -> None:
+        # Triggers on core_searchdocument keep the FTS table in sync
+        pass
+
+    def _match_sql(self, select: str) -> str:
+        return (
+            f'SELECT {select} FROM {FTS_TABLE} JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND d.content_type_id = %s'
+        )
+
+    def filter(self, queryset, index: SearchIndex, terms: List[str], match: str, lookup: Optional[Q] = None):
+        joiner = ' AND ' if match == ALL else ' OR '
+        expression = joiner.join(f'"{term}"*' for term in terms)
+        model = queryset.model
+        content_type_id = _content_type(model).pk
+
+        # Every match within the caller's queryset, with no cap
+        condition = Q(pk__in=RawSQL(self._match_sql('d.object_id'), [expression, content_type_id]))
+        if lookup is not None:
+            condition |= lookup
+        matched = queryset.filter(condition)
+
+        # bm25 ranks for the best SQLITE_MAX_RESULTS of those matches
+        scope_sql, scope_params = queryset.order_by().annotate(
+            search_pk=Cast('pk', output_field=TextField()),
+        ).values('search_pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self._match_sql(f'd.object_id, bm25({FTS_TABLE}, %s, %s, %s) AS score')
+                + f' AND d.object_id IN ({scope_sql}) ORDER BY score LIMIT %s',
+                [*self.COLUMN_WEIGHTS, expression, content_type_id, *scope_params, SQLITE_MAX_RESULTS],
+            )
+            # bm25 is lower-is-better; flip it so higher ranks first everywhere
+            ranks = {model._meta.pk.to_python(object_id): -score for object_id, score in cursor.fetchall()}
+        if not ranks:
+            return matched.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return matched.annotate(search_rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ))
+
+
+_fts_available: Dict[str, bool] = {}
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        key = str(connection.settings_dict['NAME'])
+        if key not in _fts_available:
+            _fts_available[key] = FTS_TABLE in connection.introspection.table_names()
+        if _fts_available[key]:
+            return SQLiteFTSBackend()
+    return BasicSearchBackend()
+
+
+# =====================================================
+# SEARCH
+# =====================================================
+
+def search(model, query: str, filters=None, match: str = ALL):
+    """
+    Ranked full-text search.
+
+    Args:
+        model: A model in SEARCH_INDEXES, or a queryset of one
+        query: User input; each word matches as a prefix
+        filters: Optional Q or dict of field lookups applied to the results
+        match: ALL (every term must match) or ANY
+
+    Returns:
+        Queryset annotated with search_rank, best matches first
+    """
+    queryset = model.all() if hasattr(model, 'model') else model._default_manager.all()
+    index = get_search_index(queryset.model)
+    if filters:
+        queryset = queryset.filter(filters) if isinstance(filters, Q) else queryset.filter(**filters)
+
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+    backend = get_search_backend()
+    return backend.filter(queryset, index, terms, match, index.lookup_filter(query)).order_by('-search_rank')
+
+
+# =====================================================
+# INDEXING
+# =====================================================
+
+def update_search_index(model, pks: Iterable) -> int:
+    """
+    (Re)write the search documents for the given rows of a model.
+    Rows that no longer exist lose their document.
+
+    Returns:
+        Number of documents written
+    """
+    index = get_search_index(model)
+    content_type = _content_type(model)
+    backend = get_search_backend()
+    pks = list(pks)
+    written = 0
+    for start in range(0, len(pks), BULK_BATCH_SIZE):
+        chunk = pks[start:start + BULK_BATCH_SIZE]
+        rows = model._default_manager.filter(pk__in=chunk).values('pk', *index.field_names)
+        SearchDocument.objects.filter(
+            content_type=content_type, object_id__in=[str(pk) for pk in chunk]
+        ).delete()
+        documents = SearchDocument.objects.bulk_create([
+            SearchDocument(content_type=content_type, object_id=str(row['pk']), **index.document_text(row))
+            for row in rows
+        ], batch_size=BULK_BATCH_SIZE)
+        if documents and documents[0].pk is None:
+            # Backends that do not return ids from bulk inserts
+            documents = SearchDocument.objects.filter(
+                content_type=content_type, object_id__in=[d.object_id for d in documents]
+            )
+        backend.refresh(index, [document.pk for document in documents])
+        written += len(documents)
+    return written
+
+
+def remove_from_search_index(model, pks: Iterable) -> None:
+    SearchDocument.objects.filter(
+        content_type=_content_type(model), object_id__in=[str(pk) for pk in pks]
+    ).delete()
+
+
+def rebuild_search_index(model, missing_only: bool = False) -> int:
+    """
+    Index every row of a model (or only rows without a document).
+
+    Returns:
+        Number of documents written
+    """
+    queryset = model._default_manager.all()
+    if missing_only:
+        indexed = SearchDocument.objects.filter(
+            content_type=_content_type(model)
+        ).annotate(obj_pk=_object_pk(model)).values('obj_pk')
+        queryset = queryset.exclude(pk__in=indexed)
+    else:
+        SearchDocument.objects.filter(content_type=_content_type(model)).delete()
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    return update_search_index(model, pks)
+
+
+# =====================================================
+# SAVE HOOKS
+# =====================================================
+
+def _index_on_save(sender, instance, update_fields=None, **kwargs):
+    index = SEARCH_INDEXES[sender._meta.label]
+    if update_fields and not index.local_field_names & set(update_fields):
+        return
+    update_search_index(sender, [instance.pk])
+
+
+def _remove_on_delete(sender, instance, **kwargs):
+    remove_from_search_index(sender, [instance.pk])
+
+
+def connect_search_signals() -> None:
+    """Keep search documents in step with saves and deletes of indexed models."""
+    for label in SEARCH_INDEXES:
+        post_save.connect(_index_on_save, sender=label, dispatch_uid=f'search_index_save:{label}')
+        post_delete.connect(_remove_on_delete, sender=label, dispatch_uid=f'search_index_delete:{label}')
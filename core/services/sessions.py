@@ -0,0 +1,119 @@
+"""
+Session Storage Services
+
+Housekeeping for the configured session tier (settings.SESSION_TIER):
+- purge_expired_sessions deletes expired rows in bounded chunks, so the
+  nightly purge never holds one long DELETE over django_session
+- measure_session_queries counts the queries a run of simulated requests
+  makes against a session backend (used by the benchmark_sessions command)
+
+Expired entries in the cache tier expire on their own (cached_db stores
+each session with its remaining age as the cache timeout).
+"""
+import logging
+from importlib import import_module
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+DEFAULT_PURGE_CHUNK_SIZE = 5000
+
+
+def session_store_class(engine: Optional[str] = None):
+    return import_module(engine or settings.SESSION_ENGINE).SessionStore
+
+
+def purge_expired_sessions(chunk_size: Optional[int] = None, max_chunks: Optional[int] = None) -> int:
+    """
+    Delete expired sessions from the database tier in chunks.
+
+    Args:
+        chunk_size: Rows per DELETE (defaults to SESSION_PURGE_CHUNK_SIZE)
+        max_chunks: Stop after this many chunks (None = until done)
+
+    Returns:
+        Number of sessions deleted
+    """
+    store = session_store_class()
+    if not hasattr(store, 'get_model_class'):
+        # Cookie and cache-only backends keep no session rows
+        return 0
+
+    model = store.get_model_class()
+    chunk_size = chunk_size or getattr(settings, 'SESSION_PURGE_CHUNK_SIZE', DEFAULT_PURGE_CHUNK_SIZE)
+    now = timezone.now()
+
+    deleted = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        keys = list(
+            model.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:chunk_size]
+        )
+        if not keys:
+            break
+        deleted += model.objects.filter(session_key__in=keys).delete()[0]
+        chunks += 1
+
+    if deleted:
+        logger.info(f"Purged {deleted} expired sessions in {chunks} chunks")
+    return deleted
+
+
+@shared_task(name='core.services.sessions.purge_expired_sessions_task')
+def purge_expired_sessions_task():
+    """
+    Nightly purge of expired sessions.
+    Should be scheduled to run daily via Celery Beat.
+    """
+    return {'deleted': purge_expired_sessions()}
+
+
+def measure_session_queries(engine: str, requests: int = 100, write_every: int = 10) -> Dict[str, float]:
+    """
+    Simulate authenticated page loads against one session backend.
+
+    Each request loads the session and reads from it; every `write_every`-th
+    request also modifies and saves it (as a login or flash message would).
+
+    Returns:
+        Dict with total queries and queries per request
+    """
+    from django.test.utils import CaptureQueriesContext
+
+    store_class = session_store_class(engine)
+    session = store_class()
+    session['_auth_user_id'] = '1'
+    session.save()
+    session_key = session.session_key
+
+    with CaptureQueriesContext(connection) as captured:
+        for i in range(requests):
+            session = store_class(session_key=session_key)
+            session.get('_auth_user_id')
+            if write_every and i % write_every == 0:
+                session['last_seen'] = i
+                session.save()
+            session_key = session.session_key
+
+    store_class(session_key=session_key).delete()
+    return {
+        'queries': len(captured),
+        'per_request': len(captured) / requests if requests else 0,
+    }
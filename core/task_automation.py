@@ -0,0 +1,391 @@
+"""
+Task Automation Dispatcher
+
+The post_save receivers in task_signals no longer create tasks inline. They
+queue (event, pk) entries here (each TaskEvent names its model), and the
+queue is processed once the saving transaction commits
+(transaction.on_commit; straight away in autocommit):
+- Entries are de-duplicated, so saving the same row several times in one
+  transaction is evaluated once, against the committed row
+- Each event loads its rows with one query (select_related / annotations
+  declared on the TaskEvent), e.g. NYC counts for the at-risk check
+- Open tasks are looked up with one existence query per task category and
+  new tasks are written with one bulk_create
+- At-risk checks are coalesced per enrollment
+
+Bulk imports can hold the queue and process it in one go:
+
+    with suspend_task_automation():
+        for row in rows:
+            Enrollment.objects.create(...)
+    # processed here (or when the surrounding transaction commits)
+
+flush_task_automation() processes queued entries immediately.
+
+Entries queued in a savepoint that rolled back while the outer transaction
+committed are still evaluated, but against the committed rows, so they only
+produce tasks the committed data warrants. Entries of a fully rolled-back
+transaction are discarded.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from .services.search import update_search_index
+from .tasks import Task, TaskCategory, TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+OPEN_TASK_STATUSES = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
+
+# Events
+ENROLLMENT_CREATED = 'enrollment_created'
+ASSESSMENT_RESULT_SAVED = 'assessment_result_saved'
+POE_SUBMITTED = 'poe_submitted'
+INVOICE_SAVED = 'invoice_saved'
+SESSION_SAVED = 'session_saved'
+GRANT_PROJECT_SAVED = 'grant_project_saved'
+LEARNER_AT_RISK_CHECK = 'learner_at_risk_check'
+
+# NYC results before a learner is flagged as at risk
+AT_RISK_NYC_THRESHOLD = 2
+
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class TaskRule:
+    """
+    One kind of task an event can create.
+
+    `build(instance, today)` returns the Task fields (without category and
+    related object) or None when the instance does not need the task.
+    """
+    category: str
+    build: Callable[[Any, date], Optional[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    model: str
+    rules: Tuple[TaskRule, ...]
+    select_related: Tuple[str, ...] = ()
+    annotate: Optional[Callable] = None
+
+    def load(self, pks) -> List:
+        qs = apps.get_model(self.model)._default_manager.filter(pk__in=pks)
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.annotate:
+            qs = self.annotate(qs)
+        return list(qs)
+
+
+# =====================================================
+# RULES
+# =====================================================
+
+def _seta_registration_task(enrollment, today):
+    return {
+        'title': f'Register with SETA: {enrollment.learner}',
+        'description': f'New enrollment for {enrollment.qualification.title} needs SETA registration.',
+        'assigned_role': 'REGISTRAR',
+        'due_date': today + timedelta(days=5),
+        'priority': TaskPriority.HIGH,
+        'action_url': f'/admin/academics/enrollment/{enrollment.pk}/change/',
+        'source_event': 'enrollment_created',
+    }
+
+
+def _enrollment_invoice_task(enrollment, today):
+    if enrollment.funding_type != 'SELF':
+        return None
+    return {
+        'title': f'Create invoice: {enrollment.learner}',
+        'description': f'Generate invoice for enrollment in {enrollment.qualification.short_title}.',
+        'assigned_role': 'FINANCE_CLERK',
+        'due_date': today + timedelta(days=3),
+        'priority': TaskPriority.MEDIUM,
+        'action_url': f'/admin/finance/invoice/add/?enrollment={enrollment.pk}',
+        'source_event': 'enrollment_created',
+    }
+
+
+def _assessment_marking_task(result, today):
+    if result.status != 'SUBMITTED':
+        return None
+    return {
+        'title': f'Mark assessment: {result.enrollment.learner} - {result.activity.name}',
+        'description': 'Assessment submitted and needs grading.',
+        'assigned_to': result.assessor,
+        'due_date': today + timedelta(days=3),
+        'priority': TaskPriority.HIGH,
+        'action_url': f'/portal/facilitator/assess/{result.pk}/',
+        'source_event': 'assessment_submitted',
+    }
+
+
+def _assessment_moderation_task(result, today):
+    if result.status != 'PENDING_MOD':
+        return None
+    return {
+        'title': f'Moderate assessment: {result.enrollment.learner} - {result.activity.name}',
+        'description': 'Assessment has been marked and needs moderation.',
+        'assigned_role': 'MODERATOR',
+        'due_date': today + timedelta(days=5),
+        'priority': TaskPriority.MEDIUM,
+        'action_url': f'/portal/facilitator/moderate/{result.pk}/',
+        'source_event': 'assessment_needs_moderation',
+    }
+
+
+def _poe_review_task(submission, today):
+    return {
+        'title': f'Review PoE: {submission.enrollment.learner}',
+        'description': f'Portfolio of Evidence submitted for {submission.enrollment.qualification.short_title}.',
+        'assigned_role': 'ASSESSOR',
+        'due_date': today + timedelta(days=7),
+        'priority': TaskPriority.MEDIUM,
+        'action_url': f'/admin/assessments/poesubmission/{submission.pk}/change/',
+        'source_event': 'poe_submitted',
+    }
+
+
+def _invoice_overdue_task(invoice, today):
+    if invoice.status != 'SENT' or not invoice.due_date or invoice.due_date >= today:
+        return None
+    return {
+        'title': f'Overdue invoice: {invoice.invoice_number}',
+        'description': f'Invoice {invoice.invoice_number} is overdue. Balance: R{invoice.balance_due}',
+        'assigned_role': 'FINANCE_CLERK',
+        'due_date': today,
+        'priority': TaskPriority.URGENT,
+        'action_url': f'/admin/finance/invoice/{invoice.pk}/change/',
+        'source_event': 'invoice_overdue',
+    }
+
+
+def _attendance_capture_task(session, today):
+    if session.date > today or session.is_cancelled or session.has_attendance:
+        return None
+    return {
+        'title': f'Capture attendance: {session.cohort.code} - {session.date}',
+        'description': f'Session for {session.module.title} needs attendance capture.',
+        'assigned_to': session.facilitator,
+        'due_date': session.date + timedelta(days=1),
+        'priority': TaskPriority.HIGH,
+        'action_url': f'/capture/attendance/{session.pk}/',
+        'source_event': 'session_completed',
+    }
+
+
+def _grant_report_task(project, today):
+    if project.status != 'ACTIVE' or not project.end_date or (project.end_date - today).days > 30:
+        return None
+    return {
+        'title': f'Project completion report: {project.project_name}',
+        'description': 'Project end date approaching. Prepare completion report.',
+        'assigned_to': project.project_manager,
+        'due_date': project.end_date - timedelta(days=7),
+        'priority': TaskPriority.HIGH,
+        'action_url': f'/admin/corporate/grantproject/{project.pk}/change/',
+        'source_event': 'grant_ending_soon',
+    }
+
+
+def _learner_at_risk_task(enrollment, today):
+    if enrollment.nyc_count < AT_RISK_NYC_THRESHOLD:
+        return None
+    return {
+        'title': f'At-risk learner: {enrollment.learner}',
+        'description': f'Learner has {enrollment.nyc_count} NYC results. Intervention required.',
+        'assigned_to': enrollment.cohort.facilitator if enrollment.cohort else None,
+        'assigned_role': 'FACILITATOR' if not enrollment.cohort else '',
+        'due_date': today + timedelta(days=3),
+        'priority': TaskPriority.HIGH,
+        'action_url': f'/admin/academics/enrollment/{enrollment.pk}/change/',
+        'source_event': 'learner_at_risk',
+    }
+
+
+def _with_attendance_flag(qs):
+    from logistics.models import Attendance
+    return qs.annotate(has_attendance=Exists(Attendance.objects.filter(session=OuterRef('pk'))))
+
+
+def _with_nyc_count(qs):
+    return qs.annotate(nyc_count=Count('assessment_results', filter=Q(assessment_results__result='NYC')))
+
+
+TASK_EVENTS: Dict[str, TaskEvent] = {
+    ENROLLMENT_CREATED: TaskEvent(
+        'academics.Enrollment',
+        rules=(
+            TaskRule(TaskCategory.REGISTRATION_SETA, _seta_registration_task),
+            TaskRule(TaskCategory.INVOICE_CREATE, _enrollment_invoice_task),
+        ),
+        select_related=('learner', 'qualification'),
+    ),
+    ASSESSMENT_RESULT_SAVED: TaskEvent(
+        'assessments.AssessmentResult',
+        rules=(
+            TaskRule(TaskCategory.ASSESSMENT_MARK, _assessment_marking_task),
+            TaskRule(TaskCategory.ASSESSMENT_MODERATE, _assessment_moderation_task),
+        ),
+        select_related=('enrollment__learner', 'activity', 'assessor'),
+    ),
+    POE_SUBMITTED: TaskEvent(
+        'assessments.PoESubmission',
+        rules=(TaskRule(TaskCategory.POE_REVIEW, _poe_review_task),),
+        select_related=('enrollment__learner', 'enrollment__qualification'),
+    ),
+    INVOICE_SAVED: TaskEvent(
+        'finance.Invoice',
+        rules=(TaskRule(TaskCategory.PAYMENT_OVERDUE, _invoice_overdue_task),),
+    ),
+    SESSION_SAVED: TaskEvent(
+        'logistics.ScheduleSession',
+        rules=(TaskRule(TaskCategory.ATTENDANCE_CAPTURE, _attendance_capture_task),),
+        select_related=('cohort', 'module', 'facilitator'),
+        annotate=_with_attendance_flag,
+    ),
+    GRANT_PROJECT_SAVED: TaskEvent(
+        'corporate.GrantProject',
+        rules=(TaskRule(TaskCategory.REPORT_DUE, _grant_report_task),),
+        select_related=('project_manager',),
+    ),
+    LEARNER_AT_RISK_CHECK: TaskEvent(
+        'academics.Enrollment',
+        rules=(TaskRule(TaskCategory.LEARNER_AT_RISK, _learner_at_risk_task),),
+        select_related=('learner', 'cohort__facilitator'),
+        annotate=_with_nyc_count,
+    ),
+}
+
+
+# =====================================================
+# DISPATCHER
+# =====================================================
+
+class TaskAutomationQueue:
+    """Task events queued on this thread, processed after commit."""
+
+    def __init__(self):
+        # {(event, pk): None} keeps queue order and drops repeats
+        self.pending: Dict[Tuple[str, Any], None] = {}
+        self.suspended = 0
+
+    def add(self, event: str, pk) -> None:
+        if not self.suspended and not self._flush_scheduled():
+            # Anything still queued belongs to a transaction that rolled back
+            self.pending.clear()
+            self.pending[(event, pk)] = None
+            transaction.on_commit(self.flush, robust=True)
+        else:
+            self.pending[(event, pk)] = None
+
+    def _flush_scheduled(self) -> bool:
+        return connection.in_atomic_block and any(
+            callback[1] == self.flush for callback in connection.run_on_commit
+        )
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Create the tasks for all queued events.
+
+        Returns:
+            Dict with events processed and tasks created
+        """
+        pending, self.pending = list(self.pending), {}
+        if not pending:
+            return {'events': 0, 'created': 0}
+
+        pks_by_event: Dict[str, List] = {}
+        for event, pk in pending:
+            pks_by_event.setdefault(event, []).append(pk)
+
+        today = timezone.now().date()
+        candidates: Dict[str, List[Task]] = {}
+        for event, pks in pks_by_event.items():
+            spec = TASK_EVENTS[event]
+            content_type = ContentType.objects.get_for_model(apps.get_model(spec.model))
+            for instance in spec.load(pks):
+                for rule in spec.rules:
+                    fields = rule.build(instance, today)
+                    if fields is None:
+                        continue
+                    candidates.setdefault(rule.category, []).append(Task(
+                        category=rule.category,
+                        content_type=content_type,
+                        object_id=instance.pk,
+                        is_auto_generated=True,
+                        **fields,
+                    ))
+
+        tasks = []
+        for category, category_tasks in candidates.items():
+            existing = set(Task.objects.filter(
+                category=category,
+                status__in=OPEN_TASK_STATUSES,
+                content_type_id__in={task.content_type_id for task in category_tasks},
+                object_id__in={task.object_id for task in category_tasks},
+            ).values_list('content_type_id', 'object_id'))
+            for task in category_tasks:
+                key = (task.content_type_id, task.object_id)
+                if key not in existing:
+                    existing.add(key)
+                    tasks.append(task)
+
+        Task.objects.bulk_create(tasks, batch_size=BULK_BATCH_SIZE)
+        # bulk_create skips the search index save hooks
+        update_search_index(Task, [task.pk for task in tasks if task.pk])
+        if tasks:
+            logger.info(f"Task automation: {len(tasks)} tasks created from {len(pending)} events")
+        return {'events': len(pending), 'created': len(tasks)}
+
+
+def _queue() -> TaskAutomationQueue:
+    queue = getattr(_local, 'queue', None)
+    if queue is None:
+        queue = _local.queue = TaskAutomationQueue()
+    return queue
+
+
+def queue_task_event(event: str, pk) -> None:
+    """Queue a task-automation event (one of TASK_EVENTS) for a saved row."""
+    _queue().add(event, pk)
+
+
+def flush_task_automation() -> Dict[str, int]:
+    """Process all queued task events now."""
+    return _queue().flush()
+
+
+@contextmanager
+def suspend_task_automation():
+    """
+    Hold task events queued in the block and process them in one batch
+    when it ends (after commit if it ends inside a transaction).
+    """
+    queue = _queue()
+    queue.suspended += 1
+    try:
+        yield queue
+    finally:
+        queue.suspended -= 1
+        if not queue.suspended and queue.pending:
+            if connection.in_atomic_block:
+                transaction.on_commit(queue.flush, robust=True)
+            else:
+                queue.flush()
@@ -12,6 +12,10 @@ from datetime import timedelta
 import logging
 
 from .tasks import Task, TaskCategory, TaskPriority, TaskStatus
+from .task_automation import (
+    ASSESSMENT_RESULT_SAVED, ENROLLMENT_CREATED, GRANT_PROJECT_SAVED, INVOICE_SAVED,
+    LEARNER_AT_RISK_CHECK, POE_SUBMITTED, SESSION_SAVED, queue_task_event,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -134,39 +138,14 @@ def handle_not_status_change(sender, instance, created, **kwargs):
 # =====================================================
 # ENROLLMENT SIGNALS
 # =====================================================
+# Task-creating receivers queue an event; the tasks are created in one
+# batch after the transaction commits (see task_automation).
 
 @receiver(post_save, sender='academics.Enrollment')
 def create_enrollment_tasks(sender, instance, created, **kwargs):
-    """When enrollment is created or status changes"""
+    """When enrollment is created: SETA registration and (self-funded) invoice tasks"""
     if created:
-        # Create SETA registration task
-        Task.create_task(
-            title=f'Register with SETA: {instance.learner}',
-            description=f'New enrollment for {instance.qualification.title} needs SETA registration.',
-            category=TaskCategory.REGISTRATION_SETA,
-            assigned_role='REGISTRAR',
-            due_date=timezone.now().date() + timedelta(days=5),
-            priority=TaskPriority.HIGH,
-            related_object=instance,
-            action_url=f'/admin/academics/enrollment/{instance.pk}/change/',
-            is_auto=True,
-            source_event='enrollment_created'
-        )
-        
-        # Create invoice task if self-funded
-        if instance.funding_type == 'SELF':
-            Task.create_task(
-                title=f'Create invoice: {instance.learner}',
-                description=f'Generate invoice for enrollment in {instance.qualification.short_title}.',
-                category=TaskCategory.INVOICE_CREATE,
-                assigned_role='FINANCE_CLERK',
-                due_date=timezone.now().date() + timedelta(days=3),
-                priority=TaskPriority.MEDIUM,
-                related_object=instance,
-                action_url=f'/admin/finance/invoice/add/?enrollment={instance.pk}',
-                is_auto=True,
-                source_event='enrollment_created'
-            )
+        queue_task_event(ENROLLMENT_CREATED, instance.pk)
 
 
 # =====================================================
@@ -176,53 +155,15 @@ def create_enrollment_tasks(sender, instance, created, **kwargs):
 @receiver(post_save, sender='assessments.AssessmentResult')
 def create_assessment_tasks(sender, instance, created, **kwargs):
     """When assessment result is submitted or needs moderation"""
-    if instance.status == 'SUBMITTED':
-        # Create marking task
-        Task.create_task(
-            title=f'Mark assessment: {instance.enrollment.learner} - {instance.activity.name}',
-            description=f'Assessment submitted and needs grading.',
-            category=TaskCategory.ASSESSMENT_MARK,
-            assigned_to=instance.assessor,
-            due_date=timezone.now().date() + timedelta(days=3),
-            priority=TaskPriority.HIGH,
-            related_object=instance,
-            action_url=f'/portal/facilitator/assess/{instance.pk}/',
-            is_auto=True,
-            source_event='assessment_submitted'
-        )
-    
-    elif instance.status == 'PENDING_MOD':
-        # Create moderation task
-        Task.create_task(
-            title=f'Moderate assessment: {instance.enrollment.learner} - {instance.activity.name}',
-            description=f'Assessment has been marked and needs moderation.',
-            category=TaskCategory.ASSESSMENT_MODERATE,
-            assigned_role='MODERATOR',
-            due_date=timezone.now().date() + timedelta(days=5),
-            priority=TaskPriority.MEDIUM,
-            related_object=instance,
-            action_url=f'/portal/facilitator/moderate/{instance.pk}/',
-            is_auto=True,
-            source_event='assessment_needs_moderation'
-        )
+    if instance.status in ('SUBMITTED', 'PENDING_MOD'):
+        queue_task_event(ASSESSMENT_RESULT_SAVED, instance.pk)
 
 
 @receiver(post_save, sender='assessments.PoESubmission')
 def create_poe_review_task(sender, instance, created, **kwargs):
     """When PoE is submitted"""
     if created:
-        Task.create_task(
-            title=f'Review PoE: {instance.enrollment.learner}',
-            description=f'Portfolio of Evidence submitted for {instance.enrollment.qualification.short_title}.',
-            category=TaskCategory.POE_REVIEW,
-            assigned_role='ASSESSOR',
-            due_date=timezone.now().date() + timedelta(days=7),
-            priority=TaskPriority.MEDIUM,
-            related_object=instance,
-            action_url=f'/admin/assessments/poesubmission/{instance.pk}/change/',
-            is_auto=True,
-            source_event='poe_submitted'
-        )
+        queue_task_event(POE_SUBMITTED, instance.pk)
 
 
 # =====================================================
@@ -232,31 +173,8 @@ def create_poe_review_task(sender, instance, created, **kwargs):
 @receiver(post_save, sender='finance.Invoice')
 def create_invoice_tasks(sender, instance, **kwargs):
     """When invoice becomes overdue or needs follow-up"""
-    today = timezone.now().date()
-    
-    # Check if just became overdue
-    if instance.status == 'SENT' and instance.due_date < today:
-        # Check if overdue task already exists
-        existing = Task.objects.filter(
-            content_type=ContentType.objects.get_for_model(instance),
-            object_id=instance.pk,
-            category=TaskCategory.PAYMENT_OVERDUE,
-            status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
-        ).exists()
-        
-        if not existing:
-            Task.create_task(
-                title=f'Overdue invoice: {instance.invoice_number}',
-                description=f'Invoice {instance.invoice_number} is overdue. Balance: R{instance.balance_due}',
-                category=TaskCategory.PAYMENT_OVERDUE,
-                assigned_role='FINANCE_CLERK',
-                due_date=today,
-                priority=TaskPriority.URGENT,
-                related_object=instance,
-                action_url=f'/admin/finance/invoice/{instance.pk}/change/',
-                is_auto=True,
-                source_event='invoice_overdue'
-            )
+    if instance.status == 'SENT' and instance.due_date and instance.due_date < timezone.now().date():
+        queue_task_event(INVOICE_SAVED, instance.pk)
 
 
 # =====================================================
@@ -266,32 +184,8 @@ def create_invoice_tasks(sender, instance, **kwargs):
 @receiver(post_save, sender='logistics.ScheduleSession')
 def create_attendance_task(sender, instance, created, **kwargs):
     """Create attendance capture task after session date"""
-    today = timezone.now().date()
-    
-    if instance.date <= today and not instance.is_cancelled:
-        # Check if attendance already recorded
-        if not instance.attendance_records.exists():
-            # Check if task already exists
-            existing = Task.objects.filter(
-                content_type=ContentType.objects.get_for_model(instance),
-                object_id=instance.pk,
-                category=TaskCategory.ATTENDANCE_CAPTURE,
-                status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
-            ).exists()
-            
-            if not existing:
-                Task.create_task(
-                    title=f'Capture attendance: {instance.cohort.code} - {instance.date}',
-                    description=f'Session for {instance.module.title} needs attendance capture.',
-                    category=TaskCategory.ATTENDANCE_CAPTURE,
-                    assigned_to=instance.facilitator,
-                    due_date=instance.date + timedelta(days=1),
-                    priority=TaskPriority.HIGH,
-                    related_object=instance,
-                    action_url=f'/capture/attendance/{instance.pk}/',
-                    is_auto=True,
-                    source_event='session_completed'
-                )
+    if instance.date <= timezone.now().date() and not instance.is_cancelled:
+        queue_task_event(SESSION_SAVED, instance.pk)
 
 
 # =====================================================
@@ -303,29 +197,8 @@ def create_grant_tasks(sender, instance, **kwargs):
     """Create tasks for grant milestones"""
     today = timezone.now().date()
     
-    if instance.status == 'ACTIVE':
-        # Check for upcoming reporting deadlines
-        if instance.end_date and (instance.end_date - today).days <= 30:
-            existing = Task.objects.filter(
-                content_type=ContentType.objects.get_for_model(instance),
-                object_id=instance.pk,
-                category=TaskCategory.REPORT_DUE,
-                status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
-            ).exists()
-            
-            if not existing:
-                Task.create_task(
-                    title=f'Project completion report: {instance.project_name}',
-                    description=f'Project end date approaching. Prepare completion report.',
-                    category=TaskCategory.REPORT_DUE,
-                    assigned_to=instance.project_manager,
-                    due_date=instance.end_date - timedelta(days=7),
-                    priority=TaskPriority.HIGH,
-                    related_object=instance,
-                    action_url=f'/admin/corporate/grantproject/{instance.pk}/change/',
-                    is_auto=True,
-                    source_event='grant_ending_soon'
-                )
+    if instance.status == 'ACTIVE' and instance.end_date and (instance.end_date - today).days <= 30:
+        queue_task_event(GRANT_PROJECT_SAVED, instance.pk)
 
 
 # =====================================================
@@ -333,39 +206,11 @@ def create_grant_tasks(sender, instance, **kwargs):
 # =====================================================
 
 def check_learner_at_risk(enrollment):
-    """Check if learner is at risk and create intervention task"""
-    from assessments.models import AssessmentResult
-    from django.db.models import Count, Q
-    
-    # Count NYC results
-    nyc_count = AssessmentResult.objects.filter(
-        enrollment=enrollment,
-        result='NYC'
-    ).count()
-    
-    if nyc_count >= 2:
-        # Check if task already exists
-        existing = Task.objects.filter(
-            content_type=ContentType.objects.get_for_model(enrollment),
-            object_id=enrollment.pk,
-            category=TaskCategory.LEARNER_AT_RISK,
-            status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
-        ).exists()
-        
-        if not existing:
-            Task.create_task(
-                title=f'At-risk learner: {enrollment.learner}',
-                description=f'Learner has {nyc_count} NYC results. Intervention required.',
-                category=TaskCategory.LEARNER_AT_RISK,
-                assigned_to=enrollment.cohort.facilitator if enrollment.cohort else None,
-                assigned_role='FACILITATOR' if not enrollment.cohort else '',
-                due_date=timezone.now().date() + timedelta(days=3),
-                priority=TaskPriority.HIGH,
-                related_object=enrollment,
-                action_url=f'/admin/academics/enrollment/{enrollment.pk}/change/',
-                is_auto=True,
-                source_event='learner_at_risk'
-            )
+    """
+    Check if learner is at risk and create intervention task.
+    Checks for the same enrollment are coalesced into one per batch.
+    """
+    queue_task_event(LEARNER_AT_RISK_CHECK, enrollment.pk)
 
 
 # Connect the at-risk check to assessment results
@@ -373,7 +218,7 @@ def check_learner_at_risk(enrollment):
 def check_at_risk_on_assessment(sender, instance, **kwargs):
     """After NYC result, check if learner is at risk"""
     if instance.result == 'NYC':
-        check_learner_at_risk(instance.enrollment)
+        queue_task_event(LEARNER_AT_RISK_CHECK, instance.enrollment_id)
 
 
 # =====================================================
@@ -16,6 +16,7 @@ from django.urls import reverse
 from datetime import date, timedelta
 import json
 
+from .services.search import search
 from .tasks import Task, TaskCategory, TaskStatus, TaskPriority, TaskComment
 
 
@@ -95,14 +96,14 @@ class TaskListAPIView(LoginRequiredMixin, View):
             # Default: show open tasks
             queryset = queryset.exclude(status__in=[TaskStatus.COMPLETED, TaskStatus.CANCELLED])
         
-        search = request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+        ordering = ['-priority', 'due_date', '-created_at']
+        query = request.GET.get('search')
+        if query:
+            queryset = search(queryset, query)
+            ordering.insert(0, '-search_rank')
         
         # Order and limit
-        queryset = queryset.order_by('-priority', 'due_date', '-created_at')[:50]
+        queryset = queryset.order_by(*ordering)[:50]
         
         # Build response
         tasks = []
@@ -173,13 +174,10 @@ class TaskListView(LoginRequiredMixin, ListView):
         elif date_filter == 'month':
             queryset = queryset.filter(due_date__range=[today, today + timedelta(days=30)])
         
-        # Search
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search)
-            )
+        # Search (best matches first)
+        query = self.request.GET.get('search')
+        if query:
+            return search(queryset, query).order_by('-search_rank', '-priority', 'due_date', '-created_at')
         
         return queryset.order_by('-priority', 'due_date', '-created_at')
     
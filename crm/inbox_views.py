@@ -24,6 +24,7 @@ from crm.communication_models import (
 )
 from crm.services.messaging import MessagingService
 from core.context_processors import get_selected_campus
+from core.services.search import search
 
 
 class InboxListView(LoginRequiredMixin, ListView):
@@ -576,12 +577,7 @@ class SearchLeadsView(LoginRequiredMixin, View):
         if len(query) < 2:
             return JsonResponse({'leads': []})
         
-        leads = Lead.objects.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(phone__icontains=query)
-        )[:20]
+        leads = search(Lead, query)[:20]
         
         return JsonResponse({
             'leads': [
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finance'
+    
+    def ready(self):
+        # Import signals to register them
+        import finance.signals  # noqa: F401
@@ -3088,8 +3088,8 @@ class FunderCollectionMetrics(TenantAwareModel):
         entity = self.funder_type or self.corporate_client or self.learner or self.training_notification
         return f"{entity} - {self.get_period_type_display()} ({self.period_end})"
     
-    def calculate_rates(self):
-        """Recalculate all rates from totals"""
+    def calculate_rates(self, commit=True):
+        """Recalculate all rates from totals. Pass commit=False when bulk-saving."""
         if self.total_invoiced > 0:
             self.collection_rate = (self.total_collected / self.total_invoiced) * 100
             self.bad_debt_ratio = (self.total_bad_debt / self.total_invoiced) * 100
@@ -3112,4 +3112,5 @@ class FunderCollectionMetrics(TenantAwareModel):
             self.risk_rating = 'CRITICAL'
             self.is_good_business = False
         
-        self.save()
+        if commit:
+            self.save()
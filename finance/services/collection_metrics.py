@@ -0,0 +1,430 @@
+"""
+Collection Metrics Engine
+Recomputes project, funder-type and corporate collection metrics in a single
+grouped pass over invoices and payments, then upserts FunderCollectionMetrics
+rows in bulk.
+
+Full mode rebuilds every scope. Incremental mode only recomputes the scopes
+touched by invoices or payments changed since the last run; rolling windows
+still move daily, so a full run should be scheduled at least once a day.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Set
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FUNDER_TYPES = ['PRIVATE', 'SETA', 'CORPORATE', 'CORPORATE_DG', 'MUNICIPALITY', 'GOVERNMENT']
+
+OUTSTANDING_STATUSES = ('SENT', 'PARTIAL', 'OVERDUE')
+
+# Cache key holding the start time of the last completed run
+LAST_RUN_CACHE_KEY = 'finance:collection_metrics:last_run'
+
+# Fields written per entity type - mirrors the per-entity calculate_* methods
+PROJECT_FIELDS = [
+    'period_start', 'period_end', 'total_invoiced', 'total_collected', 'total_outstanding',
+    'invoices_issued', 'invoices_paid_on_time', 'invoices_paid_late', 'invoices_outstanding',
+    'average_days_to_payment', 'aging_current', 'aging_30_days', 'aging_60_days',
+    'aging_90_days', 'aging_over_90', 'campus',
+]
+SUMMARY_FIELDS = [
+    'period_start', 'period_end', 'total_invoiced', 'total_collected', 'total_outstanding',
+    'invoices_issued', 'campus',
+]
+RATE_FIELDS = [
+    'collection_rate', 'bad_debt_ratio', 'persistency_rate', 'risk_rating', 'is_good_business',
+]
+
+
+class _MetricsAccumulator:
+    """Running totals for one metrics scope (entity + period window)."""
+
+    def __init__(self, period_start: date, period_end: date):
+        self.period_start = period_start
+        self.period_end = period_end
+        self.invoice_ids: Set[int] = set()
+        self.total_invoiced = Decimal('0.00')
+        self.total_collected = Decimal('0.00')
+        self.invoices_paid = 0
+        self.invoices_outstanding = 0
+        self.invoices_paid_on_time = 0
+        self.invoices_paid_late = 0
+        self.days_to_payment_total = 0
+        self.days_to_payment_count = 0
+        self.aging = {
+            'aging_current': Decimal('0.00'),
+            'aging_30_days': Decimal('0.00'),
+            'aging_60_days': Decimal('0.00'),
+            'aging_90_days': Decimal('0.00'),
+            'aging_over_90': Decimal('0.00'),
+        }
+
+    def add(self, invoice: dict, today: date):
+        """Fold one invoice row into the totals (each invoice counted once)."""
+        if invoice['id'] in self.invoice_ids:
+            return
+        if not (self.period_start <= invoice['invoice_date'] <= self.period_end):
+            return
+        self.invoice_ids.add(invoice['id'])
+
+        total = invoice['total'] or Decimal('0.00')
+        paid = invoice['amount_paid'] or Decimal('0.00')
+        self.total_invoiced += total
+        self.total_collected += paid
+
+        status = invoice['status']
+        first_payment_date = invoice['first_payment_date']
+        if status == 'PAID':
+            self.invoices_paid += 1
+            if first_payment_date:
+                if first_payment_date <= invoice['due_date']:
+                    self.invoices_paid_on_time += 1
+                else:
+                    self.invoices_paid_late += 1
+                self.days_to_payment_total += (first_payment_date - invoice['invoice_date']).days
+                self.days_to_payment_count += 1
+        elif status in OUTSTANDING_STATUSES:
+            self.invoices_outstanding += 1
+            days_overdue = (today - invoice['due_date']).days
+            balance = total - paid
+            if days_overdue <= 0:
+                self.aging['aging_current'] += balance
+            elif days_overdue <= 30:
+                self.aging['aging_30_days'] += balance
+            elif days_overdue <= 60:
+                self.aging['aging_60_days'] += balance
+            elif days_overdue <= 90:
+                self.aging['aging_90_days'] += balance
+            else:
+                self.aging['aging_over_90'] += balance
+
+    @property
+    def average_days_to_payment(self) -> Optional[Decimal]:
+        if not self.days_to_payment_count:
+            return None
+        return Decimal(self.days_to_payment_total) / self.days_to_payment_count
+
+    def summary_values(self) -> dict:
+        return {
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'total_invoiced': self.total_invoiced,
+            'total_collected': self.total_collected,
+            'total_outstanding': self.total_invoiced - self.total_collected,
+            'invoices_issued': len(self.invoice_ids),
+        }
+
+    def project_values(self) -> dict:
+        values = self.summary_values()
+        values.update({
+            'invoices_paid_on_time': self.invoices_paid_on_time,
+            'invoices_paid_late': self.invoices_paid_late,
+            'invoices_outstanding': self.invoices_outstanding,
+            'average_days_to_payment': self.average_days_to_payment,
+            **self.aging,
+        })
+        return values
+
+
+class CollectionMetricsEngine:
+    """
+    Computes all collection metrics scopes from one invoice read.
+
+    Usage:
+        CollectionMetricsEngine().run()                  # full rebuild
+        CollectionMetricsEngine().run(incremental=True)  # touched scopes only
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, today: Optional[date] = None):
+        self.today = today or date.today()
+        self.quarter_start = self.today - relativedelta(months=3)
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def run(self, incremental: bool = False, since=None) -> Dict[str, int]:
+        """
+        Recalculate metrics and upsert them in bulk.
+
+        Args:
+            incremental: Only recompute scopes touched since the last run
+            since: Override the change watermark used in incremental mode
+
+        Returns:
+            Dict with created/updated row counts
+        """
+        started = timezone.now()
+
+        project_ids = corporate_ids = funder_types = None
+        if incremental:
+            if since is None:
+                since = self._last_run()
+            if since is not None:
+                project_ids, corporate_ids, funder_types = self._touched_scopes(since)
+                if not (project_ids or corporate_ids or funder_types):
+                    cache.set(LAST_RUN_CACHE_KEY, started, None)
+                    return {'created': 0, 'updated': 0}
+
+        result = self._recalculate(project_ids, corporate_ids, funder_types)
+        cache.set(LAST_RUN_CACHE_KEY, started, None)
+        return result
+
+    # =========================================================================
+    # Scope selection
+    # =========================================================================
+
+    def _last_run(self):
+        """Start time of the previous run, falling back to the newest metrics row."""
+        from finance.models import FunderCollectionMetrics
+
+        last_run = cache.get(LAST_RUN_CACHE_KEY)
+        if last_run is None:
+            last_run = FunderCollectionMetrics.objects.aggregate(
+                last=Max('calculated_at')
+            )['last']
+        return last_run
+
+    def _touched_scopes(self, since):
+        """Resolve invoices/payments changed since `since` to metrics scopes."""
+        from core.models import TrainingNotification
+        from finance.models import Invoice, ScheduledInvoice
+
+        invoice_ids = set(
+            Invoice.objects.filter(
+                Q(updated_at__gte=since) | Q(payments__updated_at__gte=since)
+            ).values_list('id', flat=True).distinct()
+        )
+        if not invoice_ids:
+            return set(), set(), set()
+
+        project_ids = set()
+        corporate_ids = set()
+        for corporate_id, tranche_project_id in Invoice.objects.filter(
+            id__in=invoice_ids
+        ).values_list('corporate_client_id', 'tranche__training_notification_id'):
+            if corporate_id:
+                corporate_ids.add(corporate_id)
+            if tranche_project_id:
+                project_ids.add(tranche_project_id)
+
+        project_ids.update(
+            ScheduledInvoice.objects.filter(invoice_id__in=invoice_ids).values_list(
+                'billing_schedule__training_notification_id', flat=True
+            )
+        )
+
+        funder_types = set(
+            TrainingNotification.objects.filter(id__in=project_ids).values_list('funder', flat=True)
+        ) & set(FUNDER_TYPES)
+
+        return project_ids, corporate_ids, funder_types
+
+    # =========================================================================
+    # Calculation
+    # =========================================================================
+
+    def _recalculate(self, project_ids=None, corporate_ids=None, funder_types=None):
+        """
+        Build every requested scope from one invoice query.
+
+        `None` for a scope set means "all"; an empty set means "none".
+        """
+        from core.models import TrainingNotification
+        from corporate.models import CorporateClient
+        from finance.models import Invoice, ScheduledInvoice
+
+        full_run = project_ids is None
+
+        # Projects: written rows are limited to live projects, but funder-type
+        # totals span every project of that funder, as in the per-entity path.
+        project_filter = Q()
+        if not full_run:
+            project_filter = Q(id__in=project_ids) | Q(funder__in=funder_types)
+        projects = {
+            row['id']: row for row in TrainingNotification.objects.filter(project_filter).values(
+                'id', 'funder', 'is_deleted', 'planned_start_date', 'created_at', 'delivery_campus_id'
+            ).order_by('-created_at')
+        }
+        if full_run:
+            written_project_ids = {pk for pk, row in projects.items() if not row['is_deleted']}
+            funder_types = set(FUNDER_TYPES)
+        else:
+            written_project_ids = {
+                pk for pk in project_ids if pk in projects and not projects[pk]['is_deleted']
+            }
+
+        # CorporateClient.is_active is a property over status
+        corporates = CorporateClient.objects.filter(status='ACTIVE')
+        if corporate_ids is not None:
+            corporates = corporates.filter(id__in=corporate_ids)
+        corporate_campus = dict(corporates.values_list('id', 'campus_id'))
+
+        # Scope windows
+        lifetime_starts = {}
+        for pk in written_project_ids:
+            row = projects[pk]
+            lifetime_starts[pk] = row['planned_start_date'] or timezone.localtime(row['created_at']).date()
+        earliest = min([self.quarter_start, *lifetime_starts.values()])
+
+        project_quarterly = {pk: _MetricsAccumulator(self.quarter_start, self.today) for pk in written_project_ids}
+        project_lifetime = {pk: _MetricsAccumulator(lifetime_starts[pk], self.today) for pk in written_project_ids}
+        funder_quarterly = {ft: _MetricsAccumulator(self.quarter_start, self.today) for ft in funder_types}
+        corporate_quarterly = {pk: _MetricsAccumulator(self.quarter_start, self.today) for pk in corporate_campus}
+
+        # One grouped read: invoice facts plus first completed payment date
+        if full_run:
+            project_scope = Q()
+            invoice_filter = Q(tranche__isnull=False) | Q(scheduled_invoice_link__isnull=False) | Q(
+                corporate_client_id__in=corporates.values('id')
+            )
+        else:
+            project_scope = Q(billing_schedule__training_notification_id__in=list(projects))
+            invoice_filter = Q(tranche__training_notification_id__in=list(projects)) | Q(
+                scheduled_invoice_link__billing_schedule__training_notification_id__in=list(projects)
+            ) | Q(corporate_client_id__in=list(corporate_campus))
+        invoices = list(
+            Invoice.objects.filter(
+                invoice_filter,
+                invoice_date__gte=earliest,
+                invoice_date__lte=self.today,
+            ).values(
+                'id', 'invoice_date', 'due_date', 'status', 'total', 'amount_paid',
+                'corporate_client_id', 'tranche__training_notification_id',
+            ).annotate(
+                first_payment_date=Min('payments__payment_date', filter=Q(payments__status='COMPLETED'))
+            ).order_by()
+        )
+
+        invoice_projects = defaultdict(set)
+        for invoice_id, project_id in ScheduledInvoice.objects.filter(
+            project_scope,
+            invoice__invoice_date__gte=earliest,
+            invoice__invoice_date__lte=self.today,
+        ).values_list('invoice_id', 'billing_schedule__training_notification_id'):
+            invoice_projects[invoice_id].add(project_id)
+
+        for invoice in invoices:
+            linked = set(invoice_projects.get(invoice['id'], ()))
+            tranche_project_id = invoice['tranche__training_notification_id']
+            if tranche_project_id in projects:
+                linked.add(tranche_project_id)
+
+            for project_id in linked:
+                if project_id not in projects:
+                    continue
+                if project_id in project_quarterly:
+                    project_quarterly[project_id].add(invoice, self.today)
+                    project_lifetime[project_id].add(invoice, self.today)
+                funder = projects[project_id]['funder']
+                if funder in funder_quarterly:
+                    funder_quarterly[funder].add(invoice, self.today)
+
+            corporate_id = invoice['corporate_client_id']
+            if corporate_id in corporate_quarterly:
+                corporate_quarterly[corporate_id].add(invoice, self.today)
+
+        # Campus for funder-type rows comes from the newest project of that type
+        funder_campus = {}
+        for row in projects.values():
+            funder_campus.setdefault(row['funder'], row['delivery_campus_id'])
+
+        rows = {}
+        for pk in written_project_ids:
+            campus_id = projects[pk]['delivery_campus_id']
+            rows[('PROJECT', 'QUARTERLY', pk)] = (project_quarterly[pk].project_values(), campus_id)
+            rows[('PROJECT', 'LIFETIME', pk)] = (project_lifetime[pk].project_values(), campus_id)
+        for funder, acc in funder_quarterly.items():
+            rows[('FUNDER_TYPE', 'QUARTERLY', funder)] = (acc.summary_values(), funder_campus.get(funder))
+        for pk, acc in corporate_quarterly.items():
+            rows[('CORPORATE', 'QUARTERLY', pk)] = (acc.summary_values(), corporate_campus[pk])
+
+        return self._upsert(rows, written_project_ids, set(funder_types), set(corporate_campus))
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    def _upsert(self, rows, project_ids, funder_types, corporate_ids) -> Dict[str, int]:
+        """Apply computed values to existing rows and bulk create/update."""
+        from finance.models import FunderCollectionMetrics
+
+        existing = {}
+        for metrics in FunderCollectionMetrics.objects.filter(
+            Q(entity_type='PROJECT', period_type__in=['QUARTERLY', 'LIFETIME'],
+              training_notification_id__in=project_ids) |
+            Q(entity_type='FUNDER_TYPE', period_type='QUARTERLY', funder_type__in=funder_types) |
+            Q(entity_type='CORPORATE', period_type='QUARTERLY', corporate_client_id__in=corporate_ids)
+        ).order_by('id'):
+            existing.setdefault(self._key(metrics), metrics)
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        for key, (values, campus_id) in rows.items():
+            if campus_id is None:
+                logger.info(f"Skipping collection metrics for {key}: no campus to assign")
+                continue
+
+            metrics = existing.get(key)
+            if metrics is None:
+                metrics = self._new_metrics(key)
+                to_create.append(metrics)
+            else:
+                to_update.append(metrics)
+
+            for field, value in values.items():
+                setattr(metrics, field, value)
+            metrics.campus_id = campus_id
+            metrics.calculated_at = now
+            metrics.updated_at = now
+            metrics.calculate_rates(commit=False)
+
+        project_update = [m for m in to_update if m.entity_type == 'PROJECT']
+        summary_update = [m for m in to_update if m.entity_type != 'PROJECT']
+        audit_fields = ['calculated_at', 'updated_at']
+
+        with transaction.atomic():
+            FunderCollectionMetrics.objects.bulk_create(to_create, batch_size=self.BATCH_SIZE)
+            if project_update:
+                FunderCollectionMetrics.objects.bulk_update(
+                    project_update, PROJECT_FIELDS + RATE_FIELDS + audit_fields, batch_size=self.BATCH_SIZE
+                )
+            if summary_update:
+                FunderCollectionMetrics.objects.bulk_update(
+                    summary_update, SUMMARY_FIELDS + RATE_FIELDS + audit_fields, batch_size=self.BATCH_SIZE
+                )
+
+        return {'created': len(to_create), 'updated': len(to_update)}
+
+    @staticmethod
+    def _key(metrics):
+        if metrics.entity_type == 'PROJECT':
+            return ('PROJECT', metrics.period_type, metrics.training_notification_id)
+        if metrics.entity_type == 'FUNDER_TYPE':
+            return ('FUNDER_TYPE', metrics.period_type, metrics.funder_type)
+        return (metrics.entity_type, metrics.period_type, metrics.corporate_client_id)
+
+    @staticmethod
+    def _new_metrics(key):
+        from finance.models import FunderCollectionMetrics
+
+        entity_type, period_type, entity = key
+        metrics = FunderCollectionMetrics(entity_type=entity_type, period_type=period_type)
+        if entity_type == 'PROJECT':
+            metrics.training_notification_id = entity
+        elif entity_type == 'FUNDER_TYPE':
+            metrics.funder_type = entity
+        else:
+            metrics.corporate_client_id = entity
+        return metrics
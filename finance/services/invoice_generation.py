@@ -563,33 +563,12 @@ class CollectionMetricsService:
         return metrics
     
     @staticmethod
-    def recalculate_all_metrics():
-        """Recalculate all collection metrics - can be run as scheduled task."""
-        from core.models import TrainingNotification
-        from corporate.models import CorporateClient
-        
-        # Calculate for all active projects
-        for project in TrainingNotification.objects.filter(is_deleted=False):
-            try:
-                CollectionMetricsService.calculate_project_metrics(project, 'QUARTERLY')
-                CollectionMetricsService.calculate_project_metrics(project, 'LIFETIME')
-            except Exception as e:
-                import logging
-                logging.getLogger(__name__).error(f"Error calculating metrics for {project}: {e}")
-        
-        # Calculate for all funder types
-        funder_types = ['PRIVATE', 'SETA', 'CORPORATE', 'CORPORATE_DG', 'MUNICIPALITY', 'GOVERNMENT']
-        for funder_type in funder_types:
-            try:
-                CollectionMetricsService.calculate_funder_type_metrics(funder_type, 'QUARTERLY')
-            except Exception as e:
-                import logging
-                logging.getLogger(__name__).error(f"Error calculating metrics for {funder_type}: {e}")
+    def recalculate_all_metrics(incremental=False, since=None):
+        """
+        Recalculate all collection metrics - can be run as scheduled task.
+        Projects, funder types and corporates are computed in one grouped pass;
+        incremental mode only touches scopes with invoice/payment changes.
+        """
+        from finance.services.collection_metrics import CollectionMetricsEngine
         
-        # Calculate for all corporate clients
-        for corporate in CorporateClient.objects.filter(is_active=True):
-            try:
-                CollectionMetricsService.calculate_corporate_metrics(corporate, 'QUARTERLY')
-            except Exception as e:
-                import logging
-                logging.getLogger(__name__).error(f"Error calculating metrics for {corporate}: {e}")
+        return CollectionMetricsEngine().run(incremental=incremental, since=since)
@@ -0,0 +1,227 @@
+"""
+Price Resolution Matrix
+
+Precomputed lookup tables for PricingService.get_effective_price.
+All ACTIVE CoursePricing rows on active strategies, plus regions, are loaded
+once and indexed by qualification; resolutions are memoised per
+(qualification, brand, campus/region, corporate client, date bucket).
+
+The matrix is held per PricingService instance (i.e. per request or job) and
+in the shared cache under a version stamp. Saving or deleting pricing rows,
+strategies, regions or campuses bumps the version (see finance.signals);
+expiry is handled by the date bucket, since effective_from/effective_to
+boundaries are part of the key.
+"""
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.core.cache import cache
+
+VERSION_CACHE_KEY = 'finance:price_matrix:version'
+MATRIX_CACHE_KEY = 'finance:price_matrix:{version}'
+MATRIX_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def invalidate_price_matrix():
+    """Bump the shared matrix version so every process rebuilds on next use."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_price_matrix() -> 'PriceResolutionMatrix':
+    """Return the shared matrix for the current version, building it if needed."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, None):
+            version = cache.get(VERSION_CACHE_KEY) or version
+
+    key = MATRIX_CACHE_KEY.format(version=version)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = PriceResolutionMatrix.build()
+        cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+    return matrix
+
+
+class PriceResolutionMatrix:
+    """
+    In-memory equivalent of the CAMPUS → REGION → CORPORATE → BRAND DEFAULT
+    pricing walk. Lookups never touch the database once built.
+    """
+
+    def __init__(self, pricing_rows, default_strategies, regions):
+        # Sorted like the walk's ORDER BY -pricing_strategy__priority, -effective_from
+        self._by_qualification: Dict[int, List] = defaultdict(list)
+        boundaries = set()
+        for pricing in pricing_rows:
+            self._by_qualification[pricing.qualification_id].append(pricing)
+            boundaries.add(pricing.effective_from)
+            if pricing.effective_to:
+                boundaries.add(pricing.effective_to + timedelta(days=1))
+        for rows in self._by_qualification.values():
+            rows.sort(key=lambda p: (-p.pricing_strategy.priority, -p.effective_from.toordinal()))
+        self._boundaries = sorted(boundaries)
+
+        # Default STANDARD strategy per brand (Meta ordering: -priority, name)
+        self._default_strategy: Dict[int, int] = {}
+        for strategy in default_strategies:
+            self._default_strategy.setdefault(strategy.brand_id, strategy.id)
+
+        self._regions_by_id = {region.id: region for region in regions}
+        self._regions_by_code = {region.code: region for region in regions}
+        self._regions_by_name = defaultdict(list)
+        for region in regions:
+            self._regions_by_name[region.name].append(region)
+
+        self._memo: Dict[Tuple, Tuple] = {}
+
+    @classmethod
+    def build(cls) -> 'PriceResolutionMatrix':
+        """Load active pricing, default strategies and regions in three queries."""
+        from core.models import Region
+        from finance.models import CoursePricing, PricingStrategy
+
+        pricing_rows = list(
+            CoursePricing.objects.filter(
+                status='ACTIVE',
+                pricing_strategy__is_active=True,
+            ).select_related('pricing_strategy')
+        )
+        default_strategies = list(
+            PricingStrategy.objects.filter(
+                strategy_type='STANDARD',
+                is_default=True,
+                is_active=True,
+            ).order_by('-priority', 'name')
+        )
+        regions = list(Region.objects.all())
+        return cls(pricing_rows, default_strategies, regions)
+
+    # ===== LOOKUPS =====
+
+    def date_bucket(self, target_date) -> int:
+        """Index of the pricing validity interval containing target_date."""
+        return bisect_right(self._boundaries, target_date)
+
+    def resolve(self, qualification_id, brand_id, campus, corporate_client_id, target_date):
+        """
+        Resolve pricing for a qualification.
+
+        Returns:
+            Tuple of (source, pricing, region) where source is one of
+            CAMPUS, REGION_MODIFIED, CORPORATE, BRAND_DEFAULT or NOT_FOUND.
+        """
+        campus_id = campus.pk if campus else None
+        region_ref = None
+        if campus and campus.region:
+            region_ref = campus.region.pk if hasattr(campus.region, 'pk') else campus.region
+        key = (
+            qualification_id, brand_id, campus_id, region_ref,
+            corporate_client_id, self.date_bucket(target_date),
+        )
+        if key not in self._memo:
+            self._memo[key] = self._resolve(
+                qualification_id, brand_id, campus, corporate_client_id, target_date
+            )
+        return self._memo[key]
+
+    def _resolve(self, qualification_id, brand_id, campus, corporate_client_id, target_date):
+        rows = self._by_qualification.get(qualification_id, [])
+
+        # 1. Campus-specific pricing
+        if campus:
+            pricing = self._first(rows, target_date, lambda s: (
+                s.strategy_type == 'CAMPUS' and s.campus_id == campus.pk
+            ))
+            if pricing:
+                return ('CAMPUS', pricing, None)
+
+        # 2. Region-modified base pricing
+        if campus and campus.region:
+            region = self.region_for_campus(campus)
+            if region and region.price_modifier != Decimal('1.0000'):
+                base_pricing = self._default_pricing(rows, brand_id, target_date)
+                if base_pricing:
+                    return ('REGION_MODIFIED', base_pricing, region)
+
+        # 3. Corporate client pricing
+        if corporate_client_id:
+            pricing = self._first(rows, target_date, lambda s: (
+                s.strategy_type == 'CORPORATE' and s.corporate_client_id == corporate_client_id
+            ))
+            if pricing:
+                return ('CORPORATE', pricing, None)
+
+        # 4. Brand default pricing
+        pricing = self._default_pricing(rows, brand_id, target_date)
+        if pricing:
+            return ('BRAND_DEFAULT', pricing, None)
+
+        return ('NOT_FOUND', None, None)
+
+    def _default_pricing(self, rows, brand_id, target_date):
+        default_strategy_id = self._default_strategy.get(brand_id)
+        if default_strategy_id:
+            candidates = sorted(
+                (p for p in rows if p.pricing_strategy_id == default_strategy_id),
+                key=lambda p: -p.effective_from.toordinal(),
+            )
+            pricing = self._first(candidates, target_date)
+            if pricing:
+                return pricing
+
+        return self._first(rows, target_date, lambda s: (
+            s.brand_id == brand_id and s.strategy_type == 'STANDARD'
+        ))
+
+    @staticmethod
+    def _first(rows, target_date, strategy_matches=None):
+        for pricing in rows:
+            if pricing.effective_from > target_date:
+                continue
+            if pricing.effective_to and pricing.effective_to < target_date:
+                continue
+            if strategy_matches and not strategy_matches(pricing.pricing_strategy):
+                continue
+            return pricing
+        return None
+
+    # ===== REGIONS =====
+
+    def region_for_campus(self, campus):
+        """Match campus.region (FK or legacy code/name string) to a Region."""
+        from core.models import Region
+
+        if hasattr(campus.region, 'price_modifier'):
+            return self._regions_by_id.get(campus.region.pk, campus.region)
+
+        region = self._regions_by_code.get(campus.region)
+        if region:
+            return region
+        matches = self._regions_by_name.get(campus.region, [])
+        if len(matches) > 1:
+            raise Region.MultipleObjectsReturned(
+                f"get() returned more than one Region -- it returned {len(matches)}!"
+            )
+        return matches[0] if matches else None
+
+    def effective_price_modifier(self, region) -> Decimal:
+        """Region.effective_price_modifier without walking parents in the DB."""
+        modifier = region.price_modifier
+        seen = {region.pk}
+        parent = self._regions_by_id.get(region.parent_id)
+        while parent and parent.pk not in seen:
+            modifier *= parent.price_modifier
+            seen.add(parent.pk)
+            parent = self._regions_by_id.get(parent.parent_id)
+        return modifier
+
+    def __getstate__(self):
+        # Memoised resolutions are per-process; keep the shared payload lean
+        state = self.__dict__.copy()
+        state['_memo'] = {}
+        return state
@@ -38,7 +38,8 @@ class PricingService:
         campus=None,
         corporate_client=None,
         as_of_date: Optional[date] = None,
-        include_breakdown: bool = False
+        include_breakdown: bool = False,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Get the effective price for a qualification using the pricing hierarchy.
@@ -55,13 +56,11 @@ class PricingService:
             corporate_client: Optional CorporateClient for corporate pricing
             as_of_date: Date for price lookup (defaults to today)
             include_breakdown: Include detailed fee breakdown
+            use_cache: Resolve from the shared price matrix (False walks the DB)
             
         Returns:
             Dict with price information and resolution details
         """
-        from finance.models import CoursePricing, PricingStrategy, CoursePricingOverride
-        from core.models import Region
-        
         target_date = as_of_date or date.today()
         brand = campus.brand if campus else (self.brand or qualification.brand if hasattr(qualification, 'brand') else None)
         
@@ -77,16 +76,76 @@ class PricingService:
             'strategy': None,
         }
         
+        if use_cache:
+            matrix = self.get_price_matrix()
+            source, pricing, region = matrix.resolve(
+                qualification.pk,
+                brand.pk if brand else None,
+                campus,
+                corporate_client.pk if corporate_client else None,
+                target_date,
+            )
+            modifier = matrix.effective_price_modifier(region) if region else None
+        else:
+            source, pricing, region = self._walk_price_hierarchy(
+                qualification, brand, campus, corporate_client, target_date
+            )
+            modifier = region.effective_price_modifier if region else None
+        
+        if source == 'NOT_FOUND':
+            result['resolution_source'] = 'NOT_FOUND'
+            return result
+        
+        if source == 'REGION_MODIFIED':
+            # Apply region modifier to base pricing
+            modified_price = pricing.total_price * modifier
+            result.update({
+                'total_price': round(modified_price, 2),
+                'total_price_vat_inclusive': round(
+                    modified_price * (1 + pricing.vat_rate / 100), 2
+                ) if not pricing.prices_include_vat else round(modified_price, 2),
+                'deposit_amount': self._calculate_deposit(pricing, modified_price),
+                'resolution_source': 'REGION_MODIFIED',
+                'pricing': pricing,
+                'applied_modifier': modifier,
+                'strategy': pricing.pricing_strategy,
+                'region': region,
+            })
+            if include_breakdown:
+                result['breakdown'] = self._get_fee_breakdown(pricing, modifier=modifier)
+            return result
+        
+        result.update(self._build_price_result(pricing, source))
+        if include_breakdown:
+            result['breakdown'] = self._get_fee_breakdown(pricing)
+        return result
+    
+    def get_price_matrix(self):
+        """
+        Get the price resolution matrix, loaded once per service instance.
+        Reuse one PricingService across line items for O(1) bulk lookups.
+        """
+        if getattr(self, '_price_matrix', None) is None:
+            from finance.services.price_matrix import get_price_matrix
+            self._price_matrix = get_price_matrix()
+        return self._price_matrix
+    
+    def _walk_price_hierarchy(self, qualification, brand, campus, corporate_client, target_date):
+        """
+        Resolve pricing by querying each hierarchy level in turn.
+        
+        Returns:
+            Tuple of (source, pricing, region)
+        """
+        from core.models import Region
+        
         # 1. Check for campus-specific pricing
         if campus:
             campus_pricing = self._find_pricing_by_strategy_type(
                 qualification, 'CAMPUS', target_date, campus=campus
             )
             if campus_pricing:
-                result.update(self._build_price_result(campus_pricing, 'CAMPUS'))
-                if include_breakdown:
-                    result['breakdown'] = self._get_fee_breakdown(campus_pricing)
-                return result
+                return ('CAMPUS', campus_pricing, None)
         
         # 2. Check for region-modified pricing (apply modifier to base)
         if campus and campus.region:
@@ -105,28 +164,9 @@ class PricingService:
                         pass
             
             if region and region.price_modifier != Decimal('1.0000'):
-                # Get base pricing and apply modifier
                 base_pricing = self._find_default_pricing(qualification, brand, target_date)
                 if base_pricing:
-                    modified_price = base_pricing.total_price * region.effective_price_modifier
-                    result.update({
-                        'total_price': round(modified_price, 2),
-                        'total_price_vat_inclusive': round(
-                            modified_price * (1 + base_pricing.vat_rate / 100), 2
-                        ) if not base_pricing.prices_include_vat else round(modified_price, 2),
-                        'deposit_amount': self._calculate_deposit(base_pricing, modified_price),
-                        'resolution_source': 'REGION_MODIFIED',
-                        'pricing': base_pricing,
-                        'applied_modifier': region.effective_price_modifier,
-                        'strategy': base_pricing.pricing_strategy,
-                        'region': region,
-                    })
-                    if include_breakdown:
-                        result['breakdown'] = self._get_fee_breakdown(
-                            base_pricing, 
-                            modifier=region.effective_price_modifier
-                        )
-                    return result
+                    return ('REGION_MODIFIED', base_pricing, region)
         
         # 3. Check for corporate client pricing
         if corporate_client:
@@ -134,22 +174,14 @@ class PricingService:
                 qualification, 'CORPORATE', target_date, corporate_client=corporate_client
             )
             if corporate_pricing:
-                result.update(self._build_price_result(corporate_pricing, 'CORPORATE'))
-                if include_breakdown:
-                    result['breakdown'] = self._get_fee_breakdown(corporate_pricing)
-                return result
+                return ('CORPORATE', corporate_pricing, None)
         
         # 4. Fall back to brand default pricing
         default_pricing = self._find_default_pricing(qualification, brand, target_date)
         if default_pricing:
-            result.update(self._build_price_result(default_pricing, 'BRAND_DEFAULT'))
-            if include_breakdown:
-                result['breakdown'] = self._get_fee_breakdown(default_pricing)
-            return result
+            return ('BRAND_DEFAULT', default_pricing, None)
         
-        # No pricing found
-        result['resolution_source'] = 'NOT_FOUND'
-        return result
+        return ('NOT_FOUND', None, None)
     
     def _find_pricing_by_strategy_type(
         self, 
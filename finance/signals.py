@@ -0,0 +1,20 @@
+"""
+Signals for the finance app
+Invalidates the shared price resolution matrix when pricing inputs change
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from finance.services.price_matrix import invalidate_price_matrix
+
+
+@receiver([post_save, post_delete], sender='finance.CoursePricing')
+@receiver([post_save, post_delete], sender='finance.PricingStrategy')
+@receiver([post_save, post_delete], sender='core.Region')
+@receiver([post_save, post_delete], sender='tenants.Campus')
+def invalidate_pricing_cache(sender, **kwargs):
+    """
+    Bump the price matrix version when pricing rows are activated, versioned,
+    edited or removed, or when strategy/region/campus scoping changes.
+    """
+    invalidate_price_matrix()
@@ -0,0 +1,39 @@
+"""
+Finance Celery Tasks
+
+Scheduled finance jobs:
+- Collection metrics recalculation (full daily, incremental intra-day)
+"""
+import logging
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='finance.tasks.recalculate_collection_metrics')
+def recalculate_collection_metrics(incremental=False):
+    """
+    Recalculate FunderCollectionMetrics for projects, funder types and corporates.
+    Run a full rebuild daily (rolling windows move) and incremental runs in between.
+    """
+    from finance.services.invoice_generation import CollectionMetricsService
+    
+    result = CollectionMetricsService.recalculate_all_metrics(incremental=incremental)
+    logger.info(
+        f"Collection metrics {'incremental' if incremental else 'full'} run: "
+        f"{result['created']} created, {result['updated']} updated"
+    )
+    return result
@@ -2,6 +2,8 @@
 HR Admin Views for SkillsFlow ERP
 Custom admin views for managing HR models with unified Tailwind theme
 """
+import json
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
@@ -424,6 +426,9 @@ class PositionTaskDeleteView(LoginRequiredMixin, StaffRequiredMixin, DeleteView)
 from django.http import JsonResponse
 from django.views import View
 
+from .services.org_structure import get_org_chart
+
+
 class OrgChartView(LoginRequiredMixin, StaffRequiredMixin, ListView):
     """Display interactive organization chart"""
     model = StaffProfile
@@ -442,63 +447,13 @@ class OrgChartView(LoginRequiredMixin, StaffRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Build org chart data structure
-        context['org_data'] = self._build_org_tree()
+        # Cached org chart data structure and stats
+        chart = get_org_chart()
+        context['org_data'] = json.dumps(chart['tree'])
         context['departments'] = Department.objects.filter(is_deleted=False).order_by('name')
-        
-        # Stats
-        all_staff = self.get_queryset()
-        context['total_staff'] = all_staff.count()
-        context['without_manager'] = all_staff.filter(reports_to__isnull=True).count()
-        context['without_location'] = all_staff.filter(primary_work_location__isnull=True).count()
+        context.update(chart['stats'])
         
         return context
-    
-    def _build_org_tree(self):
-        """Build hierarchical org chart data for D3.js"""
-        import json
-        
-        staff = self.get_queryset()
-        
-        # Create nodes dictionary
-        nodes = {}
-        for s in staff:
-            nodes[s.id] = {
-                'id': s.id,
-                'name': s.user.get_full_name(),
-                'title': s.position.title if s.position else 'No Position',
-                'department': s.department.name if s.department else 'No Department',
-                'location': s.primary_work_location.name if s.primary_work_location else None,
-                'reports_to_id': s.reports_to_id,
-                'image': None,  # Could add profile image URL
-                'children': []
-            }
-        
-        # Build tree structure
-        roots = []
-        for node_id, node in nodes.items():
-            parent_id = node['reports_to_id']
-            if parent_id and parent_id in nodes:
-                nodes[parent_id]['children'].append(node)
-            else:
-                roots.append(node)
-        
-        # If multiple roots, create a virtual root
-        if len(roots) > 1:
-            org_data = {
-                'id': 0,
-                'name': 'Organization',
-                'title': '',
-                'department': '',
-                'location': None,
-                'children': roots
-            }
-        elif len(roots) == 1:
-            org_data = roots[0]
-        else:
-            org_data = {'id': 0, 'name': 'No Staff', 'title': '', 'department': '', 'children': []}
-        
-        return json.dumps(org_data)
 
 
 class OrgChartDataView(LoginRequiredMixin, StaffRequiredMixin, View):
@@ -506,32 +461,11 @@ class OrgChartDataView(LoginRequiredMixin, StaffRequiredMixin, View):
     
     def get(self, request):
         """Return org chart data as JSON"""
-        staff = StaffProfile.objects.filter(
-            is_deleted=False,
-            employment_status='ACTIVE'
-        ).select_related(
-            'user', 'position', 'department', 'reports_to', 'reports_to__user',
-            'primary_work_location'
-        )
+        nodes = get_org_chart()['nodes']
         
         # Filter by department if specified
         department_id = request.GET.get('department')
         if department_id:
-            staff = staff.filter(department_id=department_id)
-        
-        # Build nodes
-        nodes = []
-        for s in staff:
-            nodes.append({
-                'id': s.id,
-                'name': s.user.get_full_name(),
-                'title': s.position.title if s.position else 'No Position',
-                'department': s.department.name if s.department else 'No Department',
-                'department_id': s.department_id,
-                'location': s.primary_work_location.name if s.primary_work_location else None,
-                'reports_to_id': s.reports_to_id,
-                'email': s.user.email,
-            })
+            nodes = [node for node in nodes if str(node['department_id']) == department_id]
         
         return JsonResponse({'nodes': nodes})
-
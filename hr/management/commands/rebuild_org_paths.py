@@ -0,0 +1,17 @@
+"""
+Management command to recompute materialised reporting-line paths.
+Run after bulk imports or queryset updates of reports_to that bypass
+hr.signals.
+"""
+from django.core.management.base import BaseCommand
+
+from hr.services.org_structure import invalidate_org_chart, rebuild_org_paths
+
+
+class Command(BaseCommand):
+    help = 'Recompute StaffProfile org paths from reports_to and refresh the org chart cache'
+
+    def handle(self, *args, **options):
+        changed = rebuild_org_paths()
+        invalidate_org_chart()
+        self.stdout.write(self.style.SUCCESS(f'Org paths rebuilt ({changed} changed)'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:36
+
+from django.db import migrations, models
+
+
+def build_org_paths(apps, schema_editor):
+    from hr.services.org_structure import rebuild_org_paths
+
+    rebuild_org_paths(apps.get_model('hr', 'StaffProfile'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0003_leaverequest_staffdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staffprofile',
+            name='org_depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Number of managers above this staff member'),
+        ),
+        migrations.AddField(
+            model_name='staffprofile',
+            name='org_path',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='IDs from the top of the reporting line down to this staff member', max_length=1024),
+        ),
+        migrations.RunPython(build_org_paths, migrations.RunPython.noop),
+    ]
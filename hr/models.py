@@ -2,6 +2,7 @@
 HR Models for SkillsFlow ERP
 Manages organizational structure, positions, job descriptions, KPIs, and staff profiles.
 """
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -304,6 +305,13 @@ class PositionTask(AuditedModel):
         return f"{self.position.title} - {self.title}"
 
 
+# StaffProfile fields whose changes move the org chart or position history
+ORG_TRACKED_FIELDS = (
+    'reports_to_id', 'position_id', 'department_id', 'primary_work_location_id',
+    'employment_status', 'is_deleted', 'user_id', 'org_path',
+)
+
+
 class StaffProfile(AuditedModel):
     """
     Staff profile extending the User model for HR management.
@@ -350,6 +358,19 @@ class StaffProfile(AuditedModel):
         related_name='direct_reports',
         help_text='Staff member this person reports to'
     )
+    # Materialised reporting line, e.g. '/1/5/12/' (maintained by hr.signals)
+    org_path = models.CharField(
+        max_length=1024,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text='IDs from the top of the reporting line down to this staff member'
+    )
+    org_depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of managers above this staff member'
+    )
     
     # Employment details
     EMPLOYMENT_TYPE_CHOICES = [
@@ -436,6 +457,22 @@ class StaffProfile(AuditedModel):
     def __str__(self):
         return f"{self.employee_number} - {self.user.get_full_name()}"
     
+    def clean(self):
+        super().clean()
+        # hr.signals also refuses cycles on save; this reports them as a form error
+        from hr.services.org_structure import CYCLE_MESSAGE, creates_cycle
+        if creates_cycle(self.pk, self.reports_to_id):
+            raise ValidationError({'reports_to': CYCLE_MESSAGE})
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded values let hr.signals detect position/manager changes without re-fetching
+        instance._loaded_org_fields = {
+            name: instance.__dict__[name] for name in ORG_TRACKED_FIELDS if name in instance.__dict__
+        }
+        return instance
+    
     def get_position_history(self):
         """Get position history for this staff member"""
         return self.position_history.filter(is_deleted=False).order_by('-start_date')
@@ -449,21 +486,16 @@ class StaffProfile(AuditedModel):
         )
     
     def get_all_subordinates(self):
-        """Get all subordinates recursively"""
-        subordinates = []
-        for report in self.get_direct_reports():
-            subordinates.append(report)
-            subordinates.extend(report.get_all_subordinates())
-        return subordinates
+        """Get all subordinates (any depth) in one query on the reporting path"""
+        from hr.services.org_structure import subordinates_of
+        return list(subordinates_of(self).filter(
+            employment_status__in=['ACTIVE', 'ON_LEAVE', 'PROBATION']
+        ).order_by('org_depth', 'user__last_name', 'user__first_name'))
     
     def get_management_chain(self):
-        """Get chain of management above this staff member"""
-        chain = []
-        current = self.reports_to
-        while current:
-            chain.append(current)
-            current = current.reports_to
-        return chain
+        """Get chain of management above this staff member, nearest first"""
+        from hr.services.org_structure import managers_of
+        return list(managers_of(self).order_by('-org_depth'))
 
 
 class StaffPositionHistory(AuditedModel):
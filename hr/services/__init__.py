@@ -0,0 +1 @@
+# HR services package
@@ -0,0 +1,333 @@
+"""
+Org Structure
+
+Reporting lines are materialised on StaffProfile.org_path: the IDs from the
+top of the line down to the staff member, e.g. '/1/5/12/' for someone who
+reports to 5, who reports to 1. org_depth is the number of managers above.
+- "Everyone under this manager" is one indexed prefix query on org_path
+- The management chain is one pk__in query over the IDs in the path
+- Changing reports_to rewrites the moved staff member's path and their
+  whole subtree with a single UPDATE (see hr.signals)
+
+The serialised org chart (D3 tree, flat node list and stats) is built from
+one values() query and kept in the shared cache under a structure version.
+Changes to staff profiles, positions, departments, campuses or staff names
+bump the version (see hr.signals).
+
+Usage:
+    chart = get_org_chart()
+    team = subordinates_of(manager).filter(employment_status='ACTIVE')
+"""
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Length, Substr
+
+VERSION_CACHE_KEY = 'hr:org_chart:version'
+CHART_CACHE_KEY = 'hr:org_chart:{version}'
+CHART_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+PATH_SEPARATOR = '/'
+
+
+def path_for(pk: int, parent_path: str = '') -> str:
+    """org_path of a staff member below a manager with parent_path ('' for the top)."""
+    return f'{parent_path or PATH_SEPARATOR}{pk}{PATH_SEPARATOR}'
+
+
+def path_ids(path: str) -> List[int]:
+    """Staff IDs in an org_path, top first."""
+    return [int(part) for part in path.split(PATH_SEPARATOR) if part]
+
+
+def depth_of(path: str) -> int:
+    return max(len(path_ids(path)) - 1, 0)
+
+
+# =====================================================
+# QUERIES
+# =====================================================
+
+def subordinates_of(staff, include_self: bool = False):
+    """
+    Everyone under a manager, at any depth, in one prefix query.
+
+    Args:
+        staff: StaffProfile (its org_path must be loaded)
+        include_self: Include the manager in the results
+
+    Returns:
+        StaffProfile queryset (not deleted)
+    """
+    from hr.models import StaffProfile
+
+    queryset = StaffProfile.objects.filter(is_deleted=False)
+    if not staff.org_path:
+        # Path not built yet: direct reports only
+        subtree = Q(reports_to=staff)
+    else:
+        subtree = Q(org_path__startswith=staff.org_path) & ~Q(pk=staff.pk)
+    if include_self:
+        subtree |= Q(pk=staff.pk)
+    return queryset.filter(subtree)
+
+
+def managers_of(staff):
+    """The management chain above a staff member (order by -org_depth for nearest first)."""
+    from hr.models import StaffProfile
+
+    ids = path_ids(staff.org_path)[:-1]
+    if not ids and staff.reports_to_id:
+        # Path not built yet
+        ids = [staff.reports_to_id]
+    return StaffProfile.objects.filter(pk__in=ids)
+
+
+# =====================================================
+# PATH MAINTENANCE
+# =====================================================
+
+CYCLE_MESSAGE = 'A staff member cannot report to themselves or to someone who reports to them'
+
+
+def _is_below(pk: int, path: str) -> bool:
+    return f'{PATH_SEPARATOR}{pk}{PATH_SEPARATOR}' in path
+
+
+def creates_cycle(pk: Optional[int], reports_to_id: Optional[int]) -> bool:
+    """Whether reporting to reports_to_id would put a staff member under themselves."""
+    from hr.models import StaffProfile
+
+    if not pk or not reports_to_id:
+        return False
+    if reports_to_id == pk:
+        return True
+    parent_path = StaffProfile.objects.filter(pk=reports_to_id).values_list('org_path', flat=True).first()
+    return bool(parent_path) and _is_below(pk, parent_path)
+
+
+def plan_move(pk: int, reports_to_id: Optional[int]) -> Tuple[str, str, int]:
+    """
+    New path for a staff member moving under reports_to_id.
+
+    Returns:
+        (old_path, new_path, new_depth)
+
+    Raises:
+        ValueError: If the new manager reports (directly or indirectly) to this staff member
+    """
+    from hr.models import StaffProfile
+
+    paths = dict(StaffProfile.objects.filter(
+        pk__in=[pk, reports_to_id] if reports_to_id else [pk]
+    ).values_list('pk', 'org_path'))
+    old_path = paths.get(pk, '')
+    parent_path = ''
+    if reports_to_id:
+        parent_path = paths.get(reports_to_id) or path_for(reports_to_id)
+        if reports_to_id == pk or _is_below(pk, parent_path):
+            raise ValueError(CYCLE_MESSAGE)
+    new_path = path_for(pk, parent_path)
+    return old_path, new_path, depth_of(new_path)
+
+
+def move_subtree(old_path: str, new_path: str) -> int:
+    """
+    Rewrite the paths below a moved staff member with one UPDATE.
+
+    Returns:
+        Number of descendants updated
+    """
+    from hr.models import StaffProfile
+
+    if not old_path or old_path == new_path:
+        return 0
+    depth_change = depth_of(new_path) - depth_of(old_path)
+    return StaffProfile.objects.filter(
+        org_path__startswith=old_path,
+    ).exclude(org_path=old_path).update(
+        org_path=Concat(Value(new_path), Substr('org_path', Length(Value(old_path)) + 1)),
+        org_depth=F('org_depth') + depth_change,
+    )
+
+
+def detach_subtree(old_path: str) -> int:
+    """
+    Make the reports of a removed staff member the top of their lines
+    (reports_to is nulled by the delete, without save signals).
+
+    Returns:
+        Number of descendants updated
+    """
+    from hr.models import StaffProfile
+
+    if not old_path:
+        return 0
+    return StaffProfile.objects.filter(
+        org_path__startswith=old_path,
+    ).exclude(org_path=old_path).update(
+        org_path=Concat(Value(PATH_SEPARATOR), Substr('org_path', Length(Value(old_path)) + 1)),
+        org_depth=F('org_depth') - (depth_of(old_path) + 1),
+    )
+
+
+def set_path(pk: int, reports_to_id: Optional[int]) -> str:
+    """Place a staff member (and their subtree) under reports_to_id."""
+    from hr.models import StaffProfile
+
+    old_path, new_path, depth = plan_move(pk, reports_to_id)
+    StaffProfile.objects.filter(pk=pk).update(org_path=new_path, org_depth=depth)
+    move_subtree(old_path, new_path)
+    return new_path
+
+
+def rebuild_org_paths(staff_model=None) -> int:
+    """
+    Recompute every org_path from reports_to (after bulk imports or
+    queryset updates that bypass hr.signals). Staff caught in a reporting
+    cycle are treated as top of their line.
+
+    Args:
+        staff_model: StaffProfile model to use (migrations pass the historical model)
+
+    Returns:
+        Number of staff profiles whose path changed
+    """
+    if staff_model is None:
+        from hr.models import StaffProfile as staff_model
+
+    rows = list(staff_model.objects.values_list('pk', 'reports_to_id', 'org_path', 'org_depth'))
+    parents = {pk: reports_to_id for pk, reports_to_id, _, _ in rows}
+    paths: Dict[int, str] = {}
+
+    def resolve(pk: int) -> str:
+        chain = []
+        current = pk
+        while current is not None and current not in paths and current not in chain:
+            chain.append(current)
+            parent = parents.get(current)
+            current = parent if parent in parents else None
+        # A repeat in the chain is a cycle: start the line afresh there
+        parent_path = paths.get(current, '') if current not in chain else ''
+        for member in reversed(chain):
+            parent_path = paths[member] = path_for(member, parent_path)
+        return paths[pk]
+
+    changed = []
+    for pk, _, org_path, org_depth in rows:
+        path = resolve(pk)
+        if path != org_path or depth_of(path) != org_depth:
+            changed.append(staff_model(pk=pk, org_path=path, org_depth=depth_of(path)))
+    staff_model.objects.bulk_update(changed, ['org_path', 'org_depth'], batch_size=500)
+    if changed:
+        invalidate_org_chart()
+    return len(changed)
+
+
+# =====================================================
+# CACHED ORG CHART
+# =====================================================
+
+def invalidate_org_chart():
+    """Bump the structure version so every process rebuilds the chart on next use."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_org_chart() -> Dict[str, Any]:
+    """Return the serialised org chart for the current structure version, building it if needed."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, None):
+            version = cache.get(VERSION_CACHE_KEY) or version
+
+    key = CHART_CACHE_KEY.format(version=version)
+    chart = cache.get(key)
+    if chart is None:
+        chart = build_org_chart()
+        cache.set(key, chart, CHART_CACHE_TIMEOUT)
+    return chart
+
+
+def build_org_chart() -> Dict[str, Any]:
+    """
+    Build the org chart for active staff from one values() query.
+
+    Returns:
+        Dict with 'tree' (nested D3 hierarchy), 'nodes' (flat list for
+        the data API) and 'stats' (total_staff, without_manager, without_location)
+    """
+    from hr.models import StaffProfile
+
+    rows = StaffProfile.objects.filter(
+        is_deleted=False,
+        employment_status='ACTIVE',
+    ).order_by('user__last_name', 'user__first_name').values(
+        'id', 'reports_to_id', 'department_id',
+        'user__first_name', 'user__last_name', 'user__email',
+        'position__title', 'department__name', 'primary_work_location__name',
+    )
+
+    nodes = []
+    for row in rows:
+        nodes.append({
+            'id': row['id'],
+            'name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+            'title': row['position__title'] or 'No Position',
+            'department': row['department__name'] or 'No Department',
+            'department_id': row['department_id'],
+            'location': row['primary_work_location__name'],
+            'reports_to_id': row['reports_to_id'],
+            'email': row['user__email'],
+        })
+
+    return {
+        'tree': _build_tree(nodes),
+        'nodes': nodes,
+        'stats': {
+            'total_staff': len(nodes),
+            'without_manager': sum(1 for node in nodes if not node['reports_to_id']),
+            'without_location': sum(1 for node in nodes if not node['location']),
+        },
+    }
+
+
+def _build_tree(nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Nest nodes under their managers; several top-level staff share a virtual root."""
+    tree_nodes = {
+        node['id']: {
+            'id': node['id'],
+            'name': node['name'],
+            'title': node['title'],
+            'department': node['department'],
+            'department_id': node['department_id'],
+            'location': node['location'],
+            'reports_to_id': node['reports_to_id'],
+            'image': None,  # Could add profile image URL
+            'children': [],
+        }
+        for node in nodes
+    }
+
+    roots = []
+    for node in tree_nodes.values():
+        parent_id = node['reports_to_id']
+        if parent_id and parent_id in tree_nodes:
+            tree_nodes[parent_id]['children'].append(node)
+        else:
+            roots.append(node)
+
+    if len(roots) > 1:
+        return {
+            'id': 0,
+            'name': 'Organization',
+            'title': '',
+            'department': '',
+            'location': None,
+            'children': roots,
+        }
+    if len(roots) == 1:
+        return roots[0]
+    return {'id': 0, 'name': 'No Staff', 'title': '', 'department': '', 'children': []}
@@ -1,70 +1,133 @@
 """
 HR Signals for SkillsFlow ERP
-Handles automatic position history tracking and other HR-related signals.
+Handles automatic position history tracking, reporting-line paths and
+org chart cache invalidation.
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from hr.services.org_structure import (
+    depth_of, detach_subtree, invalidate_org_chart, move_subtree, plan_move, set_path,
+)
+
+# Changes to these StaffProfile fields alter the serialised org chart
+ORG_CHART_FIELDS = {
+    'reports_to_id', 'position_id', 'department_id', 'primary_work_location_id',
+    'employment_status', 'is_deleted', 'user_id',
+}
+
+# User fields shown on the org chart
+ORG_CHART_USER_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+def _loaded_org_values(instance):
+    """
+    StaffProfile tracked values as last loaded or saved (see StaffProfile.from_db).
+    Falls back to one query for instances that were not loaded from the database.
+    """
+    from .models import ORG_TRACKED_FIELDS, StaffProfile
+
+    loaded = getattr(instance, '_loaded_org_fields', None)
+    if loaded is not None and all(name in loaded for name in ORG_TRACKED_FIELDS):
+        return loaded
+    return StaffProfile.objects.filter(pk=instance.pk).values(*ORG_TRACKED_FIELDS).first()
+
+
+def _remember_org_values(instance):
+    from .models import ORG_TRACKED_FIELDS
+
+    instance._loaded_org_fields = {name: getattr(instance, name) for name in ORG_TRACKED_FIELDS}
+
 
 @receiver(pre_save, sender='hr.StaffProfile')
-def track_position_change(sender, instance, **kwargs):
+def track_position_change(sender, instance, update_fields=None, **kwargs):
     """
     Track position changes and create history records automatically.
-    When a staff member's position or department changes, create a history entry.
+    When a staff member's position or department changes, close the open
+    history entry (post_save opens the new one). When their manager
+    changes, compute the new reporting path (post_save moves the subtree).
     """
-    from .models import StaffProfile, StaffPositionHistory
+    from .models import StaffPositionHistory
     
-    if not instance.pk:
-        # New staff profile - will create history in post_save
+    if instance._state.adding:
+        # New staff profile - history and path are created in post_save
         return
     
-    try:
-        old_instance = StaffProfile.objects.get(pk=instance.pk)
-    except StaffProfile.DoesNotExist:
+    old_values = _loaded_org_values(instance)
+    if old_values is None:
         return
     
-    # Check if position or department changed
-    position_changed = old_instance.position_id != instance.position_id
-    department_changed = old_instance.department_id != instance.department_id
+    saved = None
+    if update_fields is not None:
+        saved = {sender._meta.get_field(name).attname for name in update_fields}
+    changed = {
+        name for name, value in old_values.items()
+        if (saved is None or name in saved) and getattr(instance, name) != value
+    }
+    instance._org_changed_fields = changed
     
-    if position_changed or department_changed:
+    # Check if position or department changed
+    if changed & {'position_id', 'department_id'}:
         # Close the current history record
-        current_history = StaffPositionHistory.objects.filter(
+        StaffPositionHistory.objects.filter(
             staff=instance,
             end_date__isnull=True,
             is_deleted=False
-        ).first()
-        
-        if current_history:
-            current_history.end_date = timezone.now().date()
-            current_history.save()
+        ).update(end_date=timezone.now().date(), updated_at=timezone.now())
         
         # Store flag to create new history in post_save
         instance._create_position_history = True
         instance._position_change_detected = True
+    
+    # Manager changed, or the path was never built
+    if 'reports_to_id' in changed or not old_values['org_path']:
+        old_path, new_path, depth = plan_move(instance.pk, instance.reports_to_id)
+        instance.org_path = new_path
+        instance.org_depth = depth
+        instance._org_moved_from = old_path
 
 
 @receiver(post_save, sender='hr.StaffProfile')
-def create_position_history(sender, instance, created, **kwargs):
+def create_position_history(sender, instance, created, update_fields=None, **kwargs):
     """
     Create position history record for new staff or position changes.
     """
     from .models import StaffPositionHistory
     
     # Create history for new staff profile
-    if created and instance.position and instance.department:
-        StaffPositionHistory.objects.create(
-            staff=instance,
-            position=instance.position,
-            department=instance.department,
-            start_date=instance.date_joined,
-            change_reason='HIRE',
-            salary_at_time=instance.current_salary,
-            created_by=instance.created_by
-        )
+    if created:
+        instance.org_path = set_path(instance.pk, instance.reports_to_id)
+        instance.org_depth = depth_of(instance.org_path)
+        _remember_org_values(instance)
+        invalidate_org_chart()
+        
+        if instance.position and instance.department:
+            StaffPositionHistory.objects.create(
+                staff=instance,
+                position=instance.position,
+                department=instance.department,
+                start_date=instance.date_joined,
+                change_reason='HIRE',
+                salary_at_time=instance.current_salary,
+                created_by=instance.created_by
+            )
         return
     
+    old_path = getattr(instance, '_org_moved_from', None)
+    if old_path is not None:
+        if update_fields is not None and 'org_path' not in update_fields:
+            sender.objects.filter(pk=instance.pk).update(
+                org_path=instance.org_path, org_depth=instance.org_depth
+            )
+        move_subtree(old_path, instance.org_path)
+        instance._org_moved_from = None
+    
+    if getattr(instance, '_org_changed_fields', set()) & ORG_CHART_FIELDS:
+        invalidate_org_chart()
+    instance._org_changed_fields = set()
+    _remember_org_values(instance)
+    
     # Create history for position/department change
     if getattr(instance, '_create_position_history', False) and instance.position and instance.department:
         # Determine change reason based on what changed
@@ -83,3 +146,27 @@ def create_position_history(sender, instance, created, **kwargs):
         # Clean up the flag
         instance._create_position_history = False
         instance._position_change_detected = False
+
+
+@receiver(post_delete, sender='hr.StaffProfile')
+def detach_reports(sender, instance, **kwargs):
+    """Re-root the reports of a deleted staff member (reports_to is nulled without signals)."""
+    detach_subtree(instance.org_path)
+    invalidate_org_chart()
+
+
+@receiver([post_save, post_delete], sender='hr.Position')
+@receiver([post_save, post_delete], sender='hr.Department')
+@receiver([post_save, post_delete], sender='tenants.Campus')
+def invalidate_org_chart_cache(sender, **kwargs):
+    """Position titles, department and campus names appear on the org chart."""
+    invalidate_org_chart()
+
+
+@receiver(post_save, sender='core.User')
+def invalidate_org_chart_for_user(sender, instance, update_fields=None, **kwargs):
+    """Staff names and emails appear on the org chart (login timestamps do not)."""
+    if update_fields is not None and not ORG_CHART_USER_FIELDS & set(update_fields):
+        return
+    if hasattr(instance, 'staff_profile'):
+        invalidate_org_chart()
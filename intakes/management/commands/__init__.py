@@ -0,0 +1 @@
+# This file makes this directory a Python package
@@ -0,0 +1,76 @@
+"""
+Management command to backfill IntakeCapacitySnapshot history.
+Reconstructs daily snapshots from enrollment dates so capacity trend charts
+have history from before the daily capture job was scheduled.
+"""
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from intakes.models import Intake
+from intakes.services.capacity_snapshots import CapacitySnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Backfill intake capacity snapshots from enrollment dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Number of days to backfill, ending yesterday (default: 90)',
+        )
+        parser.add_argument(
+            '--start',
+            help='First date to backfill (YYYY-MM-DD); overrides --days',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last date to backfill (YYYY-MM-DD, default: yesterday)',
+        )
+        parser.add_argument(
+            '--campus',
+            type=int,
+            help='Only backfill intakes for this campus ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many snapshots would be created without writing them',
+        )
+
+    def handle(self, *args, **options):
+        end_date = self._parse_date(options['end']) if options['end'] else date.today() - timedelta(days=1)
+        if options['start']:
+            start_date = self._parse_date(options['start'])
+        else:
+            start_date = end_date - timedelta(days=options['days'] - 1)
+        
+        if start_date > end_date:
+            raise CommandError(f'Start date {start_date} is after end date {end_date}')
+        
+        intakes = Intake.objects.all()
+        if options['campus']:
+            intakes = intakes.filter(campus_id=options['campus'])
+        
+        count = CapacitySnapshotService.backfill(
+            start_date, end_date, intakes=intakes, dry_run=options['dry_run']
+        )
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'DRY RUN: Would create up to {count} snapshot(s) from {start_date} to {end_date}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Backfilled {count} snapshot(s) from {start_date} to {end_date} '
+                f'(existing snapshots were kept)'
+            ))
+
+    @staticmethod
+    def _parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
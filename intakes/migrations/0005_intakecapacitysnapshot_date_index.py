@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intakes', '0004_alter_intakeenrollment_funding_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='intakecapacitysnapshot',
+            index=models.Index(fields=['snapshot_date'], name='intake_snapshot_date_idx'),
+        ),
+    ]
@@ -873,6 +873,10 @@ class IntakeCapacitySnapshot(models.Model):
     class Meta:
         ordering = ['-snapshot_date']
         unique_together = ['intake', 'snapshot_date']
+        indexes = [
+            # Trend charts read a date range across many intakes
+            models.Index(fields=['snapshot_date'], name='intake_snapshot_date_idx'),
+        ]
         verbose_name = 'Intake Capacity Snapshot'
         verbose_name_plural = 'Intake Capacity Snapshots'
     
@@ -0,0 +1 @@
+# Intakes services package
@@ -2,7 +2,7 @@
 from django.contrib import admin
 from .models import (
     Address, Learner, Document, SETA, Employer, LearnerEmployment,
-    WorkplaceAttendance, AttendanceAuditLog, StipendCalculation
+    WorkplaceAttendance, AttendanceAuditLog, StipendCalculation, ImportJob
 )
 
 
@@ -299,3 +299,9 @@ class DailyTaskCompletionAdmin(admin.ModelAdmin):
         return obj.task_description[:50] + '...' if len(obj.task_description) > 50 else obj.task_description
     task_description_short.short_description = 'Task'
 
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'import_type', 'status', 'requested_by', 'record_count', 'created_at', 'completed_at']
+    list_filter = ['import_type', 'status']
+    readonly_fields = ['started_at', 'completed_at', 'record_count', 'error_details']
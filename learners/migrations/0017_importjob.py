@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_import_jobs(apps, schema_editor):
+    """Imports used to be recorded as reporting.ExportJob rows; move them here."""
+    ExportJob = apps.get_model('reporting', 'ExportJob')
+    ImportJob = apps.get_model('learners', 'ImportJob')
+    moved = []
+    for job in ExportJob.objects.filter(parameters__has_key='import_type').iterator():
+        parameters = dict(job.parameters)
+        ImportJob.objects.create(
+            import_type=parameters.pop('import_type'),
+            requested_by_id=job.requested_by_id,
+            created_by_id=job.created_by_id,
+            parameters=parameters,
+            status=job.status if job.status != 'CANCELLED' else 'FAILED',
+            progress_percent=job.progress_percent,
+            progress_message=job.progress_message,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            report_file=job.output_file.name,
+            report_filename=job.output_filename,
+            record_count=job.record_count,
+            error_message=job.error_message,
+            error_details=job.error_details,
+        )
+        moved.append(job.pk)
+    ExportJob.objects.filter(pk__in=moved).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learners', '0016_guardiannotificationpreference_guardianportalaccess'),
+        ('reporting', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('import_type', models.CharField(choices=[('learners', 'Learners'), ('enrollments', 'Enrollments'), ('assessments', 'Assessment Results')], max_length=20)),
+                ('parameters', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('progress_percent', models.PositiveIntegerField(default=0)),
+                ('progress_message', models.CharField(blank=True, max_length=200)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('report_file', models.FileField(blank=True, upload_to='imports/reports/')),
+                ('report_filename', models.CharField(blank=True, max_length=200)),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('error_details', models.JSONField(blank=True, default=dict)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Import Job',
+                'verbose_name_plural': 'Import Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RunPython(move_import_jobs, migrations.RunPython.noop),
+    ]
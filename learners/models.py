@@ -294,6 +294,69 @@ class Learner(TenantAwareModel):
         return validate_sa_id(self.sa_id_number)
 
 
+class ImportJob(AuditedModel):
+    """
+    Bulk CSV import (learners, enrollments or assessment results).
+    Tracks progress and keeps the per-row error report for download;
+    see learners.services.bulk_import.
+    """
+    IMPORT_TYPE_CHOICES = [
+        ('learners', 'Learners'),
+        ('enrollments', 'Enrollments'),
+        ('assessments', 'Assessment Results'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    import_type = models.CharField(max_length=20, choices=IMPORT_TYPE_CHOICES)
+    
+    # Who requested
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='import_jobs'
+    )
+    
+    # Import options (campus_id, create_users, rows, source_file)
+    parameters = models.JSONField(default=dict)
+    
+    # Status
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    
+    # Progress
+    progress_percent = models.PositiveIntegerField(default=0)
+    progress_message = models.CharField(max_length=200, blank=True)
+    
+    # Processing
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    # Result
+    report_file = models.FileField(
+        upload_to='imports/reports/',
+        blank=True
+    )
+    report_filename = models.CharField(max_length=200, blank=True)
+    record_count = models.PositiveIntegerField(default=0)
+    
+    # Errors
+    error_message = models.TextField(blank=True)
+    error_details = models.JSONField(default=dict, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Import Job'
+        verbose_name_plural = 'Import Jobs'
+    
+    def __str__(self):
+        return f"{self.get_import_type_display()} import - {self.status}"
+
+
 class Document(AuditedModel):
     """
     Document storage for learner files
@@ -0,0 +1,710 @@
+"""
+Bulk Import Service
+
+Two-phase CSV importers for learners, enrollments and assessment results:
+- validate: checks the whole file in memory (SA ID checksums, in-file
+  duplicates, choice values) and resolves everything that already exists
+  with one IN query per lookup
+- write: creates the valid rows in chunks
+
+Every rejected or skipped row is recorded in an ImportReport. Imports run
+as a learners.ImportJob whose report file is the per-row error report, so
+large files can be processed by one background task and the report
+downloaded afterwards.
+"""
+import csv
+import io
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from learners.models import Address, Learner, validate_sa_id
+
+logger = logging.getLogger(__name__)
+
+# Rows written per bulk_create / transaction
+IMPORT_CHUNK_SIZE = 500
+
+# Files with more rows than this are imported by a background job when
+# Celery is available (override with settings.BULK_IMPORT_INLINE_LIMIT)
+DEFAULT_INLINE_LIMIT = 1000
+
+DEFAULT_PASSWORD = 'changeme123'
+PLACEHOLDER_EMAIL_DOMAIN = 'placeholder.skillsflow.co.za'
+
+# CSV rows are numbered as the user sees them in a spreadsheet (header is row 1)
+FIRST_DATA_ROW = 2
+
+
+def inline_limit() -> int:
+    return getattr(settings, 'BULK_IMPORT_INLINE_LIMIT', DEFAULT_INLINE_LIMIT)
+
+
+def read_csv_rows(data: bytes) -> List[Dict[str, str]]:
+    """Decode an uploaded CSV (tolerating an Excel BOM) into row dicts."""
+    return list(csv.DictReader(io.StringIO(data.decode('utf-8-sig'))))
+
+
+def sa_id_birth_date(sa_id: str) -> Optional[date]:
+    """Date of birth encoded in the first six digits of an SA ID number."""
+    try:
+        year = int(sa_id[0:2])
+        century = 1900 if year > date.today().year % 100 else 2000
+        return date(century + year, int(sa_id[2:4]), int(sa_id[4:6]))
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _value(row: Dict, field: str) -> str:
+    return (row.get(field) or '').strip()
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _next_sequence(model, field: str, prefix: str, width: int = 5) -> int:
+    """
+    Next free sequence number for references shaped prefix + zero-padded digits.
+
+    Only fixed-width references are considered so the string Max is also
+    the numeric max.
+    """
+    latest = model.objects.filter(
+        **{f'{field}__regex': rf'^{prefix}\d{{{width}}}$'}
+    ).aggregate(latest=Max(field))['latest']
+    return int(latest[len(prefix):]) + 1 if latest else 1
+
+
+class ImportReport:
+    """
+    Outcome of an import: the success count plus one entry per rejected
+    (ERROR) or skipped (WARNING) row.
+    """
+    HEADER = ['row', 'level', 'reference', 'message']
+
+    def __init__(self):
+        self.success = 0
+        self.total_rows = 0
+        self.entries: List[tuple] = []
+
+    def error(self, row_num: int, message: str, reference: str = ''):
+        self.entries.append((row_num, 'ERROR', reference, message))
+
+    def warning(self, row_num: int, message: str, reference: str = ''):
+        self.entries.append((row_num, 'WARNING', reference, message))
+
+    def _messages(self, level: str) -> List[str]:
+        return [
+            f'Row {row_num}: {message}'
+            for row_num, entry_level, _, message in sorted(self.entries, key=lambda e: e[0])
+            if entry_level == level
+        ]
+
+    @property
+    def errors(self) -> List[str]:
+        return self._messages('ERROR')
+
+    @property
+    def warnings(self) -> List[str]:
+        return self._messages('WARNING')
+
+    def as_results(self) -> Dict:
+        """Summary in the {'success', 'errors', 'warnings'} shape the import view shows."""
+        return {'success': self.success, 'errors': self.errors, 'warnings': self.warnings}
+
+    def rows(self) -> Iterable[List]:
+        """Error report rows, in file order."""
+        for entry in sorted(self.entries, key=lambda e: e[0]):
+            yield list(entry)
+
+
+class BaseImporter(ABC):
+    """
+    Validate-then-write importer.
+
+    Subclasses implement validate(rows, report), returning the cleaned
+    rows that should be written, and write(items, report, progress).
+    """
+    chunk_size = IMPORT_CHUNK_SIZE
+
+    def __init__(self, campus=None, created_by=None, create_users: bool = True):
+        self.campus = campus
+        self.created_by = created_by
+        self.create_users = create_users
+
+    def run(self, rows: List[Dict], progress_callback: Optional[Callable[[int, int], None]] = None) -> ImportReport:
+        """
+        Import the rows of a CSV file.
+
+        Args:
+            rows: CSV rows as dicts (csv.DictReader output)
+            progress_callback: Called with (rows written, rows to write)
+                after each chunk
+
+        Returns:
+            ImportReport
+        """
+        report = ImportReport()
+        report.total_rows = len(rows)
+        items = self.validate(rows, report)
+        if items:
+            self.write(items, report, progress_callback)
+        return report
+
+    @abstractmethod
+    def validate(self, rows: List[Dict], report: ImportReport) -> List[Dict]:
+        """Record problems in `report` and return the cleaned rows to write."""
+        pass
+
+    @abstractmethod
+    def write(self, items: List[Dict], report: ImportReport, progress_callback=None) -> None:
+        """Write validated rows, counting successes and failures in `report`."""
+        pass
+
+    def _write_rows_individually(self, items, report, progress_callback, create_row, reference_field):
+        """
+        Write rows one save() at a time, for models whose post_save signals
+        (progress tracking, task automation) must fire for every row.
+        """
+        for written, item in enumerate(items, start=1):
+            try:
+                with transaction.atomic():
+                    create_row(item)
+                report.success += 1
+            except Exception as e:
+                report.error(item['row_num'], str(e), item[reference_field])
+            if progress_callback and written % self.chunk_size == 0:
+                progress_callback(written, len(items))
+
+
+class LearnerImporter(BaseImporter):
+    """
+    Learner import.
+
+    Phase one rejects rows with a missing or invalid SA ID, an ID or email
+    repeated earlier in the file, missing names, unknown gender/population
+    group codes or an email already linked to another learner; rows for
+    learners that already exist are skipped with a warning. Phase two
+    bulk-creates users, addresses and learners chunk by chunk.
+    """
+
+    def validate(self, rows: List[Dict], report: ImportReport) -> List[Dict]:
+        User = get_user_model()
+        gender_codes = {code for code, _ in Learner.GENDER_CHOICES}
+        population_codes = {code for code, _ in Learner.POPULATION_GROUP_CHOICES}
+
+        items = []
+        seen_ids: Dict[str, int] = {}
+        seen_emails: Dict[str, int] = {}
+
+        for row_num, row in enumerate(rows, start=FIRST_DATA_ROW):
+            sa_id = _value(row, 'sa_id_number')
+            if not sa_id:
+                report.error(row_num, 'SA ID number is required')
+                continue
+
+            birth_date = sa_id_birth_date(sa_id)
+            if not (sa_id.isdigit() and validate_sa_id(sa_id) and birth_date):
+                report.error(row_num, f'SA ID number {sa_id} is not valid', sa_id)
+                continue
+
+            if sa_id in seen_ids:
+                report.error(row_num, f'SA ID number {sa_id} is repeated from row {seen_ids[sa_id]}', sa_id)
+                continue
+            seen_ids[sa_id] = row_num
+
+            first_name = _value(row, 'first_name')
+            last_name = _value(row, 'last_name')
+            if not first_name or not last_name:
+                report.error(row_num, 'First name and last name are required', sa_id)
+                continue
+
+            email = _value(row, 'email') or f"{sa_id}@{PLACEHOLDER_EMAIL_DOMAIN}"
+            try:
+                validate_email(email)
+            except ValidationError:
+                report.error(row_num, f'Email {email} is not valid', sa_id)
+                continue
+            if email in seen_emails:
+                report.error(row_num, f'Email {email} is repeated from row {seen_emails[email]}', sa_id)
+                continue
+            seen_emails[email] = row_num
+
+            gender = (_value(row, 'gender') or 'M')[:1].upper()
+            if gender not in gender_codes:
+                report.error(row_num, f"Gender '{_value(row, 'gender')}' is not one of M/F/O", sa_id)
+                continue
+
+            population_group = (_value(row, 'population_group') or 'A')[:1].upper()
+            if population_group not in population_codes:
+                report.error(
+                    row_num, f"Population group '{_value(row, 'population_group')}' is not recognised", sa_id
+                )
+                continue
+
+            items.append({
+                'row_num': row_num,
+                'sa_id_number': sa_id,
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': email,
+                'phone_mobile': _value(row, 'phone_mobile'),
+                'date_of_birth': _parse_date(_value(row, 'date_of_birth')) or birth_date,
+                'gender': gender,
+                'population_group': population_group,
+                'address_line1': _value(row, 'address_line1') or 'Not provided',
+                'city': _value(row, 'city') or 'Not provided',
+                'province': _value(row, 'province') or 'Not provided',
+                'postal_code': _value(row, 'postal_code') or '0000',
+            })
+
+        if not items:
+            return items
+
+        # Learners that already exist are skipped
+        existing_ids = set(
+            Learner.objects.filter(
+                sa_id_number__in=[item['sa_id_number'] for item in items]
+            ).values_list('sa_id_number', flat=True)
+        )
+
+        # Existing accounts are reused, unless already linked to a learner
+        users_by_email = dict(
+            User.objects.filter(
+                email__in=[item['email'] for item in items]
+            ).values_list('email', 'id')
+        )
+        linked_users = dict(
+            Learner.objects.filter(
+                user_id__in=list(users_by_email.values())
+            ).values_list('user_id', 'learner_number')
+        )
+
+        valid = []
+        for item in items:
+            sa_id = item['sa_id_number']
+            if sa_id in existing_ids:
+                report.warning(item['row_num'], f'Learner {sa_id} already exists, skipping', sa_id)
+                continue
+
+            user_id = users_by_email.get(item['email'])
+            if user_id in linked_users:
+                report.error(
+                    item['row_num'],
+                    f"Email {item['email']} belongs to learner {linked_users[user_id]}",
+                    sa_id,
+                )
+                continue
+
+            item['user_id'] = user_id
+            valid.append(item)
+
+        return valid
+
+    def write(self, items: List[Dict], report: ImportReport, progress_callback=None) -> None:
+        # Every imported account starts with the same default password, so
+        # it is hashed once rather than once per row
+        password = make_password(DEFAULT_PASSWORD)
+        prefix = f"SKF{timezone.now().year}"
+        sequence = _next_sequence(Learner, 'learner_number', prefix)
+
+        written = 0
+        for chunk in _chunks(items, self.chunk_size):
+            numbers = [f"{prefix}{sequence + i:05d}" for i in range(len(chunk))]
+            sequence += len(chunk)
+            try:
+                with transaction.atomic():
+                    self._write_chunk(chunk, numbers, password)
+                report.success += len(chunk)
+            except DatabaseError as e:
+                logger.warning(f"Learner import chunk failed: {e}")
+                for item in chunk:
+                    report.error(item['row_num'], f'Not imported: {e}', item['sa_id_number'])
+
+            written += len(chunk)
+            if progress_callback:
+                progress_callback(written, len(items))
+
+    def _write_chunk(self, chunk: List[Dict], numbers: List[str], password: str) -> None:
+        User = get_user_model()
+        now = timezone.now()
+
+        if self.create_users:
+            new_users = User.objects.bulk_create([
+                User(
+                    email=item['email'],
+                    first_name=item['first_name'],
+                    last_name=item['last_name'],
+                    password=password,
+                )
+                for item in chunk if item['user_id'] is None
+            ])
+            user_ids = {user.email: user.pk for user in new_users}
+        else:
+            user_ids = {}
+
+        addresses = Address.objects.bulk_create([
+            Address(
+                line_1=item['address_line1'],
+                city=item['city'],
+                province=item['province'],
+                postal_code=item['postal_code'],
+                created_by=self.created_by,
+            )
+            for item in chunk
+        ])
+
+        Learner.objects.bulk_create([
+            Learner(
+                campus=self.campus,
+                user_id=item['user_id'] or user_ids.get(item['email']),
+                learner_number=learner_number,
+                sa_id_number=item['sa_id_number'],
+                first_name=item['first_name'],
+                last_name=item['last_name'],
+                email=item['email'],
+                phone_mobile=item['phone_mobile'],
+                date_of_birth=item['date_of_birth'],
+                gender=item['gender'],
+                population_group=item['population_group'],
+                citizenship='SA',
+                physical_address=address,
+                popia_consent_given=True,
+                popia_consent_date=now,
+                created_by=self.created_by,
+            )
+            for item, address, learner_number in zip(chunk, addresses, numbers)
+        ])
+
+
+class EnrollmentImporter(BaseImporter):
+    """
+    Enrollment import.
+
+    Learners, qualifications, campuses and existing enrollments are resolved
+    with one query each. Enrollments are saved one by one so their progress
+    tracking and task signals still fire.
+    """
+
+    def validate(self, rows: List[Dict], report: ImportReport) -> List[Dict]:
+        from academics.models import Enrollment, Qualification
+        from tenants.models import Campus
+
+        funding_types = {code for code, _ in Enrollment.FUNDING_TYPES}
+        parsed = []
+        for row_num, row in enumerate(rows, start=FIRST_DATA_ROW):
+            sa_id = _value(row, 'sa_id_number')
+            saqa_id = _value(row, 'qualification_saqa_id')
+            funding_type = (_value(row, 'funding_type') or 'SELF').upper()
+            if funding_type not in funding_types:
+                report.error(row_num, f'Funding type {funding_type} is not recognised', sa_id)
+                continue
+            parsed.append({
+                'row_num': row_num,
+                'sa_id_number': sa_id,
+                'saqa_id': saqa_id,
+                'campus_code': _value(row, 'campus_code'),
+                'enrollment_date': _parse_date(_value(row, 'enrollment_date')) or date.today(),
+                'funding_type': funding_type,
+            })
+
+        if not parsed:
+            return []
+
+        learners = {}
+        for learner_id, sa_id in Learner.objects.filter(
+            sa_id_number__in={item['sa_id_number'] for item in parsed}
+        ).order_by('pk').values_list('id', 'sa_id_number'):
+            learners.setdefault(sa_id, learner_id)
+
+        qualifications = {}
+        for qualification_id, saqa_id, months in Qualification.objects.filter(
+            saqa_id__in={item['saqa_id'] for item in parsed}
+        ).order_by('pk').values_list('id', 'saqa_id', 'minimum_duration_months'):
+            qualifications.setdefault(saqa_id, (qualification_id, months))
+
+        campuses = dict(
+            Campus.objects.filter(
+                code__in={item['campus_code'] for item in parsed if item['campus_code']}
+            ).values_list('code', 'id')
+        )
+        default_campus_id = self.campus.pk if self.campus else Campus.objects.values_list('id', flat=True).first()
+
+        existing = set(
+            Enrollment.objects.filter(
+                learner_id__in=set(learners.values()),
+                qualification_id__in={q_id for q_id, _ in qualifications.values()},
+            ).values_list('learner_id', 'qualification_id')
+        )
+
+        valid = []
+        for item in parsed:
+            sa_id, saqa_id = item['sa_id_number'], item['saqa_id']
+            learner_id = learners.get(sa_id)
+            if not learner_id:
+                report.error(item['row_num'], f'Learner {sa_id} not found', sa_id)
+                continue
+            if saqa_id not in qualifications:
+                report.error(item['row_num'], f'Qualification {saqa_id} not found', sa_id)
+                continue
+
+            qualification_id, months = qualifications[saqa_id]
+            if (learner_id, qualification_id) in existing:
+                report.warning(item['row_num'], f'Enrollment already exists for {sa_id} in {saqa_id}', sa_id)
+                continue
+            existing.add((learner_id, qualification_id))
+
+            item.update({
+                'learner_id': learner_id,
+                'qualification_id': qualification_id,
+                'duration_months': months,
+                'campus_id': campuses.get(item['campus_code'], default_campus_id),
+            })
+            valid.append(item)
+
+        return valid
+
+    def write(self, items: List[Dict], report: ImportReport, progress_callback=None) -> None:
+        from academics.models import Enrollment
+
+        prefix = f"ENR{timezone.now().year}"
+        sequence = _next_sequence(Enrollment, 'enrollment_number', prefix)
+        for offset, item in enumerate(items):
+            item['enrollment_number'] = f"{prefix}{sequence + offset:05d}"
+
+        def create_row(item):
+            enroll_date = item['enrollment_date']
+            Enrollment.objects.create(
+                learner_id=item['learner_id'],
+                qualification_id=item['qualification_id'],
+                campus_id=item['campus_id'],
+                enrollment_number=item['enrollment_number'],
+                application_date=enroll_date,
+                enrollment_date=enroll_date,
+                start_date=enroll_date,
+                expected_completion=enroll_date + timedelta(days=item['duration_months'] * 30),
+                status='ENROLLED',
+                funding_type=item['funding_type'],
+                created_by=self.created_by,
+            )
+
+        self._write_rows_individually(items, report, progress_callback, create_row, 'sa_id_number')
+
+
+class AssessmentImporter(BaseImporter):
+    """
+    Assessment result import.
+
+    Enrollments, activities and already-recorded results are resolved with
+    one query each. Results are saved one by one so competency and task
+    signals still fire.
+    """
+    RESULT_CODES = ['C', 'NYC', 'ABS', 'DEF']
+
+    def validate(self, rows: List[Dict], report: ImportReport) -> List[Dict]:
+        from academics.models import Enrollment
+        from assessments.models import AssessmentActivity, AssessmentResult
+
+        User = get_user_model()
+        assessor_id = User.objects.filter(is_staff=True).values_list('id', flat=True).first()
+
+        parsed = []
+        for row_num, row in enumerate(rows, start=FIRST_DATA_ROW):
+            enrollment_number = _value(row, 'enrollment_number')
+            try:
+                score = Decimal(_value(row, 'percentage_score') or '0')
+            except InvalidOperation:
+                report.error(row_num, f"Score '{_value(row, 'percentage_score')}' is not a number", enrollment_number)
+                continue
+
+            result_code = (_value(row, 'result') or 'C').upper()
+            if result_code not in self.RESULT_CODES:
+                result_code = 'C'
+
+            parsed.append({
+                'row_num': row_num,
+                'enrollment_number': enrollment_number,
+                'module_code': _value(row, 'module_code'),
+                'result': result_code,
+                'percentage_score': score,
+                'assessment_date': _parse_date(_value(row, 'assessment_date')) or date.today(),
+            })
+
+        if not parsed:
+            return []
+        if assessor_id is None:
+            for item in parsed:
+                report.error(item['row_num'], 'No staff user available to record as assessor', item['enrollment_number'])
+            return []
+
+        enrollments = dict(
+            Enrollment.objects.filter(
+                enrollment_number__in={item['enrollment_number'] for item in parsed}
+            ).values_list('enrollment_number', 'id')
+        )
+
+        activities = {}
+        for activity_id, module_code in AssessmentActivity.objects.filter(
+            module__code__in={item['module_code'] for item in parsed}
+        ).order_by('pk').values_list('id', 'module__code'):
+            activities.setdefault(module_code, activity_id)
+
+        recorded = set(
+            AssessmentResult.objects.filter(
+                enrollment_id__in=set(enrollments.values()),
+                activity_id__in=set(activities.values()),
+            ).values_list('enrollment_id', 'activity_id')
+        )
+
+        valid = []
+        for item in parsed:
+            enrollment_number, module_code = item['enrollment_number'], item['module_code']
+            enrollment_id = enrollments.get(enrollment_number)
+            if not enrollment_id:
+                report.error(item['row_num'], f'Enrollment {enrollment_number} not found', enrollment_number)
+                continue
+            activity_id = activities.get(module_code)
+            if not activity_id:
+                report.error(item['row_num'], f'Activity for module {module_code} not found', enrollment_number)
+                continue
+
+            if (enrollment_id, activity_id) in recorded:
+                report.warning(
+                    item['row_num'],
+                    f'A result for {module_code} is already recorded on {enrollment_number}, skipping',
+                    enrollment_number,
+                )
+                continue
+            recorded.add((enrollment_id, activity_id))
+
+            item.update({
+                'enrollment_id': enrollment_id,
+                'activity_id': activity_id,
+                'assessor_id': assessor_id,
+            })
+            valid.append(item)
+
+        return valid
+
+    def write(self, items: List[Dict], report: ImportReport, progress_callback=None) -> None:
+        from assessments.models import AssessmentResult
+
+        def create_row(item):
+            AssessmentResult.objects.create(
+                enrollment_id=item['enrollment_id'],
+                activity_id=item['activity_id'],
+                assessor_id=item['assessor_id'],
+                result=item['result'],
+                percentage_score=item['percentage_score'],
+                assessment_date=item['assessment_date'],
+                status='MODERATED' if item['result'] == 'C' else 'PENDING_MOD',
+            )
+
+        self._write_rows_individually(items, report, progress_callback, create_row, 'enrollment_number')
+
+
+IMPORTERS = {
+    'learners': LearnerImporter,
+    'enrollments': EnrollmentImporter,
+    'assessments': AssessmentImporter,
+}
+
+
+def run_import_job(job, rows: Optional[List[Dict]] = None) -> Optional[ImportReport]:
+    """
+    Run a queued ImportJob and save its error report as the job's report
+    file.
+
+    The job's parameters hold campus_id, create_users and, for background
+    runs, source_file (the uploaded CSV in default storage,
+    deleted once read). Inline runs pass the parsed rows instead.
+
+    Returns:
+        ImportReport, or None if the job failed
+    """
+    from tenants.models import Campus
+
+    params = job.parameters or {}
+    importer_class = IMPORTERS.get(job.import_type)
+    if importer_class is None:
+        job.status = 'FAILED'
+        job.error_message = f"Unknown import type: {job.import_type}"
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+        return None
+
+    job.status = 'PROCESSING'
+    job.started_at = timezone.now()
+    job.progress_percent = 0
+    job.progress_message = 'Validating file'
+    job.save(update_fields=['status', 'started_at', 'progress_percent', 'progress_message', 'updated_at'])
+
+    def report_progress(written, total):
+        job.progress_percent = min(99, int(written / total * 100)) if total else 0
+        job.progress_message = f"{written:,} of {total:,} valid rows imported"
+        job.save(update_fields=['progress_percent', 'progress_message', 'updated_at'])
+
+    source_file = params.get('source_file')
+    try:
+        if rows is None:
+            with default_storage.open(source_file, 'rb') as source:
+                rows = read_csv_rows(source.read())
+
+        campus_id = params.get('campus_id')
+        importer = importer_class(
+            campus=Campus.objects.filter(pk=campus_id).first() if campus_id else None,
+            created_by=job.requested_by,
+            create_users=params.get('create_users', True),
+        )
+        report = importer.run(rows, report_progress)
+
+        from reporting.services.csv_export import write_csv_file
+
+        filename = f"{job.import_type}_import_report_{timezone.now():%Y%m%d_%H%M%S}.csv"
+        with tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8') as tmp:
+            write_csv_file(tmp, ImportReport.HEADER, report.rows())
+            tmp.seek(0)
+            job.report_file.save(filename, File(tmp), save=False)
+
+        errors, warnings = len(report.errors), len(report.warnings)
+        job.report_filename = filename
+        job.record_count = report.success
+        job.error_details = {'rows': report.total_rows, 'errors': errors, 'warnings': warnings}
+        job.status = 'COMPLETED'
+        job.progress_percent = 100
+        job.progress_message = f"{report.success:,} imported, {errors:,} rejected, {warnings:,} skipped"
+        job.completed_at = timezone.now()
+        job.save()
+        return report
+    except Exception as e:
+        logger.exception(f"Import job {job.pk} failed")
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'completed_at', 'updated_at'])
+        return None
+    finally:
+        if source_file:
+            default_storage.delete(source_file)
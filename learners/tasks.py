@@ -0,0 +1,48 @@
+"""
+Learners Celery Tasks
+
+Background jobs:
+- Bulk CSV imports too large to run inside the upload request
+"""
+import logging
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='learners.tasks.run_import_job')
+def run_import_job(job_id):
+    """
+    Import the uploaded CSV of a queued import job.
+    """
+    from learners.models import ImportJob
+    from learners.services.bulk_import import run_import_job as run_job
+    
+    try:
+        job = ImportJob.objects.get(pk=job_id)
+    except ImportJob.DoesNotExist:
+        logger.warning(f"Import job {job_id} not found")
+        return {'status': 'not_found'}
+    
+    if job.status != 'PENDING':
+        return {'status': job.status.lower()}
+    
+    report = run_job(job)
+    return {
+        'status': job.status.lower(),
+        'imported': job.record_count,
+        'errors': len(report.errors) if report else None,
+    }
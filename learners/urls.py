@@ -14,6 +14,7 @@ urlpatterns = [
     # Kanban view
     path('kanban/', views.LearnerKanbanView.as_view(), name='kanban'),
     path('kanban/update-status/', views.kanban_update_status, name='kanban_update_status'),
+    path('kanban/cards/', views.kanban_column_cards, name='kanban_column_cards'),
     
     # Pivot table view
     path('pivot/', views.LearnerPivotView.as_view(), name='pivot'),
@@ -27,9 +28,11 @@ urlpatterns = [
     # Import/Export (single view with tabs)
     path('import-export/', views.BulkImportView.as_view(), name='bulk_import'),
     path('import/template/<str:template_type>/', views.download_import_template, name='download_template'),
+    path('import/jobs/<int:job_id>/', views.import_job_status, name='import_job_status'),
     
     # SETA exports
     path('export/', views.ExportTemplatesView.as_view(), name='export_templates'),
+    path('export/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
     path('export/<str:template_id>/', views.export_seta_data, name='export_seta_data'),
     
     # Daily Logbook
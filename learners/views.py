@@ -4,9 +4,8 @@ Includes Kanban, Pivot, Timetable, Performance, and Import/Export functionality
 """
 import csv
 import json
-import io
-from datetime import date, datetime, timedelta
-from decimal import Decimal
+from urllib.parse import urlencode
+from datetime import date, timedelta
 from collections import defaultdict
 
 from django.shortcuts import render, get_object_or_404, redirect
@@ -16,98 +15,223 @@ from django.contrib import messages
 from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.views.generic import ListView, DetailView, TemplateView
-from django.db.models import Count, Avg, Q, F, Sum, Case, When, Value, CharField
-from django.db.models.functions import Coalesce
+from django.db.models import Count, Avg, Q, F, Sum, Case, When, Value, CharField, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import timezone
 
-from .models import Learner, Address, SETA
+from .models import ImportJob, Learner, SETA
 from academics.models import Enrollment, Qualification, Module
-from assessments.models import AssessmentResult, AssessmentActivity
+from assessments.models import AssessmentResult
 from tenants.models import Campus, Brand
 from core.context_processors import get_selected_campus
+from reporting.services.enrollment_cube import (
+    DIMENSIONS as CUBE_DIMENSIONS,
+    DERIVED_DIMENSIONS as DERIVED_CUBE_DIMENSIONS,
+    dimension_label,
+    get_enrollment_cube,
+    is_dimension,
+)
+from reporting.models import ExportJob
+from reporting.services.csv_export import stream_csv_response
+from reporting.services.seta_exports import (
+    FILTER_PARAMS as EXPORT_FILTER_PARAMS,
+    SETA_EXPORTS,
+    build_enrollment_queryset,
+    stream_limit as export_stream_limit,
+)
+from reporting.tasks import CELERY_AVAILABLE as EXPORT_CELERY_AVAILABLE, run_export_job
+from .services.bulk_import import (
+    IMPORTERS,
+    inline_limit as import_inline_limit,
+    read_csv_rows,
+    run_import_job,
+)
+from .tasks import CELERY_AVAILABLE as IMPORT_CELERY_AVAILABLE, run_import_job as queue_import_job
 
 
 # =============================================================================
 # KANBAN VIEW - Drag & Drop Learner Management
 # =============================================================================
 
+# Kanban columns with colors (statuses not listed are summarised as hidden counts)
+KANBAN_COLUMNS = [
+    {'status': 'APPLIED', 'label': 'Applied', 'color': 'slate', 'icon': 'inbox'},
+    {'status': 'DOC_CHECK', 'label': 'Document Check', 'color': 'amber', 'icon': 'document-magnifying-glass'},
+    {'status': 'REGISTERED', 'label': 'Registered', 'color': 'blue', 'icon': 'clipboard-document-check'},
+    {'status': 'ENROLLED', 'label': 'Enrolled', 'color': 'indigo', 'icon': 'academic-cap'},
+    {'status': 'ACTIVE', 'label': 'Active', 'color': 'green', 'icon': 'play-circle'},
+    {'status': 'ON_HOLD', 'label': 'On Hold', 'color': 'orange', 'icon': 'pause-circle'},
+    {'status': 'COMPLETED', 'label': 'Completed', 'color': 'teal', 'icon': 'check-circle'},
+    {'status': 'CERTIFIED', 'label': 'Certified', 'color': 'emerald', 'icon': 'trophy'},
+]
+
+KANBAN_PAGE_SIZE = 50
+
+# Newest enrollments first; id breaks ties so keyset paging is stable
+KANBAN_ORDERING = [F('enrollment_date').desc(nulls_last=True), F('id').desc()]
+
+
+def get_kanban_queryset(request):
+    """Enrollments for the kanban board with the request's filters applied"""
+    qualification_id = request.GET.get('qualification')
+    campus_id = request.GET.get('campus')
+    search = request.GET.get('search', '')
+    
+    enrollments = Enrollment.objects.all()
+    
+    if qualification_id:
+        enrollments = enrollments.filter(qualification_id=qualification_id)
+    if campus_id:
+        enrollments = enrollments.filter(campus_id=campus_id)
+    else:
+        # Apply global campus filter if set
+        selected_campus = get_selected_campus(request)
+        if selected_campus:
+            enrollments = enrollments.filter(campus=selected_campus)
+    if search:
+        enrollments = enrollments.filter(
+            Q(learner__first_name__icontains=search) |
+            Q(learner__last_name__icontains=search) |
+            Q(learner__sa_id_number__icontains=search) |
+            Q(enrollment_number__icontains=search)
+        )
+    
+    return enrollments
+
+
+def encode_kanban_cursor(enrollment):
+    """Keyset cursor for the card after which the next page starts"""
+    enrollment_date = enrollment.enrollment_date.isoformat() if enrollment.enrollment_date else ''
+    return f"{enrollment_date}|{enrollment.id}"
+
+
+def kanban_cursor_filter(cursor):
+    """Q object selecting cards that sort after the given cursor"""
+    date_part, id_part = cursor.split('|', 1)
+    last_id = int(id_part)
+    
+    if not date_part:
+        # Undated cards sort last, by id
+        return Q(enrollment_date__isnull=True, id__lt=last_id)
+    
+    last_date = date.fromisoformat(date_part)
+    return (
+        Q(enrollment_date__lt=last_date) |
+        Q(enrollment_date=last_date, id__lt=last_id) |
+        Q(enrollment_date__isnull=True)
+    )
+
+
 class LearnerKanbanView(LoginRequiredMixin, TemplateView):
     """
     Kanban board showing learners organized by enrollment status
     Supports drag-and-drop status changes
+    
+    Column counts come from one grouped query and the first page of every
+    column from one windowed query; further cards load on scroll through
+    kanban_column_cards.
     """
     template_name = 'learners/kanban.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get filter parameters
-        qualification_id = self.request.GET.get('qualification')
-        campus_id = self.request.GET.get('campus')
-        search = self.request.GET.get('search', '')
+        enrollments = get_kanban_queryset(self.request)
         
-        # Base queryset
-        enrollments = Enrollment.objects.select_related(
-            'learner', 'qualification', 'campus'
-        ).order_by('-enrollment_date')
+        # All status counts in one query
+        status_counts = dict(
+            enrollments.values_list('status').annotate(count=Count('id')).order_by()
+        )
         
-        # Apply filters
-        if qualification_id:
-            enrollments = enrollments.filter(qualification_id=qualification_id)
-        if campus_id:
-            enrollments = enrollments.filter(campus_id=campus_id)
-        else:
-            # Apply global campus filter if set
-            selected_campus = get_selected_campus(self.request)
-            if selected_campus:
-                enrollments = enrollments.filter(campus=selected_campus)
-        if search:
-            enrollments = enrollments.filter(
-                Q(learner__first_name__icontains=search) |
-                Q(learner__last_name__icontains=search) |
-                Q(learner__sa_id_number__icontains=search) |
-                Q(enrollment_number__icontains=search)
+        # First page of every column in one query
+        column_statuses = [column['status'] for column in KANBAN_COLUMNS]
+        first_pages = defaultdict(list)
+        for enrollment in enrollments.filter(
+            status__in=column_statuses
+        ).select_related(
+            'learner', 'qualification', 'campus'
+        ).annotate(
+            column_position=Window(
+                expression=RowNumber(),
+                partition_by=[F('status')],
+                order_by=KANBAN_ORDERING,
             )
-        
-        # Define Kanban columns with colors
-        kanban_columns = [
-            {'status': 'APPLIED', 'label': 'Applied', 'color': 'slate', 'icon': 'inbox'},
-            {'status': 'DOC_CHECK', 'label': 'Document Check', 'color': 'amber', 'icon': 'document-magnifying-glass'},
-            {'status': 'REGISTERED', 'label': 'Registered', 'color': 'blue', 'icon': 'clipboard-document-check'},
-            {'status': 'ENROLLED', 'label': 'Enrolled', 'color': 'indigo', 'icon': 'academic-cap'},
-            {'status': 'ACTIVE', 'label': 'Active', 'color': 'green', 'icon': 'play-circle'},
-            {'status': 'ON_HOLD', 'label': 'On Hold', 'color': 'orange', 'icon': 'pause-circle'},
-            {'status': 'COMPLETED', 'label': 'Completed', 'color': 'teal', 'icon': 'check-circle'},
-            {'status': 'CERTIFIED', 'label': 'Certified', 'color': 'emerald', 'icon': 'trophy'},
-        ]
-        
-        # Group enrollments by status
-        for column in kanban_columns:
-            column['enrollments'] = enrollments.filter(status=column['status'])[:50]
-            column['count'] = enrollments.filter(status=column['status']).count()
-        
-        # Get counts for hidden statuses
-        withdrawn_count = enrollments.filter(status='WITHDRAWN').count()
-        transferred_count = enrollments.filter(status='TRANSFERRED').count()
-        expired_count = enrollments.filter(status='EXPIRED').count()
+        ).filter(
+            column_position__lte=KANBAN_PAGE_SIZE
+        ).order_by('status', 'column_position'):
+            first_pages[enrollment.status].append(enrollment)
+        
+        kanban_columns = []
+        for column in KANBAN_COLUMNS:
+            cards = first_pages.get(column['status'], [])
+            count = status_counts.get(column['status'], 0)
+            kanban_columns.append({
+                **column,
+                'enrollments': cards,
+                'count': count,
+                'next_cursor': encode_kanban_cursor(cards[-1]) if count > len(cards) else None,
+            })
         
         context.update({
             'kanban_columns': kanban_columns,
-            'withdrawn_count': withdrawn_count,
-            'transferred_count': transferred_count,
-            'expired_count': expired_count,
+            'withdrawn_count': status_counts.get('WITHDRAWN', 0),
+            'transferred_count': status_counts.get('TRANSFERRED', 0),
+            'expired_count': status_counts.get('EXPIRED', 0),
             'qualifications': Qualification.objects.filter(is_active=True),
             'campuses': Campus.objects.filter(is_active=True),
-            'selected_qualification': qualification_id,
-            'selected_campus': campus_id,
-            'search': search,
-            'total_enrollments': enrollments.count(),
+            'selected_qualification': self.request.GET.get('qualification'),
+            'selected_campus': self.request.GET.get('campus'),
+            'search': self.request.GET.get('search', ''),
+            'total_enrollments': sum(status_counts.values()),
         })
         
         return context
 
 
+@login_required
+def kanban_column_cards(request):
+    """AJAX endpoint returning the next page of cards for one Kanban column"""
+    status = request.GET.get('status')
+    cursor = request.GET.get('cursor', '')
+    
+    if status not in [column['status'] for column in KANBAN_COLUMNS]:
+        return JsonResponse({'success': False, 'error': 'Invalid status'}, status=400)
+    
+    enrollments = get_kanban_queryset(request).filter(
+        status=status
+    ).select_related(
+        'learner', 'qualification', 'campus'
+    ).order_by(*KANBAN_ORDERING)
+    
+    if cursor:
+        try:
+            enrollments = enrollments.filter(kanban_cursor_filter(cursor))
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+    
+    # Fetch one extra card to know whether another page follows
+    cards = list(enrollments[:KANBAN_PAGE_SIZE + 1])
+    has_more = len(cards) > KANBAN_PAGE_SIZE
+    cards = cards[:KANBAN_PAGE_SIZE]
+    
+    html = ''.join(
+        render_to_string('learners/partials/kanban_card.html', {'enrollment': enrollment}, request=request)
+        for enrollment in cards
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'html': html,
+        'count': len(cards),
+        'next_cursor': encode_kanban_cursor(cards[-1]) if has_more else None,
+    })
+
+
 @login_required
 def kanban_update_status(request):
     """AJAX endpoint to update enrollment status from Kanban drag-drop"""
@@ -144,10 +268,23 @@ def kanban_update_status(request):
 class LearnerPivotView(LoginRequiredMixin, TemplateView):
     """
     Pivot table view for learner analytics
-    Group by: qualification, campus, status, funding type, gender, etc.
+    Group by: qualification, campus, status, cohort, month, funding type, gender, etc.
+    
+    Served from the shared enrollment cube (reporting.services.enrollment_cube),
+    so changing selectors or drilling down doesn't re-query enrollments.
+    Drill-downs pass dimension filters as query parameters, e.g.
+    ?rows=cohort&cols=status&campus=Main+Campus
     """
     template_name = 'learners/pivot.html'
     
+    # Next level when drilling into a row
+    DRILL_DOWN = {
+        'campus': 'qualification',
+        'qualification': 'cohort',
+        'cohort': 'status',
+        'year': 'month',
+    }
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
@@ -156,69 +293,44 @@ class LearnerPivotView(LoginRequiredMixin, TemplateView):
         col_field = self.request.GET.get('cols', 'status')
         value_field = self.request.GET.get('value', 'count')
         
+        if not is_dimension(row_field):
+            row_field = 'qualification'
+        if not is_dimension(col_field):
+            col_field = 'status'
+        
         # Define available fields
         pivot_fields = {
-            'qualification': {'label': 'Qualification', 'model_field': 'qualification__short_title'},
-            'campus': {'label': 'Campus', 'model_field': 'campus__name'},
-            'status': {'label': 'Status', 'model_field': 'status'},
-            'funding_type': {'label': 'Funding Type', 'model_field': 'funding_type'},
-            'gender': {'label': 'Gender', 'model_field': 'learner__gender'},
-            'population_group': {'label': 'Population Group', 'model_field': 'learner__population_group'},
-            'province': {'label': 'Province', 'model_field': 'learner__province_code'},
-            'year': {'label': 'Enrollment Year', 'model_field': 'enrollment_date__year'},
+            name: {'label': dimension_label(name)}
+            for name in list(CUBE_DIMENSIONS) + list(DERIVED_CUBE_DIMENSIONS)
         }
         
-        # Build pivot data
-        row_model_field = pivot_fields.get(row_field, {}).get('model_field', 'qualification__short_title')
-        col_model_field = pivot_fields.get(col_field, {}).get('model_field', 'status')
-        
-        # Get unique column values (column headers)
-        column_headers = list(Enrollment.objects.values_list(col_model_field, flat=True).distinct().order_by(col_model_field))
-        # Replace None with readable value
-        column_headers = [c if c else '(None)' for c in column_headers]
-        
-        # Build pivot query
-        pivot_query = Enrollment.objects.values(
-            row_model_field, col_model_field
-        ).annotate(
-            count=Count('id')
-        ).order_by(row_model_field)
-        
-        # Restructure for template - dictionary format for .items() iteration
-        pivot_data = {}  # {row_key: {col1: count, col2: count, 'total': total}}
-        column_totals = defaultdict(int)
-        grand_total = 0
-        
-        for item in pivot_query:
-            row_key = item[row_model_field] or '(None)'
-            col_key = item[col_model_field] or '(None)'
-            count = item['count']
-            
-            if row_key not in pivot_data:
-                pivot_data[row_key] = {'total': 0}
-            
-            pivot_data[row_key][col_key] = count
-            pivot_data[row_key]['total'] += count
-            column_totals[col_key] += count
-            grand_total += count
+        # Drill-down filters (any dimension passed as a query parameter)
+        filters = {
+            name: self.request.GET[name]
+            for name in pivot_fields
+            if self.request.GET.get(name)
+        }
         
-        # Get active count for summary card
-        active_count = Enrollment.objects.filter(status='ACTIVE').count()
-        completed_count = Enrollment.objects.filter(status__in=['COMPLETED', 'CERTIFIED']).count()
+        cube = get_enrollment_cube()
+        pivot = cube.pivot(row_field, col_field, filters)
+        status_totals = cube.totals('status', **filters)
         
         context.update({
             'pivot_fields': pivot_fields,
             'rows': row_field,
             'cols': col_field,
             'values': value_field,
-            'column_headers': column_headers,
-            'pivot_data': pivot_data,
-            'column_totals': dict(column_totals),
-            'grand_total': grand_total,
-            'row_label': pivot_fields.get(row_field, {}).get('label', 'Row'),
-            'col_label': pivot_fields.get(col_field, {}).get('label', 'Column'),
-            'active_count': active_count,
-            'completed_count': completed_count,
+            'filters': filters,
+            'filter_query': urlencode(filters),
+            'drill_down': self.DRILL_DOWN.get(row_field),
+            'column_headers': pivot['column_headers'],
+            'pivot_data': pivot['rows'],
+            'column_totals': pivot['column_totals'],
+            'grand_total': pivot['grand_total'],
+            'row_label': dimension_label(row_field),
+            'col_label': dimension_label(col_field),
+            'active_count': status_totals.get('ACTIVE', 0),
+            'completed_count': status_totals.get('COMPLETED', 0) + status_totals.get('CERTIFIED', 0),
         })
         
         return context
@@ -450,237 +562,112 @@ class BulkImportView(LoginRequiredMixin, TemplateView):
             'import_templates': import_templates,
             'qualifications': Qualification.objects.filter(is_active=True),
             'campuses': Campus.objects.filter(is_active=True),
+            'import_job': self._get_import_job(),
         })
         
         return context
     
     def post(self, request, *args, **kwargs):
-        """Handle file upload and import"""
-        import_type = request.POST.get('import_type')
+        """
+        Handle file upload and import
+        
+        Files are validated in full before anything is written; see
+        learners.services.bulk_import. Files larger than
+        BULK_IMPORT_INLINE_LIMIT rows are imported by a background job
+        when Celery is available. Either way the per-row error report is
+        kept on an ImportJob for download.
+        """
+        import_type = request.POST.get('import_type') or 'learners'
         file = request.FILES.get('file')
         
         if not file:
             messages.error(request, 'Please select a file to upload')
             return redirect('learners:bulk_import')
         
+        if import_type not in IMPORTERS:
+            messages.error(request, f'Unknown import type: {import_type}')
+            return redirect('learners:bulk_import')
+        
+        campus_id = request.POST.get('campus') or Campus.objects.filter(
+            is_active=True
+        ).values_list('id', flat=True).first()
+        if import_type == 'learners' and not campus_id:
+            messages.error(request, 'Select the campus to import learners into')
+            return redirect('learners:bulk_import')
+        
         try:
-            # Read CSV file
-            decoded_file = file.read().decode('utf-8')
-            reader = csv.DictReader(io.StringIO(decoded_file))
-            
-            results = {
-                'success': 0,
-                'errors': [],
-                'warnings': []
-            }
-            
-            if import_type == 'learners':
-                results = self._import_learners(reader)
-            elif import_type == 'enrollments':
-                results = self._import_enrollments(reader)
-            elif import_type == 'assessments':
-                results = self._import_assessments(reader)
-            
-            if results['success'] > 0:
-                messages.success(request, f"Successfully imported {results['success']} records")
-            
-            if results['errors']:
-                for error in results['errors'][:10]:  # Show first 10 errors
-                    messages.error(request, error)
-            
-            if results['warnings']:
-                for warning in results['warnings'][:5]:
-                    messages.warning(request, warning)
-                    
-        except Exception as e:
+            data = file.read()
+            rows = read_csv_rows(data)
+        except (UnicodeDecodeError, csv.Error) as e:
             messages.error(request, f'Error processing file: {str(e)}')
+            return redirect('learners:bulk_import')
+        
+        job = ImportJob.objects.create(
+            import_type=import_type,
+            requested_by=request.user,
+            created_by=request.user,
+            parameters={
+                'campus_id': int(campus_id) if campus_id else None,
+                'create_users': request.POST.get('create_users') is not None,
+                'rows': len(rows),
+            },
+            progress_message='Queued',
+        )
+        job_url = f"{reverse('learners:bulk_import')}?{urlencode({'import_job': job.pk})}"
         
+        if IMPORT_CELERY_AVAILABLE and len(rows) > import_inline_limit():
+            job.parameters['source_file'] = default_storage.save(
+                f'imports/{import_type}_{job.pk}.csv', ContentFile(data)
+            )
+            job.save(update_fields=['parameters', 'updated_at'])
+            queue_import_job.delay(job.pk)
+            messages.info(request, f'{len(rows):,} rows queued for import. The report will be ready to download here.')
+            return redirect(job_url)
+        
+        report = run_import_job(job, rows)
+        if report is None:
+            messages.error(request, f'Error processing file: {job.error_message}')
+            return redirect(job_url)
+        
+        results = report.as_results()
+        if results['success'] > 0:
+            messages.success(request, f"Successfully imported {results['success']} records")
+        
+        if results['errors']:
+            for error in results['errors'][:10]:  # Show first 10 errors
+                messages.error(request, error)
+        
+        if results['warnings']:
+            for warning in results['warnings'][:5]:
+                messages.warning(request, warning)
+        
+        if report.entries:
+            return redirect(job_url)
         return redirect('learners:bulk_import')
     
-    def _import_learners(self, reader):
-        """Import learners from CSV"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        results = {'success': 0, 'errors': [], 'warnings': []}
-        
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                # Check if learner exists
-                sa_id = row.get('sa_id_number', '').strip()
-                if not sa_id:
-                    results['errors'].append(f'Row {row_num}: SA ID number is required')
-                    continue
-                
-                if Learner.objects.filter(sa_id_number=sa_id).exists():
-                    results['warnings'].append(f'Row {row_num}: Learner {sa_id} already exists, skipping')
-                    continue
-                
-                # Create user
-                email = row.get('email', '').strip()
-                if not email:
-                    email = f"{sa_id}@placeholder.skillsflow.co.za"
-                
-                user, created = User.objects.get_or_create(
-                    email=email,
-                    defaults={
-                        'first_name': row.get('first_name', '').strip(),
-                        'last_name': row.get('last_name', '').strip(),
-                    }
-                )
-                if created:
-                    user.set_password('changeme123')
-                    user.save()
-                
-                # Create address
-                address = Address.objects.create(
-                    line_1=row.get('address_line1', 'Not provided'),
-                    city=row.get('city', 'Not provided'),
-                    province=row.get('province', 'Not provided'),
-                    postal_code=row.get('postal_code', '0000'),
-                )
-                
-                # Parse date of birth
-                dob_str = row.get('date_of_birth', '').strip()
-                try:
-                    dob = datetime.strptime(dob_str, '%Y-%m-%d').date()
-                except:
-                    dob = date(2000, 1, 1)
-                
-                # Create learner
-                learner = Learner.objects.create(
-                    user=user,
-                    learner_number=f"SKF{timezone.now().year}{row_num:05d}",
-                    sa_id_number=sa_id,
-                    first_name=row.get('first_name', '').strip(),
-                    last_name=row.get('last_name', '').strip(),
-                    email=email,
-                    phone_mobile=row.get('phone_mobile', '').strip(),
-                    date_of_birth=dob,
-                    gender=row.get('gender', 'M').strip()[:1].upper(),
-                    population_group=row.get('population_group', 'A').strip()[:1].upper(),
-                    citizenship='SA',
-                    physical_address=address,
-                    popia_consent_given=True,
-                    popia_consent_date=timezone.now(),
-                )
-                
-                results['success'] += 1
-                
-            except Exception as e:
-                results['errors'].append(f'Row {row_num}: {str(e)}')
-        
-        return results
-    
-    def _import_enrollments(self, reader):
-        """Import enrollments from CSV"""
-        results = {'success': 0, 'errors': [], 'warnings': []}
-        
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                sa_id = row.get('sa_id_number', '').strip()
-                saqa_id = row.get('qualification_saqa_id', '').strip()
-                
-                learner = Learner.objects.filter(sa_id_number=sa_id).first()
-                if not learner:
-                    results['errors'].append(f'Row {row_num}: Learner {sa_id} not found')
-                    continue
-                
-                qualification = Qualification.objects.filter(saqa_id=saqa_id).first()
-                if not qualification:
-                    results['errors'].append(f'Row {row_num}: Qualification {saqa_id} not found')
-                    continue
-                
-                # Check for existing enrollment
-                if Enrollment.objects.filter(learner=learner, qualification=qualification).exists():
-                    results['warnings'].append(f'Row {row_num}: Enrollment already exists for {sa_id} in {saqa_id}')
-                    continue
-                
-                # Parse enrollment date
-                enroll_date_str = row.get('enrollment_date', '').strip()
-                try:
-                    enroll_date = datetime.strptime(enroll_date_str, '%Y-%m-%d').date()
-                except:
-                    enroll_date = date.today()
-                
-                # Get campus
-                campus_code = row.get('campus_code', '').strip()
-                campus = Campus.objects.filter(code=campus_code).first() or Campus.objects.first()
-                
-                # Create enrollment
-                enrollment = Enrollment.objects.create(
-                    learner=learner,
-                    qualification=qualification,
-                    campus=campus,
-                    enrollment_number=f"ENR{timezone.now().year}{row_num:05d}",
-                    enrollment_date=enroll_date,
-                    start_date=enroll_date,
-                    expected_completion=enroll_date + timedelta(days=qualification.minimum_duration_months * 30),
-                    status='ENROLLED',
-                    funding_type=row.get('funding_type', 'SELF').strip().upper(),
-                )
-                
-                results['success'] += 1
-                
-            except Exception as e:
-                results['errors'].append(f'Row {row_num}: {str(e)}')
-        
-        return results
-    
-    def _import_assessments(self, reader):
-        """Import assessment results from CSV"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        results = {'success': 0, 'errors': [], 'warnings': []}
-        
-        # Get a default assessor
-        assessor = User.objects.filter(is_staff=True).first()
-        
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                enrollment_number = row.get('enrollment_number', '').strip()
-                module_code = row.get('module_code', '').strip()
-                
-                enrollment = Enrollment.objects.filter(enrollment_number=enrollment_number).first()
-                if not enrollment:
-                    results['errors'].append(f'Row {row_num}: Enrollment {enrollment_number} not found')
-                    continue
-                
-                # Find activity by module code
-                activity = AssessmentActivity.objects.filter(module__code=module_code).first()
-                if not activity:
-                    results['errors'].append(f'Row {row_num}: Activity for module {module_code} not found')
-                    continue
-                
-                # Parse assessment date
-                assess_date_str = row.get('assessment_date', '').strip()
-                try:
-                    assess_date = datetime.strptime(assess_date_str, '%Y-%m-%d').date()
-                except:
-                    assess_date = date.today()
-                
-                # Create result
-                result_code = row.get('result', 'C').strip().upper()
-                if result_code not in ['C', 'NYC', 'ABS', 'DEF']:
-                    result_code = 'C'
-                
-                AssessmentResult.objects.create(
-                    enrollment=enrollment,
-                    activity=activity,
-                    assessor=assessor,
-                    result=result_code,
-                    percentage_score=Decimal(row.get('percentage_score', '0') or '0'),
-                    assessment_date=assess_date,
-                    status='MODERATED' if result_code == 'C' else 'PENDING_MOD',
-                )
-                
-                results['success'] += 1
-                
-            except Exception as e:
-                results['errors'].append(f'Row {row_num}: {str(e)}')
-        
-        return results
+    def _get_import_job(self):
+        """Import job to show progress / the error report for"""
+        job_id = self.request.GET.get('import_job', '')
+        if not job_id.isdigit():
+            return None
+        return ImportJob.objects.filter(pk=job_id, requested_by=self.request.user).first()
+
+
+@login_required
+def import_job_status(request, job_id):
+    """AJAX endpoint reporting progress of a bulk import"""
+    job = get_object_or_404(ImportJob, pk=job_id, requested_by=request.user)
+    
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'progress_percent': job.progress_percent,
+        'progress_message': job.progress_message,
+        'record_count': job.record_count,
+        'download_url': job.report_file.url if job.status == 'COMPLETED' and job.report_file else None,
+        'filename': job.report_filename,
+        'error': job.error_message or None,
+    })
 
 
 @login_required
@@ -692,14 +679,14 @@ def download_import_template(request, template_type):
             'headers': ['sa_id_number', 'first_name', 'last_name', 'email', 'phone_mobile', 
                        'date_of_birth', 'gender', 'population_group', 'address_line1', 
                        'city', 'province', 'postal_code'],
-            'sample': ['9001015800086', 'John', 'Doe', 'john@email.com', '0821234567',
+            'sample': ['9001015800088', 'John', 'Doe', 'john@email.com', '0821234567',
                       '1990-01-01', 'M', 'A', '123 Main Street', 'Johannesburg', 'Gauteng', '2000']
         },
         'enrollments': {
             'filename': 'enrollment_import_template.csv',
             'headers': ['sa_id_number', 'qualification_saqa_id', 'campus_code', 
                        'enrollment_date', 'funding_type'],
-            'sample': ['9001015800086', 'SAQA-12345', 'SKF-JHB', '2025-01-15', 'SELF']
+            'sample': ['9001015800088', 'SAQA-12345', 'SKF-JHB', '2025-01-15', 'SELF']
         },
         'assessments': {
             'filename': 'assessment_import_template.csv',
@@ -793,338 +780,71 @@ class ExportTemplatesView(LoginRequiredMixin, TemplateView):
             'qualifications': Qualification.objects.filter(is_active=True),
             'campuses': Campus.objects.filter(is_active=True),
             'setas': SETA.objects.filter(is_active=True),
+            'export_job': self._get_export_job(),
         })
         
         return context
+    
+    def _get_export_job(self):
+        """Background export to show progress for (after a large export was queued)"""
+        job_id = self.request.GET.get('export_job', '')
+        if not job_id.isdigit():
+            return None
+        return ExportJob.objects.filter(pk=job_id, requested_by=self.request.user).first()
 
 
 @login_required
 def export_seta_data(request, template_id):
-    """Generate SETA export based on template"""
-    # Get filter parameters
-    qualification_id = request.GET.get('qualification')
-    campus_id = request.GET.get('campus')
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
-    
-    # Base queryset
-    enrollments = Enrollment.objects.select_related(
-        'learner', 'qualification', 'campus', 'learner__physical_address'
-    )
-    
-    if qualification_id:
-        enrollments = enrollments.filter(qualification_id=qualification_id)
-    if campus_id:
-        enrollments = enrollments.filter(campus_id=campus_id)
-    if date_from:
-        enrollments = enrollments.filter(enrollment_date__gte=date_from)
-    if date_to:
-        enrollments = enrollments.filter(enrollment_date__lte=date_to)
-    
-    # Generate appropriate export
-    if template_id == 'nlrd_learner':
-        return _export_nlrd_learner(enrollments)
-    elif template_id == 'nlrd_enrollment':
-        return _export_nlrd_enrollment(enrollments)
-    elif template_id == 'nlrd_achievement':
-        return _export_nlrd_achievement(enrollments)
-    elif template_id == 'wsp_training_report':
-        return _export_wsp_report(enrollments)
-    elif template_id == 'atr_summary':
-        return _export_atr_summary(enrollments)
-    elif template_id == 'qcto_assessment':
-        return _export_qcto_assessment(enrollments)
-    
-    return HttpResponse('Template not found', status=404)
-
-
-def _export_nlrd_learner(enrollments):
-    """Export NLRD Learner Upload format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="NLRD_Learner_{date.today()}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # NLRD Learner file header
-    writer.writerow([
-        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Equity_Code',
-        'Nationality_Code', 'Home_Language_Code', 'Gender', 'Citizen_Resident_Status_Code',
-        'Socio_Economic_Status_Code', 'Disability_Status_Code', 'First_Name',
-        'Second_Name', 'Surname', 'Birth_Date', 'School_EMIS_Number',
-        'Highest_Edu_Level_Code', 'Physical_Address_Line_1', 'Physical_Address_Line_2',
-        'Physical_Address_City', 'Physical_Address_Postcode'
-    ])
-    
-    # Export unique learners
-    exported_ids = set()
-    for enrollment in enrollments:
-        learner = enrollment.learner
-        if learner.sa_id_number in exported_ids:
-            continue
-        exported_ids.add(learner.sa_id_number)
-        
-        address = learner.physical_address
-        
-        writer.writerow([
-            learner.sa_id_number,
-            '',  # Alternate ID
-            '',  # Alternate ID Type
-            learner.population_group,
-            'SA' if learner.citizenship == 'SA' else learner.passport_country,
-            learner.home_language[:3] if learner.home_language else 'ENG',
-            learner.gender,
-            'SA' if learner.citizenship == 'SA' else 'O',
-            learner.socio_economic_status or 'U',
-            learner.disability_status,
-            learner.first_name,
-            learner.middle_name or '',
-            learner.last_name,
-            learner.date_of_birth.strftime('%Y%m%d') if learner.date_of_birth else '',
-            '',  # School EMIS
-            learner.highest_qualification or '4',
-            address.line_1 if address else '',
-            address.line_2 if address else '',
-            address.city if address else '',
-            address.postal_code if address else '',
-        ])
-    
-    return response
-
-
-def _export_nlrd_enrollment(enrollments):
-    """Export NLRD Enrollment Upload format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="NLRD_Enrollment_{date.today()}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # NLRD Enrollment header
-    writer.writerow([
-        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Enrol_Status_Code',
-        'Enrol_Status_Start_Date', 'Enrol_Date', 'Provider_Code', 'Provider_ETQI_ID',
-        'Qualification_ID', 'Learnership_ID', 'Funding_Type', 'Cumulative_Spend',
-        'OFO_Code', 'Urban_Rural_Code', 'SDL_Number', 'Site_Number',
-        'Practical_Provider_Code', 'Practical_Provider_ETQE_ID', 'SIC_Code',
-        'Non_NFSD_Funding_Source', 'Assessment_ETQE_ID', 'Enrolment_NQF_Level',
-        'Part_of_ID', 'Last_School_Year', 'Last_School_EMIS_Number'
-    ])
-    
-    for enrollment in enrollments:
-        learner = enrollment.learner
-        qual = enrollment.qualification
-        
-        # Map status codes
-        status_map = {
-            'APPLIED': '1', 'DOC_CHECK': '1', 'REGISTERED': '2', 'ENROLLED': '2',
-            'ACTIVE': '3', 'ON_HOLD': '5', 'COMPLETED': '4', 'CERTIFIED': '4',
-            'WITHDRAWN': '6', 'TRANSFERRED': '7', 'EXPIRED': '8'
-        }
-        
-        writer.writerow([
-            learner.sa_id_number,
-            '',
-            '',
-            status_map.get(enrollment.status, '3'),
-            enrollment.enrollment_date.strftime('%Y%m%d') if enrollment.enrollment_date else '',
-            enrollment.enrollment_date.strftime('%Y%m%d') if enrollment.enrollment_date else '',
-            enrollment.campus.code if enrollment.campus else '',
-            '',  # Provider ETQI
-            qual.saqa_id if qual else '',
-            '',  # Learnership ID
-            enrollment.funding_type,
-            '',  # Cumulative Spend
-            '',  # OFO Code
-            '',  # Urban/Rural
-            '',  # SDL Number
-            '',  # Site Number
-            '',  # Practical Provider
-            '',  # Practical Provider ETQE
-            '',  # SIC Code
-            '',  # Non-NFSD Funding
-            '',  # Assessment ETQE
-            qual.nqf_level if qual else '',
-            '',  # Part of ID
-            '',  # Last School Year
-            '',  # Last School EMIS
-        ])
-    
-    return response
-
-
-def _export_nlrd_achievement(enrollments):
-    """Export NLRD Achievement Upload format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="NLRD_Achievement_{date.today()}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # NLRD Achievement header
-    writer.writerow([
-        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Qualification_ID',
-        'Designation_Code', 'Designation_Start_Date', 'Designation_End_Date',
-        'Provider_Code', 'Provider_ETQI_ID', 'Assessment_ETQE_ID',
-        'NLRD_Certificate_Number', 'Certificate_Number', 'Honour_Code',
-        'Part_Of_ID', 'Achievement_Date'
-    ])
-    
-    # Export completed/certified enrollments
-    for enrollment in enrollments.filter(status__in=['COMPLETED', 'CERTIFIED']):
-        learner = enrollment.learner
-        qual = enrollment.qualification
-        
-        writer.writerow([
-            learner.sa_id_number,
-            '',
-            '',
-            qual.saqa_id if qual else '',
-            'Q',  # Qualification
-            enrollment.enrollment_date.strftime('%Y%m%d') if enrollment.enrollment_date else '',
-            enrollment.actual_completion.strftime('%Y%m%d') if enrollment.actual_completion else '',
-            enrollment.campus.code if enrollment.campus else '',
-            '',
-            '',
-            enrollment.nlrd_reference or '',
-            enrollment.certificate_number or '',
-            '',  # Honour code
-            '',
-            enrollment.actual_completion.strftime('%Y%m%d') if enrollment.actual_completion else '',
-        ])
-    
-    return response
-
-
-def _export_wsp_report(enrollments):
-    """Export WSP Training Report format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="WSP_Training_Report_{date.today()}.csv"'
-    
-    writer = csv.writer(response)
-    
-    writer.writerow([
-        'Employee_ID', 'First_Name', 'Last_Name', 'ID_Number', 'Gender',
-        'Race', 'Disability', 'Province', 'Occupation', 'OFO_Code',
-        'Training_Type', 'Qualification_Name', 'SAQA_ID', 'NQF_Level',
-        'Start_Date', 'End_Date', 'Status', 'Provider_Name', 'Provider_Accreditation',
-        'Funding_Type', 'Training_Cost', 'Completion_Status'
-    ])
-    
-    for enrollment in enrollments:
-        learner = enrollment.learner
-        qual = enrollment.qualification
-        
-        writer.writerow([
-            learner.learner_number,
-            learner.first_name,
-            learner.last_name,
-            learner.sa_id_number,
-            learner.gender,
-            learner.population_group,
-            learner.disability_status,
-            learner.province_code,
-            '',  # Occupation
-            '',  # OFO Code
-            qual.qualification_type if qual else '',
-            qual.title if qual else '',
-            qual.saqa_id if qual else '',
-            qual.nqf_level if qual else '',
-            enrollment.start_date.strftime('%Y-%m-%d') if enrollment.start_date else '',
-            enrollment.expected_completion.strftime('%Y-%m-%d') if enrollment.expected_completion else '',
-            enrollment.status,
-            enrollment.campus.name if enrollment.campus else '',
-            '',  # Accreditation
-            enrollment.funding_type,
-            '',  # Cost
-            'Completed' if enrollment.status in ['COMPLETED', 'CERTIFIED'] else 'In Progress',
-        ])
-    
-    return response
-
-
-def _export_atr_summary(enrollments):
-    """Export ATR Summary format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="ATR_Summary_{date.today()}.csv"'
+    """
+    Generate SETA export based on template
     
-    writer = csv.writer(response)
+    Exports stream straight to the browser. Ones larger than
+    SETA_EXPORT_STREAM_LIMIT rows are queued as a background ExportJob
+    when Celery is available; poll export_job_status for progress.
+    """
+    export = SETA_EXPORTS.get(template_id)
+    if export is None:
+        return HttpResponse('Template not found', status=404)
     
-    # Summary header
-    writer.writerow(['Metric', 'Value'])
-    
-    # Calculate summary stats
-    total = enrollments.count()
-    completed = enrollments.filter(status__in=['COMPLETED', 'CERTIFIED']).count()
-    active = enrollments.filter(status='ACTIVE').count()
-    
-    # Gender breakdown
-    male = enrollments.filter(learner__gender='M').count()
-    female = enrollments.filter(learner__gender='F').count()
-    
-    # Population group breakdown  
-    african = enrollments.filter(learner__population_group='A').count()
-    coloured = enrollments.filter(learner__population_group='C').count()
-    indian = enrollments.filter(learner__population_group='I').count()
-    white = enrollments.filter(learner__population_group='W').count()
-    
-    writer.writerow(['Total Enrollments', total])
-    writer.writerow(['Completed', completed])
-    writer.writerow(['Active', active])
-    writer.writerow(['Completion Rate %', round(completed/total*100, 1) if total > 0 else 0])
-    writer.writerow(['', ''])
-    writer.writerow(['Gender Breakdown', ''])
-    writer.writerow(['Male', male])
-    writer.writerow(['Female', female])
-    writer.writerow(['', ''])
-    writer.writerow(['Population Group', ''])
-    writer.writerow(['African', african])
-    writer.writerow(['Coloured', coloured])
-    writer.writerow(['Indian', indian])
-    writer.writerow(['White', white])
+    # Get filter parameters
+    params = {name: request.GET.get(name) for name in EXPORT_FILTER_PARAMS if request.GET.get(name)}
+    enrollments = build_enrollment_queryset(params)
+    
+    if EXPORT_CELERY_AVAILABLE:
+        expected_rows = export.row_count(enrollments)
+        if expected_rows > export_stream_limit():
+            job = ExportJob.objects.create(
+                requested_by=request.user,
+                created_by=request.user,
+                parameters={**params, 'template_id': template_id, 'expected_rows': expected_rows},
+                progress_message='Queued',
+            )
+            run_export_job.delay(job.pk)
+            messages.info(
+                request,
+                f'{export.filename_prefix.replace("_", " ")} export has {expected_rows:,} rows and is being '
+                f'generated in the background (job #{job.pk}).'
+            )
+            return redirect(f"{reverse('learners:export_templates')}?export_job={job.pk}")
     
-    return response
+    return stream_csv_response(export.filename(), export.header, export.rows(enrollments))
 
 
-def _export_qcto_assessment(enrollments):
-    """Export QCTO Assessment Records format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="QCTO_Assessment_{date.today()}.csv"'
-    
-    writer = csv.writer(response)
-    
-    writer.writerow([
-        'Learner_ID', 'First_Name', 'Last_Name', 'ID_Number',
-        'Qualification_Code', 'Module_Code', 'Module_Title',
-        'Assessment_Type', 'Assessor_ID', 'Assessment_Date',
-        'Result', 'Score', 'Attempt_Number', 'Comments'
-    ])
-    
-    # Get assessment results for these enrollments
-    results = AssessmentResult.objects.filter(
-        enrollment__in=enrollments
-    ).select_related('enrollment__learner', 'activity__module', 'assessor')
-    
-    for result in results:
-        learner = result.enrollment.learner
-        activity = result.activity
-        module = activity.module if activity else None
-        
-        writer.writerow([
-            learner.learner_number,
-            learner.first_name,
-            learner.last_name,
-            learner.sa_id_number,
-            result.enrollment.qualification.saqa_id if result.enrollment.qualification else '',
-            module.code if module else '',
-            module.title if module else '',
-            activity.activity_type if activity else '',
-            result.assessor.email if result.assessor else '',
-            result.assessment_date.strftime('%Y-%m-%d') if result.assessment_date else '',
-            result.result,
-            str(result.percentage_score) if result.percentage_score else '',
-            result.attempt_number,
-            result.feedback or '',
-        ])
-    
-    return response
+@login_required
+def export_job_status(request, job_id):
+    """AJAX endpoint reporting progress of a background export"""
+    job = get_object_or_404(ExportJob, pk=job_id, requested_by=request.user)
+    
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'progress_percent': job.progress_percent,
+        'progress_message': job.progress_message,
+        'record_count': job.record_count,
+        'download_url': job.output_file.url if job.status == 'COMPLETED' and job.output_file else None,
+        'filename': job.output_filename,
+        'error': job.error_message or None,
+    })
 
 
 # =============================================================================
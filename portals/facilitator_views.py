@@ -25,6 +25,7 @@ from core.models import User, FacilitatorProfile
 from learners.models import Learner
 from academics.models import Enrollment, Module, Qualification, PersonnelRegistration
 from assessments.models import AssessmentActivity, AssessmentResult, ModerationRecord
+from assessments.services.cohort_progress import CohortProgressMatrix
 from logistics.models import Cohort, ScheduleSession, Attendance
 
 
@@ -614,61 +615,8 @@ class FacilitatorCohortDetailView(LoginRequiredMixin, TemplateView):
                 status__in=['ACTIVE', 'ENROLLED', 'COMPLETED', 'WITHDRAWN']
             ).select_related('learner__user', 'qualification')
             
-            # Calculate stats for each enrollment
-            enrollment_list = []
-            total_progress = 0
-            total_score = 0
-            score_count = 0
-            score_distribution = {
-                '0_30': 0, '31_50': 0, '51_70': 0, '71_85': 0, '86_100': 0
-            }
-            
-            for enrollment in enrollments:
-                modules = Module.objects.filter(qualification=enrollment.qualification)
-                activities = AssessmentActivity.objects.filter(module__in=modules, is_active=True)
-                total_activities = activities.count()
-                
-                # Get results
-                results = AssessmentResult.objects.filter(enrollment=enrollment)
-                competent = results.filter(result='C').values('activity').distinct().count()
-                pending = total_activities - results.values('activity').distinct().count()
-                
-                # Calculate progress
-                progress = round((competent / total_activities * 100) if total_activities > 0 else 0)
-                enrollment.progress = progress
-                total_progress += progress
-                
-                # Calculate average score
-                scores = results.filter(percentage_score__isnull=False)
-                if scores.exists():
-                    avg = scores.aggregate(avg=Avg('percentage_score'))['avg'] or 0
-                    enrollment.avg_score = round(avg)
-                    total_score += avg
-                    score_count += 1
-                    
-                    # Update score distribution
-                    if avg <= 30:
-                        score_distribution['0_30'] += 1
-                    elif avg <= 50:
-                        score_distribution['31_50'] += 1
-                    elif avg <= 70:
-                        score_distribution['51_70'] += 1
-                    elif avg <= 85:
-                        score_distribution['71_85'] += 1
-                    else:
-                        score_distribution['86_100'] += 1
-                else:
-                    enrollment.avg_score = None
-                
-                enrollment.pending_count = pending
-                enrollment_list.append(enrollment)
-            
-            context['enrollments'] = enrollment_list
-            context['active_learners'] = enrollments.filter(status='ACTIVE').count()
-            context['pending_assessments'] = sum(e.pending_count for e in enrollment_list)
-            context['avg_progress'] = round(total_progress / len(enrollment_list)) if enrollment_list else 0
-            context['pass_rate'] = round(total_score / score_count) if score_count > 0 else 0
-            context['score_distribution'] = score_distribution
+            # Progress, scores and pending counts come from one matrix build
+            context.update(CohortProgressMatrix(enrollments).cohort_summary())
             
             return context
         else:
@@ -678,51 +626,9 @@ class FacilitatorCohortDetailView(LoginRequiredMixin, TemplateView):
         context['enrollment'] = enrollment
         
         # Get all modules with results
-        modules = Module.objects.filter(
-            qualification=enrollment.qualification,
-            is_active=True
-        ).order_by('sequence_order')
-        
-        module_data = []
-        total_activities = 0
-        total_completed = 0
-        
-        for module in modules:
-            activities = AssessmentActivity.objects.filter(module=module, is_active=True)
-            
-            activity_data = []
-            for activity in activities:
-                results = AssessmentResult.objects.filter(
-                    enrollment=enrollment,
-                    activity=activity
-                ).order_by('-attempt_number')
-                
-                latest = results.first()
-                is_competent = latest and latest.result == 'C'
-                
-                activity_data.append({
-                    'activity': activity,
-                    'results': results,
-                    'latest_result': latest,
-                    'status': 'competent' if is_competent else
-                             'nyc' if latest and latest.result == 'NYC' else
-                             'pending' if latest else 'not_started',
-                    'can_grade': not is_competent and (not latest or results.count() < activity.max_attempts)
-                })
-                
-                total_activities += 1
-                if is_competent:
-                    total_completed += 1
-            
-            competent_count = len([a for a in activity_data if a['status'] == 'competent'])
-            
-            module_data.append({
-                'module': module,
-                'activities': activity_data,
-                'competent_count': competent_count,
-                'total_count': len(activity_data),
-                'progress': round(competent_count / len(activity_data) * 100) if activity_data else 0
-            })
+        module_data = CohortProgressMatrix([enrollment]).module_breakdown(enrollment)
+        total_activities = sum(m['total_count'] for m in module_data)
+        total_completed = sum(m['competent_count'] for m in module_data)
         
         context['modules'] = module_data
         
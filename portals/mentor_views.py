@@ -40,6 +40,7 @@ from core.models import (
     ThreadParticipant,
     Notification,
 )
+from core.services.messaging import annotate_unread, mark_thread_read, total_unread
 
 
 def get_mentor_context(user):
@@ -113,13 +114,8 @@ def mentor_dashboard(request):
         date__gte=first_of_month
     ).order_by('-date')[:10]
 
-    # Get unread messages count (messages where user hasn't marked as read in read_by JSONField)
-    user_id_str = str(request.user.id)
-    unread_messages = Message.objects.filter(
-        thread__participants__user=request.user
-    ).exclude(sender=request.user).exclude(
-        read_by__has_key=user_id_str
-    ).count()
+    # Get unread messages count (messages past the user's read cursors)
+    unread_messages = total_unread(request.user)
     
     # Get recent notifications
     notifications = Notification.objects.filter(
@@ -632,18 +628,10 @@ def messages_inbox(request):
     if not mentor:
         return HttpResponseForbidden("You don't have mentor access.")
     
-    threads = MessageThread.objects.filter(
-        participants__user=request.user
-    ).select_related().order_by('-updated_at')
-    
-    # Mark unread count per thread
-    user_id_str = str(request.user.id)
-    for thread in threads:
-        thread.unread_count = Message.objects.filter(
-            thread=thread
-        ).exclude(sender=request.user).exclude(
-            read_by__has_key=user_id_str
-        ).count()
+    # Threads with their unread counts in one query
+    threads = annotate_unread(
+        MessageThread.objects.select_related(), request.user
+    ).order_by('-updated_at')
     
     context = {
         'mentor': mentor,
@@ -666,15 +654,8 @@ def message_thread(request, thread_id):
         participants__user=request.user
     )
     
-    # Mark messages as read using the model's method
-    user_id_str = str(request.user.id)
-    unread_messages = Message.objects.filter(
-        thread=thread
-    ).exclude(sender=request.user).exclude(
-        read_by__has_key=user_id_str
-    )
-    for msg in unread_messages:
-        msg.mark_read_by(request.user)
+    # Mark messages as read by advancing the read cursor
+    mark_thread_read(thread, request.user)
     
     if request.method == 'POST':
         data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
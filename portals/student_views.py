@@ -42,6 +42,7 @@ from assessments.models import AssessmentActivity, AssessmentResult, PoESubmissi
 from logistics.models import Cohort, ScheduleSession, Attendance
 from corporate.models import WorkplacePlacement, HostMentor
 from core.models import MessageThread, Message, ThreadParticipant, Notification
+from core.services.messaging import annotate_unread, mark_thread_read, total_unread
 
 
 class StudentDashboardView(LoginRequiredMixin, TemplateView):
@@ -850,13 +851,7 @@ class StudentAttendanceHomeView(LoginRequiredMixin, TemplateView):
         ).count()
         
         # Unread messages
-        user_id_str = str(user.id)
-        unread_messages = Message.objects.filter(
-            thread__participants__user=user
-        ).exclude(sender=user).exclude(
-            read_by__has_key=user_id_str
-        ).count()
-        context['unread_messages'] = unread_messages
+        context['unread_messages'] = total_unread(user)
         
         context['today'] = today
         
@@ -942,15 +937,8 @@ class StudentWBLDashboardView(LoginRequiredMixin, TemplateView):
         
         context['recent_stipends'] = stipends
         
-        # Unread messages (messages where user hasn't marked as read)
-        user_id_str = str(user.id)
-        unread_messages = Message.objects.filter(
-            thread__participants__user=user
-        ).exclude(sender=user).exclude(
-            read_by__has_key=user_id_str
-        ).count()
-        
-        context['unread_messages'] = unread_messages
+        # Unread messages (messages past the user's read cursors)
+        context['unread_messages'] = total_unread(user)
         
         # Notifications
         notifications = Notification.objects.filter(
@@ -1657,17 +1645,7 @@ class StudentMessagesView(LoginRequiredMixin, TemplateView):
         context['placement'] = placement
         
         # Get message threads
-        threads = MessageThread.objects.filter(
-            participants__user=user
-        ).order_by('-updated_at')
-        
-        user_id_str = str(user.id)
-        for thread in threads:
-            thread.unread_count = Message.objects.filter(
-                thread=thread
-            ).exclude(sender=user).exclude(
-                read_by__has_key=user_id_str
-            ).count()
+        threads = annotate_unread(MessageThread.objects.all(), user).order_by('-updated_at')
         
         context['threads'] = threads
         
@@ -1697,15 +1675,8 @@ class StudentMessageThreadView(LoginRequiredMixin, TemplateView):
             participants__user=user
         )
         
-        # Mark as read using the model's method
-        user_id_str = str(user.id)
-        unread_msgs = Message.objects.filter(
-            thread=thread
-        ).exclude(sender=user).exclude(
-            read_by__has_key=user_id_str
-        )
-        for msg in unread_msgs:
-            msg.mark_read_by(user)
+        # Mark as read by advancing the read cursor
+        mark_thread_read(thread, user)
         
         context['thread'] = thread
         context['messages'] = Message.objects.filter(thread=thread).order_by('created_at')
@@ -43,6 +43,7 @@ from core.models import (
     ThreadParticipant,
     Notification,
 )
+from core.services.messaging import annotate_unread, mark_thread_read, total_unread
 
 
 def get_officer_context(user):
@@ -141,13 +142,8 @@ def officer_dashboard(request):
         status='SCHEDULED'
     ).order_by('visit_date')[:5] if hasattr(profile, 'workplace_visits') else []
     
-    # Unread messages (messages where user hasn't marked as read)
-    user_id_str = str(request.user.id)
-    unread_messages = Message.objects.filter(
-        thread__participants__user=request.user
-    ).exclude(sender=request.user).exclude(
-        read_by__has_key=user_id_str
-    ).count()
+    # Unread messages (messages past the user's read cursors)
+    unread_messages = total_unread(request.user)
     
     # Pending disputes requiring review
     from learners.models import StipendDispute
@@ -969,17 +965,9 @@ def messages_inbox(request):
     if not profile:
         return HttpResponseForbidden("You don't have workplace officer access.")
     
-    threads = MessageThread.objects.filter(
-        participants__user=request.user
-    ).select_related('related_placement').order_by('-updated_at')
-    
-    user_id_str = str(request.user.id)
-    for thread in threads:
-        thread.unread_count = Message.objects.filter(
-            thread=thread
-        ).exclude(sender=request.user).exclude(
-            read_by__has_key=user_id_str
-        ).count()
+    threads = annotate_unread(
+        MessageThread.objects.select_related('related_placement'), request.user
+    ).order_by('-updated_at')
     
     context = {
         'profile': profile,
@@ -1002,15 +990,8 @@ def message_thread(request, thread_id):
         participants__user=request.user
     )
     
-    # Mark as read using the model's method
-    user_id_str = str(request.user.id)
-    unread_msgs = Message.objects.filter(
-        thread=thread
-    ).exclude(sender=request.user).exclude(
-        read_by__has_key=user_id_str
-    )
-    for msg in unread_msgs:
-        msg.mark_read_by(request.user)
+    # Mark as read by advancing the read cursor
+    mark_thread_read(thread, request.user)
     
     if request.method == 'POST':
         data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ReportingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reporting'
+    
+    def ready(self):
+        # Import signals to register them
+        import reporting.signals  # noqa: F401
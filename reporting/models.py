@@ -427,6 +427,7 @@ class ScheduledReport(AuditedModel):
     last_run = models.DateTimeField(null=True, blank=True)
     last_run_status = models.CharField(max_length=50, blank=True)
     next_run = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # Set while a worker runs it
     
     class Meta:
         ordering = ['name']
@@ -0,0 +1 @@
+# Reporting services package
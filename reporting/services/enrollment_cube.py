@@ -0,0 +1,280 @@
+"""
+Enrollment Pivot Cube
+
+A precomputed count cube of enrollments over the reporting dimensions
+(campus, qualification, status, cohort, month, funding type and learner
+demographics). Pivots, slices, drill-downs and totals are rolled up from
+the cube in memory instead of running grouped queries per request.
+
+The cube lives in the shared cache under a version stamp:
+- Saving an Enrollment or Learner marks the cube stale; the next read
+  re-reads only enrollments changed since the last refresh (updated_at)
+  and moves them between cells.
+- Deleting an Enrollment bumps the version (full rebuild on next read).
+- A full rebuild also happens after CUBE_TIMEOUT as a safety net for bulk
+  queryset updates that bypass signals.
+
+Usage:
+    cube = get_enrollment_cube()
+    cube.pivot('qualification', 'status')
+    cube.totals('status', campus='Main Campus')
+    cube.count(status='ACTIVE')
+"""
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+VERSION_CACHE_KEY = 'reporting:enrollment_cube:version'
+CUBE_CACHE_KEY = 'reporting:enrollment_cube:{version}'
+STALE_CACHE_KEY = 'reporting:enrollment_cube:stale'
+CUBE_TIMEOUT = 60 * 60 * 6  # Full rebuild every 6 hours
+
+# Re-read a little before the last refresh so rows committed late are not missed
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+NONE_LABEL = '(None)'
+
+# Dimension name -> (label, enrollment field)
+DIMENSIONS = {
+    'campus': ('Campus', 'campus__name'),
+    'qualification': ('Qualification', 'qualification__short_title'),
+    'status': ('Status', 'status'),
+    'cohort': ('Cohort', 'cohort__code'),
+    'month': ('Enrollment Month', 'month'),
+    'funding_type': ('Funding Type', 'funding_type'),
+    'gender': ('Gender', 'learner__gender'),
+    'population_group': ('Population Group', 'learner__population_group'),
+    'province': ('Province', 'learner__province_code'),
+}
+
+# Dimensions rolled up from a stored one: name -> (label, source, derive)
+DERIVED_DIMENSIONS = {
+    'year': ('Enrollment Year', 'month', lambda month: int(month[:4]) if month else None),
+}
+
+DIMENSION_NAMES = list(DIMENSIONS)
+_POSITION = {name: i for i, name in enumerate(DIMENSION_NAMES)}
+
+
+def dimension_label(name: str) -> str:
+    """Human-readable label for a cube dimension."""
+    if name in DERIVED_DIMENSIONS:
+        return DERIVED_DIMENSIONS[name][0]
+    return DIMENSIONS[name][0]
+
+
+def is_dimension(name: str) -> bool:
+    return name in DIMENSIONS or name in DERIVED_DIMENSIONS
+
+
+def invalidate_enrollment_cube():
+    """Bump the cube version so the next read rebuilds it."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def mark_enrollment_cube_stale():
+    """Flag the cube for an incremental refresh on its next read."""
+    cache.set(STALE_CACHE_KEY, True, None)
+
+
+def get_enrollment_cube() -> 'EnrollmentCube':
+    """Return the shared cube, building or incrementally refreshing it as needed."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, None):
+            version = cache.get(VERSION_CACHE_KEY) or version
+
+    key = CUBE_CACHE_KEY.format(version=version)
+    cube = cache.get(key)
+    if cube is None:
+        cache.delete(STALE_CACHE_KEY)
+        cube = EnrollmentCube.build()
+        cache.set(key, cube, CUBE_TIMEOUT)
+    elif cache.get(STALE_CACHE_KEY):
+        cache.delete(STALE_CACHE_KEY)
+        cube.refresh()
+        cache.set(key, cube, max(int(cube.seconds_until_expiry()), 1))
+    return cube
+
+
+class EnrollmentCube:
+    """
+    Enrollment counts at the finest grain of all dimensions.
+
+    cells maps a tuple of dimension values (in DIMENSION_NAMES order) to a
+    count; members maps each enrollment id to its cell so changed
+    enrollments can be moved without recounting everything.
+    """
+
+    def __init__(self):
+        self.cells: Dict[Tuple, int] = defaultdict(int)
+        self.members: Dict[int, Tuple] = {}
+        self.built_at = timezone.now()
+        self.refreshed_at = self.built_at
+
+    # ===== BUILD / REFRESH =====
+
+    @staticmethod
+    def _rows(queryset):
+        fields = [field for _, field in DIMENSIONS.values()]
+        return queryset.annotate(
+            month=TruncMonth('enrollment_date')
+        ).values_list('id', *fields).order_by().iterator(chunk_size=5000)
+
+    @staticmethod
+    def _cell_key(values) -> Tuple:
+        values = list(values)
+        month = values[_POSITION['month']]
+        values[_POSITION['month']] = month.strftime('%Y-%m') if month else None
+        return tuple(values)
+
+    @classmethod
+    def build(cls) -> 'EnrollmentCube':
+        """Build the cube from all enrollments in one query."""
+        from academics.models import Enrollment
+
+        cube = cls()
+        for row in cls._rows(Enrollment.objects.all()):
+            key = cls._cell_key(row[1:])
+            cube.cells[key] += 1
+            cube.members[row[0]] = key
+        return cube
+
+    def refresh(self) -> int:
+        """
+        Move enrollments changed since the last refresh to their current cells.
+
+        Returns:
+            Number of enrollments re-read
+        """
+        from academics.models import Enrollment
+
+        started = timezone.now()
+        since = self.refreshed_at - REFRESH_OVERLAP
+        changed = Enrollment.objects.filter(
+            Q(updated_at__gte=since) | Q(learner__updated_at__gte=since)
+        )
+
+        count = 0
+        for row in self._rows(changed):
+            self._move(row[0], self._cell_key(row[1:]))
+            count += 1
+
+        self.refreshed_at = started
+        return count
+
+    def _move(self, enrollment_id, key):
+        old_key = self.members.get(enrollment_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self.cells[old_key] -= 1
+            if self.cells[old_key] <= 0:
+                del self.cells[old_key]
+        self.cells[key] += 1
+        self.members[enrollment_id] = key
+
+    def seconds_until_expiry(self) -> float:
+        return CUBE_TIMEOUT - (timezone.now() - self.built_at).total_seconds()
+
+    # ===== QUERIES =====
+
+    @staticmethod
+    def _value(key: Tuple, dimension: str):
+        if dimension in DERIVED_DIMENSIONS:
+            _, source, derive = DERIVED_DIMENSIONS[dimension]
+            return derive(key[_POSITION[source]])
+        return key[_POSITION[dimension]]
+
+    @staticmethod
+    def _normalise(value):
+        # Blank and NULL dimension values are reported together
+        return value if value not in (None, '') else None
+
+    def _matching(self, filters: Dict):
+        """Yield (key, count) for cells matching dimension=value filters."""
+        wanted = {
+            dimension: (None if value == NONE_LABEL else value)
+            for dimension, value in (filters or {}).items()
+        }
+        for key, count in self.cells.items():
+            if all(
+                self._normalise(self._value(key, dimension)) == value
+                or str(self._normalise(self._value(key, dimension))) == str(value)
+                for dimension, value in wanted.items()
+            ):
+                yield key, count
+
+    def count(self, **filters) -> int:
+        """Total enrollments matching the filters."""
+        return sum(count for _, count in self._matching(filters))
+
+    def totals(self, dimension: str, **filters) -> Dict:
+        """Counts per value of one dimension (a slice / drill-down level)."""
+        result = defaultdict(int)
+        for key, count in self._matching(filters):
+            result[self._normalise(self._value(key, dimension))] += count
+        return dict(result)
+
+    def values(self, dimension: str, **filters) -> List:
+        """Distinct values of a dimension, sorted, with blanks last."""
+        return sorted(
+            self.totals(dimension, **filters),
+            key=lambda value: (value is None, str(value) if value is not None else ''),
+        )
+
+    def pivot(self, row_dimension: str, col_dimension: str, filters: Optional[Dict] = None) -> Dict:
+        """
+        Cross-tabulate two dimensions.
+
+        Returns:
+            Dict with rows ({row: {col: count, 'total': n}}), column_headers,
+            column_totals and grand_total. Blank values are labelled (None).
+        """
+        cross = defaultdict(lambda: defaultdict(int))
+        for key, count in self._matching(filters or {}):
+            row = self._normalise(self._value(key, row_dimension))
+            col = self._normalise(self._value(key, col_dimension))
+            cross[row][col] += count
+
+        def label(value):
+            return value if value is not None else NONE_LABEL
+
+        def order(value):
+            return (value is None, str(value) if value is not None else '')
+
+        column_values = sorted({col for cols in cross.values() for col in cols}, key=order)
+        rows = {}
+        column_totals = defaultdict(int)
+        grand_total = 0
+        for row in sorted(cross, key=order):
+            row_data = {'total': 0}
+            for col, count in cross[row].items():
+                row_data[label(col)] = count
+                row_data['total'] += count
+                column_totals[label(col)] += count
+            grand_total += row_data['total']
+            rows[label(row)] = row_data
+
+        return {
+            'rows': rows,
+            'column_headers': [label(col) for col in column_values],
+            'column_totals': dict(column_totals),
+            'grand_total': grand_total,
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['cells'] = dict(self.cells)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cells = defaultdict(int, self.cells)
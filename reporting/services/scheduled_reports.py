@@ -0,0 +1,382 @@
+"""
+Scheduled Report Executor
+
+Runs ScheduledReport schedules (reporting.tasks.process_scheduled_reports,
+hourly via Celery Beat):
+- Due reports are claimed with select_for_update(skip_locked=True) by
+  setting claimed_at, so concurrent workers never run a schedule twice
+- next_run only moves past a run once it has been delivered (or cannot
+  ever be: no recipients, no export definition). A failed run stays due
+  and is retried on the next pass; a claim left behind by a worker that
+  died is taken over after SCHEDULED_REPORT_CLAIM_TIMEOUT
+- Each run creates an ExportJob for the ReportTemplate's export and emails
+  the file to the recipients and additional_emails
+- Runs missed during downtime are coalesced into one run by default; set
+  parameters['catch_up'] = True to run every missed occurrence instead
+  (the most recent MAX_CATCH_UP_RUNS of them)
+
+Schedule parameters are the export filters (qualification, campus,
+date_from, date_to). parameters['period'] = 'previous' fills date_from /
+date_to with the period that ended at the run (previous day, week, month
+or quarter).
+
+ReportTemplate -> export: template.config['export'], falling back to
+template.code, names an entry of SETA_EXPORTS.
+"""
+import calendar
+import logging
+import re
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .seta_exports import (
+    FILTER_PARAMS,
+    SETA_EXPORTS,
+    build_enrollment_queryset,
+    run_export_job,
+)
+
+logger = logging.getLogger(__name__)
+
+# Schedules claimed per processing run
+CLAIM_BATCH_SIZE = 50
+
+# Most missed occurrences replayed for a catch_up schedule
+MAX_CATCH_UP_RUNS = 12
+
+# A claim older than this belongs to a worker that died
+DEFAULT_CLAIM_TIMEOUT = timedelta(hours=2)
+
+# Larger files are linked rather than attached
+DEFAULT_ATTACHMENT_LIMIT = 10 * 1024 * 1024
+
+# ScheduledReport.last_run_status is a 50 character field
+STATUS_MAX_LENGTH = 50
+
+MONTHS_PER_FREQUENCY = {'MONTHLY': 1, 'QUARTERLY': 3}
+
+
+def attachment_limit() -> int:
+    return getattr(settings, 'SCHEDULED_REPORT_ATTACHMENT_LIMIT', DEFAULT_ATTACHMENT_LIMIT)
+
+
+def claim_timeout() -> timedelta:
+    return getattr(settings, 'SCHEDULED_REPORT_CLAIM_TIMEOUT', DEFAULT_CLAIM_TIMEOUT)
+
+
+# =============================================================================
+# SCHEDULE ARITHMETIC
+# =============================================================================
+
+def _at(day: date, time_of_day) -> datetime:
+    """Aware datetime for a local date and time of day."""
+    return timezone.make_aware(datetime.combine(day, time_of_day))
+
+
+def _add_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def _month_day(year: int, month: int, day_of_month: int) -> date:
+    """day_of_month in the given month, clamped to the month's last day (31 -> 28/29/30)."""
+    return date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(schedule, after: datetime) -> datetime:
+    """
+    First scheduled time strictly after `after`.
+
+    - DAILY: every day at time_of_day
+    - WEEKLY: on day_of_week (Monday = 0, default Monday)
+    - MONTHLY: on day_of_month (default 1st), clamped to short months
+    - QUARTERLY: as MONTHLY, in January, April, July and October
+
+    Args:
+        schedule: ScheduledReport (or anything with the schedule fields)
+        after: Aware datetime
+
+    Returns:
+        Aware datetime in the current time zone
+    """
+    local = timezone.localtime(after)
+    time_of_day = schedule.time_of_day
+
+    if schedule.frequency == 'DAILY':
+        candidate = _at(local.date(), time_of_day)
+        if candidate <= after:
+            candidate = _at(local.date() + timedelta(days=1), time_of_day)
+        return candidate
+
+    if schedule.frequency == 'WEEKLY':
+        weekday = schedule.day_of_week if schedule.day_of_week is not None else 0
+        day = local.date() + timedelta(days=(weekday - local.weekday()) % 7)
+        candidate = _at(day, time_of_day)
+        if candidate <= after:
+            candidate = _at(day + timedelta(days=7), time_of_day)
+        return candidate
+
+    step = MONTHS_PER_FREQUENCY.get(schedule.frequency)
+    if step is None:
+        raise ValueError(f"Unknown report frequency: {schedule.frequency}")
+
+    day_of_month = schedule.day_of_month or 1
+    year, month = local.year, local.month
+    if step == 3:
+        month = (month - 1) // 3 * 3 + 1  # first month of the quarter
+    while True:
+        candidate = _at(_month_day(year, month, day_of_month), time_of_day)
+        if candidate > after:
+            return candidate
+        year, month = _add_months(year, month, step)
+
+
+def missed_occurrences(schedule, now: datetime, limit: int = MAX_CATCH_UP_RUNS) -> List[datetime]:
+    """
+    Scheduled times from next_run up to now, keeping the most recent `limit`.
+    """
+    occurrences = deque(maxlen=limit)
+    occurrence = schedule.next_run
+    while occurrence is not None and occurrence <= now:
+        occurrences.append(occurrence)
+        occurrence = next_occurrence(schedule, occurrence)
+    return list(occurrences)
+
+
+def reporting_period(frequency: str, run_at: datetime) -> Tuple[date, date]:
+    """
+    The complete period before a run: yesterday, the previous 7 days, the
+    previous calendar month or the previous calendar quarter.
+    """
+    end = timezone.localtime(run_at).date() - timedelta(days=1)
+    if frequency == 'DAILY':
+        return end, end
+    if frequency == 'WEEKLY':
+        return end - timedelta(days=6), end
+
+    step = MONTHS_PER_FREQUENCY.get(frequency, 1)
+    run_date = timezone.localtime(run_at).date()
+    month = run_date.month if step == 1 else (run_date.month - 1) // 3 * 3 + 1
+    year, month = _add_months(run_date.year, month, -step)
+    start = date(year, month, 1)
+    end_year, end_month = _add_months(year, month, step - 1)
+    return start, _month_day(end_year, end_month, 31)
+
+
+def _parse_emails(value: str) -> List[str]:
+    return [email for email in re.split(r'[,;\s]+', value or '') if email]
+
+
+# =============================================================================
+# EXECUTOR
+# =============================================================================
+
+class ScheduledReportService:
+    """
+    Claims, runs and delivers due scheduled reports.
+    """
+
+    @staticmethod
+    def claim_due_reports(now: datetime, limit: int = CLAIM_BATCH_SIZE) -> List[Tuple]:
+        """
+        Lock due schedules, mark them claimed and work out which runs are owed.
+
+        next_run is left alone: it is advanced run by run as each one is
+        settled (see process_due_reports). Schedules without a next_run are
+        initialised to their next occurrence and not run.
+
+        Returns:
+            List of (schedule, [run times]) tuples to execute
+        """
+        from reporting.models import ScheduledReport
+
+        claimed = []
+        with transaction.atomic():
+            schedules = ScheduledReport.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).select_related('template').filter(
+                Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - claim_timeout()),
+                is_active=True, next_run__lte=now,
+            ).order_by('next_run')[:limit]
+
+            for schedule in schedules:
+                runs = missed_occurrences(schedule, now)
+                if not schedule.parameters.get('catch_up'):
+                    runs = runs[-1:]
+                schedule.claimed_at = now
+                schedule.save(update_fields=['claimed_at', 'updated_at'])
+                claimed.append((schedule, runs))
+
+            for schedule in ScheduledReport.objects.select_for_update(
+                skip_locked=True
+            ).filter(is_active=True, next_run__isnull=True):
+                schedule.next_run = next_occurrence(schedule, now)
+                schedule.save(update_fields=['next_run', 'updated_at'])
+
+        return claimed
+
+    @staticmethod
+    def build_parameters(schedule, run_at: datetime) -> Dict:
+        """Export filter parameters for one run of a schedule."""
+        parameters = schedule.parameters or {}
+        params = {name: parameters[name] for name in FILTER_PARAMS if parameters.get(name)}
+        if parameters.get('period') == 'previous':
+            start, end = reporting_period(schedule.frequency, run_at)
+            params['date_from'] = start.isoformat()
+            params['date_to'] = end.isoformat()
+        return params
+
+    @staticmethod
+    def run_report(schedule, run_at: datetime):
+        """
+        Generate the export for one run.
+
+        Returns:
+            Completed ExportJob
+
+        Raises:
+            ValueError: The template has no export or the schedule no owner
+            RuntimeError: The export job failed
+        """
+        from reporting.models import ExportJob
+
+        template = schedule.template
+        export_id = (template.config or {}).get('export') or template.code
+        export = SETA_EXPORTS.get(export_id)
+        if export is None:
+            raise ValueError(f"Template {template.code} has no export definition")
+
+        requested_by = schedule.created_by or schedule.recipients.order_by('pk').first()
+        if requested_by is None:
+            raise ValueError('Schedule has no owner or recipients')
+
+        params = ScheduledReportService.build_parameters(schedule, run_at)
+        job = ExportJob.objects.create(
+            template=template,
+            requested_by=requested_by,
+            parameters={
+                'template_id': export_id,
+                **params,
+                'expected_rows': export.row_count(build_enrollment_queryset(params)),
+                'scheduled_report_id': schedule.pk,
+                'run_at': run_at.isoformat(),
+            },
+        )
+        run_export_job(job)
+        if job.status != 'COMPLETED':
+            raise RuntimeError(job.error_message or 'Export failed')
+        return job
+
+    @staticmethod
+    def recipient_emails(schedule) -> List[str]:
+        """Active recipients' emails plus additional_emails, without duplicates."""
+        emails = list(
+            schedule.recipients.filter(is_active=True).exclude(email='').values_list('email', flat=True)
+        )
+        emails += _parse_emails(schedule.additional_emails)
+        return list(dict.fromkeys(emails))
+
+    @staticmethod
+    def deliver(schedule, job, run_at: datetime, emails: List[str]) -> None:
+        """Email the export to the schedule's recipients."""
+        run_label = timezone.localtime(run_at).strftime('%Y-%m-%d %H:%M')
+        body = [
+            f"Your scheduled report \"{schedule.name}\" for {run_label} is ready.",
+            f"Rows: {job.record_count:,}",
+        ]
+
+        email = EmailMessage(
+            subject=f"{schedule.name} - {run_label}",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=emails,
+        )
+        if job.output_file.size <= attachment_limit():
+            with job.output_file.open('rb') as output:
+                email.attach(job.output_filename, output.read(), 'text/csv')
+        else:
+            site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+            body.append(f"The file is too large to attach. Download it here: {site_url}{job.output_file.url}")
+
+        email.body = '\n\n'.join(body)
+        email.send(fail_silently=False)
+
+    @staticmethod
+    def execute(schedule, run_at: datetime) -> str:
+        """
+        Run and deliver one occurrence, recording the outcome on the schedule.
+
+        Returns:
+            SUCCESS, NO_RECIPIENTS, SKIPPED (the schedule is misconfigured
+            and retrying cannot help) or FAILED (retry later), each with
+            the error message where there is one
+        """
+        try:
+            emails = ScheduledReportService.recipient_emails(schedule)
+            if not emails:
+                status = 'NO_RECIPIENTS'
+            else:
+                job = ScheduledReportService.run_report(schedule, run_at)
+                ScheduledReportService.deliver(schedule, job, run_at, emails)
+                status = 'SUCCESS'
+        except ValueError as e:
+            logger.warning(f"Scheduled report {schedule.pk} skipped for {run_at}: {e}")
+            status = f"SKIPPED: {e}"
+        except Exception as e:
+            logger.exception(f"Scheduled report {schedule.pk} failed for {run_at}")
+            status = f"FAILED: {e}"
+
+        schedule.last_run = timezone.now()
+        schedule.last_run_status = status[:STATUS_MAX_LENGTH]
+        schedule.save(update_fields=['last_run', 'last_run_status', 'updated_at'])
+        return status
+
+    @staticmethod
+    def process_due_reports(now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Claim and run every due schedule.
+
+        Runs are settled in order: after each delivered (or skipped) run,
+        next_run moves to the following occurrence. The first failed run
+        stops the schedule for this pass and stays due, so it and the runs
+        after it are retried next time. The claim is always released.
+
+        Args:
+            now: Current time (defaults to timezone.now(); pass a fixed
+                time to test schedules)
+
+        Returns:
+            Dict with schedules, runs, delivered, skipped and failed counts
+        """
+        now = now or timezone.now()
+        summary = {'schedules': 0, 'runs': 0, 'delivered': 0, 'skipped': 0, 'failed': 0}
+
+        for schedule, runs in ScheduledReportService.claim_due_reports(now):
+            summary['schedules'] += 1
+            try:
+                for run_at in runs:
+                    summary['runs'] += 1
+                    status = ScheduledReportService.execute(schedule, run_at)
+                    if status.startswith('FAILED'):
+                        summary['failed'] += 1
+                        break
+                    summary['delivered' if status == 'SUCCESS' else 'skipped'] += 1
+                    schedule.next_run = next_occurrence(schedule, run_at)
+                    schedule.save(update_fields=['next_run', 'updated_at'])
+            finally:
+                schedule.claimed_at = None
+                schedule.save(update_fields=['claimed_at', 'updated_at'])
+
+        if summary['schedules']:
+            logger.info(
+                f"Scheduled reports: {summary['runs']} runs for {summary['schedules']} schedules, "
+                f"{summary['delivered']} delivered, {summary['skipped']} skipped, "
+                f"{summary['failed']} failed"
+            )
+        return summary
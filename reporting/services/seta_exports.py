@@ -0,0 +1,495 @@
+"""
+SETA / NLRD / QCTO Exports
+
+Row generators for the learner export templates, written against
+select_related/only() projections and iterated with .iterator() so a
+province-wide export never materialises its queryset.
+
+Small exports stream straight to the browser; exports above
+SETA_EXPORT_STREAM_LIMIT rows are diverted to a background ExportJob
+(see reporting.tasks.run_export_job) that writes the file and reports
+progress.
+"""
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Iterator, List
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .csv_export import write_csv_file
+
+logger = logging.getLogger(__name__)
+
+ITERATOR_CHUNK_SIZE = 2000
+
+# Exports larger than this run as a background ExportJob
+DEFAULT_STREAM_LIMIT = 20000
+
+FILTER_PARAMS = ['qualification', 'campus', 'date_from', 'date_to']
+
+NLRD_STATUS_MAP = {
+    'APPLIED': '1', 'DOC_CHECK': '1', 'REGISTERED': '2', 'ENROLLED': '2',
+    'ACTIVE': '3', 'ON_HOLD': '5', 'COMPLETED': '4', 'CERTIFIED': '4',
+    'WITHDRAWN': '6', 'TRANSFERRED': '7', 'EXPIRED': '8'
+}
+
+LEARNER_FIELDS = [
+    'learner', 'learner__learner_number', 'learner__sa_id_number',
+    'learner__first_name', 'learner__middle_name', 'learner__last_name',
+    'learner__gender', 'learner__population_group', 'learner__disability_status',
+    'learner__province_code',
+]
+QUALIFICATION_FIELDS = [
+    'qualification', 'qualification__saqa_id', 'qualification__title',
+    'qualification__nqf_level', 'qualification__qualification_type',
+]
+
+
+def stream_limit() -> int:
+    return getattr(settings, 'SETA_EXPORT_STREAM_LIMIT', DEFAULT_STREAM_LIMIT)
+
+
+def _yyyymmdd(value) -> str:
+    return value.strftime('%Y%m%d') if value else ''
+
+
+def _iso(value) -> str:
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+def build_enrollment_queryset(params: Dict):
+    """
+    Enrollments for an export, filtered by the export form parameters.
+
+    Args:
+        params: Dict with optional qualification, campus, date_from, date_to
+    """
+    from academics.models import Enrollment
+
+    enrollments = Enrollment.objects.all()
+
+    if params.get('qualification'):
+        enrollments = enrollments.filter(qualification_id=params['qualification'])
+    if params.get('campus'):
+        enrollments = enrollments.filter(campus_id=params['campus'])
+    if params.get('date_from'):
+        enrollments = enrollments.filter(enrollment_date__gte=params['date_from'])
+    if params.get('date_to'):
+        enrollments = enrollments.filter(enrollment_date__lte=params['date_to'])
+
+    return enrollments
+
+
+# =============================================================================
+# EXPORT DEFINITIONS
+# =============================================================================
+
+class SetaExport(ABC):
+    """
+    One export template: a header, a projection of the filtered enrollments
+    and a row generator over it.
+    """
+    template_id = ''
+    filename_prefix = ''
+    header: List[str] = []
+
+    def queryset(self, enrollments):
+        return enrollments
+
+    def row_count(self, enrollments) -> int:
+        """Rows the export will produce (used to decide stream vs background)."""
+        return self.queryset(enrollments).count()
+
+    @abstractmethod
+    def rows(self, enrollments) -> Iterator[list]:
+        """CSV rows (matching header) for the filtered enrollments."""
+        pass
+
+    def filename(self) -> str:
+        return f"{self.filename_prefix}_{date.today()}.csv"
+
+
+class NLRDLearnerExport(SetaExport):
+    """NLRD Learner Upload format (one row per learner)"""
+    template_id = 'nlrd_learner'
+    filename_prefix = 'NLRD_Learner'
+    header = [
+        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Equity_Code',
+        'Nationality_Code', 'Home_Language_Code', 'Gender', 'Citizen_Resident_Status_Code',
+        'Socio_Economic_Status_Code', 'Disability_Status_Code', 'First_Name',
+        'Second_Name', 'Surname', 'Birth_Date', 'School_EMIS_Number',
+        'Highest_Edu_Level_Code', 'Physical_Address_Line_1', 'Physical_Address_Line_2',
+        'Physical_Address_City', 'Physical_Address_Postcode'
+    ]
+
+    def queryset(self, enrollments):
+        return enrollments.select_related(
+            'learner', 'learner__physical_address'
+        ).only(
+            *LEARNER_FIELDS,
+            'learner__citizenship', 'learner__passport_country', 'learner__home_language',
+            'learner__socio_economic_status', 'learner__date_of_birth',
+            'learner__highest_qualification', 'learner__physical_address',
+            'learner__physical_address__line_1', 'learner__physical_address__line_2',
+            'learner__physical_address__city', 'learner__physical_address__postal_code',
+        )
+
+    def row_count(self, enrollments) -> int:
+        return enrollments.values('learner__sa_id_number').distinct().count()
+
+    def rows(self, enrollments):
+        # Export unique learners
+        exported_ids = set()
+        for enrollment in self.queryset(enrollments).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            learner = enrollment.learner
+            if learner.sa_id_number in exported_ids:
+                continue
+            exported_ids.add(learner.sa_id_number)
+
+            address = learner.physical_address
+
+            yield [
+                learner.sa_id_number,
+                '',  # Alternate ID
+                '',  # Alternate ID Type
+                learner.population_group,
+                'SA' if learner.citizenship == 'SA' else learner.passport_country,
+                learner.home_language[:3] if learner.home_language else 'ENG',
+                learner.gender,
+                'SA' if learner.citizenship == 'SA' else 'O',
+                learner.socio_economic_status or 'U',
+                learner.disability_status,
+                learner.first_name,
+                learner.middle_name or '',
+                learner.last_name,
+                _yyyymmdd(learner.date_of_birth),
+                '',  # School EMIS
+                learner.highest_qualification or '4',
+                address.line_1 if address else '',
+                address.line_2 if address else '',
+                address.city if address else '',
+                address.postal_code if address else '',
+            ]
+
+
+class NLRDEnrollmentExport(SetaExport):
+    """NLRD Enrollment Upload format"""
+    template_id = 'nlrd_enrollment'
+    filename_prefix = 'NLRD_Enrollment'
+    header = [
+        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Enrol_Status_Code',
+        'Enrol_Status_Start_Date', 'Enrol_Date', 'Provider_Code', 'Provider_ETQI_ID',
+        'Qualification_ID', 'Learnership_ID', 'Funding_Type', 'Cumulative_Spend',
+        'OFO_Code', 'Urban_Rural_Code', 'SDL_Number', 'Site_Number',
+        'Practical_Provider_Code', 'Practical_Provider_ETQE_ID', 'SIC_Code',
+        'Non_NFSD_Funding_Source', 'Assessment_ETQE_ID', 'Enrolment_NQF_Level',
+        'Part_of_ID', 'Last_School_Year', 'Last_School_EMIS_Number'
+    ]
+
+    def queryset(self, enrollments):
+        return enrollments.select_related(
+            'learner', 'qualification', 'campus'
+        ).only(
+            'status', 'enrollment_date', 'funding_type',
+            'learner', 'learner__sa_id_number',
+            'qualification', 'qualification__saqa_id', 'qualification__nqf_level',
+            'campus', 'campus__code',
+        )
+
+    def rows(self, enrollments):
+        for enrollment in self.queryset(enrollments).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            qual = enrollment.qualification
+
+            yield [
+                enrollment.learner.sa_id_number,
+                '',
+                '',
+                NLRD_STATUS_MAP.get(enrollment.status, '3'),
+                _yyyymmdd(enrollment.enrollment_date),
+                _yyyymmdd(enrollment.enrollment_date),
+                enrollment.campus.code if enrollment.campus else '',
+                '',  # Provider ETQI
+                qual.saqa_id if qual else '',
+                '',  # Learnership ID
+                enrollment.funding_type,
+                '',  # Cumulative Spend
+                '',  # OFO Code
+                '',  # Urban/Rural
+                '',  # SDL Number
+                '',  # Site Number
+                '',  # Practical Provider
+                '',  # Practical Provider ETQE
+                '',  # SIC Code
+                '',  # Non-NFSD Funding
+                '',  # Assessment ETQE
+                qual.nqf_level if qual else '',
+                '',  # Part of ID
+                '',  # Last School Year
+                '',  # Last School EMIS
+            ]
+
+
+class NLRDAchievementExport(SetaExport):
+    """NLRD Achievement Upload format (completed/certified enrollments)"""
+    template_id = 'nlrd_achievement'
+    filename_prefix = 'NLRD_Achievement'
+    header = [
+        'Natl_ID', 'Person_Alternate_ID', 'Alternate_ID_Type', 'Qualification_ID',
+        'Designation_Code', 'Designation_Start_Date', 'Designation_End_Date',
+        'Provider_Code', 'Provider_ETQI_ID', 'Assessment_ETQE_ID',
+        'NLRD_Certificate_Number', 'Certificate_Number', 'Honour_Code',
+        'Part_Of_ID', 'Achievement_Date'
+    ]
+
+    def queryset(self, enrollments):
+        return enrollments.filter(
+            status__in=['COMPLETED', 'CERTIFIED']
+        ).select_related(
+            'learner', 'qualification', 'campus'
+        ).only(
+            'enrollment_date', 'actual_completion', 'nlrd_reference', 'certificate_number',
+            'learner', 'learner__sa_id_number',
+            'qualification', 'qualification__saqa_id',
+            'campus', 'campus__code',
+        )
+
+    def rows(self, enrollments):
+        for enrollment in self.queryset(enrollments).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            qual = enrollment.qualification
+
+            yield [
+                enrollment.learner.sa_id_number,
+                '',
+                '',
+                qual.saqa_id if qual else '',
+                'Q',  # Qualification
+                _yyyymmdd(enrollment.enrollment_date),
+                _yyyymmdd(enrollment.actual_completion),
+                enrollment.campus.code if enrollment.campus else '',
+                '',
+                '',
+                enrollment.nlrd_reference or '',
+                enrollment.certificate_number or '',
+                '',  # Honour code
+                '',
+                _yyyymmdd(enrollment.actual_completion),
+            ]
+
+
+class WSPReportExport(SetaExport):
+    """WSP Training Report format"""
+    template_id = 'wsp_training_report'
+    filename_prefix = 'WSP_Training_Report'
+    header = [
+        'Employee_ID', 'First_Name', 'Last_Name', 'ID_Number', 'Gender',
+        'Race', 'Disability', 'Province', 'Occupation', 'OFO_Code',
+        'Training_Type', 'Qualification_Name', 'SAQA_ID', 'NQF_Level',
+        'Start_Date', 'End_Date', 'Status', 'Provider_Name', 'Provider_Accreditation',
+        'Funding_Type', 'Training_Cost', 'Completion_Status'
+    ]
+
+    def queryset(self, enrollments):
+        return enrollments.select_related(
+            'learner', 'qualification', 'campus'
+        ).only(
+            'status', 'start_date', 'expected_completion', 'funding_type',
+            *LEARNER_FIELDS, *QUALIFICATION_FIELDS,
+            'campus', 'campus__name',
+        )
+
+    def rows(self, enrollments):
+        for enrollment in self.queryset(enrollments).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            learner = enrollment.learner
+            qual = enrollment.qualification
+
+            yield [
+                learner.learner_number,
+                learner.first_name,
+                learner.last_name,
+                learner.sa_id_number,
+                learner.gender,
+                learner.population_group,
+                learner.disability_status,
+                learner.province_code,
+                '',  # Occupation
+                '',  # OFO Code
+                qual.qualification_type if qual else '',
+                qual.title if qual else '',
+                qual.saqa_id if qual else '',
+                qual.nqf_level if qual else '',
+                _iso(enrollment.start_date),
+                _iso(enrollment.expected_completion),
+                enrollment.status,
+                enrollment.campus.name if enrollment.campus else '',
+                '',  # Accreditation
+                enrollment.funding_type,
+                '',  # Cost
+                'Completed' if enrollment.status in ['COMPLETED', 'CERTIFIED'] else 'In Progress',
+            ]
+
+
+class ATRSummaryExport(SetaExport):
+    """ATR Summary format (a handful of totals from one aggregate query)"""
+    template_id = 'atr_summary'
+    filename_prefix = 'ATR_Summary'
+    header = ['Metric', 'Value']
+
+    def row_count(self, enrollments) -> int:
+        return 0  # Always small enough to stream
+
+    def rows(self, enrollments):
+        stats = enrollments.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status__in=['COMPLETED', 'CERTIFIED'])),
+            active=Count('id', filter=Q(status='ACTIVE')),
+            male=Count('id', filter=Q(learner__gender='M')),
+            female=Count('id', filter=Q(learner__gender='F')),
+            african=Count('id', filter=Q(learner__population_group='A')),
+            coloured=Count('id', filter=Q(learner__population_group='C')),
+            indian=Count('id', filter=Q(learner__population_group='I')),
+            white=Count('id', filter=Q(learner__population_group='W')),
+        )
+        total = stats['total']
+        completed = stats['completed']
+
+        yield ['Total Enrollments', total]
+        yield ['Completed', completed]
+        yield ['Active', stats['active']]
+        yield ['Completion Rate %', round(completed/total*100, 1) if total > 0 else 0]
+        yield ['', '']
+        yield ['Gender Breakdown', '']
+        yield ['Male', stats['male']]
+        yield ['Female', stats['female']]
+        yield ['', '']
+        yield ['Population Group', '']
+        yield ['African', stats['african']]
+        yield ['Coloured', stats['coloured']]
+        yield ['Indian', stats['indian']]
+        yield ['White', stats['white']]
+
+
+class QCTOAssessmentExport(SetaExport):
+    """QCTO Assessment Records format (one row per assessment result)"""
+    template_id = 'qcto_assessment'
+    filename_prefix = 'QCTO_Assessment'
+    header = [
+        'Learner_ID', 'First_Name', 'Last_Name', 'ID_Number',
+        'Qualification_Code', 'Module_Code', 'Module_Title',
+        'Assessment_Type', 'Assessor_ID', 'Assessment_Date',
+        'Result', 'Score', 'Attempt_Number', 'Comments'
+    ]
+
+    def queryset(self, enrollments):
+        from assessments.models import AssessmentResult
+
+        return AssessmentResult.objects.filter(
+            enrollment__in=enrollments.values('pk')
+        ).select_related(
+            'enrollment__learner', 'enrollment__qualification', 'activity__module', 'assessor'
+        ).only(
+            'assessment_date', 'result', 'percentage_score', 'attempt_number', 'feedback',
+            'enrollment', 'enrollment__learner', 'enrollment__learner__learner_number',
+            'enrollment__learner__first_name', 'enrollment__learner__last_name',
+            'enrollment__learner__sa_id_number',
+            'enrollment__qualification', 'enrollment__qualification__saqa_id',
+            'activity', 'activity__activity_type',
+            'activity__module', 'activity__module__code', 'activity__module__title',
+            'assessor', 'assessor__email',
+        )
+
+    def rows(self, enrollments):
+        for result in self.queryset(enrollments).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            learner = result.enrollment.learner
+            activity = result.activity
+            module = activity.module if activity else None
+            qual = result.enrollment.qualification
+
+            yield [
+                learner.learner_number,
+                learner.first_name,
+                learner.last_name,
+                learner.sa_id_number,
+                qual.saqa_id if qual else '',
+                module.code if module else '',
+                module.title if module else '',
+                activity.activity_type if activity else '',
+                result.assessor.email if result.assessor else '',
+                _iso(result.assessment_date),
+                result.result,
+                str(result.percentage_score) if result.percentage_score else '',
+                result.attempt_number,
+                result.feedback or '',
+            ]
+
+
+SETA_EXPORTS: Dict[str, SetaExport] = {
+    export.template_id: export
+    for export in [
+        NLRDLearnerExport(),
+        NLRDEnrollmentExport(),
+        NLRDAchievementExport(),
+        WSPReportExport(),
+        ATRSummaryExport(),
+        QCTOAssessmentExport(),
+    ]
+}
+
+
+# =============================================================================
+# BACKGROUND EXPORT JOBS
+# =============================================================================
+
+def run_export_job(job) -> None:
+    """
+    Write a SETA export to job.output_file, updating progress as it goes.
+
+    The job's parameters hold template_id, the filter parameters and
+    expected_rows (the row count measured when the job was queued).
+    """
+    params = job.parameters or {}
+    export = SETA_EXPORTS.get(params.get('template_id'))
+    if export is None:
+        job.status = 'FAILED'
+        job.error_message = f"Unknown export template: {params.get('template_id')}"
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+        return
+
+    expected_rows = params.get('expected_rows') or 0
+    job.status = 'PROCESSING'
+    job.started_at = timezone.now()
+    job.progress_percent = 0
+    job.progress_message = 'Starting export'
+    job.save(update_fields=['status', 'started_at', 'progress_percent', 'progress_message', 'updated_at'])
+
+    def report_progress(count):
+        job.record_count = count
+        job.progress_percent = min(99, int(count / expected_rows * 100)) if expected_rows else 0
+        job.progress_message = f"{count:,} of ~{expected_rows:,} rows written"
+        job.save(update_fields=['record_count', 'progress_percent', 'progress_message', 'updated_at'])
+
+    try:
+        enrollments = build_enrollment_queryset(params)
+        with tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8') as tmp:
+            count = write_csv_file(tmp, export.header, export.rows(enrollments), report_progress)
+            tmp.seek(0)
+            filename = export.filename()
+            job.output_file.save(filename, File(tmp), save=False)
+
+        job.output_filename = filename
+        job.record_count = count
+        job.status = 'COMPLETED'
+        job.progress_percent = 100
+        job.progress_message = f"{count:,} rows exported"
+        job.completed_at = timezone.now()
+        job.save()
+    except Exception as e:
+        logger.exception(f"Export job {job.pk} failed")
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'completed_at', 'updated_at'])
@@ -0,0 +1,377 @@
+"""
+Dashboard Widget Engine
+
+Evaluates DashboardWidget.query_config as an ORM aggregate over a whitelist
+of models, fields and aggregations, and caches each result for the
+widget's refresh_interval_seconds.
+
+query_config:
+    {
+        "source": "enrollments",            # key of SOURCES
+        "aggregate": "count",               # count | sum | avg | min | max
+        "field": "percentage_score",        # required unless aggregate is count
+                                            # (count with a field counts distinct values)
+        "group_by": "status",               # optional; date fields accept
+                                            # "enrollment_date:month" (day/week/month/year)
+        "filters": {"status__in": ["ACTIVE", "ENROLLED"]},
+        "order": "-value",                  # value | -value | label | -label
+        "limit": 10
+    }
+
+DashboardWidgetPlacement.config_overrides uses the same keys; its filters
+are merged into the widget's.
+
+A dashboard is evaluated in one pass: cached results come from one
+get_many, and the remaining widgets are grouped so that widgets sharing a
+source, filters and grouping are answered by a single query with one
+annotation per distinct aggregate. Identical widgets cost nothing extra.
+"""
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WIDGET_CACHE_KEY = 'reporting:widget:{widget_id}:{brand}:{signature}'
+
+# Source name -> model, path to the brand (for dashboard scoping) and the
+# fields widgets may filter, group or aggregate on
+SOURCES = {
+    'enrollments': {
+        'model': 'academics.Enrollment',
+        'brand_path': 'campus__brand',
+        'fields': {
+            'status', 'funding_type', 'campus', 'campus__name', 'qualification',
+            'qualification__short_title', 'qualification__nqf_level', 'cohort',
+            'application_date', 'enrollment_date', 'expected_completion',
+            'actual_completion', 'learner__gender', 'learner__population_group',
+            'learner__province_code', 'nlrd_submitted',
+        },
+    },
+    'learners': {
+        'model': 'learners.Learner',
+        'brand_path': 'campus__brand',
+        'fields': {
+            'campus', 'campus__name', 'gender', 'population_group', 'citizenship',
+            'disability_status', 'socio_economic_status', 'highest_qualification',
+            'province_code', 'date_of_birth', 'created_at', 'financial_hold',
+        },
+    },
+    'assessment_results': {
+        'model': 'assessments.AssessmentResult',
+        'brand_path': 'enrollment__campus__brand',
+        'fields': {
+            'result', 'status', 'percentage_score', 'assessment_date', 'attempt_number',
+            'activity__module__code', 'enrollment__qualification__short_title',
+            'enrollment__campus__name',
+        },
+    },
+    'intake_enrollments': {
+        'model': 'intakes.IntakeEnrollment',
+        'brand_path': 'intake__campus__brand',
+        'fields': {
+            'status', 'funding_type', 'intake', 'intake__campus__name',
+            'application_date', 'enrollment_date', 'withdrawal_date',
+        },
+    },
+}
+
+AGGREGATES = {
+    'count': Count,
+    'sum': Sum,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+}
+
+DATE_TRUNCATIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+LOOKUPS = {'exact', 'in', 'gt', 'gte', 'lt', 'lte', 'isnull', 'icontains', 'range'}
+
+ORDERINGS = {'value', '-value', 'label', '-label'}
+
+QUERY_KEYS = ['source', 'aggregate', 'field', 'group_by', 'filters', 'order', 'limit']
+
+MAX_LIMIT = 100
+
+
+class WidgetConfigError(ValueError):
+    """query_config refers to something outside the whitelist."""
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# =============================================================================
+# COMPILATION
+# =============================================================================
+
+def merge_config(query_config: Dict, overrides: Optional[Dict] = None) -> Dict:
+    """Widget query_config with placement overrides applied (filters merged)."""
+    config = {key: query_config[key] for key in QUERY_KEYS if key in query_config}
+    for key, value in (overrides or {}).items():
+        if key == 'filters':
+            config['filters'] = {**config.get('filters', {}), **value}
+        elif key in QUERY_KEYS:
+            config[key] = value
+    return config
+
+
+def _check_field(source: Dict, field: str, source_name: str) -> str:
+    if field not in source['fields']:
+        raise WidgetConfigError(f"Field '{field}' is not available for {source_name}")
+    return field
+
+
+def compile_query(config: Dict, brand_id=None) -> Dict:
+    """
+    Validate a merged query config against the whitelist.
+
+    Returns:
+        Canonical spec: source, aggregate, field, group_by, truncation,
+        filters (sorted list of (lookup, value)), order, limit and brand_id
+
+    Raises:
+        WidgetConfigError
+    """
+    source_name = config.get('source')
+    source = SOURCES.get(source_name)
+    if source is None:
+        raise WidgetConfigError(f"Unknown data source '{source_name}'")
+
+    aggregate = config.get('aggregate', 'count')
+    if aggregate not in AGGREGATES:
+        raise WidgetConfigError(f"Unknown aggregation '{aggregate}'")
+    field = config.get('field') or ('pk' if aggregate == 'count' else None)
+    if field is None:
+        raise WidgetConfigError(f"Aggregation '{aggregate}' needs a field")
+    if field != 'pk':
+        _check_field(source, field, source_name)
+
+    group_by, truncation = config.get('group_by'), None
+    if group_by:
+        group_by, _, truncation = group_by.partition(':')
+        _check_field(source, group_by, source_name)
+        if truncation and truncation not in DATE_TRUNCATIONS:
+            raise WidgetConfigError(f"Unknown date grouping '{truncation}'")
+
+    filters = []
+    for lookup, value in (config.get('filters') or {}).items():
+        field_name = lookup
+        if '__' in lookup and lookup.rsplit('__', 1)[1] in LOOKUPS:
+            field_name = lookup.rsplit('__', 1)[0]
+        _check_field(source, field_name, source_name)
+        filters.append((lookup, value))
+    filters.sort(key=lambda item: item[0])
+
+    order = config.get('order') or ('label' if truncation else '-value')
+    if order not in ORDERINGS:
+        raise WidgetConfigError(f"Unknown ordering '{order}'")
+
+    try:
+        limit = min(int(config['limit']), MAX_LIMIT) if config.get('limit') else None
+    except (TypeError, ValueError):
+        raise WidgetConfigError('limit must be a number')
+
+    return {
+        'source': source_name,
+        'aggregate': aggregate,
+        'field': field,
+        'group_by': group_by or None,
+        'truncation': truncation or None,
+        'filters': filters,
+        'order': order,
+        'limit': limit,
+        'brand_id': brand_id,
+    }
+
+
+def signature(spec: Dict) -> str:
+    """Stable hash of a compiled spec."""
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _query_group(spec: Dict) -> Tuple:
+    """Specs with the same group share one query."""
+    return (
+        spec['source'], spec['group_by'], spec['truncation'],
+        json.dumps(spec['filters'], default=str), spec['brand_id'],
+    )
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+
+def _aggregate_expression(aggregate: str, field: str):
+    if aggregate == 'count':
+        # Counting a field counts its distinct values
+        return Count(field, distinct=field != 'pk')
+    return AGGREGATES[aggregate](field)
+
+
+def _run_query_group(specs: List[Dict]) -> Dict[Tuple, object]:
+    """
+    Evaluate specs sharing a source/filters/grouping in one query.
+
+    Returns:
+        {(aggregate, field): value} for ungrouped specs, or
+        {(aggregate, field): [(label, value), ...]} for grouped ones
+    """
+    first = specs[0]
+    source = SOURCES[first['source']]
+    queryset = apps.get_model(source['model']).objects.all()
+
+    if first['brand_id'] is not None:
+        queryset = queryset.filter(**{source['brand_path']: first['brand_id']})
+    if first['filters']:
+        queryset = queryset.filter(**dict(first['filters']))
+
+    measures = sorted({(spec['aggregate'], spec['field']) for spec in specs})
+    annotations = {
+        f'm{i}': _aggregate_expression(aggregate, field)
+        for i, (aggregate, field) in enumerate(measures)
+    }
+
+    if not first['group_by']:
+        row = queryset.aggregate(**annotations)
+        return {measure: row[f'm{i}'] for i, measure in enumerate(measures)}
+
+    group = first['group_by']
+    if first['truncation']:
+        queryset = queryset.annotate(_label=DATE_TRUNCATIONS[first['truncation']](group))
+    else:
+        queryset = queryset.annotate(_label=F(group))
+    rows = list(queryset.values('_label').annotate(**annotations).order_by())
+
+    return {
+        measure: [(row['_label'], row[f'm{i}']) for row in rows]
+        for i, measure in enumerate(measures)
+    }
+
+
+def _format(spec: Dict, value) -> Dict:
+    result = {'evaluated_at': timezone.now().isoformat()}
+    if not spec['group_by']:
+        result['value'] = _json_value(value)
+        return result
+
+    pairs = list(value)
+    descending = spec['order'].startswith('-')
+    if spec['order'].lstrip('-') == 'label':
+        pairs.sort(key=lambda pair: (pair[0] is None, pair[0] if pair[0] is not None else ''), reverse=descending)
+    else:
+        pairs.sort(key=lambda pair: pair[1] or 0, reverse=descending)
+    if spec['limit']:
+        pairs = pairs[:spec['limit']]
+
+    result['labels'] = [_json_value(label) if label is not None else '(None)' for label, _ in pairs]
+    result['values'] = [_json_value(v) for _, v in pairs]
+    return result
+
+
+class WidgetEngine:
+    """
+    Evaluates dashboard widgets with caching and query batching.
+
+    Usage:
+        engine = WidgetEngine()
+        engine.evaluate_dashboard(dashboard)   # {placement_id: result}
+        engine.evaluate(widget, overrides={'filters': {'status': 'ACTIVE'}})
+    """
+
+    def __init__(self, brand=None):
+        self.brand_id = getattr(brand, 'pk', brand)
+
+    def evaluate(self, widget, overrides: Optional[Dict] = None, brand=None) -> Dict:
+        """Evaluate one widget."""
+        return self.evaluate_many([(widget.pk, widget, overrides, brand)])[widget.pk]
+
+    def evaluate_dashboard(self, dashboard) -> Dict[int, Dict]:
+        """
+        Evaluate every active widget placed on a dashboard, scoped to the
+        dashboard's brand (or the engine's brand).
+
+        Returns:
+            {placement_id: result}
+        """
+        brand_id = self.brand_id if self.brand_id is not None else dashboard.brand_id
+        placements = dashboard.widget_placements.select_related('widget').filter(widget__is_active=True)
+        return self.evaluate_many([
+            (placement.pk, placement.widget, placement.config_overrides, brand_id)
+            for placement in placements
+        ])
+
+    def evaluate_many(self, items: Iterable[Tuple]) -> Dict:
+        """
+        Evaluate (key, widget, overrides, brand) items in one batched pass.
+
+        Results are dicts with either value (ungrouped) or labels/values
+        (grouped), plus evaluated_at; invalid configs give {'error': ...}.
+        """
+        results = {}
+        pending = []  # (key, widget, spec, cache_key)
+
+        for key, widget, overrides, brand in items:
+            brand_id = getattr(brand, 'pk', brand)
+            if brand_id is None:
+                brand_id = self.brand_id
+            try:
+                spec = compile_query(merge_config(widget.query_config or {}, overrides), brand_id)
+            except WidgetConfigError as e:
+                results[key] = {'error': str(e)}
+                continue
+            cache_key = WIDGET_CACHE_KEY.format(
+                widget_id=widget.pk, brand=brand_id or 'all', signature=signature(spec)
+            )
+            pending.append((key, widget, spec, cache_key))
+
+        cached = cache.get_many({cache_key for _, _, _, cache_key in pending})
+
+        # Group the misses so each distinct query runs once
+        groups: Dict[Tuple, List] = defaultdict(list)
+        for key, widget, spec, cache_key in pending:
+            if cache_key in cached:
+                results[key] = cached[cache_key]
+            else:
+                groups[_query_group(spec)].append((key, widget, spec, cache_key))
+
+        by_timeout: Dict[int, Dict] = defaultdict(dict)
+        for members in groups.values():
+            try:
+                values = _run_query_group([spec for _, _, spec, _ in members])
+            except Exception as e:
+                logger.exception('Dashboard widget query failed')
+                for key, _, _, _ in members:
+                    results[key] = {'error': str(e)}
+                continue
+
+            for key, widget, spec, cache_key in members:
+                result = _format(spec, values[(spec['aggregate'], spec['field'])])
+                results[key] = result
+                by_timeout[max(widget.refresh_interval_seconds, 1)][cache_key] = result
+
+        for timeout, entries in by_timeout.items():
+            cache.set_many(entries, timeout)
+
+        return results
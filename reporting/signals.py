@@ -0,0 +1,33 @@
+"""
+Signals for the reporting app
+Keeps the shared enrollment cube in step with enrollment changes
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from reporting.services.enrollment_cube import (
+    invalidate_enrollment_cube,
+    mark_enrollment_cube_stale,
+)
+
+
+@receiver(post_save, sender='academics.Enrollment')
+@receiver(post_save, sender='learners.Learner')
+def refresh_enrollment_cube(sender, **kwargs):
+    """
+    Changed enrollments (and learner demographics) are picked up by an
+    incremental refresh on the cube's next read.
+    """
+    mark_enrollment_cube_stale()
+
+
+@receiver(post_delete, sender='academics.Enrollment')
+@receiver(post_save, sender='tenants.Campus')
+@receiver(post_save, sender='academics.Qualification')
+@receiver(post_save, sender='logistics.Cohort')
+def rebuild_enrollment_cube(sender, **kwargs):
+    """
+    Deleted enrollments and renamed campuses, qualifications or cohorts
+    need a full rebuild.
+    """
+    invalidate_enrollment_cube()
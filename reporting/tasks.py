@@ -0,0 +1,56 @@
+"""
+Reporting Celery Tasks
+
+Background jobs:
+- Large SETA/NLRD/QCTO exports (ExportJob)
+- Scheduled report delivery (ScheduledReport)
+"""
+import logging
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='reporting.tasks.run_export_job')
+def run_export_job(job_id):
+    """
+    Generate the file for a queued ExportJob.
+    """
+    from reporting.models import ExportJob
+    from reporting.services.seta_exports import run_export_job as run_job
+    
+    try:
+        job = ExportJob.objects.get(pk=job_id)
+    except ExportJob.DoesNotExist:
+        logger.warning(f"Export job {job_id} not found")
+        return {'status': 'not_found'}
+    
+    if job.status != 'PENDING':
+        return {'status': job.status.lower()}
+    
+    run_job(job)
+    return {'status': job.status.lower(), 'records': job.record_count}
+
+
+@shared_task(name='reporting.tasks.process_scheduled_reports')
+def process_scheduled_reports():
+    """
+    Run and email every ScheduledReport whose next_run has passed.
+    Scheduled hourly via Celery Beat.
+    """
+    from reporting.services.scheduled_reports import ScheduledReportService
+    
+    return ScheduledReportService.process_due_reports()
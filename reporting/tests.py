@@ -1,3 +1,125 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import User
+from reporting.models import ReportTemplate, ScheduledReport
+from reporting.services.scheduled_reports import ScheduledReportService, next_occurrence
+
+
+def at(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ScheduledReportProcessingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='x', first_name='Report', last_name='Owner'
+        )
+        cls.template = ReportTemplate.objects.create(
+            name='NLRD', code='nlrd_learner', report_type='NLRD', output_format='CSV'
+        )
+
+    def schedule(self, **kwargs):
+        fields = {
+            'name': 'Learners',
+            'template': self.template,
+            'frequency': 'DAILY',
+            'time_of_day': time(7, 0),
+            'additional_emails': 'reports@example.com',
+            'created_by': self.owner,
+        }
+        fields.update(kwargs)
+        return ScheduledReport.objects.create(**fields)
+
+    def test_monthly_schedule_clamps_to_month_end(self):
+        schedule = self.schedule(frequency='MONTHLY', day_of_month=31, next_run=at(2026, 1, 31, 7, 0))
+
+        summary = ScheduledReportService.process_due_reports(now=at(2026, 2, 1, 9, 0))
+
+        schedule.refresh_from_db()
+        self.assertEqual(summary['delivered'], 1)
+        self.assertEqual(schedule.next_run, at(2026, 2, 28, 7, 0))
+        self.assertEqual(next_occurrence(schedule, schedule.next_run), at(2026, 3, 31, 7, 0))
+        self.assertEqual(next_occurrence(schedule, at(2026, 3, 31, 7, 0)), at(2026, 4, 30, 7, 0))
+        self.assertEqual([message.subject for message in mail.outbox], ['Learners - 2026-01-31 07:00'])
+
+    def test_missed_runs_are_coalesced_by_default(self):
+        schedule = self.schedule(next_run=at(2026, 10, 15, 7, 0))
+
+        summary = ScheduledReportService.process_due_reports(now=at(2026, 10, 18, 9, 0))
+
+        schedule.refresh_from_db()
+        self.assertEqual(summary['runs'], 1)
+        self.assertEqual(schedule.next_run, at(2026, 10, 19, 7, 0))
+        self.assertEqual([message.subject for message in mail.outbox], ['Learners - 2026-10-18 07:00'])
+
+    def test_catch_up_runs_every_missed_occurrence(self):
+        schedule = self.schedule(next_run=at(2026, 10, 15, 7, 0), parameters={'catch_up': True})
+
+        summary = ScheduledReportService.process_due_reports(now=at(2026, 10, 18, 9, 0))
+
+        schedule.refresh_from_db()
+        self.assertEqual(summary['delivered'], 4)
+        self.assertEqual(schedule.next_run, at(2026, 10, 19, 7, 0))
+        self.assertIsNone(schedule.claimed_at)
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            [f'Learners - 2026-10-{day} 07:00' for day in (15, 16, 17, 18)],
+        )
+
+        self.assertEqual(ScheduledReportService.process_due_reports(now=at(2026, 10, 18, 10, 0))['runs'], 0)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_failed_run_stays_due_and_is_retried(self):
+        schedule = self.schedule(next_run=at(2026, 10, 16, 7, 0), parameters={'catch_up': True})
+        deliver = ScheduledReportService.deliver
+        calls = []
+
+        def flaky_deliver(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise ConnectionError('SMTP unavailable')
+            return deliver(*args)
+
+        with mock.patch.object(ScheduledReportService, 'deliver', side_effect=flaky_deliver), \
+                self.assertLogs('reporting.services.scheduled_reports', 'ERROR'):
+            summary = ScheduledReportService.process_due_reports(now=at(2026, 10, 18, 9, 0))
+
+        schedule.refresh_from_db()
+        self.assertEqual((summary['delivered'], summary['failed']), (1, 1))
+        self.assertEqual(schedule.next_run, at(2026, 10, 17, 7, 0))
+        self.assertTrue(schedule.last_run_status.startswith('FAILED'))
+
+        ScheduledReportService.process_due_reports(now=at(2026, 10, 18, 10, 0))
+
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run, at(2026, 10, 19, 7, 0))
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            [f'Learners - 2026-10-{day} 07:00' for day in (16, 17, 18)],
+        )
+
+    def test_claim_of_a_dead_worker_is_taken_over(self):
+        now = at(2026, 10, 18, 9, 0)
+        schedule = self.schedule(next_run=at(2026, 10, 18, 7, 0))
+        claimed = ScheduledReportService.claim_due_reports(now)
+        self.assertEqual([item[0].pk for item in claimed], [schedule.pk])
+
+        # The worker died: nothing was delivered and next_run was not advanced
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run, at(2026, 10, 18, 7, 0))
+        self.assertEqual(ScheduledReportService.claim_due_reports(now + timedelta(minutes=30)), [])
+
+        summary = ScheduledReportService.process_due_reports(now=now + timedelta(hours=3))
+
+        schedule.refresh_from_db()
+        self.assertEqual(summary['delivered'], 1)
+        self.assertEqual(schedule.next_run, at(2026, 10, 19, 7, 0))
+        self.assertEqual(len(mail.outbox), 1)
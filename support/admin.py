@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     SupportCategory, KnowledgeBaseArticle, ArticleFeedback,
     TrainingGuide, GuideProgress,
-    SupportTicket, TicketMessage, TicketAttachment
+    SupportTicket, TicketMessage, TicketAttachment, SupportAgentCapacity
 )
 
 
@@ -65,3 +65,10 @@ class SupportTicketAdmin(admin.ModelAdmin):
     search_fields = ("subject", "description", "requester__username", "requester__email")
     autocomplete_fields = ("requester", "assigned_to", "category")
     inlines = [TicketMessageInline, TicketAttachmentInline]
+
+
+@admin.register(SupportAgentCapacity)
+class SupportAgentCapacityAdmin(admin.ModelAdmin):
+    list_display = ("user", "capacity", "last_assigned_at")
+    search_fields = ("user__username", "user__email")
+    readonly_fields = ("last_assigned_at",)
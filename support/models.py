@@ -183,6 +183,23 @@ class SupportRoutingRule(TimestampedModel):
         return f"{self.module} -> {self.group_name}"
 
 
+class SupportAgentCapacity(TimestampedModel):
+    """
+    Routing weight per support agent.
+    Load = open assigned tickets / capacity; capacity 0 takes the agent out of routing.
+    Agents without a row route with capacity 1.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="support_capacity")
+    capacity = models.PositiveIntegerField(default=1, help_text="Relative share of new tickets (0 = not routed)")
+    last_assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Support agent capacities"
+
+    def __str__(self):
+        return f"{self.user} (capacity {self.capacity})"
+
+
 class SupportTicket(TimestampedModel):
     class Status(models.TextChoices):
         OPEN = "open", "Open"
@@ -0,0 +1 @@
+# Support services package
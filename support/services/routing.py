@@ -0,0 +1,153 @@
+"""
+Support Ticket Routing
+
+Assigns new tickets to the least-loaded agent of the ticket's routing group:
+- Load is open assigned tickets / SupportAgentCapacity.capacity (default 1),
+  computed for every candidate in one annotated Count(filter=...) query
+- Ties go to the agent assigned least recently (round robin)
+- Assignment is serialised per routing group with a transaction-scoped
+  advisory lock on PostgreSQL. SQLite has no row locks (select_for_update
+  is a no-op there), so the routing transaction takes the database write
+  lock with an empty UPDATE before it reads anything, which serialises all
+  routing. Either way the next ticket sees the previous assignment's load.
+
+Group resolution (unchanged from the original view helper):
+SupportRoutingRule.group_name, else the module's default group; then the
+rule's fallback_assignee; then any active staff user.
+"""
+import logging
+import zlib
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from support.models import SupportAgentCapacity, SupportModule, SupportRoutingRule, SupportTicket
+from .sla import OPEN_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Default group per module when no SupportRoutingRule exists
+DEFAULT_GROUPS = {
+    SupportModule.CRM: "Support - CRM",
+    SupportModule.TENDERS: "Support - Tenders",
+    SupportModule.LMS: "Support - LMS",
+    SupportModule.HR: "Support - HR",
+    SupportModule.FINANCE: "Support - Finance",
+}
+GENERAL_GROUP = "Support - General"
+
+# Lock key for the "any staff" last resort
+ANY_STAFF_LOCK = "support:any-staff"
+
+
+def _lock_routing_group(name: str) -> None:
+    """
+    Serialise assignment within a routing group for the current transaction.
+
+    On SQLite this takes the database write lock, which only serialises if
+    nothing has been read yet in the transaction (a transaction holding a
+    read lock that then waits for the write lock fails with "database is
+    locked" instead of waiting), so call it first.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [zlib.crc32(f'support:{name}'.encode())])
+        elif connection.vendor == 'sqlite':
+            table = connection.ops.quote_name(SupportAgentCapacity._meta.db_table)
+            cursor.execute(f'UPDATE {table} SET id = id WHERE 0')
+
+
+def annotate_load(users_qs):
+    """Annotate open_tickets, routing_capacity and load; drop agents with capacity 0."""
+    return users_qs.annotate(
+        open_tickets=Count('assigned_tickets', filter=Q(assigned_tickets__status__in=OPEN_STATUSES)),
+        routing_capacity=Coalesce('support_capacity__capacity', Value(1)),
+        last_assigned=F('support_capacity__last_assigned_at'),
+    ).filter(routing_capacity__gt=0).annotate(
+        load=Cast('open_tickets', FloatField()) / Cast('routing_capacity', FloatField()),
+    )
+
+
+def pick_least_loaded_agent(users_qs):
+    """
+    Agent with the lowest load, least recently assigned first on ties.
+    One query; returns None when there are no routable agents.
+    """
+    return annotate_load(users_qs).order_by(
+        'load', F('last_assigned').asc(nulls_first=True), 'pk'
+    ).first()
+
+
+class TicketRouter:
+    """
+    Least-loaded, capacity-weighted ticket assignment.
+    """
+
+    @staticmethod
+    def group_name_for(ticket: SupportTicket, rule: Optional[SupportRoutingRule]) -> str:
+        if rule:
+            return rule.group_name
+        return DEFAULT_GROUPS.get(ticket.module, GENERAL_GROUP)
+
+    @staticmethod
+    def assign_from(ticket: SupportTicket, lock_name: str, candidates):
+        """
+        Lock the group, pick the least-loaded candidate and assign the ticket.
+        Must run inside a transaction. On SQLite the transaction must not
+        have read anything before its first routing lock (see
+        _lock_routing_group).
+
+        Returns:
+            The assigned user, or None if no candidate is routable
+        """
+        _lock_routing_group(lock_name)
+        assignee = pick_least_loaded_agent(candidates)
+        if assignee is None:
+            return None
+        TicketRouter._assign(ticket, assignee)
+        return assignee
+
+    @staticmethod
+    def _assign(ticket: SupportTicket, assignee) -> None:
+        now = timezone.now()
+        ticket.assigned_to = assignee
+        ticket.save(update_fields=["assigned_to", "updated_at"])
+        SupportAgentCapacity.objects.update_or_create(user=assignee, defaults={'last_assigned_at': now})
+
+    @staticmethod
+    def assign(ticket: SupportTicket):
+        """
+        Route a ticket to its module's group.
+
+        Returns:
+            The assigned user, or None if nobody could be assigned
+        """
+        rule = SupportRoutingRule.objects.filter(module=ticket.module).select_related('fallback_assignee').first()
+        group_name = TicketRouter.group_name_for(ticket, rule)
+
+        with transaction.atomic():
+            _lock_routing_group(group_name)
+            group = Group.objects.filter(name=group_name).first()
+            if group:
+                agents = group.user_set.filter(is_active=True, is_staff=True)
+                assignee = TicketRouter.assign_from(ticket, group_name, agents)
+                if assignee:
+                    return assignee
+
+            # fallback if group missing or empty
+            if rule and rule.fallback_assignee:
+                TicketRouter._assign(ticket, rule.fallback_assignee)
+                return rule.fallback_assignee
+
+            # last resort: any staff
+            staff = get_user_model().objects.filter(is_staff=True, is_active=True)
+            assignee = TicketRouter.assign_from(ticket, ANY_STAFF_LOCK, staff)
+
+        if assignee is None:
+            logger.warning(f"No agent available for support ticket {ticket.pk} ({ticket.module})")
+        return assignee
@@ -0,0 +1,208 @@
+"""
+Support SLA Engine
+
+Set-based breach detection for open support tickets (sla_check):
+- All SupportSLAConfig rows are loaded once into a (module, priority) map
+- Each ticket's first-response and resolution deadlines are computed in SQL:
+  the stored *_due_at, or created_at plus the configured minutes for tickets
+  without one (DEFAULT_* minutes when no config matches, as apply_sla does)
+- Only tickets with a passed deadline, no breach flag and no breach
+  SLAEvent are selected
+- Breach and escalation SLAEvents are bulk-inserted and flags / URGENT
+  priorities set with a few UPDATE statements
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, DateTimeField, DurationField, Exists, ExpressionWrapper,
+    F, OuterRef, Q, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from support.models import SLAEvent, SupportSLAConfig, SupportTicket
+
+logger = logging.getLogger(__name__)
+
+# Defaults when no SupportSLAConfig matches (same as apply_sla)
+DEFAULT_FIRST_RESPONSE_MINUTES = 240
+DEFAULT_RESOLUTION_MINUTES = 2880
+
+BULK_BATCH_SIZE = 1000
+
+OPEN_STATUSES = [
+    SupportTicket.Status.OPEN,
+    SupportTicket.Status.IN_PROGRESS,
+    SupportTicket.Status.WAITING_ON_USER,
+]
+
+FIRST_RESPONSE_BREACH = 'first_response_breach'
+RESOLUTION_BREACH = 'resolution_breach'
+AUTO_ESCALATED = 'auto_escalated'
+
+
+@dataclass(frozen=True)
+class SLARule:
+    first_response_minutes: int
+    resolution_minutes: int
+    auto_escalate_on_breach: bool
+
+
+def load_sla_rules() -> Dict[Tuple[str, str], SLARule]:
+    """All SLA configs keyed by (module, priority), in one query."""
+    return {
+        (module, priority): SLARule(first, resolution, escalate)
+        for module, priority, first, resolution, escalate in SupportSLAConfig.objects.values_list(
+            'module', 'priority', 'first_response_minutes', 'resolution_minutes', 'auto_escalate_on_breach'
+        )
+    }
+
+
+def _by_rule(rules: Dict[Tuple[str, str], SLARule], value_for, default, output_field):
+    """CASE over (module, priority) returning a per-rule value."""
+    whens = [
+        When(module=module, priority=priority, then=Value(value_for(rule), output_field=output_field))
+        for (module, priority), rule in rules.items()
+    ]
+    default = Value(default, output_field=output_field)
+    return Case(*whens, default=default, output_field=output_field) if whens else default
+
+
+def _deadline(due_field: str, rules, minutes_for, default_minutes: int):
+    allowance = _by_rule(
+        rules, lambda rule: timedelta(minutes=minutes_for(rule)),
+        timedelta(minutes=default_minutes), DurationField(),
+    )
+    return Coalesce(
+        due_field,
+        ExpressionWrapper(F('created_at') + allowance, output_field=DateTimeField()),
+        output_field=DateTimeField(),
+    )
+
+
+def _breach_event_exists(event_type: str):
+    return Exists(SLAEvent.objects.filter(ticket=OuterRef('pk'), event_type=event_type))
+
+
+class SLAEngine:
+    """
+    Evaluates SLA breaches for all open tickets with a handful of queries.
+
+    Usage:
+        SLAEngine().run()
+    """
+
+    def __init__(self, rules: Optional[Dict[Tuple[str, str], SLARule]] = None):
+        self.rules = load_sla_rules() if rules is None else rules
+
+    def annotated_tickets(self, now: datetime):
+        """
+        Open tickets annotated with their deadlines and whether each SLA is
+        newly breached at `now`.
+        """
+        first_response_deadline = _deadline(
+            'first_response_due_at', self.rules,
+            lambda rule: rule.first_response_minutes, DEFAULT_FIRST_RESPONSE_MINUTES,
+        )
+        resolution_deadline = _deadline(
+            'resolution_due_at', self.rules,
+            lambda rule: rule.resolution_minutes, DEFAULT_RESOLUTION_MINUTES,
+        )
+        qs = SupportTicket.objects.filter(status__in=OPEN_STATUSES).annotate(
+            sla_first_response_deadline=first_response_deadline,
+            sla_resolution_deadline=resolution_deadline,
+        )
+        return qs.annotate(
+            first_response_due=Case(
+                When(
+                    Q(first_response_at__isnull=True, first_response_breached=False,
+                      sla_first_response_deadline__lt=now)
+                    & ~_breach_event_exists(FIRST_RESPONSE_BREACH),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            resolution_due=Case(
+                When(
+                    Q(resolved_at__isnull=True, resolution_breached=False,
+                      sla_resolution_deadline__lt=now)
+                    & ~_breach_event_exists(RESOLUTION_BREACH),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            auto_escalate=_by_rule(
+                self.rules, lambda rule: rule.auto_escalate_on_breach, False, BooleanField(),
+            ),
+        )
+
+    def breached_tickets(self, now: datetime) -> List[Dict]:
+        """Tickets with at least one newly breached SLA (id, priority and flags only)."""
+        return list(
+            self.annotated_tickets(now).filter(
+                Q(first_response_due=True) | Q(resolution_due=True)
+            ).values('pk', 'priority', 'first_response_due', 'resolution_due', 'auto_escalate')
+        )
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Record new breaches and auto-escalate where the SLA config asks for it.
+
+        Args:
+            now: Evaluation time (defaults to timezone.now())
+
+        Returns:
+            Dict with tickets, first_response_breaches, resolution_breaches
+            and escalated counts
+        """
+        now = now or timezone.now()
+        rows = self.breached_tickets(now)
+
+        events = []
+        first_response_ids, resolution_ids, escalate_ids = [], [], []
+        for row in rows:
+            if row['first_response_due']:
+                first_response_ids.append(row['pk'])
+                events.append(SLAEvent(
+                    ticket_id=row['pk'], event_type=FIRST_RESPONSE_BREACH,
+                    notes="First response SLA breached.", created_at=now,
+                ))
+            if row['resolution_due']:
+                resolution_ids.append(row['pk'])
+                events.append(SLAEvent(
+                    ticket_id=row['pk'], event_type=RESOLUTION_BREACH,
+                    notes="Resolution SLA breached.", created_at=now,
+                ))
+            if row['auto_escalate'] and row['priority'] != SupportTicket.Priority.URGENT:
+                escalate_ids.append(row['pk'])
+                events.append(SLAEvent(
+                    ticket_id=row['pk'], event_type=AUTO_ESCALATED,
+                    notes="Auto-escalated to URGENT.", created_at=now,
+                ))
+
+        with transaction.atomic():
+            SLAEvent.objects.bulk_create(events, batch_size=BULK_BATCH_SIZE)
+            self._update(first_response_ids, first_response_breached=True, updated_at=now)
+            self._update(resolution_ids, resolution_breached=True, updated_at=now)
+            self._update(escalate_ids, priority=SupportTicket.Priority.URGENT, updated_at=now)
+
+        summary = {
+            'tickets': len(rows),
+            'first_response_breaches': len(first_response_ids),
+            'resolution_breaches': len(resolution_ids),
+            'escalated': len(escalate_ids),
+        }
+        if rows:
+            logger.info(f"SLA check: {summary}")
+        return summary
+
+    @staticmethod
+    def _update(ticket_ids: List, **fields) -> None:
+        for start in range(0, len(ticket_ids), BULK_BATCH_SIZE):
+            SupportTicket.objects.filter(pk__in=ticket_ids[start:start + BULK_BATCH_SIZE]).update(**fields)
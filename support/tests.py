@@ -0,0 +1,66 @@
+import threading
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from support.models import SupportAgentCapacity, SupportModule, SupportTicket
+from support.services.routing import DEFAULT_GROUPS, TicketRouter
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentRoutingTests(TransactionTestCase):
+    """Tickets routed at the same time still spread by capacity."""
+
+    def setUp(self):
+        User = get_user_model()
+        group = Group.objects.create(name=DEFAULT_GROUPS[SupportModule.CRM])
+        self.agents = {}
+        for name, capacity in (('double', 2), ('single_a', 1), ('single_b', 1), ('off', 0)):
+            agent = User.objects.create_user(
+                email=f'{name}@example.com', password='x', first_name=name, last_name='Agent', is_staff=True,
+            )
+            SupportAgentCapacity.objects.create(user=agent, capacity=capacity)
+            group.user_set.add(agent)
+            self.agents[agent.pk] = name
+
+        requester = User.objects.create_user(
+            email='requester@example.com', password='x', first_name='Req', last_name='User',
+        )
+        self.tickets = [
+            SupportTicket.objects.create(
+                requester=requester, module=SupportModule.CRM, subject=f'Ticket {i}', description='Help',
+            )
+            for i in range(8)
+        ]
+
+    def route_concurrently(self, tickets):
+        barrier = threading.Barrier(len(tickets))
+        errors = []
+
+        def route(ticket):
+            try:
+                barrier.wait()
+                TicketRouter.assign(ticket)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=route, args=(ticket,)) for ticket in tickets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_simultaneous_tickets_spread_by_capacity(self):
+        self.route_concurrently(self.tickets)
+
+        assigned = Counter(
+            self.agents[user_id]
+            for user_id in SupportTicket.objects.values_list('assigned_to', flat=True)
+        )
+        self.assertEqual(assigned, {'double': 4, 'single_a': 2, 'single_b': 2})
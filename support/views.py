@@ -1,6 +1,5 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import Group
 from django.db.models import Q, F, Count
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
@@ -12,76 +11,23 @@ from .models import (
     SupportCategory, KnowledgeBaseArticle, ArticleFeedback,
     TrainingGuide, GuideProgress,
     SupportTicket, TicketMessage, TicketAttachment,
-    SupportRoutingRule, SupportSLAConfig, SLAEvent,
+    SupportSLAConfig, SLAEvent,
     OnboardingChecklist, OnboardingItem, UserOnboardingProgress,
     SupportModule
 )
+from .services.routing import TicketRouter
+from core.services.search import ANY, parse_terms, search
 
 
 # -----------------------------
 # Helpers: Routing + SLA
 # -----------------------------
-def _pick_least_loaded_agent(users_qs):
-    """
-    Pick agent with least open tickets assigned (rough load balancing).
-    """
-    users = list(users_qs)
-    if not users:
-        return None
-    # annotate load
-    best = None
-    best_count = None
-    for u in users:
-        c = SupportTicket.objects.filter(assigned_to=u, status__in=[
-            SupportTicket.Status.OPEN,
-            SupportTicket.Status.IN_PROGRESS,
-            SupportTicket.Status.WAITING_ON_USER,
-        ]).count()
-        if best is None or c < best_count:
-            best = u
-            best_count = c
-    return best
-
-
 def auto_assign_ticket(ticket: SupportTicket):
     """
-    Role-based routing:
-      - If module=CRM -> group "Support - CRM"
-      - Else module-specific group set in SupportRoutingRule
+    Role-based routing to the least-loaded agent of the module's group
+    (see support.services.routing).
     """
-    rule = SupportRoutingRule.objects.filter(module=ticket.module).first()
-
-    # Default conventions if rule not created
-    group_name = rule.group_name if rule else {
-        SupportModule.CRM: "Support - CRM",
-        SupportModule.TENDERS: "Support - Tenders",
-        SupportModule.LMS: "Support - LMS",
-        SupportModule.HR: "Support - HR",
-        SupportModule.FINANCE: "Support - Finance",
-    }.get(ticket.module, "Support - General")
-
-    group = Group.objects.filter(name=group_name).first()
-    if group:
-        agents = group.user_set.filter(is_active=True, is_staff=True)
-        assignee = _pick_least_loaded_agent(agents)
-        if assignee:
-            ticket.assigned_to = assignee
-            ticket.save(update_fields=["assigned_to", "updated_at"])
-            return
-
-    # fallback if group missing
-    if rule and rule.fallback_assignee:
-        ticket.assigned_to = rule.fallback_assignee
-        ticket.save(update_fields=["assigned_to", "updated_at"])
-        return
-
-    # last resort: any staff
-    any_staff = _pick_least_loaded_agent(
-        type(ticket.requester).objects.filter(is_staff=True, is_active=True)  # works with custom User
-    )
-    if any_staff:
-        ticket.assigned_to = any_staff
-        ticket.save(update_fields=["assigned_to", "updated_at"])
+    TicketRouter.assign(ticket)
 
 
 def apply_sla(ticket: SupportTicket):
@@ -125,18 +71,17 @@ def recommended_articles_for(module: str, category_slug: str | None, subject_hin
     if category_slug:
         mod_qs = mod_qs.filter(category__slug=category_slug)
 
-    # keyword/subject matching
+    # keyword/subject matching: any significant word, best text match first
+    ordering = ["-is_featured", "-helpful", "-view_count", "-updated_at"]
     if subject_hint:
-        tokens = [t.strip().lower() for t in subject_hint.split() if len(t.strip()) >= 4]
+        tokens = [t for t in parse_terms(subject_hint) if len(t) >= 4]
         if tokens:
-            kw_q = Q()
-            for t in tokens[:8]:
-                kw_q |= Q(title__icontains=t) | Q(summary__icontains=t) | Q(keywords__icontains=t)
-            mod_qs = mod_qs.filter(kw_q)
+            mod_qs = search(mod_qs, " ".join(tokens), match=ANY)
+            ordering.insert(0, "-search_rank")
 
     # rank: featured + view_count + helpful feedback ratio (approx)
     mod_qs = mod_qs.annotate(helpful=Count("feedback", filter=Q(feedback__is_helpful=True)))
-    return mod_qs.order_by("-is_featured", "-helpful", "-view_count", "-updated_at")[:6]
+    return mod_qs.order_by(*ordering)[:6]
 
 
 # -----------------------------
@@ -155,12 +100,7 @@ def help_center(request):
         articles = articles.filter(category__slug=category_slug)
 
     if query:
-        articles = articles.filter(
-            Q(title__icontains=query) |
-            Q(summary__icontains=query) |
-            Q(body__icontains=query) |
-            Q(category__name__icontains=query)
-        )
+        articles = search(articles, query)
 
     featured = KnowledgeBaseArticle.objects.filter(is_published=True, is_featured=True)[:6]
     recommended = recommended_articles_for(module=module, category_slug=category_slug or None, subject_hint=query or None)
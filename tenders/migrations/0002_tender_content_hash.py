@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tender',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Hash of the last scraped payload; unchanged re-scrapes are skipped', max_length=64),
+        ),
+    ]
@@ -364,6 +364,13 @@ class Tender(AuditedModel):
     notes = models.TextField(blank=True, help_text="Internal notes")
     tags = models.JSONField(default=list, blank=True, help_text="Tags for filtering")
     
+    # Scrape deduplication
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the last scraped payload; unchanged re-scrapes are skipped"
+    )
+    
     # Campus (optional multi-tenancy)
     campus = models.ForeignKey(
         'tenants.Campus',
@@ -5,6 +5,7 @@ Tender services package.
 from .base_scraper import BaseScraper, ScrapedTender
 from .beautifulsoup_scraper import BeautifulSoupScraper
 from .playwright_scraper import PlaywrightScraper, get_scraper
+from .scrape_orchestrator import ScrapeOrchestrator
 from .tender_service import TenderService
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     'BeautifulSoupScraper',
     'PlaywrightScraper',
     'get_scraper',
+    'ScrapeOrchestrator',
     'TenderService',
 ]
@@ -2,7 +2,10 @@
 Base scraper interface and utilities for tender scraping.
 """
 
+import hashlib
+import json
 import logging
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import date, datetime
@@ -64,6 +67,15 @@ class ScrapedTender:
             'eligibility_notes': self.eligibility_notes,
             'tags': self.tags,
         }
+    
+    def content_hash(self) -> str:
+        """SHA-256 of the scraped payload, used to skip unchanged re-scrapes."""
+        payload = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScrapeDeadlineExceeded(Exception):
+    """A scraper's deadline passed; it must stop making requests."""
 
 
 class BaseScraper(ABC):
@@ -84,6 +96,11 @@ class BaseScraper(ABC):
         self.base_url = source.base_url
         self.errors = []
         self.warnings = []
+        
+        # Optional DomainThrottle and time.monotonic() deadline, set by the
+        # ScrapeOrchestrator
+        self.throttle = None
+        self.deadline = None
     
     @abstractmethod
     def scrape(self) -> List[ScrapedTender]:
@@ -105,6 +122,42 @@ class BaseScraper(ABC):
         """
         pass
     
+    def time_left(self) -> Optional[float]:
+        """
+        Seconds until the deadline, or None without one.
+
+        Raises:
+            ScrapeDeadlineExceeded: The deadline has passed
+        """
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise ScrapeDeadlineExceeded(f"Scrape deadline passed for {self.source.name}")
+        return remaining
+    
+    def request_timeout(self, default: float) -> float:
+        """Timeout for one request: default, capped at the time left."""
+        remaining = self.time_left()
+        return default if remaining is None else min(default, remaining)
+    
+    def wait_for_turn(self, url: str) -> None:
+        """
+        Block until the per-domain politeness delay allows a request to url.
+        
+        Raises:
+            ScrapeDeadlineExceeded: The deadline has passed or would pass
+                before the request's turn
+        """
+        remaining = self.time_left()
+        if self.throttle:
+            self.throttle.wait(url, max_wait=remaining)
+    
+    async def async_wait_for_turn(self, url: str) -> None:
+        """Async variant of wait_for_turn for browser-based scrapers."""
+        if self.throttle:
+            await self.throttle.async_wait(url)
+    
     def get_selector(self, key: str, default: str = "") -> str:
         """Get a CSS selector from config."""
         selectors = self.config.get('selectors', {})
@@ -64,9 +64,10 @@ class BeautifulSoupScraper(BaseScraper):
         """Test if we can connect to the source."""
         try:
             list_url = self.config.get('list_url', self.base_url)
+            self.wait_for_turn(list_url)
             response = self.session.get(
                 list_url,
-                timeout=self.DEFAULT_TIMEOUT
+                timeout=self.request_timeout(self.DEFAULT_TIMEOUT)
             )
             response.raise_for_status()
             return True
@@ -130,7 +131,8 @@ class BeautifulSoupScraper(BaseScraper):
         tenders = []
         
         try:
-            response = self.session.get(url, timeout=self.DEFAULT_TIMEOUT)
+            self.wait_for_turn(url)
+            response = self.session.get(url, timeout=self.request_timeout(self.DEFAULT_TIMEOUT))
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -229,7 +231,8 @@ class BeautifulSoupScraper(BaseScraper):
         details = {}
         
         try:
-            response = self.session.get(url, timeout=self.DEFAULT_TIMEOUT)
+            self.wait_for_turn(url)
+            response = self.session.get(url, timeout=self.request_timeout(self.DEFAULT_TIMEOUT))
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -54,6 +54,7 @@ class PlaywrightScraper(BaseScraper):
     """
     
     DEFAULT_TIMEOUT = 30000  # 30 seconds
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     
     def __init__(self, source):
         super().__init__(source)
@@ -83,6 +84,7 @@ class PlaywrightScraper(BaseScraper):
                 page = await browser.new_page()
                 list_url = self.config.get('list_url', self.base_url)
                 
+                await self.async_wait_for_turn(list_url)
                 await page.goto(list_url, timeout=self.DEFAULT_TIMEOUT)
                 
                 # Wait for content selector if configured
@@ -115,9 +117,7 @@ class PlaywrightScraper(BaseScraper):
             return []
     
     async def _async_scrape(self) -> List[ScrapedTender]:
-        """Async scraping implementation."""
-        tenders = []
-        
+        """Async scraping implementation with a dedicated browser."""
         async with async_playwright() as p:
             # Launch browser
             browser_config = self.config.get('browser', {})
@@ -130,45 +130,67 @@ class PlaywrightScraper(BaseScraper):
                 viewport = browser_config.get('viewport', {'width': 1920, 'height': 1080})
                 context = await browser.new_context(
                     viewport=viewport,
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                    user_agent=self.USER_AGENT
                 )
-                
-                page = await context.new_page()
-                page.set_default_timeout(browser_config.get('timeout', self.DEFAULT_TIMEOUT))
-                
-                # Handle authentication if needed
-                auth_config = self.config.get('auth', {})
-                if auth_config:
-                    await self._handle_auth(page, auth_config)
-                
-                # Navigate to listing page
-                list_url = self.config.get('list_url', self.base_url)
-                await page.goto(list_url)
-                
-                # Wait for content to load
-                wait_for = self.config.get('wait_for')
-                if wait_for:
-                    await page.wait_for_selector(wait_for, timeout=15000)
-                
-                # Handle pagination
-                pagination = self.config.get('pagination', {'type': 'none'})
-                
-                if pagination.get('type') == 'none':
-                    tenders.extend(await self._scrape_page(page))
-                
-                elif pagination.get('type') == 'load_more':
-                    tenders.extend(await self._scrape_with_load_more(page, pagination))
-                
-                elif pagination.get('type') == 'scroll':
-                    tenders.extend(await self._scrape_with_infinite_scroll(page, pagination))
-                
-                elif pagination.get('type') == 'page':
-                    tenders.extend(await self._scrape_with_pagination(page, pagination))
-                
-                logger.info(f"Scraped {len(tenders)} tenders from {self.source.name}")
-                
+                return await self.scrape_in_context(context)
             finally:
                 await browser.close()
+    
+    async def async_scrape_with_context(self, context) -> List[ScrapedTender]:
+        """
+        Scrape using a browser context owned by the caller (e.g. a BrowserPool).
+        Errors are recorded on the scraper, matching scrape().
+        """
+        try:
+            return await self.scrape_in_context(context)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log_error(f"Scrape failed: {str(e)}")
+            return []
+    
+    async def scrape_in_context(self, context) -> List[ScrapedTender]:
+        """Scrape the source in an existing browser context."""
+        tenders = []
+        browser_config = self.config.get('browser', {})
+        
+        page = await context.new_page()
+        try:
+            page.set_default_timeout(browser_config.get('timeout', self.DEFAULT_TIMEOUT))
+            
+            # Handle authentication if needed
+            auth_config = self.config.get('auth', {})
+            if auth_config:
+                await self._handle_auth(page, auth_config)
+            
+            # Navigate to listing page
+            list_url = self.config.get('list_url', self.base_url)
+            await self.async_wait_for_turn(list_url)
+            await page.goto(list_url)
+            
+            # Wait for content to load
+            wait_for = self.config.get('wait_for')
+            if wait_for:
+                await page.wait_for_selector(wait_for, timeout=15000)
+            
+            # Handle pagination
+            pagination = self.config.get('pagination', {'type': 'none'})
+            
+            if pagination.get('type') == 'none':
+                tenders.extend(await self._scrape_page(page))
+            
+            elif pagination.get('type') == 'load_more':
+                tenders.extend(await self._scrape_with_load_more(page, pagination))
+            
+            elif pagination.get('type') == 'scroll':
+                tenders.extend(await self._scrape_with_infinite_scroll(page, pagination))
+            
+            elif pagination.get('type') == 'page':
+                tenders.extend(await self._scrape_with_pagination(page, pagination))
+            
+            logger.info(f"Scraped {len(tenders)} tenders from {self.source.name}")
+        finally:
+            await page.close()
         
         return tenders
     
@@ -177,6 +199,7 @@ class PlaywrightScraper(BaseScraper):
         if auth_config.get('type') == 'form':
             login_url = auth_config.get('login_url')
             if login_url:
+                await self.async_wait_for_turn(login_url)
                 await page.goto(login_url)
                 
                 # Fill login form
@@ -303,6 +326,7 @@ class PlaywrightScraper(BaseScraper):
                 if not load_more or not await load_more.is_visible():
                     break
                 
+                await self.async_wait_for_turn(page.url)
                 await load_more.click()
                 await page.wait_for_load_state('networkidle')
                 await asyncio.sleep(1)  # Brief pause for content
@@ -356,6 +380,7 @@ class PlaywrightScraper(BaseScraper):
                     if not next_btn or not await next_btn.is_visible():
                         break
                     
+                    await self.async_wait_for_turn(page.url)
                     await next_btn.click()
                     await page.wait_for_load_state('networkidle')
                     
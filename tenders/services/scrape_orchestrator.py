@@ -0,0 +1,292 @@
+"""
+Concurrent scrape orchestration for multiple tender sources.
+
+Runs sources concurrently under a global limit, shares a small pool of
+long-lived headless browser contexts between Playwright sources, enforces a
+per-domain politeness delay and applies a per-source timeout so one hung
+portal can't stall the run.
+
+Browser scrapes are cancelled at their timeout. Blocking (requests) scrapes
+can't be cancelled, so they run on the orchestrator's own thread pool with
+a deadline that the scraper checks before every request and caps every
+request timeout with. An abandoned thread therefore stops at its next
+request and no longer takes throttle slots. The pool is shut down without
+waiting, so the run returns at the timeout. The pool has `concurrency`
+workers, so abandoned threads still count towards the limit until they stop.
+
+The scrape phase never touches the database, so it can be exercised offline
+against saved HTML pages served by a local HTTP server. Ingestion happens
+afterwards, synchronously, in TenderService.run_scrapes.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from .base_scraper import ScrapeDeadlineExceeded, ScrapedTender
+from .playwright_scraper import PLAYWRIGHT_AVAILABLE, PlaywrightScraper, get_scraper
+
+logger = logging.getLogger(__name__)
+
+if PLAYWRIGHT_AVAILABLE:
+    from playwright.async_api import async_playwright
+
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BROWSER_POOL_SIZE = 2
+DEFAULT_DOMAIN_DELAY = 2.0  # seconds between requests to one domain
+DEFAULT_SOURCE_TIMEOUT = 300  # seconds per source
+
+
+class DomainThrottle:
+    """
+    Per-domain politeness delay shared by sync (thread) and async scrapers.
+    Each request reserves the next free slot for its domain, so concurrent
+    callers queue up instead of bursting.
+    """
+
+    def __init__(self, delay: float = DEFAULT_DOMAIN_DELAY, overrides: Optional[Dict[str, float]] = None):
+        self.delay = delay
+        self.overrides = overrides or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, url: str, max_wait: Optional[float] = None) -> float:
+        """
+        Reserve a request slot for url's domain; returns seconds to wait.
+
+        Raises:
+            ScrapeDeadlineExceeded: The slot is more than max_wait away
+                (nothing is reserved)
+        """
+        domain = urlparse(url).netloc.lower()
+        delay = self.overrides.get(domain, self.delay)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            if max_wait is not None and slot - now > max_wait:
+                raise ScrapeDeadlineExceeded(f"No request slot for {domain} before the deadline")
+            self._next_slot[domain] = slot + delay
+        return slot - now
+
+    def wait(self, url: str, max_wait: Optional[float] = None) -> None:
+        wait_seconds = self._reserve(url, max_wait)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def async_wait(self, url: str) -> None:
+        wait_seconds = self._reserve(url)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+
+class BrowserPool:
+    """
+    A single headless browser with up to `size` reusable contexts.
+    Contexts are created lazily and handed out one scrape at a time.
+    """
+
+    def __init__(self, size: int = DEFAULT_BROWSER_POOL_SIZE, headless: bool = True):
+        self.size = size
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._created = 0
+        self._create_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        self._idle = asyncio.Queue()
+        self._create_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if self._browser:
+                await self._browser.close()
+        finally:
+            if self._playwright:
+                await self._playwright.stop()
+
+    async def _new_context(self):
+        return await self._browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=PlaywrightScraper.USER_AGENT,
+        )
+
+    @asynccontextmanager
+    async def context(self):
+        """Borrow a browser context; cookies are cleared when it's returned."""
+        ctx = None
+        async with self._create_lock:
+            if self._idle.empty() and self._created < self.size:
+                ctx = await self._new_context()
+                self._created += 1
+        if ctx is None:
+            ctx = await self._idle.get()
+
+        healthy = True
+        try:
+            yield ctx
+        except BaseException:
+            # Cancelled/timed-out scrapes may leave pages mid-navigation
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                try:
+                    await ctx.clear_cookies()
+                except Exception:
+                    healthy = False
+            if healthy:
+                self._idle.put_nowait(ctx)
+            else:
+                await self._replace_context(ctx)
+
+    async def _replace_context(self, ctx):
+        """Close a context that may be in a bad state and pool a fresh one."""
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+        try:
+            self._idle.put_nowait(await self._new_context())
+        except Exception as e:
+            logger.warning(f"Could not replace browser context: {str(e)}")
+            self._created -= 1
+
+
+@dataclass
+class SourceScrapeResult:
+    """Outcome of scraping one source (before ingestion)."""
+    source: object
+    tenders: List[ScrapedTender] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    status_message: str = ''
+    timed_out: bool = False
+    duration: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.errors and not self.timed_out
+
+
+class ScrapeOrchestrator:
+    """
+    Scrape many TenderSources concurrently.
+
+    Settings (all optional):
+        TENDER_SCRAPE_CONCURRENCY: Max sources scraped at once
+        TENDER_BROWSER_POOL_SIZE: Browser contexts shared by Playwright sources
+        TENDER_SCRAPE_DOMAIN_DELAY: Seconds between requests to one domain
+        TENDER_SCRAPE_SOURCE_TIMEOUT: Seconds before a source is abandoned
+
+    Per-source scrape_config overrides:
+        politeness_delay: Seconds between requests to this source's domain
+        timeout_seconds: Timeout for this source
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        domain_delay: Optional[float] = None,
+        source_timeout: Optional[float] = None,
+    ):
+        self.concurrency = concurrency or getattr(settings, 'TENDER_SCRAPE_CONCURRENCY', DEFAULT_CONCURRENCY)
+        self.pool_size = pool_size or getattr(settings, 'TENDER_BROWSER_POOL_SIZE', DEFAULT_BROWSER_POOL_SIZE)
+        self.domain_delay = (
+            domain_delay if domain_delay is not None
+            else getattr(settings, 'TENDER_SCRAPE_DOMAIN_DELAY', DEFAULT_DOMAIN_DELAY)
+        )
+        self.source_timeout = source_timeout or getattr(
+            settings, 'TENDER_SCRAPE_SOURCE_TIMEOUT', DEFAULT_SOURCE_TIMEOUT
+        )
+
+    def scrape(self, sources) -> List[SourceScrapeResult]:
+        """Scrape all sources; blocks until every source finished or timed out."""
+        return asyncio.run(self.scrape_async(list(sources)))
+
+    async def scrape_async(self, sources) -> List[SourceScrapeResult]:
+        throttle = DomainThrottle(self.domain_delay, self._domain_overrides(sources))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        scrapers = [(source, get_scraper(source)) for source in sources]
+        for _, scraper in scrapers:
+            scraper.throttle = throttle
+
+        # Not the loop's default executor: asyncio.run() would wait for it
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='tender-scrape')
+        try:
+            needs_browser = any(isinstance(scraper, PlaywrightScraper) for _, scraper in scrapers)
+            if needs_browser:
+                async with BrowserPool(size=self.pool_size) as pool:
+                    return await asyncio.gather(*[
+                        self._run_source(source, scraper, semaphore, pool, executor)
+                        for source, scraper in scrapers
+                    ])
+
+            return await asyncio.gather(*[
+                self._run_source(source, scraper, semaphore, None, executor)
+                for source, scraper in scrapers
+            ])
+        finally:
+            # Abandoned scrapes stop at their next request; don't wait for them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_source(self, source, scraper, semaphore, pool, executor) -> SourceScrapeResult:
+        result = SourceScrapeResult(source=source)
+        timeout = (source.scrape_config or {}).get('timeout_seconds', self.source_timeout)
+
+        async with semaphore:
+            started = time.monotonic()
+            scraper.deadline = started + timeout
+            try:
+                result.tenders = await asyncio.wait_for(
+                    self._scrape_source(scraper, pool, executor), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                scraper.log_error(f"Scrape timed out after {timeout}s")
+            except Exception as e:
+                scraper.log_error(f"Scrape failed: {str(e)}")
+            result.duration = time.monotonic() - started
+
+        result.errors = list(scraper.errors)
+        result.status_message = scraper.get_status_message()
+        logger.info(
+            f"Scraped {source.name}: {len(result.tenders)} tenders in {result.duration:.1f}s"
+            + (" (timed out)" if result.timed_out else "")
+        )
+        return result
+
+    async def _scrape_source(self, scraper, pool, executor) -> List[ScrapedTender]:
+        if isinstance(scraper, PlaywrightScraper) and pool is not None:
+            async with pool.context() as ctx:
+                return await scraper.async_scrape_with_context(ctx)
+
+        # requests-based scrapers are blocking; run them off the event loop
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(executor, scraper.test_connection):
+            return []
+        return await loop.run_in_executor(executor, scraper.scrape)
+
+    @staticmethod
+    def _domain_overrides(sources) -> Dict[str, float]:
+        overrides = {}
+        for source in sources:
+            delay = (source.scrape_config or {}).get('politeness_delay')
+            if delay is not None:
+                url = (source.scrape_config or {}).get('list_url') or source.base_url
+                overrides[urlparse(url).netloc.lower()] = float(delay)
+        return overrides
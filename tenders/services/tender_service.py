@@ -3,9 +3,10 @@ Tender service for orchestrating scraping and tender management.
 """
 
 import logging
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from django.db import transaction
 from django.db.models import Sum, Avg, Count, Q
@@ -21,11 +22,41 @@ from .base_scraper import ScrapedTender
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class IngestResult:
+    """Counts from ingesting one batch of scraped tenders."""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    
+    def __str__(self):
+        return (
+            f"{self.created} new, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.failed} failed"
+        )
+
+
 class TenderService:
     """
     Service class for managing tenders and scraping operations.
     """
     
+    # Scraped fields that refresh an existing tender (model_field, data_field)
+    UPDATE_FIELD_MAPPINGS = [
+        ('title', 'title'),
+        ('description', 'description'),
+        ('closing_date', 'closing_date'),
+        ('published_date', 'published_date'),
+        ('opening_date', 'opening_date'),
+        ('estimated_value', 'estimated_value'),
+        ('funder', 'funder'),
+        ('region', 'region'),
+    ]
+    
+    # Rows per existence query / bulk write
+    INGEST_BATCH_SIZE = 500
+    
     @staticmethod
     def run_scrape(source: TenderSource, campus=None) -> Tuple[int, int, str]:
         """
@@ -55,29 +86,81 @@ class TenderService:
             return 0, 0, scraper.get_status_message()
         
         # Process scraped tenders
-        new_count, updated_count = TenderService._process_scraped_tenders(
-            source, scraped_tenders, campus
-        )
+        result = TenderService._process_scraped_tenders(source, scraped_tenders, campus)
         
         # Mark source as scraped
         source.mark_scraped(
             tenders_found=len(scraped_tenders),
             success=True,
-            message=f"Found {len(scraped_tenders)}, {new_count} new, {updated_count} updated"
+            message=f"Found {len(scraped_tenders)}, {result}"
         )
         
-        logger.info(f"Completed scrape for {source.name}: {new_count} new, {updated_count} updated")
+        logger.info(f"Completed scrape for {source.name}: {result}")
         
-        return new_count, updated_count, scraper.get_status_message()
+        return result.created, result.updated, scraper.get_status_message()
+    
+    @staticmethod
+    def run_scrapes(sources, campus=None) -> List[dict]:
+        """
+        Scrape several sources concurrently, then ingest each one's tenders.
+        
+        Scraping runs through the ScrapeOrchestrator (global concurrency
+        limit, shared browser pool, per-domain delays, per-source timeout);
+        ingestion and source bookkeeping happen afterwards in this thread.
+        
+        Args:
+            sources: Iterable of TenderSource instances
+            campus: Optional campus for tenant-aware tenders
+            
+        Returns:
+            List of per-source result dicts
+        """
+        from .scrape_orchestrator import ScrapeOrchestrator
+        
+        summary = []
+        for scrape in ScrapeOrchestrator().scrape(sources):
+            source = scrape.source
+            
+            if not scrape.success:
+                source.mark_scraped(0, success=False, message=scrape.status_message)
+                summary.append({
+                    'status': 'error',
+                    'source': source.name,
+                    'timed_out': scrape.timed_out,
+                    'message': scrape.status_message,
+                })
+                continue
+            
+            result = TenderService._process_scraped_tenders(source, scrape.tenders, campus)
+            source.mark_scraped(
+                tenders_found=len(scrape.tenders),
+                success=True,
+                message=f"Found {len(scrape.tenders)}, {result}"
+            )
+            summary.append({
+                'status': 'success',
+                'source': source.name,
+                'new_tenders': result.created,
+                'updated_tenders': result.updated,
+                'unchanged_tenders': result.unchanged,
+                'duration_seconds': round(scrape.duration, 1),
+                'message': scrape.status_message,
+            })
+        
+        return summary
     
     @staticmethod
     def _process_scraped_tenders(
         source: TenderSource,
         scraped: List[ScrapedTender],
         campus=None
-    ) -> Tuple[int, int]:
+    ) -> IngestResult:
         """
-        Process scraped tenders into the database.
+        Process scraped tenders into the database in bulk.
+        
+        Existing tenders for each batch are loaded with one query, compared
+        in memory and written with bulk_create/bulk_update. Tenders whose
+        content hash matches the stored one are skipped without any write.
         
         Args:
             source: TenderSource these came from
@@ -85,34 +168,139 @@ class TenderService:
             campus: Optional campus for tenant-aware tenders
             
         Returns:
-            Tuple of (new_count, updated_count)
+            IngestResult with created/updated/unchanged/failed counts
         """
-        new_count = 0
-        updated_count = 0
-        
+        # De-duplicate within the scrape - the last listing of a reference wins
+        unique: Dict[str, ScrapedTender] = {}
         for tender_data in scraped:
+            unique.pop(tender_data.reference_number, None)
+            unique[tender_data.reference_number] = tender_data
+        batch = list(unique.values())
+        
+        result = IngestResult()
+        size = TenderService.INGEST_BATCH_SIZE
+        for i in range(0, len(batch), size):
+            chunk = batch[i:i + size]
+            try:
+                with transaction.atomic():
+                    chunk_result = TenderService._ingest_batch(source, chunk, campus)
+            except Exception as e:
+                logger.warning(
+                    f"Bulk ingest failed for {source.name} ({str(e)}), retrying row by row"
+                )
+                chunk_result = TenderService._ingest_rows(source, chunk, campus)
+            
+            result.created += chunk_result.created
+            result.updated += chunk_result.updated
+            result.unchanged += chunk_result.unchanged
+            result.failed += chunk_result.failed
+        
+        return result
+    
+    @staticmethod
+    def _ingest_batch(
+        source: TenderSource,
+        batch: List[ScrapedTender],
+        campus=None
+    ) -> IngestResult:
+        """Diff and write one batch with a single read and bulk writes."""
+        result = IngestResult()
+        mapped_fields = [model_field for model_field, _ in TenderService.UPDATE_FIELD_MAPPINGS]
+        
+        existing = {
+            tender.reference_number: tender
+            for tender in Tender.objects.filter(
+                source=source,
+                reference_number__in=[data.reference_number for data in batch]
+            ).only('id', 'reference_number', 'content_hash', *mapped_fields)
+        }
+        
+        to_create = []
+        to_update = []
+        changed_fields = set()
+        for data in batch:
+            content_hash = data.content_hash()
+            tender = existing.get(data.reference_number)
+            
+            if tender is None:
+                tender = Tender(
+                    source=source,
+                    segment=source.default_segment,
+                    campus=campus,
+                    content_hash=content_hash,
+                    **data.to_dict()
+                )
+                to_create.append(tender)
+                continue
+            
+            if tender.content_hash == content_hash:
+                result.unchanged += 1
+                continue
+            
+            fields = TenderService._apply_scraped_fields(tender, data)
+            tender.content_hash = content_hash
+            to_update.append(tender)
+            changed_fields.update(fields)
+            if fields:
+                result.updated += 1
+            else:
+                result.unchanged += 1
+        
+        if to_create:
+            Tender.objects.bulk_create(to_create)
+            TenderNote.objects.bulk_create([
+                TenderNote(
+                    tender=tender,
+                    note_type='SYSTEM',
+                    content=f"Tender discovered from {source.name}",
+                    new_status='DISCOVERED'
+                )
+                for tender in to_create
+            ])
+            result.created = len(to_create)
+        
+        if to_update:
+            now = timezone.now()
+            for tender in to_update:
+                tender.updated_at = now
+            Tender.objects.bulk_update(
+                to_update,
+                sorted(changed_fields) + ['content_hash', 'updated_at']
+            )
+        
+        return result
+    
+    @staticmethod
+    def _ingest_rows(
+        source: TenderSource,
+        batch: List[ScrapedTender],
+        campus=None
+    ) -> IngestResult:
+        """Row-by-row fallback so one bad tender can't sink its whole batch."""
+        result = IngestResult()
+        
+        for tender_data in batch:
             try:
                 with transaction.atomic():
-                    # Check if tender already exists
                     existing = Tender.objects.filter(
                         reference_number=tender_data.reference_number,
                         source=source
                     ).first()
                     
                     if existing:
-                        # Update existing tender
-                        updated = TenderService._update_tender(existing, tender_data)
-                        if updated:
-                            updated_count += 1
+                        if TenderService._update_tender(existing, tender_data):
+                            result.updated += 1
+                        else:
+                            result.unchanged += 1
                     else:
-                        # Create new tender
                         TenderService._create_tender(source, tender_data, campus)
-                        new_count += 1
+                        result.created += 1
                         
             except Exception as e:
+                result.failed += 1
                 logger.error(f"Failed to process tender {tender_data.reference_number}: {str(e)}")
         
-        return new_count, updated_count
+        return result
     
     @staticmethod
     def _create_tender(source: TenderSource, data: ScrapedTender, campus=None) -> Tender:
@@ -121,6 +309,7 @@ class TenderService:
             source=source,
             segment=source.default_segment,
             campus=campus,
+            content_hash=data.content_hash(),
             **data.to_dict()
         )
         tender.save()
@@ -141,32 +330,31 @@ class TenderService:
         Update an existing tender with new scraped data.
         Returns True if any fields were updated.
         """
-        updated = False
-        update_fields = []
+        update_fields = TenderService._apply_scraped_fields(tender, data)
         
-        # Update fields that might have changed
-        field_mappings = [
-            ('title', 'title'),
-            ('description', 'description'),
-            ('closing_date', 'closing_date'),
-            ('published_date', 'published_date'),
-            ('opening_date', 'opening_date'),
-            ('estimated_value', 'estimated_value'),
-            ('funder', 'funder'),
-            ('region', 'region'),
-        ]
+        content_hash = data.content_hash()
+        if update_fields or tender.content_hash != content_hash:
+            tender.content_hash = content_hash
+            tender.save(update_fields=update_fields + ['content_hash', 'updated_at'])
         
-        for model_field, data_field in field_mappings:
+        return bool(update_fields)
+    
+    @staticmethod
+    def _apply_scraped_fields(tender: Tender, data: ScrapedTender) -> List[str]:
+        """
+        Copy changed scraped values onto a tender (without saving).
+        Empty scraped values never overwrite existing data.
+        Returns the list of model fields that changed.
+        """
+        update_fields = []
+        
+        for model_field, data_field in TenderService.UPDATE_FIELD_MAPPINGS:
             new_value = getattr(data, data_field)
             if new_value and getattr(tender, model_field) != new_value:
                 setattr(tender, model_field, new_value)
                 update_fields.append(model_field)
-                updated = True
-        
-        if updated:
-            tender.save(update_fields=update_fields)
         
-        return updated
+        return update_fields
     
     @staticmethod
     def update_all_probabilities():
@@ -71,33 +71,29 @@ def scrape_all_sources():
     """
     Scrape all active tender sources that are due for a scrape.
     Should be scheduled to run hourly via Celery Beat.
+    
+    Sources are scraped concurrently in this task (see ScrapeOrchestrator)
+    so Playwright sources share one browser instead of launching their own.
     """
     from .models import TenderSource
+    from .services import TenderService
     
     now = timezone.now()
     
     # Get sources due for scraping
-    sources = TenderSource.objects.filter(
+    sources = list(TenderSource.objects.filter(
         status='ACTIVE',
     ).filter(
         # Never scraped, or next scrape time has passed
         models.Q(next_scrape_at__isnull=True) |
         models.Q(next_scrape_at__lte=now)
-    )
+    ).select_related('default_segment'))
     
-    logger.info(f"Found {sources.count()} sources due for scraping")
+    logger.info(f"Found {len(sources)} sources due for scraping")
     
-    results = []
-    for source in sources:
-        # Queue each source as a separate task
-        task = scrape_tender_source.delay(source.id)
-        results.append({
-            'source_id': source.id,
-            'source_name': source.name,
-            'task_id': task.id,
-        })
+    results = TenderService.run_scrapes(sources) if sources else []
     
-    return {'queued': len(results), 'sources': results}
+    return {'scraped': len(results), 'sources': results}
 
 
 @shared_task
@@ -0,0 +1,128 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from django.test import SimpleTestCase
+
+from tenders.models import TenderSource
+from tenders.services.base_scraper import ScrapeDeadlineExceeded
+from tenders.services.scrape_orchestrator import DomainThrottle, ScrapeOrchestrator
+
+LISTING = """
+<html><body><ul>
+  <li class="tender">
+    <span class="ref">{prefix}-001</span><a class="title" href="/tenders/1">Learnership facilitation</a>
+    <span class="closing">15/11/2026</span><span class="value">R 1 250 000.00</span>
+  </li>
+  <li class="tender">
+    <span class="ref">{prefix}-002</span><a class="title" href="/tenders/2">Skills audit</a>
+    <span class="closing">2026-12-01</span><span class="value">R 80 000</span>
+  </li>
+</ul></body></html>
+"""
+
+SELECTORS = {
+    'tender_list': 'li.tender',
+    'reference': '.ref',
+    'title': '.title',
+    'detail_link': '.title',
+    'closing_date': '.closing',
+    'value': '.value',
+}
+
+SLOW_PAGE_SECONDS = 0.3
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    """Saved tender listings: /fast answers at once, every /slow page takes SLOW_PAGE_SECONDS."""
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        self.server.requests.append((time.monotonic(), path))
+        if path.startswith('/slow'):
+            time.sleep(SLOW_PAGE_SECONDS)
+        body = LISTING.format(prefix=path.strip('/').split('/')[0].upper()).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The scraper gave up on this page
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ScrapeOrchestratorTests(SimpleTestCase):
+    """Scrapes run against a local HTTP server; nothing leaves the machine."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), PortalHandler)
+        cls.server.daemon_threads = True
+        cls.server.requests = []
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests.clear()
+
+    def source(self, name, **config):
+        return TenderSource(
+            name=name,
+            slug=name,
+            base_url=self.base_url,
+            scraper_type='BEAUTIFULSOUP',
+            scrape_config={'list_url': f'{self.base_url}/{name}/tenders', 'selectors': SELECTORS, **config},
+        )
+
+    def test_scrapes_saved_listing(self):
+        results = ScrapeOrchestrator(domain_delay=0).scrape([self.source('fast')])
+
+        result = results[0]
+        self.assertTrue(result.success, result.errors)
+        self.assertEqual([t.reference_number for t in result.tenders], ['FAST-001', 'FAST-002'])
+        first = result.tenders[0]
+        self.assertEqual(first.source_url, f'{self.base_url}/tenders/1')
+        self.assertEqual(str(first.closing_date), '2026-11-15')
+        self.assertEqual(str(first.estimated_value), '1250000.00')
+
+    def test_timed_out_source_is_abandoned_without_waiting(self):
+        slow = self.source(
+            'slow', timeout_seconds=1, pagination={'type': 'page', 'param': 'page', 'max_pages': 50},
+        )
+
+        started = time.monotonic()
+        with self.assertLogs('tenders.services', 'ERROR'):
+            results = ScrapeOrchestrator(domain_delay=0).scrape([slow, self.source('fast')])
+            elapsed = time.monotonic() - started
+            # Let the abandoned thread reach its next request
+            time.sleep(2 * SLOW_PAGE_SECONDS)
+
+        slow_result, fast_result = results
+        self.assertTrue(slow_result.timed_out)
+        self.assertEqual(len(fast_result.tenders), 2)
+        self.assertLess(elapsed, 1 + SLOW_PAGE_SECONDS)
+
+        # It made no request after its deadline
+        last_request = max(at for at, path in self.server.requests if path.startswith('/slow'))
+        self.assertLess(last_request, started + 1 + 0.1)
+
+    def test_throttle_refuses_slots_past_the_deadline(self):
+        throttle = DomainThrottle(delay=5)
+        throttle.wait(f'{self.base_url}/a')
+
+        with self.assertRaises(ScrapeDeadlineExceeded):
+            throttle.wait(f'{self.base_url}/b', max_wait=1)
+        # Nothing was reserved for the refused request
+        self.assertLessEqual(throttle._reserve(f'{self.base_url}/c'), 5)
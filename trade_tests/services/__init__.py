@@ -0,0 +1 @@
+# Trade tests services package
@@ -0,0 +1,256 @@
+"""
+Trade Test Scheduling
+
+Packs bookings awaiting a schedule into centre/date sessions without
+exceeding:
+- TradeTestCentre.max_daily_capacity (all trades at the centre that day)
+- TradeTestCentreCapability.max_candidates_per_session (one session per
+  trade per day)
+and never before the capability's next_available_date.
+
+allocate_slots is a pure function over plain data so the packing can be
+tested without a database. TradeTestScheduler loads capacity with a few
+grouped queries, bulk-updates the bookings and their applications, and
+queues a single notification job for everything it scheduled (the bulk
+update bypasses the per-booking notify_schedule_set signal).
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Furthest ahead of the requested start date a booking will be placed
+DEFAULT_HORIZON_DAYS = 90
+
+# Bookings in these states hold a seat on their scheduled date
+SEAT_HOLDING_STATUSES = ['CONFIRMED', 'RESCHEDULED']
+
+
+@dataclass
+class BookingRequest:
+    booking_id: int
+    centre_id: Optional[int]
+    trade_id: int
+
+
+@dataclass
+class TradeCapacity:
+    session_capacity: int
+    next_available_date: Optional[date] = None
+    booked: Dict[date, int] = field(default_factory=dict)
+
+
+@dataclass
+class CentreCapacity:
+    daily_capacity: int
+    booked: Dict[date, int] = field(default_factory=dict)
+    trades: Dict[int, TradeCapacity] = field(default_factory=dict)
+
+
+@dataclass
+class AllocationResult:
+    # booking_id -> (centre_id, date)
+    assigned: Dict[int, Tuple[int, date]] = field(default_factory=dict)
+    # booking_id -> reason it could not be placed
+    unassigned: Dict[int, str] = field(default_factory=dict)
+
+
+def _test_days(start: date, horizon_days: int, weekdays_only: bool):
+    for offset in range(horizon_days + 1):
+        day = start + timedelta(days=offset)
+        if weekdays_only and day.weekday() >= 5:
+            continue
+        yield day
+
+
+def allocate_slots(
+    requests: List[BookingRequest],
+    centres: Dict[int, CentreCapacity],
+    start_date: date,
+    horizon_days: int = DEFAULT_HORIZON_DAYS,
+    weekdays_only: bool = True,
+) -> AllocationResult:
+    """
+    Assign each booking the earliest day its centre and trade session have room.
+
+    Bookings are placed in the order given (first come, first served).
+    The capacity structures are updated in place as seats are taken.
+
+    Args:
+        requests: Bookings to place
+        centres: Capacity per centre id, with per-trade session capacity
+        start_date: Earliest date to schedule
+        horizon_days: Days after start_date to search
+        weekdays_only: Skip Saturdays and Sundays
+
+    Returns:
+        AllocationResult
+    """
+    result = AllocationResult()
+
+    for request in requests:
+        centre = centres.get(request.centre_id)
+        if centre is None:
+            result.unassigned[request.booking_id] = 'No test centre on the booking'
+            continue
+        trade = centre.trades.get(request.trade_id)
+        if trade is None:
+            result.unassigned[request.booking_id] = 'Centre does not test this trade'
+            continue
+
+        earliest = max(start_date, trade.next_available_date or start_date)
+        last_day = start_date + timedelta(days=horizon_days)
+        for day in _test_days(earliest, (last_day - earliest).days, weekdays_only):
+            if centre.booked.get(day, 0) >= centre.daily_capacity:
+                continue
+            if trade.booked.get(day, 0) >= trade.session_capacity:
+                continue
+            centre.booked[day] = centre.booked.get(day, 0) + 1
+            trade.booked[day] = trade.booked.get(day, 0) + 1
+            result.assigned[request.booking_id] = (request.centre_id, day)
+            break
+        else:
+            result.unassigned[request.booking_id] = f'No capacity within {horizon_days} days'
+
+    return result
+
+
+class TradeTestScheduler:
+    """
+    Capacity-aware bulk scheduling of trade test bookings.
+    """
+
+    @staticmethod
+    def load_capacity(requests: List[BookingRequest], start_date: date, end_date: date) -> Dict[int, CentreCapacity]:
+        """
+        Capacity for the centres and trades in the requests, with seats
+        already taken between start_date and end_date.
+
+        Centre rows are locked (inside the caller's transaction) so two
+        schedulers cannot hand out the same seats.
+        """
+        from trade_tests.models import TradeTestBooking, TradeTestCentre, TradeTestCentreCapability
+
+        centre_ids = {r.centre_id for r in requests if r.centre_id}
+        trade_ids = {r.trade_id for r in requests}
+
+        centres = {
+            centre_id: CentreCapacity(daily_capacity=capacity)
+            for centre_id, capacity in TradeTestCentre.objects.select_for_update().filter(
+                pk__in=centre_ids, is_active=True
+            ).values_list('id', 'max_daily_capacity')
+        }
+
+        for centre_id, trade_id, session_capacity, next_available in TradeTestCentreCapability.objects.filter(
+            centre_id__in=list(centres), trade_id__in=trade_ids, is_active=True
+        ).values_list('centre_id', 'trade_id', 'max_candidates_per_session', 'next_available_date'):
+            centres[centre_id].trades[trade_id] = TradeCapacity(session_capacity, next_available)
+
+        taken = TradeTestBooking.objects.filter(
+            centre_id__in=list(centres),
+            scheduled_date__range=(start_date, end_date),
+            status__in=SEAT_HOLDING_STATUSES,
+        ).values('centre_id', 'trade_id', 'scheduled_date').annotate(seats=Count('id')).order_by()
+
+        for row in taken:
+            centre = centres[row['centre_id']]
+            day = row['scheduled_date']
+            centre.booked[day] = centre.booked.get(day, 0) + row['seats']
+            trade = centre.trades.get(row['trade_id'])
+            if trade is not None:
+                trade.booked[day] = trade.booked.get(day, 0) + row['seats']
+
+        return centres
+
+    @staticmethod
+    def schedule(
+        booking_ids: List[int],
+        start_date: date,
+        scheduled_time: Optional[time] = None,
+        namb_reference: str = '',
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ) -> AllocationResult:
+        """
+        Schedule bookings awaiting a date into the earliest sessions with room.
+
+        Confirmed bookings get their date, time and NAMB reference in one
+        bulk update; their applications move to SCHEDULED; one notification
+        job is queued for all of them.
+
+        Args:
+            booking_ids: Bookings selected for scheduling
+            start_date: Earliest test date
+            scheduled_time: Session start time
+            namb_reference: NAMB reference to record on every booking
+            horizon_days: Days after start_date to search for room
+
+        Returns:
+            AllocationResult
+        """
+        from trade_tests.models import TradeTestApplication, TradeTestBooking
+
+        with transaction.atomic():
+            rows = list(
+                TradeTestBooking.objects.select_for_update(of=('self',)).filter(
+                    pk__in=booking_ids,
+                    status='AWAITING_SCHEDULE',
+                    scheduled_date__isnull=True,
+                ).annotate(
+                    test_centre_id=Coalesce('centre', 'application__centre')
+                ).order_by('submission_date', 'pk').values_list(
+                    'id', 'test_centre_id', 'trade_id', 'application_id'
+                )
+            )
+            requests = [BookingRequest(pk, centre_id, trade_id) for pk, centre_id, trade_id, _ in rows]
+            application_ids = {pk: application_id for pk, _, _, application_id in rows}
+
+            centres = TradeTestScheduler.load_capacity(
+                requests, start_date, start_date + timedelta(days=horizon_days)
+            )
+            result = allocate_slots(requests, centres, start_date, horizon_days)
+
+            now = timezone.now()
+            TradeTestBooking.objects.bulk_update([
+                TradeTestBooking(
+                    pk=booking_id,
+                    centre_id=centre_id,
+                    scheduled_date=day,
+                    scheduled_time=scheduled_time,
+                    namb_reference=namb_reference,
+                    status='CONFIRMED',
+                    updated_at=now,
+                )
+                for booking_id, (centre_id, day) in result.assigned.items()
+            ], ['centre_id', 'scheduled_date', 'scheduled_time', 'namb_reference', 'status', 'updated_at'],
+                batch_size=500)
+
+            TradeTestApplication.objects.filter(
+                pk__in={application_ids[booking_id] for booking_id in result.assigned}
+            ).update(status='SCHEDULED', updated_at=now)
+
+            scheduled_ids = list(result.assigned)
+            if scheduled_ids:
+                transaction.on_commit(lambda: TradeTestScheduler.queue_notifications(scheduled_ids))
+
+        logger.info(
+            f"Scheduled {len(result.assigned)} trade test bookings from {start_date}, "
+            f"{len(result.unassigned)} could not be placed"
+        )
+        return result
+
+    @staticmethod
+    def queue_notifications(booking_ids: List[int]) -> None:
+        """Notify learners of their dates in one background job (inline without Celery)."""
+        from trade_tests.tasks import CELERY_AVAILABLE, send_schedule_notifications
+
+        if CELERY_AVAILABLE:
+            send_schedule_notifications.delay(booking_ids)
+        else:
+            send_schedule_notifications(booking_ids)
@@ -6,12 +6,16 @@ Handles automated notifications and workflow actions:
 - Auto-create next attempt booking on NOT_YET_COMPETENT
 - Notify on competent result
 """
+import logging
+
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from .models import TradeTestBooking, TradeTestResult
 
+logger = logging.getLogger(__name__)
+
 
 @receiver(pre_save, sender=TradeTestBooking)
 def track_schedule_change(sender, instance, **kwargs):
@@ -109,30 +113,62 @@ def handle_result_saved(sender, instance, created, **kwargs):
         send_success_notification(instance)
 
 
-def send_schedule_notification(booking):
+def _notify_learner(learner, title, message, link):
     """
-    Send email/SMS notification when trade test is scheduled.
+    In-app notification (plus the learner's preferred email/SMS, delivered
+    in the background) for a learner with a portal account.
     """
-    learner = booking.learner
+    if not learner.user_id:
+        return
+    
+    from core.services.notification_dispatch import NotificationDispatcher
     
-    # Create system notification
     try:
-        from core.models import Notification
-        
-        Notification.objects.create(
-            recipient=learner.user if learner.user else None,
-            title='Trade Test Scheduled',
-            message=f'Your trade test for {booking.trade.name} has been scheduled for '
-                    f'{booking.scheduled_date.strftime("%d %B %Y")} at {booking.centre.name}.',
-            notification_type='TRADE_TEST',
-            link=f'/trade-tests/bookings/{booking.pk}/',
+        NotificationDispatcher.dispatch(
+            recipients=[learner.user_id],
+            notification_type='SYSTEM',
+            title=title,
+            message=message,
+            link=link,
         )
     except Exception:
-        pass  # Notification model may not exist or be different
+        logger.exception(f"Could not notify learner {learner.pk}: {title}")
+
+
+def build_schedule_notification(booking):
+    """
+    (user id, NotificationMessage) for a booking's test date, or None if the
+    learner has no portal account. Shared by the per-booking signal and
+    the batched trade_tests.tasks.send_schedule_notifications job.
+    """
+    from core.services.notification_dispatch import NotificationMessage
+    
+    learner = booking.learner
+    if not learner.user_id:
+        return None
     
-    # TODO: Integrate with SMS/Email service
-    # send_sms(learner.phone_mobile, message)
-    # send_email(learner.email, subject, message)
+    return learner.user_id, NotificationMessage(
+        notification_type='SYSTEM',
+        title='Trade Test Scheduled',
+        message=f'Your trade test for {booking.trade.name} has been scheduled for '
+                f'{booking.scheduled_date.strftime("%d %B %Y")} at {booking.centre.name}.',
+        link=f'/trade-tests/bookings/{booking.pk}/',
+    )
+
+
+def send_schedule_notification(booking):
+    """
+    Notify the learner (in-app, email/SMS per their preferences) when a
+    trade test is scheduled.
+    """
+    from core.services.notification_dispatch import NotificationDispatcher
+    
+    try:
+        item = build_schedule_notification(booking)
+        if item:
+            NotificationDispatcher.dispatch_many([item])
+    except Exception:
+        logger.exception(f"Could not send schedule notification for booking {booking.pk}")
 
 
 def send_next_attempt_notification(result, next_booking):
@@ -142,19 +178,13 @@ def send_next_attempt_notification(result, next_booking):
     learner = result.booking.learner
     attempt_num = next_booking.attempt_number
     
-    try:
-        from core.models import Notification
-        
-        Notification.objects.create(
-            recipient=learner.user if learner.user else None,
-            title=f'Trade Test Attempt {attempt_num} Created',
-            message=f'Your attempt {attempt_num} for {result.booking.trade.name} has been '
-                    f'registered. You will be notified when the test date is confirmed.',
-            notification_type='TRADE_TEST',
-            link=f'/trade-tests/bookings/{next_booking.pk}/',
-        )
-    except Exception:
-        pass
+    _notify_learner(
+        learner,
+        title=f'Trade Test Attempt {attempt_num} Created',
+        message=f'Your attempt {attempt_num} for {result.booking.trade.name} has been '
+                f'registered. You will be notified when the test date is confirmed.',
+        link=f'/trade-tests/bookings/{next_booking.pk}/',
+    )
 
 
 def send_final_attempt_failed_notification(result):
@@ -163,19 +193,13 @@ def send_final_attempt_failed_notification(result):
     """
     learner = result.booking.learner
     
-    try:
-        from core.models import Notification
-        
-        Notification.objects.create(
-            recipient=learner.user if learner.user else None,
-            title='Trade Test - All Attempts Used',
-            message=f'You have used all 3 attempts for {result.booking.trade.name}. '
-                    f'Please contact the training centre for guidance on next steps.',
-            notification_type='TRADE_TEST',
-            link=f'/trade-tests/applications/{result.booking.application.pk}/',
-        )
-    except Exception:
-        pass
+    _notify_learner(
+        learner,
+        title='Trade Test - All Attempts Used',
+        message=f'You have used all 3 attempts for {result.booking.trade.name}. '
+                f'Please contact the training centre for guidance on next steps.',
+        link=f'/trade-tests/applications/{result.booking.application.pk}/',
+    )
 
 
 def send_success_notification(result):
@@ -184,17 +208,11 @@ def send_success_notification(result):
     """
     learner = result.booking.learner
     
-    try:
-        from core.models import Notification
-        
-        Notification.objects.create(
-            recipient=learner.user if learner.user else None,
-            title='Trade Test Passed!',
-            message=f'Congratulations! You have passed your trade test for '
-                    f'{result.booking.trade.name}. Your assessment report will be '
-                    f'available shortly.',
-            notification_type='TRADE_TEST',
-            link=f'/trade-tests/bookings/{result.booking.pk}/',
-        )
-    except Exception:
-        pass
+    _notify_learner(
+        learner,
+        title='Trade Test Passed!',
+        message=f'Congratulations! You have passed your trade test for '
+                f'{result.booking.trade.name}. Your assessment report will be '
+                f'available shortly.',
+        link=f'/trade-tests/bookings/{result.booking.pk}/',
+    )
@@ -0,0 +1,44 @@
+"""
+Trade Tests Celery Tasks
+
+Background jobs:
+- Batched learner notifications after bulk scheduling
+"""
+import logging
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='trade_tests.tasks.send_schedule_notifications')
+def send_schedule_notifications(booking_ids):
+    """
+    Notify learners of their scheduled test dates in one batch.
+    """
+    from core.services.notification_dispatch import NotificationDispatcher
+    from trade_tests.models import TradeTestBooking
+    from trade_tests.signals import build_schedule_notification
+    
+    bookings = TradeTestBooking.objects.filter(
+        pk__in=booking_ids,
+        scheduled_date__isnull=False,
+    ).select_related('learner', 'trade', 'centre')
+    
+    items = [item for item in (build_schedule_notification(booking) for booking in bookings) if item]
+    NotificationDispatcher.dispatch_many(items)
+    
+    logger.info(f"Sent {len(items)} trade test schedule notifications")
+    return {'notified': len(items)}
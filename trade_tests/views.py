@@ -30,6 +30,7 @@ from .forms import (
     ARPLAssessmentForm,
     TradeTestCentreForm,
 )
+from .services.scheduling import TradeTestScheduler
 
 
 # =============================================================================
@@ -413,7 +414,12 @@ def record_result(request, pk):
 
 @login_required
 def bulk_schedule_entry(request):
-    """Bulk schedule entry for multiple bookings"""
+    """
+    Bulk schedule entry for multiple bookings
+    
+    The chosen date is the earliest test date; bookings that don't fit
+    within centre and session capacity on it roll over to later days.
+    """
     pending_bookings = TradeTestBooking.objects.filter(
         status='AWAITING_SCHEDULE',
         scheduled_date__isnull=True
@@ -427,16 +433,24 @@ def bulk_schedule_entry(request):
             scheduled_time = form.cleaned_data.get('scheduled_time')
             namb_reference = form.cleaned_data.get('namb_reference', '')
             
-            updated = TradeTestBooking.objects.filter(
-                pk__in=booking_ids
-            ).update(
-                scheduled_date=scheduled_date,
+            # Packs bookings into the earliest sessions with room, starting
+            # from the chosen date
+            result = TradeTestScheduler.schedule(
+                booking_ids=[int(pk) for pk in booking_ids],
+                start_date=scheduled_date,
                 scheduled_time=scheduled_time,
                 namb_reference=namb_reference,
-                status='CONFIRMED'
             )
             
-            messages.success(request, f'{updated} bookings scheduled for {scheduled_date}.')
+            if result.assigned:
+                dates = [day for _, day in result.assigned.values()]
+                messages.success(
+                    request,
+                    f'{len(result.assigned)} bookings scheduled between {min(dates)} and {max(dates)}.'
+                )
+            if result.unassigned:
+                reasons = ', '.join(sorted(set(result.unassigned.values())))
+                messages.warning(request, f'{len(result.unassigned)} bookings could not be scheduled: {reasons}.')
             return redirect('trade_tests:bulk_schedule')
     else:
         form = BulkScheduleForm(pending_bookings=pending_bookings)
@@ -4,7 +4,8 @@ SOP (Standard Operating Procedures) Admin Configuration
 from django.contrib import admin
 from .models import (
     SOPCategory, SOP, SOPStep, Task,
-    ProcessFlow, ProcessStage, ProcessStageTransition, TransitionAttemptLog
+    ProcessFlow, ProcessStage, ProcessStageTransition, TransitionAttemptLog,
+    TransitionAttemptSummary
 )
 
 
@@ -130,3 +131,12 @@ class TransitionAttemptLogAdmin(admin.ModelAdmin):
     readonly_fields = ['process_flow', 'entity_type', 'entity_id', 'from_stage', 'to_stage', 
                        'was_allowed', 'was_blocked', 'block_reason', 'attempted_by', 
                        'attempted_at', 'ip_address', 'reason_provided']
+
+
+@admin.register(TransitionAttemptSummary)
+class TransitionAttemptSummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'entity_type', 'from_stage', 'to_stage', 'allowed_count']
+    list_filter = ['entity_type', 'date']
+    search_fields = ['from_stage', 'to_stage']
+    date_hierarchy = 'date'
+    readonly_fields = ['process_flow', 'entity_type', 'from_stage', 'to_stage', 'date', 'allowed_count']
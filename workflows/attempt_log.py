@@ -0,0 +1,283 @@
+"""
+Transition Attempt Log Buffer
+
+TransitionService.validate_and_log_transition records attempts here instead
+of inserting a TransitionAttemptLog row per call. Inside a buffer scope
+(TransitionAttemptBufferMiddleware for requests, buffer_transition_attempts()
+for jobs and bulk moves) attempts are collected and written with one
+bulk_create:
+- Attempts made inside a transaction count once that transaction commits
+  (each registers a transaction.on_commit marker). The batch is written when
+  the scope ends, which is always outside any transaction: the outermost
+  scope must be opened outside ATOMIC_REQUESTS / job transactions (as the
+  middleware does), and nested scopes hand their attempts to the enclosing
+  one.
+- If the transaction rolls back, allowed attempts are dropped (the status
+  change did not happen either) but blocked attempts are spilled: written on
+  their own after the rollback, so the blocked-attempt reports stay complete.
+  A spill that cannot be written is logged with the full record.
+Outside a scope each attempt is saved immediately, as before.
+
+compact_allowed_attempts (workflows.tasks.compact_transition_attempts, daily
+via Celery Beat) rolls allowed attempts older than the retention period up
+into daily TransitionAttemptSummary counts and deletes them, one short
+transaction per chunk. Blocked attempts are never compacted.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.transaction import TransactionManagementError
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+# Allowed attempts older than this are compacted into daily summaries
+DEFAULT_RETENTION_DAYS = 90
+
+# Rows summarised and deleted per transaction while compacting
+DELETE_CHUNK_SIZE = 5000
+
+_local = threading.local()
+
+
+def retention_days() -> int:
+    return getattr(settings, 'TRANSITION_LOG_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def _in_transaction() -> bool:
+    """Inside a real transaction (TestCase's wrapping atomic blocks do not count)."""
+    return any(not getattr(block, '_from_testcase', False) for block in connection.atomic_blocks)
+
+
+class _PendingAttempt:
+    __slots__ = ('entry', 'committed')
+
+    def __init__(self, entry, committed: bool):
+        self.entry = entry
+        self.committed = committed
+
+    def mark_committed(self):
+        self.committed = True
+
+
+class TransitionAttemptBuffer:
+    """Attempts collected in one buffer scope."""
+
+    def __init__(self):
+        self.pending: List[_PendingAttempt] = []
+
+    def add(self, entry) -> None:
+        if _in_transaction():
+            attempt = _PendingAttempt(entry, committed=False)
+            transaction.on_commit(attempt.mark_committed)
+        else:
+            attempt = _PendingAttempt(entry, committed=True)
+        self.pending.append(attempt)
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write committed attempts in one bulk_create and spill blocked
+        attempts whose transaction rolled back.
+
+        Returns:
+            Dict with written, spilled and dropped counts
+        """
+        pending, self.pending = self.pending, []
+        committed = [a.entry for a in pending if a.committed]
+        rolled_back = [a.entry for a in pending if not a.committed]
+        spilled = [entry for entry in rolled_back if entry.was_blocked]
+
+        _bulk_write(committed)
+        if spilled:
+            _spill(spilled)
+        return {
+            'written': len(committed),
+            'spilled': len(spilled),
+            'dropped': len(rolled_back) - len(spilled),
+        }
+
+
+def _bulk_write(entries) -> None:
+    from .models import TransitionAttemptLog
+
+    if entries:
+        TransitionAttemptLog.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+
+
+def _spill(entries) -> None:
+    """Write blocked attempts whose transaction rolled back."""
+    try:
+        _bulk_write(entries)
+    except Exception:
+        for entry in entries:
+            logger.error(
+                'Lost blocked transition attempt: %s',
+                {
+                    'process_flow_id': entry.process_flow_id,
+                    'entity_type': entry.entity_type,
+                    'entity_id': entry.entity_id,
+                    'from_stage': entry.from_stage,
+                    'to_stage': entry.to_stage,
+                    'block_reason': entry.block_reason,
+                    'attempted_by_id': entry.attempted_by_id,
+                    'attempted_at': entry.attempted_at.isoformat(),
+                },
+            )
+        logger.exception(f'Could not spill {len(entries)} blocked transition attempts')
+
+
+def current_buffer() -> Optional[TransitionAttemptBuffer]:
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def record_attempt(entry) -> None:
+    """
+    Record a TransitionAttemptLog (unsaved) in the active buffer, or save
+    it immediately when no buffer scope is active.
+    """
+    buffer = current_buffer()
+    if buffer is None:
+        entry.save()
+    else:
+        buffer.add(entry)
+
+
+@contextmanager
+def buffer_transition_attempts():
+    """
+    Collect transition attempts made in the block and write them in one
+    batch when it ends.
+
+    Raises:
+        TransactionManagementError: If opened inside a transaction without an
+            enclosing scope (a rollback would lose its blocked attempts)
+
+    Usage:
+        with buffer_transition_attempts():
+            for enrollment in enrollments:
+                TransitionService.validate_and_log_transition(...)
+    """
+    parent = current_buffer()
+    if parent is None and _in_transaction():
+        raise TransactionManagementError(
+            'buffer_transition_attempts() must be opened outside transaction.atomic()'
+        )
+    buffer = TransitionAttemptBuffer()
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(buffer)
+    try:
+        yield buffer
+    finally:
+        stack.pop()
+        if parent is not None and _in_transaction():
+            # The enclosing scope ends outside the transaction, so it can tell
+            # committed attempts from rolled-back ones and spill the latter
+            parent.pending.extend(buffer.pending)
+            buffer.pending = []
+        else:
+            buffer.flush()
+
+
+# =============================================================================
+# RETENTION
+# =============================================================================
+
+def compact_allowed_attempts(days: Optional[int] = None, now=None) -> Dict[str, int]:
+    """
+    Roll allowed attempts older than `days` into daily TransitionAttemptSummary
+    counts and delete them. Blocked attempts are kept for reporting.
+
+    Args:
+        days: Retention period (defaults to TRANSITION_LOG_RETENTION_DAYS)
+        now: Current time (defaults to timezone.now())
+
+    Returns:
+        Dict with compacted row and summary counts
+    """
+    from .models import TransitionAttemptLog
+
+    days = retention_days() if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    old_allowed = TransitionAttemptLog.objects.filter(was_blocked=False, attempted_at__lt=cutoff)
+
+    last_pk = old_allowed.order_by('-pk').values_list('pk', flat=True).first()
+    if last_pk is None:
+        return {'compacted': 0, 'summaries': 0}
+    # Fix the set being compacted so rows written meanwhile are left alone
+    batch = old_allowed.filter(pk__lte=last_pk).order_by('pk')
+
+    # Each chunk is summarised and deleted together, so an interrupted run
+    # never counts a row twice and no transaction spans the whole backlog
+    compacted = 0
+    summary_keys = set()
+    while True:
+        with transaction.atomic():
+            ids = list(batch.select_for_update().values_list('pk', flat=True)[:DELETE_CHUNK_SIZE])
+            if not ids:
+                break
+            chunk = TransitionAttemptLog.objects.filter(pk__in=ids)
+            summary_keys |= _add_to_summaries(chunk)
+            compacted += chunk.delete()[0]
+
+    logger.info(f'Compacted {compacted} allowed transition attempts older than {days} days')
+    return {'compacted': compacted, 'summaries': len(summary_keys)}
+
+
+def _add_to_summaries(attempts) -> set:
+    """
+    Add the daily allowed counts of `attempts` to TransitionAttemptSummary
+    (call inside a transaction).
+
+    Returns:
+        Summary keys touched
+    """
+    from .models import TransitionAttemptSummary
+
+    groups = attempts.annotate(day=TruncDate('attempted_at')).values(
+        'process_flow_id', 'entity_type', 'from_stage', 'to_stage', 'day'
+    ).annotate(attempts=Count('id')).order_by()
+
+    counts = {
+        (g['process_flow_id'], g['entity_type'], g['from_stage'], g['to_stage'], g['day']): g['attempts']
+        for g in groups
+    }
+    existing = {
+        (s.process_flow_id, s.entity_type, s.from_stage, s.to_stage, s.date): s
+        for s in TransitionAttemptSummary.objects.select_for_update().filter(
+            date__in={key[4] for key in counts},
+            process_flow_id__in={key[0] for key in counts},
+        )
+    }
+
+    to_create, to_update = [], []
+    for key, attempts_count in counts.items():
+        summary = existing.get(key)
+        if summary is None:
+            flow_id, entity_type, from_stage, to_stage, day = key
+            to_create.append(TransitionAttemptSummary(
+                process_flow_id=flow_id,
+                entity_type=entity_type,
+                from_stage=from_stage,
+                to_stage=to_stage,
+                date=day,
+                allowed_count=attempts_count,
+            ))
+        else:
+            summary.allowed_count += attempts_count
+            to_update.append(summary)
+
+    TransitionAttemptSummary.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+    TransitionAttemptSummary.objects.bulk_update(to_update, ['allowed_count'], batch_size=BULK_BATCH_SIZE)
+    return set(counts)
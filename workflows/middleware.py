@@ -0,0 +1,19 @@
+"""
+Workflows middleware
+"""
+from workflows.attempt_log import buffer_transition_attempts
+
+
+class TransitionAttemptBufferMiddleware:
+    """Batch the request's transition attempt log writes (see workflows.attempt_log).
+
+    Sits outside the view (and any ATOMIC_REQUESTS transaction), so attempts
+    are written after the request's transaction has committed or rolled back.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffer_transition_attempts():
+            return self.get_response(request)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0004_alter_sop_options_alter_sop_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transitionattemptlog',
+            name='attempted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='TransitionAttemptSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(max_length=50)),
+                ('from_stage', models.CharField(max_length=30)),
+                ('to_stage', models.CharField(max_length=30)),
+                ('date', models.DateField()),
+                ('allowed_count', models.PositiveIntegerField(default=0)),
+                ('process_flow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transition_summaries', to='workflows.processflow')),
+            ],
+            options={
+                'verbose_name': 'Transition Attempt Summary',
+                'verbose_name_plural': 'Transition Attempt Summaries',
+                'ordering': ['-date'],
+                'unique_together': {('process_flow', 'entity_type', 'from_stage', 'to_stage', 'date')},
+            },
+        ),
+    ]
@@ -7,6 +7,7 @@ This module provides:
 """
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.urls import reverse, NoReverseMatch
 from core.models import AuditedModel
 
@@ -332,28 +333,34 @@ class ProcessStageTransition(AuditedModel):
         if not self.is_allowed:
             return False, f"Transition from {self.from_stage.name} to {self.to_stage.name} is not allowed"
         
-        # Check validation rules
-        rules = self.validation_rules
-        errors = []
-        
-        # Check required fields
-        required_fields = rules.get('required_fields', [])
-        for field in required_fields:
-            value = getattr(instance, field, None)
-            if not value:
-                errors.append(f"{field.replace('_', ' ').title()} is required for this transition")
-        
-        # Check date requirements
-        date_checks = rules.get('date_checks', {})
-        for field, check in date_checks.items():
-            value = getattr(instance, field, None)
-            if check == 'must_be_set' and not value:
-                errors.append(f"{field.replace('_', ' ').title()} must be set for this transition")
-        
-        if errors:
-            return False, "; ".join(errors)
-        
-        return True, None
+        return check_validation_rules(self.validation_rules, instance)
+
+
+def check_validation_rules(rules, instance):
+    """
+    Check a transition's validation_rules against an instance.
+    Returns (is_valid, error_message)
+    """
+    errors = []
+    
+    # Check required fields
+    required_fields = rules.get('required_fields', [])
+    for field in required_fields:
+        value = getattr(instance, field, None)
+        if not value:
+            errors.append(f"{field.replace('_', ' ').title()} is required for this transition")
+    
+    # Check date requirements
+    date_checks = rules.get('date_checks', {})
+    for field, check in date_checks.items():
+        value = getattr(instance, field, None)
+        if check == 'must_be_set' and not value:
+            errors.append(f"{field.replace('_', ' ').title()} must be set for this transition")
+    
+    if errors:
+        return False, "; ".join(errors)
+    
+    return True, None
 
 
 class TransitionAttemptLog(models.Model):
@@ -379,7 +386,8 @@ class TransitionAttemptLog(models.Model):
         null=True,
         related_name='transition_attempts'
     )
-    attempted_at = models.DateTimeField(auto_now_add=True)
+    # Set when the attempt is made; buffered rows are written later (workflows.attempt_log)
+    attempted_at = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     reason_provided = models.TextField(blank=True)
     
@@ -395,3 +403,25 @@ class TransitionAttemptLog(models.Model):
     def __str__(self):
         status = "Allowed" if self.was_allowed else "Blocked"
         return f"{self.entity_type}#{self.entity_id}: {self.from_stage} → {self.to_stage} ({status})"
+
+
+class TransitionAttemptSummary(models.Model):
+    """
+    Daily counts of allowed transition attempts compacted out of
+    TransitionAttemptLog by the retention job. Blocked attempts stay in the log.
+    """
+    process_flow = models.ForeignKey(ProcessFlow, on_delete=models.CASCADE, related_name='transition_summaries')
+    entity_type = models.CharField(max_length=50)
+    from_stage = models.CharField(max_length=30)
+    to_stage = models.CharField(max_length=30)
+    date = models.DateField()
+    allowed_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Transition Attempt Summary"
+        verbose_name_plural = "Transition Attempt Summaries"
+        ordering = ['-date']
+        unique_together = ['process_flow', 'entity_type', 'from_stage', 'to_stage', 'date']
+    
+    def __str__(self):
+        return f"{self.entity_type} {self.date}: {self.from_stage} → {self.to_stage} ({self.allowed_count})"
@@ -9,6 +9,8 @@ from django.db import transaction
 from django.utils import timezone
 
 from .models import Task
+from .attempt_log import record_attempt
+from .transition_graph import get_flow_graph
 
 
 class TaskService:
@@ -92,6 +94,9 @@ class TransitionService:
     """
     Service for managing status transitions with business rule enforcement.
     Validates transitions against ProcessFlow configuration and logs attempts.
+
+    Lookups use the compiled transition graph (workflows.transition_graph),
+    so checks run without queries once the graph is cached.
     """
     
     @classmethod
@@ -103,45 +108,33 @@ class TransitionService:
             is_active=True
         ).prefetch_related('stages', 'transitions').first()
     
+    @classmethod
+    def get_flow_graph(cls, entity_type: str):
+        """Get the compiled graph of the active ProcessFlow for an entity type"""
+        return get_flow_graph(entity_type)
+    
     @classmethod
     def get_allowed_transitions(cls, entity_type: str, from_stage_code: str) -> List[Dict]:
         """
         Get all allowed transitions from a given stage.
         Returns list of dicts with stage info for UI dropdown.
         """
-        from .models import ProcessStageTransition
-        
-        process_flow = cls.get_process_flow(entity_type)
-        if not process_flow:
+        flow = cls.get_flow_graph(entity_type)
+        if not flow:
             # No process flow defined - allow all transitions (legacy behavior)
             return None
         
-        transitions = ProcessStageTransition.objects.filter(
-            process_flow=process_flow,
-            from_stage__code=from_stage_code,
-            is_allowed=True
-        ).select_related('to_stage').order_by('to_stage__sequence_order')
-        
-        return [
-            {
-                'code': t.to_stage.code,
-                'name': t.to_stage.name,
-                'color': t.to_stage.color,
-                'requires_reason': t.requires_reason or t.to_stage.requires_reason_on_entry,
-                'requires_approval': t.requires_approval,
-            }
-            for t in transitions
-        ]
+        return [edge.as_option() for edge in flow.allowed_from(from_stage_code)]
     
     @classmethod
     def can_transition(cls, entity_type: str, from_stage_code: str, to_stage_code: str) -> bool:
         """Check if a transition is allowed (simple boolean)"""
-        process_flow = cls.get_process_flow(entity_type)
-        if not process_flow:
+        flow = cls.get_flow_graph(entity_type)
+        if not flow:
             # No process flow defined - allow all transitions
             return True
         
-        return process_flow.can_transition(from_stage_code, to_stage_code)
+        return flow.can_transition(from_stage_code, to_stage_code)
     
     @classmethod
     def validate_and_log_transition(
@@ -158,21 +151,27 @@ class TransitionService:
         """
         Validate a transition and log the attempt.
         Returns (is_valid, error_message, transition_object)
+
+        transition_object is the compiled TransitionEdge, which carries the
+        is_allowed / requires_reason / to_stage attributes of the rule.
+
+        The attempt is recorded through workflows.attempt_log, so inside a
+        buffer scope it is written in a batch after commit.
         """
-        from .models import ProcessFlow, ProcessStageTransition, TransitionAttemptLog
+        from .models import TransitionAttemptLog
         
-        process_flow = cls.get_process_flow(entity_type)
+        flow = cls.get_flow_graph(entity_type)
         
         # If no process flow is configured, allow all transitions (legacy behavior)
-        if not process_flow:
+        if not flow:
             return True, None, None
         
         # Find the transition rule
-        transition = process_flow.get_transition(from_stage_code, to_stage_code)
+        transition = flow.get_transition(from_stage_code, to_stage_code)
         
         # Log the attempt
         log_entry = TransitionAttemptLog(
-            process_flow=process_flow,
+            process_flow_id=flow.flow_id,
             entity_type=entity_type,
             entity_id=entity_id,
             from_stage=from_stage_code,
@@ -187,14 +186,14 @@ class TransitionService:
             log_entry.was_allowed = False
             log_entry.was_blocked = True
             log_entry.block_reason = f"No transition rule defined from {from_stage_code} to {to_stage_code}"
-            log_entry.save()
+            record_attempt(log_entry)
             return False, f"Transition from {from_stage_code} to {to_stage_code} is not configured", None
         
         if not transition.is_allowed:
             log_entry.was_allowed = False
             log_entry.was_blocked = True
             log_entry.block_reason = "Transition is explicitly blocked in process flow configuration"
-            log_entry.save()
+            record_attempt(log_entry)
             return False, f"Transition from {from_stage_code} to {to_stage_code} is not allowed", None
         
         # Validate using transition's validation rules
@@ -204,46 +203,37 @@ class TransitionService:
             log_entry.was_allowed = False
             log_entry.was_blocked = True
             log_entry.block_reason = error_message
-            log_entry.save()
+            record_attempt(log_entry)
             return False, error_message, transition
         
         # Check if reason is required but not provided
-        if (transition.requires_reason or 
-            (transition.to_stage and transition.to_stage.requires_reason_on_entry)):
+        if transition.reason_required:
             if not reason.strip():
                 log_entry.was_allowed = False
                 log_entry.was_blocked = True
                 log_entry.block_reason = "Reason is required for this transition"
-                log_entry.save()
+                record_attempt(log_entry)
                 return False, "Please provide a reason for this status change", transition
         
         # Transition is valid
         log_entry.was_allowed = True
         log_entry.was_blocked = False
-        log_entry.save()
+        record_attempt(log_entry)
         
         return True, None, transition
     
     @classmethod
     def get_stage_info(cls, entity_type: str, stage_code: str) -> Optional[Dict]:
         """Get information about a specific stage"""
-        process_flow = cls.get_process_flow(entity_type)
-        if not process_flow:
+        flow = cls.get_flow_graph(entity_type)
+        if not flow:
             return None
         
-        stage = process_flow.get_stage(stage_code)
+        stage = flow.get_stage(stage_code)
         if not stage:
             return None
         
-        return {
-            'code': stage.code,
-            'name': stage.name,
-            'description': stage.description,
-            'color': stage.color,
-            'icon': stage.icon,
-            'stage_type': stage.stage_type,
-            'sequence_order': stage.sequence_order,
-        }
+        return stage.as_info()
     
     @classmethod
     def get_blocked_attempts(cls, entity_type: str = None, days: int = 30) -> List:
@@ -0,0 +1,20 @@
+"""
+Signals for the workflows app
+Invalidates the compiled transition graph when process flow configuration changes
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from workflows.transition_graph import invalidate_transition_graph
+
+
+@receiver([post_save, post_delete], sender='workflows.ProcessFlow')
+@receiver([post_save, post_delete], sender='workflows.ProcessStage')
+@receiver([post_save, post_delete], sender='workflows.ProcessStageTransition')
+def invalidate_transition_cache(sender, **kwargs):
+    """
+    Bump the transition graph version once the change is committed, so no
+    process recompiles the graph from rows that are not yet visible.
+    """
+    transaction.on_commit(invalidate_transition_graph)
@@ -0,0 +1,35 @@
+"""
+Workflows Celery Tasks
+
+Scheduled workflow jobs:
+- Nightly compaction of old allowed transition attempts
+"""
+import logging
+
+# Make Celery import conditional for serverless environments
+try:
+    from celery import shared_task
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    # Create a no-op decorator for when Celery is not available
+    def shared_task(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='workflows.tasks.compact_transition_attempts')
+def compact_transition_attempts(days=None):
+    """
+    Roll allowed transition attempts past the retention period into daily
+    summaries. Blocked attempts are kept.
+    Should be scheduled to run daily via Celery Beat.
+    """
+    from workflows.attempt_log import compact_allowed_attempts
+
+    return compact_allowed_attempts(days=days)
@@ -0,0 +1,244 @@
+"""
+Compiled Process Flow Graph
+
+Active ProcessFlows compiled into one immutable state graph per entity type:
+stage metadata keyed by code, every configured transition keyed by
+(from, to), and adjacency sets of allowed target stages. TransitionService
+answers can_transition, get_allowed_transitions and get_stage_info from the
+graph with dictionary lookups instead of per-call queries.
+
+The graph is built with three queries and held in process memory and in
+the shared cache under a version stamp. Saving or deleting a flow, stage or
+transition bumps the version (see workflows.signals), so every process
+rebuilds on its next lookup. GRAPH_CACHE_TIMEOUT is a safety net for
+queryset updates that bypass signals.
+"""
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from django.core.cache import cache
+
+VERSION_CACHE_KEY = 'workflows:transition_graph:version'
+GRAPH_CACHE_KEY = 'workflows:transition_graph:{version}'
+GRAPH_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# Process-local copy of the shared graph: (version, loaded_at, graph)
+_local_graph: Optional[Tuple[str, float, 'TransitionGraph']] = None
+
+
+@dataclass(frozen=True)
+class StageNode:
+    code: str
+    name: str
+    description: str
+    color: str
+    icon: str
+    stage_type: str
+    sequence_order: int
+    requires_reason_on_entry: bool
+
+    def as_info(self) -> Dict:
+        """Stage details in the TransitionService.get_stage_info shape."""
+        return {
+            'code': self.code,
+            'name': self.name,
+            'description': self.description,
+            'color': self.color,
+            'icon': self.icon,
+            'stage_type': self.stage_type,
+            'sequence_order': self.sequence_order,
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class TransitionEdge:
+    """
+    A configured transition. Exposes the ProcessStageTransition attributes
+    callers use (is_allowed, requires_reason, requires_approval, to_stage,
+    validate_transition) without holding a model instance.
+    """
+    id: int
+    from_stage: StageNode
+    to_stage: StageNode
+    is_allowed: bool
+    requires_reason: bool
+    requires_approval: bool
+    approval_role: str
+    validation_rules: Dict = field(default_factory=dict)
+
+    @property
+    def reason_required(self) -> bool:
+        return self.requires_reason or self.to_stage.requires_reason_on_entry
+
+    def validate_transition(self, instance):
+        """
+        Validate the transition for an instance (as ProcessStageTransition.validate_transition).
+        Returns (is_valid, error_message)
+        """
+        from .models import check_validation_rules
+
+        if not self.is_allowed:
+            return False, f"Transition from {self.from_stage.name} to {self.to_stage.name} is not allowed"
+        return check_validation_rules(self.validation_rules, instance)
+
+    def as_option(self) -> Dict:
+        """Target stage in the TransitionService.get_allowed_transitions shape."""
+        return {
+            'code': self.to_stage.code,
+            'name': self.to_stage.name,
+            'color': self.to_stage.color,
+            'requires_reason': self.reason_required,
+            'requires_approval': self.requires_approval,
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class FlowGraph:
+    """Compiled stages and transitions of one active ProcessFlow."""
+    flow_id: int
+    entity_type: str
+    version: int
+    stages: Dict[str, StageNode]
+    edges: Dict[Tuple[str, str], TransitionEdge]
+    # from stage code -> codes of allowed target stages
+    allowed: Dict[str, FrozenSet[str]]
+    # from stage code -> allowed edges ordered by target sequence_order
+    allowed_edges: Dict[str, Tuple[TransitionEdge, ...]]
+
+    def get_stage(self, stage_code: str) -> Optional[StageNode]:
+        return self.stages.get(stage_code)
+
+    def get_transition(self, from_stage_code: str, to_stage_code: str) -> Optional[TransitionEdge]:
+        return self.edges.get((from_stage_code, to_stage_code))
+
+    def can_transition(self, from_stage_code: str, to_stage_code: str) -> bool:
+        return to_stage_code in self.allowed.get(from_stage_code, ())
+
+    def allowed_from(self, from_stage_code: str) -> Tuple[TransitionEdge, ...]:
+        return self.allowed_edges.get(from_stage_code, ())
+
+
+class TransitionGraph:
+    """Compiled graphs of every active ProcessFlow, keyed by entity type."""
+
+    def __init__(self, flows: Dict[str, FlowGraph]):
+        self._flows = flows
+
+    def get_flow(self, entity_type: str) -> Optional[FlowGraph]:
+        return self._flows.get(entity_type)
+
+    @classmethod
+    def build(cls) -> 'TransitionGraph':
+        """Compile all active process flows (three queries)."""
+        from .models import ProcessFlow, ProcessStage, ProcessStageTransition
+
+        flows = {
+            flow_id: (entity_type, version)
+            for flow_id, entity_type, version in ProcessFlow.objects.filter(
+                is_active=True
+            ).values_list('id', 'entity_type', 'version')
+        }
+
+        stages_by_id = {}
+        stages_by_flow = defaultdict(dict)
+        for row in ProcessStage.objects.filter(process_flow_id__in=list(flows)).values(
+            'id', 'process_flow_id', 'code', 'name', 'description', 'color', 'icon',
+            'stage_type', 'sequence_order', 'requires_reason_on_entry',
+        ).order_by('sequence_order', 'id'):
+            stage = StageNode(
+                code=row['code'],
+                name=row['name'],
+                description=row['description'],
+                color=row['color'],
+                icon=row['icon'],
+                stage_type=row['stage_type'],
+                sequence_order=row['sequence_order'],
+                requires_reason_on_entry=row['requires_reason_on_entry'],
+            )
+            stages_by_id[row['id']] = stage
+            stages_by_flow[row['process_flow_id']][stage.code] = stage
+
+        edges_by_flow = defaultdict(dict)
+        for row in ProcessStageTransition.objects.filter(process_flow_id__in=list(flows)).values(
+            'id', 'process_flow_id', 'from_stage_id', 'to_stage_id', 'is_allowed',
+            'requires_reason', 'requires_approval', 'approval_role', 'validation_rules',
+        ).order_by('id'):
+            from_stage = stages_by_id.get(row['from_stage_id'])
+            to_stage = stages_by_id.get(row['to_stage_id'])
+            if from_stage is None or to_stage is None:
+                continue
+            edges_by_flow[row['process_flow_id']][(from_stage.code, to_stage.code)] = TransitionEdge(
+                id=row['id'],
+                from_stage=from_stage,
+                to_stage=to_stage,
+                is_allowed=row['is_allowed'],
+                requires_reason=row['requires_reason'],
+                requires_approval=row['requires_approval'],
+                approval_role=row['approval_role'],
+                validation_rules=row['validation_rules'] or {},
+            )
+
+        compiled = {}
+        for flow_id, (entity_type, version) in flows.items():
+            edges = edges_by_flow[flow_id]
+            outgoing = defaultdict(list)
+            for edge in edges.values():
+                if edge.is_allowed:
+                    outgoing[edge.from_stage.code].append(edge)
+            compiled[entity_type] = FlowGraph(
+                flow_id=flow_id,
+                entity_type=entity_type,
+                version=version,
+                stages=stages_by_flow[flow_id],
+                edges=edges,
+                allowed={code: frozenset(e.to_stage.code for e in out) for code, out in outgoing.items()},
+                allowed_edges={
+                    code: tuple(sorted(out, key=lambda e: e.to_stage.sequence_order))
+                    for code, out in outgoing.items()
+                },
+            )
+        return cls(compiled)
+
+
+def invalidate_transition_graph():
+    """Bump the shared graph version so every process recompiles on next use."""
+    global _local_graph
+    _local_graph = None
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_transition_graph() -> TransitionGraph:
+    """
+    Return the compiled graph for the current version.
+
+    The process-local copy is reused while the shared version is unchanged;
+    otherwise it is loaded from the shared cache, or compiled and stored.
+    """
+    global _local_graph
+
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, None):
+            version = cache.get(VERSION_CACHE_KEY) or version
+
+    local = _local_graph
+    if local and local[0] == version and time.monotonic() - local[1] < GRAPH_CACHE_TIMEOUT:
+        return local[2]
+
+    key = GRAPH_CACHE_KEY.format(version=version)
+    graph = cache.get(key)
+    if graph is None:
+        graph = TransitionGraph.build()
+        cache.set(key, graph, GRAPH_CACHE_TIMEOUT)
+
+    _local_graph = (version, time.monotonic(), graph)
+    return graph
+
+
+def get_flow_graph(entity_type: str) -> Optional[FlowGraph]:
+    """Compiled graph of the active flow for an entity type, or None."""
+    return get_transition_graph().get_flow(entity_type)